@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import re
+import time
+import weakref
+
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CARD_TTL = 300.0
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+@dataclass
+class _CardEntry:
+    data: dict[str, Any]
+    etag: str | None
+    expires_at: float
+
+
+def _freshness(response: httpx.Response, default_ttl: float) -> float | None:
+    """Seconds a response may be reused without revalidation, `None` if not at all."""
+    cache_control = response.headers.get('Cache-Control', '').lower()
+    if 'no-store' in cache_control:
+        return None
+    if 'no-cache' in cache_control:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    return float(match.group(1)) if match else default_ttl
+
+
+class AgentCardCache:
+    """Cache of fetched agent cards shared by `A2ACardResolver` instances.
+
+    A cached card is served without a request until its freshness lifetime
+    ends: the `max-age` sent by the server, or `ttl` when the response has no
+    `Cache-Control` header. After that the card is revalidated with
+    `If-None-Match`, so an unchanged card costs a `304` without a body.
+
+    Concurrent fetches of the same card share a single request.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CARD_TTL) -> None:
+        """Initializes the AgentCardCache.
+
+        Args:
+            ttl: Freshness lifetime, in seconds, for responses that do not
+                specify one.
+        """
+        self.ttl = ttl
+        self._entries: dict[Any, _CardEntry] = {}
+        # Shared fetches per event loop: a task cannot be awaited from
+        # another loop, e.g. after `asyncio.run` started a new one.
+        self._inflight: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[Any, asyncio.Task[dict[str, Any]]]
+        ] = weakref.WeakKeyDictionary()
+
+    async def fetch(
+        self,
+        httpx_client: httpx.AsyncClient,
+        url: str,
+        http_kwargs: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Returns the card JSON at `url`, from the cache when it is fresh.
+
+        Args:
+            httpx_client: The client used when a request is needed.
+            url: The agent card URL.
+            http_kwargs: Keyword arguments passed to `httpx_client.get`. Cards
+                fetched with different headers are cached separately.
+
+        Raises:
+            httpx.HTTPStatusError: If the server answers with an error status.
+            httpx.RequestError: If the request fails.
+            json.JSONDecodeError: If the body is not JSON.
+        """
+        http_kwargs = http_kwargs or {}
+        headers = dict(http_kwargs.get('headers') or {})
+        key = (url, tuple(sorted(headers.items())))
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            return entry.data
+
+        loop_inflight = self._inflight.setdefault(
+            asyncio.get_running_loop(), {}
+        )
+        inflight = loop_inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.create_task(
+                self._revalidate(httpx_client, url, http_kwargs, key, entry)
+            )
+            loop_inflight[key] = inflight
+            inflight.add_done_callback(lambda _: loop_inflight.pop(key, None))
+        # Shield the shared request: one caller timing out must not cancel
+        # it for the others.
+        return await asyncio.shield(inflight)
+
+    def invalidate(self, url: str | None = None) -> None:
+        """Drops the cached cards for `url`, or all cards."""
+        if url is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == url]:
+            del self._entries[key]
+
+    async def _revalidate(
+        self,
+        httpx_client: httpx.AsyncClient,
+        url: str,
+        http_kwargs: dict[str, Any],
+        key: Any,
+        entry: _CardEntry | None,
+    ) -> dict[str, Any]:
+        headers = dict(http_kwargs.get('headers') or {})
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        response = await httpx_client.get(
+            url, **{**http_kwargs, 'headers': headers}
+        )
+        freshness = _freshness(response, self.ttl)
+        if response.status_code == httpx.codes.NOT_MODIFIED and entry:
+            logger.debug('Agent card at %s not modified.', url)
+            data = entry.data
+            etag = response.headers.get('ETag', entry.etag)
+        else:
+            response.raise_for_status()
+            data = response.json()
+            etag = response.headers.get('ETag')
+        if freshness is None:
+            self._entries.pop(key, None)
+        else:
+            self._entries[key] = _CardEntry(
+                data=data,
+                etag=etag,
+                expires_at=time.monotonic() + freshness,
+            )
+        return data
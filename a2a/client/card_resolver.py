@@ -7,6 +7,7 @@ import httpx
 
 from pydantic import ValidationError
 
+from a2a.client.card_cache import AgentCardCache
 from a2a.client.errors import (
     A2AClientHTTPError,
     A2AClientJSONError,
@@ -28,6 +29,7 @@ class A2ACardResolver:
         httpx_client: httpx.AsyncClient,
         base_url: str,
         agent_card_path: str = AGENT_CARD_WELL_KNOWN_PATH,
+        cache: AgentCardCache | None = None,
     ) -> None:
         """Initializes the A2ACardResolver.
 
@@ -35,10 +37,14 @@ class A2ACardResolver:
             httpx_client: An async HTTP client instance (e.g., httpx.AsyncClient).
             base_url: The base URL of the agent's host.
             agent_card_path: The path to the agent card endpoint, relative to the base URL.
+            cache: An optional `AgentCardCache`, usually shared by all
+                resolvers of the process. Without it every call fetches
+                the card.
         """
         self.base_url = base_url.rstrip('/')
         self.agent_card_path = agent_card_path.lstrip('/')
         self.httpx_client = httpx_client
+        self.cache = cache
 
     async def get_agent_card(
         self,
@@ -74,12 +80,17 @@ class A2ACardResolver:
         target_url = f'{self.base_url}/{path_segment}'
 
         try:
-            response = await self.httpx_client.get(
-                target_url,
-                **(http_kwargs or {}),
-            )
-            response.raise_for_status()
-            agent_card_data = response.json()
+            if self.cache is not None:
+                agent_card_data = await self.cache.fetch(
+                    self.httpx_client, target_url, http_kwargs
+                )
+            else:
+                response = await self.httpx_client.get(
+                    target_url,
+                    **(http_kwargs or {}),
+                )
+                response.raise_for_status()
+                agent_card_data = response.json()
             logger.info(
                 'Successfully fetched agent card data from %s: %s',
                 target_url,
@@ -70,6 +70,10 @@ class ClientConfig:
     extensions: list[str] = dataclasses.field(default_factory=list)
     """A list of extension URIs the client supports."""
 
+    batch_requests: bool = False
+    """Whether the JSON-RPC transport sends `message/send` and `tasks/get`
+    calls made in the same event loop iteration as a single batch."""
+
 
 UpdateEvent = TaskStatusUpdateEvent | TaskArtifactUpdateEvent | None
 # Alias for emitted events from client
@@ -81,6 +81,7 @@ class ClientFactory:
                     url,
                     interceptors,
                     config.extensions or None,
+                    batch_requests=config.batch_requests,
                 ),
             )
         if TransportProtocol.http_json in supported:
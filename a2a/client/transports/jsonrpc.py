@@ -1,7 +1,9 @@
+import asyncio
 import json
 import logging
 
 from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
 from typing import Any
 from uuid import uuid4
 
@@ -53,17 +55,37 @@ from a2a.utils.telemetry import SpanKind, trace_class
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _PendingBatch:
+    """Requests waiting to be sent together in one JSON-RPC batch."""
+
+    http_kwargs: dict[str, Any]
+    requests: list[tuple[dict[str, Any], asyncio.Future[Any]]] = field(
+        default_factory=list
+    )
+
+
 @trace_class(kind=SpanKind.CLIENT)
 class JsonRpcTransport(ClientTransport):
-    """A JSON-RPC transport for the A2A client."""
+    """A JSON-RPC transport for the A2A client.
 
-    def __init__(
+    With `batch_requests`, `message/send` and `tasks/get` calls issued in
+    the same event loop iteration (e.g. from `asyncio.gather`) are sent as
+    a single JSON-RPC batch, one POST for all of them. Calls are only
+    batched together when their HTTP arguments (headers, timeout, ...) are
+    equal. Servers that answer a batch with a single error object are
+    assumed not to support batches, and the calls are retried one by one.
+    """
+
+    def __init__(  # noqa: PLR0913
         self,
         httpx_client: httpx.AsyncClient,
         agent_card: AgentCard | None = None,
         url: str | None = None,
         interceptors: list[ClientCallInterceptor] | None = None,
         extensions: list[str] | None = None,
+        batch_requests: bool = False,
+        max_batch_size: int = 100,
     ):
         """Initializes the JsonRpcTransport."""
         if url:
@@ -82,6 +104,10 @@ class JsonRpcTransport(ClientTransport):
             else True
         )
         self.extensions = extensions
+        self.batch_requests = batch_requests
+        self.max_batch_size = max_batch_size
+        self._pending_batches: list[_PendingBatch] = []
+        self._batch_tasks: set[asyncio.Task[None]] = set()
 
     async def _apply_interceptors(
         self,
@@ -130,7 +156,9 @@ class JsonRpcTransport(ClientTransport):
             modified_kwargs,
             context,
         )
-        response_data = await self._send_request(payload, modified_kwargs)
+        response_data = await self._send_batchable_request(
+            payload, modified_kwargs
+        )
         response = SendMessageResponse.model_validate(response_data)
         if isinstance(response.root, JSONRPCErrorResponse):
             raise A2AClientJSONRPCError(response.root)
@@ -194,9 +222,9 @@ class JsonRpcTransport(ClientTransport):
 
     async def _send_request(
         self,
-        rpc_request_payload: dict[str, Any],
+        rpc_request_payload: dict[str, Any] | list[dict[str, Any]],
         http_kwargs: dict[str, Any] | None = None,
-    ) -> dict[str, Any]:
+    ) -> Any:
         try:
             response = await self.httpx_client.post(
                 self.url, json=rpc_request_payload, **(http_kwargs or {})
@@ -214,6 +242,89 @@ class JsonRpcTransport(ClientTransport):
                 503, f'Network communication error: {e}'
             ) from e
 
+    async def _send_batchable_request(
+        self,
+        rpc_request_payload: dict[str, Any],
+        http_kwargs: dict[str, Any] | None = None,
+    ) -> Any:
+        """Sends a request, in a batch with other calls of this tick if enabled."""
+        if not self.batch_requests:
+            return await self._send_request(rpc_request_payload, http_kwargs)
+
+        loop = asyncio.get_running_loop()
+        http_kwargs = http_kwargs or {}
+        batch = next(
+            (b for b in self._pending_batches if b.http_kwargs == http_kwargs),
+            None,
+        )
+        if batch is None:
+            batch = _PendingBatch(http_kwargs)
+            self._pending_batches.append(batch)
+            # Runs after every task that is already ready, so the calls
+            # started together end up in the same batch.
+            loop.call_soon(self._flush_batch, batch)
+        future = loop.create_future()
+        batch.requests.append((rpc_request_payload, future))
+        if len(batch.requests) >= self.max_batch_size:
+            self._flush_batch(batch)
+        return await future
+
+    def _flush_batch(self, batch: _PendingBatch) -> None:
+        if batch not in self._pending_batches:
+            return
+        self._pending_batches.remove(batch)
+        task = asyncio.create_task(self._send_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, batch: _PendingBatch) -> None:
+        payloads = [payload for payload, _ in batch.requests]
+        futures = [future for _, future in batch.requests]
+        try:
+            if len(payloads) == 1:
+                results = [
+                    await self._send_request(payloads[0], batch.http_kwargs)
+                ]
+            else:
+                logger.debug('Sending batch of %d requests', len(payloads))
+                data = await self._send_request(payloads, batch.http_kwargs)
+                if isinstance(data, list):
+                    by_id = {
+                        item.get('id'): item
+                        for item in data
+                        if isinstance(item, dict)
+                    }
+                    results = [by_id.get(p.get('id')) for p in payloads]
+                else:
+                    logger.debug(
+                        'Server did not accept a batch, sending requests one by one'
+                    )
+                    results = await asyncio.gather(
+                        *(
+                            self._send_request(payload, batch.http_kwargs)
+                            for payload in payloads
+                        ),
+                        return_exceptions=True,
+                    )
+        except Exception as e:  # noqa: BLE001
+            results = [e] * len(futures)
+
+        for payload, future, result in zip(
+            payloads, futures, results, strict=True
+        ):
+            if future.done():
+                continue
+            if result is None:
+                future.set_exception(
+                    A2AClientJSONError(
+                        f'No response for request {payload.get("id")} in batch'
+                    )
+                )
+            elif isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
     async def get_task(
         self,
         request: TaskQueryParams,
@@ -233,7 +344,9 @@ class JsonRpcTransport(ClientTransport):
             modified_kwargs,
             context,
         )
-        response_data = await self._send_request(payload, modified_kwargs)
+        response_data = await self._send_batchable_request(
+            payload, modified_kwargs
+        )
         response = GetTaskResponse.model_validate(response_data)
         if isinstance(response.root, JSONRPCErrorResponse):
             raise A2AClientJSONRPCError(response.root)
@@ -418,4 +531,6 @@ class JsonRpcTransport(ClientTransport):
 
     async def close(self) -> None:
         """Closes the httpx client."""
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
         await self.httpx_client.aclose()
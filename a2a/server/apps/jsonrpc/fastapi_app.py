@@ -78,6 +78,7 @@ class A2AFastAPIApplication(JSONRPCApplication):
         ]
         | None = None,
         max_content_length: int | None = 10 * 1024 * 1024,  # 10MB
+        max_batch_size: int | None = 100,
     ) -> None:
         """Initializes the A2AFastAPIApplication.
 
@@ -97,6 +98,8 @@ class A2AFastAPIApplication(JSONRPCApplication):
               call context.
             max_content_length: The maximum allowed content length for incoming
               requests. Defaults to 10MB. Set to None for unbounded maximum.
+            max_batch_size: The maximum number of requests in a JSON-RPC
+              batch. Defaults to 100. Set to None for unbounded maximum.
         """
         if not _package_fastapi_installed:
             raise ImportError(
@@ -112,6 +115,7 @@ class A2AFastAPIApplication(JSONRPCApplication):
             card_modifier=card_modifier,
             extended_card_modifier=extended_card_modifier,
             max_content_length=max_content_length,
+            max_batch_size=max_batch_size,
         )
 
     def add_routes_to_app(
@@ -120,6 +124,7 @@ class A2AFastAPIApplication(JSONRPCApplication):
         agent_card_url: str = AGENT_CARD_WELL_KNOWN_PATH,
         rpc_url: str = DEFAULT_RPC_URL,
         extended_agent_card_url: str = EXTENDED_AGENT_CARD_PATH,
+        metrics_url: str | None = None,
     ) -> None:
         """Adds the routes to the FastAPI application.
 
@@ -128,6 +133,8 @@ class A2AFastAPIApplication(JSONRPCApplication):
             agent_card_url: The URL for the agent card endpoint.
             rpc_url: The URL for the A2A JSON-RPC endpoint.
             extended_agent_card_url: The URL for the authenticated extended agent card endpoint.
+            metrics_url: The URL for the Prometheus metrics endpoint, e.g.
+              `METRICS_PATH`. Not served if None.
         """
         app.post(
             rpc_url,
@@ -159,11 +166,15 @@ class A2AFastAPIApplication(JSONRPCApplication):
                 self._handle_get_authenticated_extended_agent_card
             )
 
+        if metrics_url is not None:
+            app.get(metrics_url)(self._handle_get_metrics)
+
     def build(
         self,
         agent_card_url: str = AGENT_CARD_WELL_KNOWN_PATH,
         rpc_url: str = DEFAULT_RPC_URL,
         extended_agent_card_url: str = EXTENDED_AGENT_CARD_PATH,
+        metrics_url: str | None = None,
         **kwargs: Any,
     ) -> FastAPI:
         """Builds and returns the FastAPI application instance.
@@ -172,6 +183,8 @@ class A2AFastAPIApplication(JSONRPCApplication):
             agent_card_url: The URL for the agent card endpoint.
             rpc_url: The URL for the A2A JSON-RPC endpoint.
             extended_agent_card_url: The URL for the authenticated extended agent card endpoint.
+            metrics_url: The URL for the Prometheus metrics endpoint, e.g.
+              `METRICS_PATH`. Not served if None.
             **kwargs: Additional keyword arguments to pass to the FastAPI constructor.
 
         Returns:
@@ -180,7 +193,7 @@ class A2AFastAPIApplication(JSONRPCApplication):
         app = A2AFastAPI(**kwargs)
 
         self.add_routes_to_app(
-            app, agent_card_url, rpc_url, extended_agent_card_url
+            app, agent_card_url, rpc_url, extended_agent_card_url, metrics_url
         )
 
         return app
@@ -1,13 +1,18 @@
+import asyncio
 import contextlib
+import hashlib
 import json
 import logging
+import time
 import traceback
+import uuid
 
 from abc import ABC, abstractmethod
 from collections.abc import AsyncGenerator, Callable
 from typing import TYPE_CHECKING, Any
 
 from pydantic import ValidationError
+from pydantic_core import from_json
 
 from a2a.auth.user import UnauthenticatedUser
 from a2a.auth.user import User as A2AUser
@@ -33,7 +38,6 @@ from a2a.types import (
     JSONParseError,
     JSONRPCError,
     JSONRPCErrorResponse,
-    JSONRPCRequest,
     JSONRPCResponse,
     ListTaskPushNotificationConfigRequest,
     MethodNotFoundError,
@@ -45,12 +49,14 @@ from a2a.types import (
     UnsupportedOperationError,
 )
 from a2a.utils.constants import (
+    AGENT_CARD_CACHE_MAX_AGE,
     AGENT_CARD_WELL_KNOWN_PATH,
     DEFAULT_RPC_URL,
     EXTENDED_AGENT_CARD_PATH,
     PREV_AGENT_CARD_WELL_KNOWN_PATH,
 )
 from a2a.utils.errors import MethodNotImplementedError
+from a2a.utils.metrics import CONTENT_TYPE, REGISTRY, REQUEST_DURATION
 
 
 logger = logging.getLogger(__name__)
@@ -184,6 +190,7 @@ class JSONRPCApplication(ABC):
         ]
         | None = None,
         max_content_length: int | None = 10 * 1024 * 1024,  # 10MB
+        max_batch_size: int | None = 100,
     ) -> None:
         """Initializes the JSONRPCApplication.
 
@@ -203,6 +210,8 @@ class JSONRPCApplication(ABC):
               call context.
             max_content_length: The maximum allowed content length for incoming
               requests. Defaults to 10MB. Set to None for unbounded maximum.
+            max_batch_size: The maximum number of requests in a JSON-RPC
+              batch. Defaults to 100. Set to None for unbounded maximum.
         """
         if not _package_starlette_installed:
             raise ImportError(
@@ -222,6 +231,9 @@ class JSONRPCApplication(ABC):
         )
         self._context_builder = context_builder or DefaultCallContextBuilder()
         self._max_content_length = max_content_length
+        self._max_batch_size = max_batch_size
+        # (serialized body, ETag) of the last public card served.
+        self._serialized_card: tuple[bytes, str] | None = None
 
     def _generate_error_response(
         self, request_id: str | int | None, error: JSONRPCError | A2AError
@@ -237,6 +249,15 @@ class JSONRPCApplication(ABC):
         Returns:
             A `JSONResponse` object formatted as a JSON-RPC error response.
         """
+        return JSONResponse(
+            self._error_payload(request_id, error),
+            status_code=200,
+        )
+
+    def _error_payload(
+        self, request_id: str | int | None, error: JSONRPCError | A2AError
+    ) -> dict[str, Any]:
+        """Logs a JSON-RPC error and returns its response object as a dict."""
         error_resp = JSONRPCErrorResponse(
             id=request_id,
             error=error if isinstance(error, JSONRPCError) else error.root,
@@ -258,10 +279,7 @@ class JSONRPCApplication(ABC):
             if error_resp.error.data
             else '',
         )
-        return JSONResponse(
-            error_resp.model_dump(mode='json', exclude_none=True),
-            status_code=200,
-        )
+        return error_resp.model_dump(mode='json', exclude_none=True)
 
     def _allowed_content_length(self, request: Request) -> bool:
         """Checks if the request content length is within the allowed maximum.
@@ -279,6 +297,81 @@ class JSONRPCApplication(ABC):
                     return False
         return True
 
+    async def _read_body(self, request: Request) -> bytes | None:
+        """Reads the request body, stopping as soon as it exceeds the allowed maximum.
+
+        A declared `Content-Length` above the maximum is rejected before
+        anything is read; bodies without one (chunked uploads) are read in
+        chunks and abandoned once the maximum is crossed.
+
+        Args:
+            request: The incoming Starlette Request object.
+
+        Returns:
+            The body, or None if it is larger than the allowed maximum.
+        """
+        if self._max_content_length is None:
+            return await request.body()
+        if not self._allowed_content_length(request):
+            return None
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > self._max_content_length:
+                return None
+        return bytes(body)
+
+    def _validate_request(
+        self, body: Any
+    ) -> tuple[str | int | None, A2ARequestModel | A2AError]:
+        """Validates a decoded JSON-RPC request in a single pass.
+
+        The envelope is checked by hand and the body is validated once,
+        directly into the model of its method.
+
+        Args:
+            body: The decoded JSON body.
+
+        Returns:
+            The request ID (None if missing or invalid) and either the
+            validated request model or the error to respond with: invalid
+            request (-32600), method not found (-32601) or invalid params
+            (-32602).
+        """
+        if not isinstance(body, dict):
+            return None, A2AError(
+                root=InvalidRequestError(
+                    message='Request must be a JSON object'
+                )
+            )
+        request_id = body.get('id')
+        # A JSON-RPC id is a string, an integer or null; anything else makes
+        # the whole request invalid and cannot be echoed back.
+        if request_id is not None and not isinstance(request_id, str | int):
+            return None, A2AError(
+                root=InvalidRequestError(
+                    message='Request id must be a string, an integer or null'
+                )
+            )
+        method = body.get('method')
+        if body.get('jsonrpc') != '2.0' or not isinstance(method, str):
+            return request_id, A2AError(
+                root=InvalidRequestError(
+                    message="Request must have jsonrpc '2.0' and a string method"
+                )
+            )
+
+        model_class = self.METHOD_TO_MODEL.get(method)
+        if not model_class:
+            return request_id, A2AError(root=MethodNotFoundError())
+        try:
+            return request_id, model_class.model_validate(body)
+        except ValidationError as e:
+            logger.warning('Invalid params for method %s', method)
+            return request_id, A2AError(
+                root=InvalidParamsError(data=json.loads(e.json()))
+            )
+
     async def _handle_requests(self, request: Request) -> Response:  # noqa: PLR0911
         """Handles incoming POST requests to the main A2A endpoint.
 
@@ -298,56 +391,35 @@ class JSONRPCApplication(ABC):
             into JSON-RPC error responses by this method.
         """
         request_id = None
-        body = None
 
         try:
-            body = await request.json()
-            if isinstance(body, dict):
-                request_id = body.get('id')
-                # Ensure request_id is valid for JSON-RPC response (str/int/None only)
-                if request_id is not None and not isinstance(
-                    request_id, str | int
-                ):
-                    request_id = None
-            # Treat payloads lager than allowed as invalid request (-32600) before routing
-            if not self._allowed_content_length(request):
+            # 1) Read with a size cap: payloads larger than allowed are an
+            # invalid request (-32600) and are never buffered in full.
+            raw_body = await self._read_body(request)
+            if raw_body is None:
                 return self._generate_error_response(
-                    request_id,
+                    None,
                     A2AError(
                         root=InvalidRequestError(message='Payload too large')
                     ),
                 )
-            logger.debug('Request body: %s', body)
-            # 1) Validate base JSON-RPC structure only (-32600 on failure)
             try:
-                base_request = JSONRPCRequest.model_validate(body)
-            except ValidationError as e:
-                logger.exception('Failed to validate base JSON-RPC request')
+                body = from_json(raw_body)
+            except ValueError as e:
                 return self._generate_error_response(
-                    request_id,
-                    A2AError(
-                        root=InvalidRequestError(data=json.loads(e.json()))
-                    ),
+                    None, A2AError(root=JSONParseError(message=str(e)))
                 )
+            if isinstance(body, list):
+                return await self._handle_batch(request, body)
 
-            # 2) Route by method name; unknown -> -32601, known -> validate params (-32602 on failure)
-            method = base_request.method
-
-            model_class = self.METHOD_TO_MODEL.get(method)
-            if not model_class:
+            # 2) Validate once, straight into the method's request model
+            request_id, specific_request = self._validate_request(body)
+            if isinstance(specific_request, A2AError):
                 return self._generate_error_response(
-                    request_id, A2AError(root=MethodNotFoundError())
-                )
-            try:
-                specific_request = model_class.model_validate(body)
-            except ValidationError as e:
-                logger.exception('Failed to validate base JSON-RPC request')
-                return self._generate_error_response(
-                    request_id,
-                    A2AError(
-                        root=InvalidParamsError(data=json.loads(e.json()))
-                    ),
+                    request_id, specific_request
                 )
+            method = specific_request.method
+            logger.debug('Request %s: %s', request_id, method)
 
             # 3) Build call context and wrap the request for downstream handling
             call_context = self._context_builder.build(request)
@@ -373,11 +445,6 @@ class JSONRPCApplication(ABC):
             return self._generate_error_response(
                 request_id, A2AError(root=UnsupportedOperationError())
             )
-        except json.decoder.JSONDecodeError as e:
-            traceback.print_exc()
-            return self._generate_error_response(
-                None, A2AError(root=JSONParseError(message=str(e)))
-            )
         except HTTPException as e:
             if e.status_code == HTTP_413_REQUEST_ENTITY_TOO_LARGE:
                 return self._generate_error_response(
@@ -425,6 +492,106 @@ class JSONRPCApplication(ABC):
 
         return self._create_response(context, handler_result)
 
+    async def _handle_batch(self, request: Request, batch: list[Any]) -> Response:
+        """Handles a JSON-RPC batch: an array of request objects.
+
+        The requests are validated one by one and dispatched concurrently;
+        their responses are returned in an array, in request order. Streaming
+        methods cannot be answered inside an array and are rejected per item.
+        Items without an `id` member are notifications: they are dispatched
+        like the other items, but get no response, not even an error. If
+        nothing is left to answer, the response has no body.
+
+        Args:
+            request: The incoming Starlette Request object.
+            batch: The decoded JSON array.
+
+        Returns:
+            A `JSONResponse` with the array of responses, a single error
+            response if the batch itself is invalid, or an empty `204`
+            response.
+        """
+        if not batch:
+            return self._generate_error_response(
+                None,
+                A2AError(root=InvalidRequestError(message='Empty batch')),
+            )
+        if (
+            self._max_batch_size is not None
+            and len(batch) > self._max_batch_size
+        ):
+            return self._generate_error_response(
+                None,
+                A2AError(
+                    root=InvalidRequestError(
+                        message=f'Batch larger than {self._max_batch_size} requests'
+                    )
+                ),
+            )
+
+        contexts: list[ServerCallContext] = []
+
+        async def respond(item: Any) -> dict[str, Any]:
+            if isinstance(item, dict) and 'id' not in item:
+                # The request models require an id. Notifications get an
+                # internal one; their responses are dropped below.
+                item = {**item, 'id': f'notification-{uuid.uuid4().hex}'}
+            request_id, specific_request = self._validate_request(item)
+            if isinstance(specific_request, A2AError):
+                return self._error_payload(request_id, specific_request)
+            if isinstance(
+                specific_request,
+                TaskResubscriptionRequest | SendStreamingMessageRequest,
+            ):
+                return self._error_payload(
+                    request_id,
+                    A2AError(
+                        root=InvalidRequestError(
+                            message=f'{specific_request.method} cannot be batched'
+                        )
+                    ),
+                )
+            call_context = self._context_builder.build(request)
+            call_context.state['method'] = specific_request.method
+            contexts.append(call_context)
+            try:
+                handler_result = await self._call_non_streaming_handler(
+                    specific_request.id,
+                    A2ARequest(root=specific_request),
+                    call_context,
+                )
+            except MethodNotImplementedError:
+                traceback.print_exc()
+                return self._error_payload(
+                    request_id, A2AError(root=UnsupportedOperationError())
+                )
+            except Exception as e:
+                logger.exception('Unhandled exception')
+                return self._error_payload(
+                    request_id, A2AError(root=InternalError(message=str(e)))
+                )
+            if isinstance(handler_result, JSONRPCErrorResponse):
+                return handler_result.model_dump(mode='json', exclude_none=True)
+            return handler_result.root.model_dump(
+                mode='json', exclude_none=True
+            )
+
+        logger.debug('Batch of %d requests', len(batch))
+        results = await asyncio.gather(*(respond(item) for item in batch))
+        responses = [
+            result
+            for item, result in zip(batch, results, strict=True)
+            if not (isinstance(item, dict) and 'id' not in item)
+        ]
+
+        headers = {}
+        exts = set().union(*(ctx.activated_extensions for ctx in contexts))
+        if exts:
+            headers[HTTP_EXTENSION_HEADER] = ', '.join(sorted(exts))
+        if not responses:
+            return Response(status_code=204, headers=headers)
+        return JSONResponse(responses, headers=headers)
+
     async def _process_non_streaming_request(
         self,
         request_id: str | int | None,
@@ -441,6 +608,29 @@ class JSONRPCApplication(ABC):
         Returns:
             A `JSONResponse` object containing the result or error.
         """
+        handler_result = await self._call_non_streaming_handler(
+            request_id, a2a_request, context
+        )
+        return self._create_response(context, handler_result)
+
+    async def _call_non_streaming_handler(
+        self,
+        request_id: str | int | None,
+        a2a_request: A2ARequest,
+        context: ServerCallContext,
+    ) -> JSONRPCErrorResponse | JSONRPCResponse:
+        """Calls the handler method for a non-streaming request.
+
+        Args:
+            request_id: The ID of the request.
+            a2a_request: The validated A2ARequest object.
+            context: The ServerCallContext for the request.
+
+        Returns:
+            The handler's response model, or a `JSONRPCErrorResponse` for an
+            unknown request type.
+        """
+        start = time.perf_counter()
         request_obj = a2a_request.root
         handler_result: Any = None
         match request_obj:
@@ -502,7 +692,11 @@ class JSONRPCApplication(ABC):
                     id=request_id, error=error
                 )
 
-        return self._create_response(context, handler_result)
+        if REGISTRY.enabled:
+            REQUEST_DURATION.labels(request_obj.method).observe(
+                time.perf_counter() - start
+            )
+        return handler_result
 
     def _create_response(
         self,
@@ -557,14 +751,32 @@ class JSONRPCApplication(ABC):
             headers=headers,
         )
 
-    async def _handle_get_agent_card(self, request: Request) -> JSONResponse:
+    def _serialize_agent_card(self, card: AgentCard) -> tuple[bytes, str]:
+        """Returns the JSON body and ETag of a card.
+
+        The card is serialized on every call, since it may have been modified
+        in place; the ETag is only recomputed when the body changed.
+        """
+        body = card.model_dump_json(exclude_none=True, by_alias=True).encode()
+        cached = self._serialized_card
+        if cached is not None and cached[0] == body:
+            return cached
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._serialized_card = (body, etag)
+        return body, etag
+
+    async def _handle_get_agent_card(self, request: Request) -> Response:
         """Handles GET requests for the agent card endpoint.
 
+        The card is served with an `ETag` derived from its content
+        and `Cache-Control` headers; a request whose `If-None-Match` matches
+        the current card gets an empty `304 Not Modified`.
+
         Args:
             request: The incoming Starlette Request object.
 
         Returns:
-            A JSONResponse containing the agent card data.
+            A Response containing the agent card data.
         """
         if request.url.path == PREV_AGENT_CARD_WELL_KNOWN_PATH:
             logger.warning(
@@ -578,12 +790,28 @@ class JSONRPCApplication(ABC):
         if self.card_modifier:
             card_to_serve = self.card_modifier(card_to_serve)
 
-        return JSONResponse(
-            card_to_serve.model_dump(
-                exclude_none=True,
-                by_alias=True,
-            )
-        )
+        body, etag = self._serialize_agent_card(card_to_serve)
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={AGENT_CARD_CACHE_MAX_AGE}',
+        }
+        if_none_match = request.headers.get('if-none-match', '')
+        if if_none_match.strip() == '*' or etag in (
+            tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+        ):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type='application/json', headers=headers)
+
+    async def _handle_get_metrics(self, request: Request) -> Response:
+        """Handles GET requests for the metrics endpoint.
+
+        Args:
+            request: The incoming Starlette Request object.
+
+        Returns:
+            A Response with the SDK's metrics in the Prometheus text format.
+        """
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
 
     async def _handle_get_authenticated_extended_agent_card(
         self, request: Request
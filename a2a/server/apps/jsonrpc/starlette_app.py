@@ -60,6 +60,7 @@ class A2AStarletteApplication(JSONRPCApplication):
         ]
         | None = None,
         max_content_length: int | None = 10 * 1024 * 1024,  # 10MB
+        max_batch_size: int | None = 100,
     ) -> None:
         """Initializes the A2AStarletteApplication.
 
@@ -79,6 +80,8 @@ class A2AStarletteApplication(JSONRPCApplication):
               call context.
             max_content_length: The maximum allowed content length for incoming
               requests. Defaults to 10MB. Set to None for unbounded maximum.
+            max_batch_size: The maximum number of requests in a JSON-RPC
+              batch. Defaults to 100. Set to None for unbounded maximum.
         """
         if not _package_starlette_installed:
             raise ImportError(
@@ -94,6 +97,7 @@ class A2AStarletteApplication(JSONRPCApplication):
             card_modifier=card_modifier,
             extended_card_modifier=extended_card_modifier,
             max_content_length=max_content_length,
+            max_batch_size=max_batch_size,
         )
 
     def routes(
@@ -101,6 +105,7 @@ class A2AStarletteApplication(JSONRPCApplication):
         agent_card_url: str = AGENT_CARD_WELL_KNOWN_PATH,
         rpc_url: str = DEFAULT_RPC_URL,
         extended_agent_card_url: str = EXTENDED_AGENT_CARD_PATH,
+        metrics_url: str | None = None,
     ) -> list[Route]:
         """Returns the Starlette Routes for handling A2A requests.
 
@@ -108,6 +113,8 @@ class A2AStarletteApplication(JSONRPCApplication):
             agent_card_url: The URL path for the agent card endpoint.
             rpc_url: The URL path for the A2A JSON-RPC endpoint (POST requests).
             extended_agent_card_url: The URL for the authenticated extended agent card endpoint.
+            metrics_url: The URL for the Prometheus metrics endpoint, e.g.
+              `METRICS_PATH`. Not served if None.
 
         Returns:
             A list of Starlette Route objects.
@@ -149,6 +156,15 @@ class A2AStarletteApplication(JSONRPCApplication):
                     name='authenticated_extended_agent_card',
                 )
             )
+        if metrics_url is not None:
+            app_routes.append(
+                Route(
+                    metrics_url,
+                    self._handle_get_metrics,
+                    methods=['GET'],
+                    name='metrics',
+                )
+            )
         return app_routes
 
     def add_routes_to_app(
@@ -157,6 +173,7 @@ class A2AStarletteApplication(JSONRPCApplication):
         agent_card_url: str = AGENT_CARD_WELL_KNOWN_PATH,
         rpc_url: str = DEFAULT_RPC_URL,
         extended_agent_card_url: str = EXTENDED_AGENT_CARD_PATH,
+        metrics_url: str | None = None,
     ) -> None:
         """Adds the routes to the Starlette application.
 
@@ -165,11 +182,14 @@ class A2AStarletteApplication(JSONRPCApplication):
             agent_card_url: The URL path for the agent card endpoint.
             rpc_url: The URL path for the A2A JSON-RPC endpoint (POST requests).
             extended_agent_card_url: The URL for the authenticated extended agent card endpoint.
+            metrics_url: The URL for the Prometheus metrics endpoint, e.g.
+              `METRICS_PATH`. Not served if None.
         """
         routes = self.routes(
             agent_card_url=agent_card_url,
             rpc_url=rpc_url,
             extended_agent_card_url=extended_agent_card_url,
+            metrics_url=metrics_url,
         )
         app.routes.extend(routes)
 
@@ -178,6 +198,7 @@ class A2AStarletteApplication(JSONRPCApplication):
         agent_card_url: str = AGENT_CARD_WELL_KNOWN_PATH,
         rpc_url: str = DEFAULT_RPC_URL,
         extended_agent_card_url: str = EXTENDED_AGENT_CARD_PATH,
+        metrics_url: str | None = None,
         **kwargs: Any,
     ) -> Starlette:
         """Builds and returns the Starlette application instance.
@@ -186,6 +207,8 @@ class A2AStarletteApplication(JSONRPCApplication):
             agent_card_url: The URL path for the agent card endpoint.
             rpc_url: The URL path for the A2A JSON-RPC endpoint (POST requests).
             extended_agent_card_url: The URL for the authenticated extended agent card endpoint.
+            metrics_url: The URL for the Prometheus metrics endpoint, e.g.
+              `METRICS_PATH`. Not served if None.
             **kwargs: Additional keyword arguments to pass to the Starlette constructor.
 
         Returns:
@@ -194,7 +217,7 @@ class A2AStarletteApplication(JSONRPCApplication):
         app = Starlette(**kwargs)
 
         self.add_routes_to_app(
-            app, agent_card_url, rpc_url, extended_agent_card_url
+            app, agent_card_url, rpc_url, extended_agent_card_url, metrics_url
         )
 
         return app
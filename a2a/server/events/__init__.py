@@ -1,21 +1,36 @@
 """Event handling components for the A2A server."""
 
 from a2a.server.events.event_consumer import EventConsumer
-from a2a.server.events.event_queue import Event, EventQueue
+from a2a.server.events.event_queue import (
+    Event,
+    EventLog,
+    EventLogGap,
+    EventQueue,
+    SlowConsumerPolicy,
+)
 from a2a.server.events.in_memory_queue_manager import InMemoryQueueManager
 from a2a.server.events.queue_manager import (
     NoTaskQueue,
     QueueManager,
     TaskQueueExists,
 )
+from a2a.server.events.socket_queue_manager import (
+    QueueBroker,
+    SocketQueueManager,
+)
 
 
 __all__ = [
     'Event',
     'EventConsumer',
+    'EventLog',
+    'EventLogGap',
     'EventQueue',
     'InMemoryQueueManager',
     'NoTaskQueue',
+    'QueueBroker',
     'QueueManager',
+    'SlowConsumerPolicy',
+    'SocketQueueManager',
     'TaskQueueExists',
 ]
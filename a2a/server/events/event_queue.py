@@ -2,12 +2,16 @@ import asyncio
 import logging
 import sys
 
+from collections import deque
+from enum import Enum
+
 from a2a.types import (
     Message,
     Task,
     TaskArtifactUpdateEvent,
     TaskStatusUpdateEvent,
 )
+from a2a.utils.metrics import EVENTS, QUEUE_DEPTH, REGISTRY
 from a2a.utils.telemetry import SpanKind, trace_class
 
 
@@ -18,6 +22,143 @@ Event = Message | Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 """Type alias for events that can be enqueued."""
 
 DEFAULT_MAX_QUEUE_SIZE = 1024
+DEFAULT_EVENT_LOG_SIZE = 256
+
+# Raised by `dequeue_event` once a queue is closed and drained, matching what
+# `asyncio.Queue` raises on each Python version.
+_QueueClosed: type[Exception] = asyncio.QueueEmpty
+if sys.version_info >= (3, 13):
+    _QueueClosed = asyncio.QueueShutDown
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What the producer does when a consumer falls a full buffer behind."""
+
+    BLOCK = 'block'
+    """Wait until the consumer catches up (backpressure)."""
+
+    DROP = 'drop'
+    """Skip the consumer past the oldest events it has not read yet."""
+
+    DISCONNECT = 'disconnect'
+    """Close the consumer; its next `dequeue_event` reports a closed queue."""
+
+
+class EventLogGap(Exception):  # noqa: N818
+    """Exception raised when requested events are no longer in the event log."""
+
+
+class EventLog:
+    """Bounded, sequence-numbered log of the events enqueued for one task.
+
+    Events are numbered from 1 in enqueue order. A stream that has received
+    `n` events of a task has seen exactly the events with sequence <= `n`,
+    so a reconnecting client can ask for everything after `n`.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_EVENT_LOG_SIZE) -> None:
+        """Initializes the EventLog.
+
+        Args:
+            capacity: Maximum number of events retained; older events are
+                dropped first.
+        """
+        if capacity <= 0:
+            raise ValueError('capacity must be greater than 0')
+        self._events: deque[tuple[int, Event]] = deque(maxlen=capacity)
+        self._last_sequence = 0
+
+    @property
+    def last_sequence(self) -> int:
+        """Sequence number of the most recent event, 0 if there is none."""
+        return self._last_sequence
+
+    def append(self, event: Event) -> int:
+        """Appends an event and returns its sequence number."""
+        self._last_sequence += 1
+        self._events.append((self._last_sequence, event))
+        return self._last_sequence
+
+    def since(self, sequence: int) -> list[Event]:
+        """Returns the events with a sequence number greater than `sequence`.
+
+        Raises:
+            EventLogGap: If some of those events were already dropped, or
+                `sequence` is ahead of the log.
+        """
+        if sequence < 0 or sequence > self._last_sequence:
+            raise EventLogGap(
+                f'Sequence {sequence} is outside the event log (last: {self._last_sequence}).'
+            )
+        first = self._events[0][0] if self._events else self._last_sequence + 1
+        if sequence + 1 < first:
+            raise EventLogGap(
+                f'Events after {sequence} are no longer retained (oldest: {first}).'
+            )
+        return [event for seq, event in self._events if seq > sequence]
+
+
+class _SharedBuffer:
+    """Ring buffer holding a task's events once for all of its queues.
+
+    Each `EventQueue` sharing the buffer is a consumer with its own cursor.
+    An event stays in the buffer until every attached consumer has read it,
+    so fan-out costs one append per event regardless of the consumer count.
+    """
+
+    def __init__(self, capacity: int, event_log_size: int) -> None:
+        self.capacity = capacity
+        self.slots: list[Event | None] = [None] * capacity
+        self.tail = 0  # Position the next event is written to.
+        self.consumers: set[EventQueue] = set()
+        self.log = EventLog(event_log_size) if event_log_size > 0 else None
+        # Lower bound of the slowest consumer's cursor; recomputed only when
+        # the buffer looks full, which keeps appends O(1).
+        self._min_cursor = 0
+        self._data_waiter: asyncio.Future[None] | None = None
+        self._space_waiter: asyncio.Future[None] | None = None
+
+    def is_full(self) -> bool:
+        if self.tail - self._min_cursor < self.capacity:
+            return False
+        self._min_cursor = min(
+            (consumer._cursor for consumer in self.consumers), default=self.tail
+        )
+        return self.tail - self._min_cursor >= self.capacity
+
+    def lagging(self) -> list['EventQueue']:
+        """Consumers holding the oldest slot of a full buffer."""
+        oldest = self.tail - self.capacity
+        return [c for c in self.consumers if c._cursor <= oldest]
+
+    def append(self, event: Event) -> None:
+        self.slots[self.tail % self.capacity] = event
+        self.tail += 1
+        if self.log is not None:
+            self.log.append(event)
+        self.notify_data()
+
+    async def wait_for_data(self) -> None:
+        if self._data_waiter is None or self._data_waiter.done():
+            self._data_waiter = asyncio.get_running_loop().create_future()
+        # Shield the shared future: a cancelled waiter (e.g. a `wait_for`
+        # timeout) must not cancel it for every other consumer.
+        await asyncio.shield(self._data_waiter)
+
+    def notify_data(self) -> None:
+        if self._data_waiter is not None and not self._data_waiter.done():
+            self._data_waiter.set_result(None)
+        self._data_waiter = None
+
+    async def wait_for_space(self) -> None:
+        if self._space_waiter is None or self._space_waiter.done():
+            self._space_waiter = asyncio.get_running_loop().create_future()
+        await asyncio.shield(self._space_waiter)
+
+    def notify_space(self) -> None:
+        if self._space_waiter is not None and not self._space_waiter.done():
+            self._space_waiter.set_result(None)
+        self._space_waiter = None
 
 
 @trace_class(kind=SpanKind.SERVER)
@@ -27,56 +168,113 @@ class EventQueue:
     Acts as a buffer between the agent's asynchronous execution and the
     server's response handling (e.g., streaming via SSE). Supports tapping
     to create child queues that receive the same events.
+
+    A queue and all queues tapped from it share one ring buffer: each event
+    is stored once and every queue reads it through its own cursor. When the
+    buffer is full, the producer applies each lagging queue's
+    `SlowConsumerPolicy`. The buffer also keeps a bounded `EventLog` so a
+    reconnecting subscriber can be sent the events it missed (see
+    `tap_from`).
     """
 
-    def __init__(self, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE) -> None:
-        """Initializes the EventQueue."""
-        # Make sure the `asyncio.Queue` is bounded.
-        # If it's unbounded (maxsize=0), then `queue.put()` never needs to wait,
-        # and so the streaming won't work correctly.
+    def __init__(
+        self,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        event_log_size: int = DEFAULT_EVENT_LOG_SIZE,
+        slow_consumer_policy: SlowConsumerPolicy = SlowConsumerPolicy.BLOCK,
+    ) -> None:
+        """Initializes the EventQueue.
+
+        Args:
+            max_queue_size: Capacity of the shared buffer, i.e. how far the
+                slowest consumer may fall behind the producer.
+            event_log_size: Number of past events kept for replay. 0 disables
+                the log.
+            slow_consumer_policy: Policy for this queue and, by default, for
+                the queues tapped from it.
+        """
+        # Make sure the buffer is bounded, otherwise the producer never waits
+        # and streaming won't work correctly.
         if max_queue_size <= 0:
             raise ValueError('max_queue_size must be greater than 0')
 
-        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=max_queue_size)
+        self._attach(
+            _SharedBuffer(max_queue_size, event_log_size),
+            SlowConsumerPolicy(slow_consumer_policy),
+        )
+        logger.debug('EventQueue initialized.')
+
+    def _attach(
+        self, buffer: _SharedBuffer, policy: SlowConsumerPolicy
+    ) -> None:
+        self._buffer = buffer
+        self._cursor = buffer.tail
+        self._in_progress = 0  # Dequeued but not yet marked done.
+        self._policy = policy
         self._children: list[EventQueue] = []
         self._is_closed = False
-        self._lock = asyncio.Lock()
-        logger.debug('EventQueue initialized.')
+        self._dropped = 0
+        self._drain_waiter: asyncio.Future[None] | None = None
+        buffer.consumers.add(self)
+
+    @property
+    def dropped_events(self) -> int:
+        """Number of events skipped for this queue under the DROP policy."""
+        return self._dropped
 
     async def enqueue_event(self, event: Event) -> None:
         """Enqueues an event to this queue and all its children.
 
+        The event is stored once in the shared buffer, so every queue tapped
+        from the same root receives it.
+
         Args:
             event: The event object to enqueue.
         """
-        async with self._lock:
-            if self._is_closed:
-                logger.warning('Queue is closed. Event will not be enqueued.')
-                return
+        if self._is_closed:
+            logger.warning('Queue is closed. Event will not be enqueued.')
+            return
 
         logger.debug('Enqueuing event of type: %s', type(event))
-
-        # Make sure to use put instead of put_nowait to avoid blocking the event loop.
-        await self.queue.put(event)
-        for child in self._children:
-            await child.enqueue_event(event)
+        buffer = self._buffer
+        while buffer.is_full():
+            for consumer in buffer.lagging():
+                consumer._fall_behind()
+            if buffer.is_full():
+                await buffer.wait_for_space()
+                if self._is_closed:
+                    logger.warning(
+                        'Queue closed while waiting for space. Event will not be enqueued.'
+                    )
+                    return
+        buffer.append(event)
+        if REGISTRY.enabled:
+            EVENTS.labels(type(event).__name__).inc()
+            QUEUE_DEPTH.observe(buffer.tail - self._cursor)
+
+    def _fall_behind(self) -> None:
+        """Applies this queue's slow-consumer policy when it holds up the producer."""
+        if self._policy == SlowConsumerPolicy.DROP:
+            oldest = self._buffer.tail - self._buffer.capacity + 1
+            self._dropped += oldest - self._cursor
+            self._cursor = oldest
+            logger.warning(
+                'Slow consumer fell behind; %d event(s) dropped so far.',
+                self._dropped,
+            )
+        elif self._policy == SlowConsumerPolicy.DISCONNECT:
+            logger.warning('Slow consumer fell behind; disconnecting it.')
+            self._is_closed = True
+            self._discard_pending()
+            self._detach()
 
     async def dequeue_event(self, no_wait: bool = False) -> Event:
         """Dequeues an event from the queue.
 
-        This implementation expects that dequeue to raise an exception when
-        the queue has been closed. In python 3.13+ this is naturally provided
-        by the QueueShutDown exception generated when the queue has closed and
-        the user is awaiting the queue.get method. Python<=3.12 this needs to
-        manage this lifecycle itself. The current implementation can lead to
-        blocking if the dequeue_event is called before the EventQueue has been
-        closed but when there are no events on the queue. Two ways to avoid this
-        are to call this with no_wait = True which won't block, but is the
-        callers responsibility to retry as appropriate. Alternatively, one can
-        use a async Task management solution to cancel the get task if the queue
-        has closed or some other condition is met. The implementation of the
-        EventConsumer uses an async.wait with a timeout to abort the
-        dequeue_event call and retry, when it will return with a closed error.
+        Waiting dequeues are woken when the queue is closed, so a consumer
+        blocked on an empty queue observes the closed error instead of
+        hanging. The EventConsumer still uses `asyncio.wait_for` with a
+        timeout so it can check for agent exceptions between events.
 
         Args:
             no_wait: If True, retrieve an event immediately or raise `asyncio.QueueEmpty`.
@@ -86,31 +284,28 @@ class EventQueue:
             The next event from the queue.
 
         Raises:
-            asyncio.QueueEmpty: If `no_wait` is True and the queue is empty.
-            asyncio.QueueShutDown: If the queue has been closed and is empty.
+            asyncio.QueueEmpty: If `no_wait` is True and the queue is empty,
+                or (Python < 3.13) the queue has been closed and is empty.
+            asyncio.QueueShutDown: If the queue has been closed and is empty
+                (Python >= 3.13).
         """
-        async with self._lock:
-            if (
-                sys.version_info < (3, 13)
-                and self._is_closed
-                and self.queue.empty()
-            ):
-                # On 3.13+, skip early raise; await self.queue.get() will raise QueueShutDown after shutdown()
+        buffer = self._buffer
+        while True:
+            if self._cursor < buffer.tail:
+                event = buffer.slots[self._cursor % buffer.capacity]
+                self._cursor += 1
+                self._in_progress += 1
+                buffer.notify_space()
+                logger.debug('Dequeued event of type: %s', type(event))
+                return event  # type: ignore[return-value]
+            if self._is_closed:
                 logger.warning('Queue is closed. Event will not be dequeued.')
-                raise asyncio.QueueEmpty('Queue is closed.')
-
-        if no_wait:
-            logger.debug('Attempting to dequeue event (no_wait=True).')
-            event = self.queue.get_nowait()
-            logger.debug(
-                'Dequeued event (no_wait=True) of type: %s', type(event)
-            )
-            return event
-
-        logger.debug('Attempting to dequeue event (waiting).')
-        event = await self.queue.get()
-        logger.debug('Dequeued event (waited) of type: %s', type(event))
-        return event
+                self._detach()
+                raise _QueueClosed('Queue is closed.')
+            if no_wait:
+                raise asyncio.QueueEmpty
+            logger.debug('Attempting to dequeue event (waiting).')
+            await buffer.wait_for_data()
 
     def task_done(self) -> None:
         """Signals that a formerly enqueued task is complete.
@@ -118,31 +313,68 @@ class EventQueue:
         Used in conjunction with `dequeue_event` to track processed items.
         """
         logger.debug('Marking task as done in EventQueue.')
-        self.queue.task_done()
-
-    def tap(self) -> 'EventQueue':
+        if self._in_progress <= 0:
+            raise ValueError('task_done() called too many times')
+        self._in_progress -= 1
+        self._notify_if_drained()
+
+    def tap(
+        self, slow_consumer_policy: SlowConsumerPolicy | None = None
+    ) -> 'EventQueue':
         """Taps the event queue to create a new child queue that receives all future events.
 
+        The child reads the shared buffer through its own cursor; no events
+        are copied.
+
+        Args:
+            slow_consumer_policy: Policy for the child. Defaults to this
+                queue's policy.
+
         Returns:
             A new `EventQueue` instance that will receive all events enqueued
             to this parent queue from this point forward.
         """
         logger.debug('Tapping EventQueue to create a child queue.')
-        queue = EventQueue()
+        queue = EventQueue.__new__(EventQueue)
+        queue._attach(self._buffer, slow_consumer_policy or self._policy)
         self._children.append(queue)
         return queue
 
+    def tap_from(self, sequence: int) -> tuple[list[Event], 'EventQueue']:
+        """Taps the queue and returns the logged events after `sequence`.
+
+        The returned events and the new child queue together form a gap-free,
+        duplicate-free continuation of the stream after `sequence`.
+
+        Args:
+            sequence: Number of events the subscriber has already received.
+
+        Returns:
+            A tuple of the missed events and the new child queue.
+
+        Raises:
+            EventLogGap: If this queue keeps no log or the missed events are
+                no longer retained.
+        """
+        log = self._buffer.log
+        if log is None:
+            raise EventLogGap('This queue does not keep an event log.')
+        missed = log.since(sequence)
+        logger.debug(
+            'Replaying %d event(s) after sequence %d.', len(missed), sequence
+        )
+        return missed, self.tap()
+
+    @property
+    def last_sequence(self) -> int:
+        """Sequence number of the last logged event, 0 without a log."""
+        log = self._buffer.log
+        return log.last_sequence if log is not None else 0
+
     async def close(self, immediate: bool = False) -> None:
         """Closes the queue for future push events and also closes all child queues.
 
-        Once closed, no new events can be enqueued. Behavior is consistent across
-        Python versions:
-        - Python >= 3.13: Uses `asyncio.Queue.shutdown` to stop the queue. With
-          `immediate=True` the queue is shut down and pending events are cleared; with
-          `immediate=False` the queue is shut down and we wait for it to drain via
-          `queue.join()`.
-        - Python < 3.13: Emulates the same semantics by clearing on `immediate=True`
-          or awaiting `queue.join()` on `immediate=False`.
+        Once closed, no new events can be enqueued through this queue.
 
         Consumers attempting to dequeue after close on an empty queue will observe
         `asyncio.QueueShutDown` on Python >= 3.13 and `asyncio.QueueEmpty` on
@@ -155,36 +387,23 @@ class EventQueue:
 
         """
         logger.debug('Closing EventQueue.')
-        async with self._lock:
-            # If already closed, just return.
-            if self._is_closed and not immediate:
-                return
-            if not self._is_closed:
-                self._is_closed = True
-        # If using python 3.13 or higher, use shutdown but match <3.13 semantics
-        if sys.version_info >= (3, 13):
-            if immediate:
-                # Immediate: stop queue and clear any pending events, then close children
-                self.queue.shutdown(True)
-                await self.clear_events(True)
-                for child in self._children:
-                    await child.close(True)
-                return
-            # Graceful: prevent further gets/puts via shutdown, then wait for drain and children
-            self.queue.shutdown(False)
-            await asyncio.gather(
-                self.queue.join(), *(child.close() for child in self._children)
-            )
-        # Otherwise, join the queue
-        else:
-            if immediate:
-                await self.clear_events(True)
-                for child in self._children:
-                    await child.close(immediate)
-                return
-            await asyncio.gather(
-                self.queue.join(), *(child.close() for child in self._children)
-            )
+        # If already closed, just return.
+        if self._is_closed and not immediate:
+            return
+        self._is_closed = True
+        # Wake consumers blocked on an empty queue and producers blocked on
+        # a full buffer so they observe the close.
+        self._buffer.notify_data()
+        self._buffer.notify_space()
+        if immediate:
+            self._discard_pending()
+            self._detach()
+            for child in self._children:
+                await child.close(True)
+            return
+        await asyncio.gather(
+            self._join(), *(child.close() for child in self._children)
+        )
 
     def is_closed(self) -> bool:
         """Checks if the queue is closed."""
@@ -201,44 +420,46 @@ class EventQueue:
                               If False, only clear the current queue, leaving child queues untouched.
         """
         logger.debug('Clearing all events from EventQueue and child queues.')
+        cleared_count = self._discard_pending()
+        if cleared_count > 0:
+            logger.debug(
+                'Cleared %d unprocessed events from EventQueue.',
+                cleared_count,
+            )
 
-        # Clear all events from the queue, even if closed
-        cleared_count = 0
-        async with self._lock:
-            try:
-                while True:
-                    event = self.queue.get_nowait()
-                    logger.debug(
-                        'Discarding unprocessed event of type: %s, content: %s',
-                        type(event),
-                        event,
-                    )
-                    self.queue.task_done()
-                    cleared_count += 1
-            except asyncio.QueueEmpty:
-                pass
-            except Exception as e:
-                # Handle Python 3.13+ QueueShutDown
-                if (
-                    sys.version_info >= (3, 13)
-                    and type(e).__name__ == 'QueueShutDown'
-                ):
-                    pass
-                else:
-                    raise
-
-            if cleared_count > 0:
-                logger.debug(
-                    'Cleared %d unprocessed events from EventQueue.',
-                    cleared_count,
-                )
-
-        # Clear all child queues (lock released before awaiting child tasks)
-        if clear_child_queues and self._children:
-            child_tasks = [
-                asyncio.create_task(child.clear_events())
-                for child in self._children
-            ]
-
-            if child_tasks:
-                await asyncio.gather(*child_tasks, return_exceptions=True)
+        if clear_child_queues:
+            for child in self._children:
+                await child.clear_events()
+
+    def _discard_pending(self) -> int:
+        """Moves the cursor past all unread events; returns how many were skipped."""
+        skipped = self._buffer.tail - self._cursor
+        self._cursor = self._buffer.tail
+        self._buffer.notify_space()
+        self._notify_if_drained()
+        return skipped
+
+    def _detach(self) -> None:
+        """Stops this queue from holding events in the shared buffer."""
+        if self in self._buffer.consumers:
+            self._buffer.consumers.discard(self)
+            self._buffer.notify_space()
+
+    def _drained(self) -> bool:
+        return self._cursor >= self._buffer.tail and self._in_progress == 0
+
+    def _notify_if_drained(self) -> None:
+        if (
+            self._drain_waiter is not None
+            and not self._drain_waiter.done()
+            and self._drained()
+        ):
+            self._drain_waiter.set_result(None)
+
+    async def _join(self) -> None:
+        """Waits until every event readable by this queue was dequeued and marked done."""
+        while not self._drained():
+            if self._drain_waiter is None or self._drain_waiter.done():
+                self._drain_waiter = asyncio.get_running_loop().create_future()
+            await asyncio.shield(self._drain_waiter)
+        self._detach()
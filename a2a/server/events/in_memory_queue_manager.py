@@ -1,6 +1,6 @@
 import asyncio
 
-from a2a.server.events.event_queue import EventQueue
+from a2a.server.events.event_queue import Event, EventQueue
 from a2a.server.events.queue_manager import (
     NoTaskQueue,
     QueueManager,
@@ -59,6 +59,23 @@ class InMemoryQueueManager(QueueManager):
                 return None
             return self._task_queue[task_id].tap()
 
+    async def tap_from(
+        self, task_id: str, sequence: int
+    ) -> tuple[list[Event], EventQueue] | None:
+        """Taps the event queue for a task ID and returns the events missed after `sequence`.
+
+        Returns:
+            The missed events and a new child `EventQueue`, or `None` if the
+            task ID is not found.
+
+        Raises:
+            EventLogGap: If the missed events are no longer retained.
+        """
+        async with self._lock:
+            if task_id not in self._task_queue:
+                return None
+            return self._task_queue[task_id].tap_from(sequence)
+
     async def close(self, task_id: str) -> None:
         """Closes and removes the event queue for a task ID.
 
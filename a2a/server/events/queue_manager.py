@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-from a2a.server.events.event_queue import EventQueue
+from a2a.server.events.event_queue import Event, EventLogGap, EventQueue
 
 
 class QueueManager(ABC):
@@ -18,6 +18,16 @@ class QueueManager(ABC):
     async def tap(self, task_id: str) -> EventQueue | None:
         """Creates a child event queue (tap) for an existing task ID."""
 
+    async def tap_from(
+        self, task_id: str, sequence: int
+    ) -> tuple[list[Event], EventQueue] | None:
+        """Taps the queue for a task ID and returns the events missed after `sequence`.
+
+        Returns `None` if there is no queue for the task. Managers that do not
+        keep an event log raise `EventLogGap`.
+        """
+        raise EventLogGap(f'{type(self).__name__} does not replay events.')
+
     @abstractmethod
     async def close(self, task_id: str) -> None:
         """Closes and removes the event queue for a task ID."""
@@ -0,0 +1,679 @@
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import os
+import socket
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from a2a.server.events.event_consumer import QueueClosed
+from a2a.server.events.event_queue import (
+    DEFAULT_EVENT_LOG_SIZE,
+    DEFAULT_MAX_QUEUE_SIZE,
+    Event,
+    EventLog,
+    EventLogGap,
+    EventQueue,
+)
+from a2a.server.events.queue_manager import (
+    NoTaskQueue,
+    QueueManager,
+    TaskQueueExists,
+)
+from a2a.types import (
+    Message,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+)
+from a2a.utils.telemetry import SpanKind, trace_class
+
+
+logger = logging.getLogger(__name__)
+
+
+BrokerAddress = str | tuple[str, int]
+"""A Unix domain socket path, or a loopback `(host, port)` pair where Unix
+sockets are unavailable (e.g. Windows event loops)."""
+
+# Frames are newline-delimited JSON; a task snapshot with a long history can
+# be far larger than asyncio's 64 KiB default line limit.
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+_EVENT_TYPES: dict[str, type[Event]] = {
+    'message': Message,
+    'task': Task,
+    'status-update': TaskStatusUpdateEvent,
+    'artifact-update': TaskArtifactUpdateEvent,
+}
+
+
+def _dump_event(event: Event) -> dict[str, Any]:
+    return event.model_dump(mode='json', by_alias=True, exclude_none=True)
+
+
+def _load_event(data: dict[str, Any]) -> Event:
+    return _EVENT_TYPES[data['kind']].model_validate(data)
+
+
+def _encode(frame: dict[str, Any]) -> bytes:
+    return json.dumps(frame, separators=(',', ':')).encode() + b'\n'
+
+
+class _Peer:
+    """A queue manager connected to the broker."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.owned: set[str] = set()
+        self.subscriptions: dict[int, str] = {}  # Subscription id -> task id.
+
+    def send(self, frame: dict[str, Any]) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(_encode(frame))
+
+    async def drain(self, timeout: float) -> None:
+        """Waits until the peer has read what was sent to it.
+
+        A peer that does not catch up within `timeout` is disconnected, so
+        it cannot hold up the owners whose events it subscribed to.
+        """
+        if self.writer.is_closing():
+            return
+        try:
+            await asyncio.wait_for(self.writer.drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                'Queue manager stopped reading events; disconnecting it.'
+            )
+            self.writer.transport.abort()
+        except ConnectionError:
+            pass
+
+
+@dataclass
+class _BrokerTask:
+    owner: _Peer
+    # Events are kept serialized; the broker never parses them.
+    log: EventLog
+    subscribers: set[tuple[_Peer, int]] = field(default_factory=set)
+
+
+class QueueBroker:
+    """Relays task event streams between the queue managers of one host.
+
+    Every task has one owner, the worker process running its agent. The
+    owner publishes the task's events to the broker, which keeps a bounded
+    log of them and fans them out to the managers of other workers that
+    tapped the task.
+
+    The broker does not read the next frame of a peer until the frames it
+    relayed to other peers were flushed, so a subscriber that reads slowly
+    slows down the owner's publishing instead of growing the broker's
+    buffers. A subscriber that stops reading for `slow_peer_timeout` is
+    disconnected.
+
+    The broker normally runs inside whichever worker's `SocketQueueManager`
+    binds the address first. It can also be used in-process through
+    `connect`, which lets several managers in one process behave like
+    separate workers (e.g. in tests).
+    """
+
+    def __init__(
+        self,
+        event_log_size: int = DEFAULT_EVENT_LOG_SIZE,
+        slow_peer_timeout: float = 30.0,
+    ) -> None:
+        """Initializes the QueueBroker.
+
+        Args:
+            event_log_size: Number of past events kept per task for replay.
+            slow_peer_timeout: How long a peer may take to read the frames
+                relayed to it before it is disconnected.
+        """
+        self._event_log_size = event_log_size
+        self._slow_peer_timeout = slow_peer_timeout
+        self._tasks: dict[str, _BrokerTask] = {}
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.Task] = set()
+        self._lock_file: int | None = None
+
+    async def serve(self, address: BrokerAddress) -> None:
+        """Starts accepting connections on `address`.
+
+        Raises:
+            OSError: If the address is in use, e.g. another process already
+                hosts the broker.
+        """
+        if isinstance(address, tuple):
+            host, port = address
+            self._server = await asyncio.start_server(
+                self._accept, host, port, limit=_STREAM_LIMIT
+            )
+            return
+        # Unlike a TCP port, a socket file outlives the process that bound
+        # it. An exclusive lock held for the broker's lifetime tells a stale
+        # file (safe to replace) from a live broker.
+        import fcntl  # noqa: PLC0415
+
+        fd = os.open(f'{address}.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(address)
+            self._server = await asyncio.start_unix_server(
+                self._accept, address, limit=_STREAM_LIMIT
+            )
+        except BaseException:
+            os.close(fd)
+            raise
+        self._lock_file = fd
+
+    async def connect(
+        self,
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Opens an in-process connection to the broker."""
+        client_sock, broker_sock = socket.socketpair()
+        reader, writer = await asyncio.open_connection(
+            sock=broker_sock, limit=_STREAM_LIMIT
+        )
+        self._accept(reader, writer)
+        return await asyncio.open_connection(
+            sock=client_sock, limit=_STREAM_LIMIT
+        )
+
+    async def close(self) -> None:
+        """Stops the broker and drops every connection."""
+        if self._server is not None:
+            self._server.close()
+        for connection in list(self._connections):
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+        if self._lock_file is not None:
+            os.close(self._lock_file)
+            self._lock_file = None
+
+    def _accept(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        connection = asyncio.create_task(self._serve_peer(reader, writer))
+        self._connections.add(connection)
+        connection.add_done_callback(self._connections.discard)
+
+    async def _serve_peer(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = _Peer(writer)
+        try:
+            while line := await reader.readline():
+                recipients = self._dispatch(peer, json.loads(line))
+                await asyncio.gather(
+                    *(
+                        recipient.drain(self._slow_peer_timeout)
+                        for recipient in recipients
+                    )
+                )
+        except (ConnectionError, ValueError) as e:
+            logger.warning('Dropping queue manager connection: %s', e)
+        finally:
+            self._drop_peer(peer)
+            writer.close()
+
+    def _dispatch(self, peer: _Peer, frame: dict[str, Any]) -> set[_Peer]:
+        """Handles one frame and returns the peers that were sent frames."""
+        op = frame['op']
+        task_id = frame.get('task')
+        task = self._tasks.get(task_id) if task_id is not None else None
+        if op == 'publish':
+            if task is None or task.owner is not peer:
+                return set()
+            task.log.append(frame['event'])
+            for subscriber, sub_id in task.subscribers:
+                subscriber.send(
+                    {'op': 'event', 'sub': sub_id, 'event': frame['event']}
+                )
+            return {subscriber for subscriber, _ in task.subscribers}
+        if op == 'claim':
+            if task is not None and task.owner is not peer:
+                peer.send({'op': 'reply', 'id': frame['id'], 'error': 'exists'})
+                return {peer}
+            if task is None:
+                self._tasks[task_id] = _BrokerTask(
+                    owner=peer, log=EventLog(self._event_log_size)
+                )
+                peer.owned.add(task_id)
+            peer.send({'op': 'reply', 'id': frame['id']})
+            return {peer}
+        if op == 'subscribe':
+            self._subscribe(peer, task, frame)
+            return {peer}
+        if op == 'unsubscribe':
+            task_id = peer.subscriptions.pop(frame['sub'], None)
+            if task_id in self._tasks:
+                self._tasks[task_id].subscribers.discard((peer, frame['sub']))
+        elif op == 'release':
+            if task is not None and task.owner is peer:
+                return self._release(task_id)
+        else:
+            logger.warning('Ignoring unknown broker operation %s', op)
+        return set()
+
+    def _subscribe(
+        self, peer: _Peer, task: _BrokerTask | None, frame: dict[str, Any]
+    ) -> None:
+        reply: dict[str, Any] = {'op': 'reply', 'id': frame['id']}
+        if task is None:
+            reply['error'] = 'missing'
+        else:
+            try:
+                reply['missed'] = (
+                    task.log.since(frame['from'])
+                    if frame.get('from') is not None
+                    else []
+                )
+            except EventLogGap:
+                reply['error'] = 'gap'
+            else:
+                task.subscribers.add((peer, frame['id']))
+                peer.subscriptions[frame['id']] = frame['task']
+        peer.send(reply)
+
+    def _release(self, task_id: str) -> set[_Peer]:
+        task = self._tasks.pop(task_id)
+        task.owner.owned.discard(task_id)
+        for subscriber, sub_id in task.subscribers:
+            subscriber.subscriptions.pop(sub_id, None)
+            subscriber.send({'op': 'closed', 'sub': sub_id})
+        return {subscriber for subscriber, _ in task.subscribers}
+
+    def _drop_peer(self, peer: _Peer) -> None:
+        for task_id in list(peer.owned):
+            self._release(task_id)
+        for sub_id, task_id in peer.subscriptions.items():
+            if task_id in self._tasks:
+                self._tasks[task_id].subscribers.discard((peer, sub_id))
+        peer.subscriptions.clear()
+
+
+@dataclass
+class _Subscription:
+    """A local queue fed with a task's events relayed by the broker."""
+
+    queue: EventQueue
+    # Raw events from the broker; `None` marks the end of the stream.
+    inbox: asyncio.Queue[dict[str, Any] | None] = field(
+        default_factory=lambda: asyncio.Queue(DEFAULT_MAX_QUEUE_SIZE)
+    )
+    pump: asyncio.Task | None = None
+
+
+@trace_class(kind=SpanKind.SERVER)
+class SocketQueueManager(QueueManager):
+    """QueueManager sharing event streams between worker processes on one host.
+
+    Events of a task are produced in the worker that runs its agent. That
+    worker keeps the task's queue locally, exactly like
+    `InMemoryQueueManager`, and also publishes the events to a
+    `QueueBroker` over a local socket. Taps for tasks owned by another
+    worker (e.g. a `tasks/resubscribe` that landed on a different uvicorn
+    worker) subscribe to the broker and receive the same events, including
+    the replay of missed events through `tap_from`.
+
+    The first manager that cannot reach the broker starts one in its own
+    process; if that worker exits, the next operation of any remaining
+    manager takes over.
+
+    Events enqueued into a tap of a task owned by another worker stay in the
+    local process.
+
+    Publishing waits for the broker to take the events, so a broker that
+    relays to a slow subscriber holds up the task's forwarder, and the
+    owner's queue applies its `SlowConsumerPolicy` to it like to any other
+    lagging consumer. A subscriber that falls a full buffer behind is
+    disconnected rather than stalling the connection shared by the other
+    subscriptions of this process.
+    """
+
+    def __init__(
+        self,
+        address: BrokerAddress | None = None,
+        broker: QueueBroker | None = None,
+        event_log_size: int = DEFAULT_EVENT_LOG_SIZE,
+        connect_timeout: float = 5.0,
+    ) -> None:
+        """Initializes the SocketQueueManager.
+
+        Args:
+            address: Address of the host's broker, shared by all workers.
+            broker: An in-process broker to use instead of `address`, for
+                tests and single-process setups.
+            event_log_size: Number of past events kept per task for replay,
+                both locally and by a broker started by this manager.
+            connect_timeout: How long to keep retrying while another worker
+                is starting the broker.
+        """
+        if (address is None) == (broker is None):
+            raise ValueError('Exactly one of address or broker must be given')
+        self._address = address
+        self._broker = broker
+        self._event_log_size = event_log_size
+        self._connect_timeout = connect_timeout
+        self._task_queue: dict[str, EventQueue] = {}
+        self._forwarders: dict[str, asyncio.Task] = {}
+        self._subscriptions: dict[int, _Subscription] = {}
+        self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._hosted_broker: QueueBroker | None = None
+
+    async def add(self, task_id: str, queue: EventQueue) -> None:
+        """Adds a new event queue for a task ID owned by this process.
+
+        Raises:
+            TaskQueueExists: If a queue for the given `task_id` already
+                exists in any worker.
+        """
+        async with self._lock:
+            if task_id in self._task_queue or not await self._claim(task_id):
+                raise TaskQueueExists
+            self._own(task_id, queue)
+
+    async def get(self, task_id: str) -> EventQueue | None:
+        """Retrieves the event queue for a task ID.
+
+        Returns:
+            The local `EventQueue` for the `task_id`, a queue relaying it from
+            the worker that owns it, or `None` if not found.
+        """
+        async with self._lock:
+            if task_id in self._task_queue:
+                return self._task_queue[task_id]
+        subscribed = await self._subscribe(task_id, None)
+        return subscribed[1] if subscribed else None
+
+    async def tap(self, task_id: str) -> EventQueue | None:
+        """Taps the event queue for a task ID to create a child queue.
+
+        Returns:
+            A new child `EventQueue` instance, or `None` if no worker has a
+            queue for the task ID.
+        """
+        async with self._lock:
+            if task_id in self._task_queue:
+                return self._task_queue[task_id].tap()
+        subscribed = await self._subscribe(task_id, None)
+        return subscribed[1] if subscribed else None
+
+    async def tap_from(
+        self, task_id: str, sequence: int
+    ) -> tuple[list[Event], EventQueue] | None:
+        """Taps the event queue for a task ID and returns the events missed after `sequence`.
+
+        Returns:
+            The missed events and a new child `EventQueue`, or `None` if no
+            worker has a queue for the task ID.
+
+        Raises:
+            EventLogGap: If the missed events are no longer retained.
+        """
+        async with self._lock:
+            if task_id in self._task_queue:
+                return self._task_queue[task_id].tap_from(sequence)
+        return await self._subscribe(task_id, sequence)
+
+    async def close(self, task_id: str) -> None:
+        """Closes and removes the event queue for a task ID owned by this process.
+
+        Subscribers in other workers see their queues closed once the
+        remaining events were relayed.
+
+        Raises:
+            NoTaskQueue: If this process has no queue for the given `task_id`.
+        """
+        async with self._lock:
+            if task_id not in self._task_queue:
+                raise NoTaskQueue
+            queue = self._task_queue.pop(task_id)
+            await queue.close()
+
+    async def create_or_tap(self, task_id: str) -> EventQueue:
+        """Creates a new event queue for a task ID if one doesn't exist, otherwise taps the existing one.
+
+        Returns:
+            A new or child `EventQueue` instance for the `task_id`.
+        """
+        async with self._lock:
+            if task_id in self._task_queue:
+                return self._task_queue[task_id].tap()
+            if await self._claim(task_id):
+                queue = EventQueue(event_log_size=self._event_log_size)
+                self._own(task_id, queue)
+                return queue
+        subscribed = await self._subscribe(task_id, None)
+        if subscribed is None:
+            # The owner released the task in the meantime.
+            return await self.create_or_tap(task_id)
+        return subscribed[1]
+
+    async def aclose(self) -> None:
+        """Disconnects from the broker and stops it if this process hosts it."""
+        for forwarder in list(self._forwarders.values()):
+            forwarder.cancel()
+        await asyncio.gather(*self._forwarders.values(), return_exceptions=True)
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+        if self._hosted_broker is not None:
+            await self._hosted_broker.close()
+            self._hosted_broker = None
+
+    def _own(self, task_id: str, queue: EventQueue) -> None:
+        self._task_queue[task_id] = queue
+        self._forwarders[task_id] = asyncio.create_task(
+            self._forward(task_id, queue.tap())
+        )
+
+    async def _forward(self, task_id: str, queue: EventQueue) -> None:
+        """Publishes the events of an owned task until its queue is closed."""
+        try:
+            while True:
+                try:
+                    event = await queue.dequeue_event()
+                except (QueueClosed, asyncio.QueueEmpty):
+                    break
+                await self._publish(
+                    {'op': 'publish', 'task': task_id, 'event': _dump_event(event)}
+                )
+                queue.task_done()
+        finally:
+            self._forwarders.pop(task_id, None)
+            self._send({'op': 'release', 'task': task_id})
+
+    async def _claim(self, task_id: str) -> bool:
+        reply = await self._request({'op': 'claim', 'task': task_id})
+        return 'error' not in reply
+
+    async def _subscribe(
+        self, task_id: str, sequence: int | None
+    ) -> tuple[list[Event], EventQueue] | None:
+        sub_id = next(self._ids)
+        subscription = _Subscription(EventQueue(event_log_size=0))
+        # Register before asking, so events relayed right after the reply
+        # are routed to this subscription.
+        self._subscriptions[sub_id] = subscription
+        try:
+            reply = await self._request(
+                {'op': 'subscribe', 'task': task_id, 'from': sequence}, sub_id
+            )
+        except BaseException:
+            self._subscriptions.pop(sub_id, None)
+            raise
+        error = reply.get('error')
+        if error is not None:
+            self._subscriptions.pop(sub_id, None)
+            if error == 'gap':
+                raise EventLogGap(
+                    f'Events of task {task_id} after sequence {sequence} are no longer retained.'
+                )
+            return None
+        if sub_id in self._subscriptions:
+            subscription.pump = asyncio.create_task(
+                self._pump(sub_id, subscription)
+            )
+        else:
+            # Cut off for falling behind before the pump even started.
+            await subscription.queue.close(immediate=True)
+        return [_load_event(raw) for raw in reply['missed']], subscription.queue
+
+    async def _pump(self, sub_id: int, subscription: _Subscription) -> None:
+        """Feeds relayed events into a subscription's queue."""
+        queue = subscription.queue
+        try:
+            while (raw := await subscription.inbox.get()) is not None:
+                if queue.is_closed():
+                    # The consumer went away; stop relaying.
+                    self._send({'op': 'unsubscribe', 'sub': sub_id})
+                    break
+                await queue.enqueue_event(_load_event(raw))
+        finally:
+            # A subscription already removed was cut off by `_deliver`; its
+            # remaining events are discarded.
+            cut_off = self._subscriptions.pop(sub_id, None) is None
+            await queue.close(immediate=cut_off)
+
+    async def _request(
+        self, frame: dict[str, Any], request_id: int | None = None
+    ) -> dict[str, Any]:
+        await self._ensure_connected()
+        frame['id'] = request_id if request_id is not None else next(self._ids)
+        reply = asyncio.get_running_loop().create_future()
+        self._pending[frame['id']] = reply
+        try:
+            self._send(frame)
+            return await reply
+        finally:
+            self._pending.pop(frame['id'], None)
+
+    async def _publish(self, frame: dict[str, Any]) -> None:
+        """Sends a frame once the broker has taken the previous ones.
+
+        A lost connection is reestablished (re-registering the tasks owned
+        here) instead of dropping the frame.
+        """
+        while True:
+            try:
+                await self._ensure_connected()
+                writer = self._writer
+                writer.write(_encode(frame))  # type: ignore[union-attr]
+                await writer.drain()  # type: ignore[union-attr]
+                return
+            except OSError as e:
+                logger.warning('Publishing to the queue broker failed: %s', e)
+                await asyncio.sleep(0.05)
+
+    def _send(self, frame: dict[str, Any]) -> None:
+        if self._writer is None or self._writer.is_closing():
+            logger.debug('Not connected to the queue broker; dropping %s.', frame['op'])
+            return
+        self._writer.write(_encode(frame))
+
+    def _deliver(self, sub_id: int, raw: dict[str, Any] | None) -> None:
+        """Hands a relayed event, or the end of the stream, to a subscription."""
+        subscription = self._subscriptions[sub_id]
+        try:
+            subscription.inbox.put_nowait(raw)
+        except asyncio.QueueFull:
+            logger.warning(
+                'Subscriber fell a full buffer behind; disconnecting it.'
+            )
+            self._subscriptions.pop(sub_id, None)
+            if raw is not None:
+                self._send({'op': 'unsubscribe', 'sub': sub_id})
+            if subscription.pump is not None:
+                subscription.pump.cancel()
+
+    async def _ensure_connected(self) -> None:
+        if self._writer is not None and not self._writer.is_closing():
+            return
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            reader, self._writer = await self._open()
+            self._reader_task = asyncio.create_task(self._read(reader))
+            # After a reconnect (e.g. the worker hosting the broker exited),
+            # register the tasks this process still owns with the new broker.
+            for task_id in self._task_queue:
+                self._send({'op': 'claim', 'id': next(self._ids), 'task': task_id})
+
+    async def _open(
+        self,
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self._broker is not None:
+            return await self._broker.connect()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._connect_timeout
+        while True:
+            try:
+                if isinstance(self._address, tuple):
+                    host, port = self._address
+                    return await asyncio.open_connection(
+                        host, port, limit=_STREAM_LIMIT
+                    )
+                return await asyncio.open_unix_connection(
+                    self._address, limit=_STREAM_LIMIT
+                )
+            except OSError:
+                if await self._host_broker():
+                    continue
+                if loop.time() >= deadline:
+                    raise
+                await asyncio.sleep(0.05)
+
+    async def _host_broker(self) -> bool:
+        """Starts the broker in this process unless another worker hosts it."""
+        if self._hosted_broker is not None:
+            return False
+        broker = QueueBroker(self._event_log_size)
+        try:
+            await broker.serve(self._address)  # type: ignore[arg-type]
+        except OSError:
+            return False
+        logger.info('Hosting the queue broker at %s', self._address)
+        self._hosted_broker = broker
+        return True
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                frame = json.loads(line)
+                op = frame['op']
+                if op == 'reply':
+                    reply = self._pending.get(frame['id'])
+                    if reply is not None and not reply.done():
+                        reply.set_result(frame)
+                elif frame['sub'] in self._subscriptions:
+                    self._deliver(
+                        frame['sub'], frame['event'] if op == 'event' else None
+                    )
+        except (ConnectionError, ValueError) as e:
+            logger.warning('Lost connection to the queue broker: %s', e)
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+            for reply in self._pending.values():
+                if not reply.done():
+                    reply.set_exception(
+                        ConnectionError('Lost connection to the queue broker')
+                    )
+            for sub_id in list(self._subscriptions):
+                self._deliver(sub_id, None)
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 
 from collections.abc import AsyncGenerator
 from typing import cast
@@ -14,6 +15,7 @@ from a2a.server.context import ServerCallContext
 from a2a.server.events import (
     Event,
     EventConsumer,
+    EventLogGap,
     EventQueue,
     InMemoryQueueManager,
     QueueManager,
@@ -41,9 +43,11 @@ from a2a.types import (
     TaskPushNotificationConfig,
     TaskQueryParams,
     TaskState,
+    TaskStatusUpdateEvent,
     UnsupportedOperationError,
 )
 from a2a.utils.errors import ServerError
+from a2a.utils.metrics import REGISTRY, TASK_DURATION
 from a2a.utils.task import apply_history_length
 from a2a.utils.telemetry import SpanKind, trace_class
 
@@ -57,6 +61,10 @@ TERMINAL_TASK_STATES = {
     TaskState.rejected,
 }
 
+# `tasks/resubscribe` metadata key holding the number of events the client
+# already received on the task's stream.
+RESUBSCRIBE_FROM_SEQUENCE_KEY = 'fromSequence'
+
 
 @trace_class(kind=SpanKind.SERVER)
 class DefaultRequestHandler(RequestHandler):
@@ -193,7 +201,19 @@ class DefaultRequestHandler(RequestHandler):
             request: The request context for the agent.
             queue: The event queue for the agent to publish to.
         """
-        await self.agent_executor.execute(request, queue)
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            await self.agent_executor.execute(request, queue)
+            outcome = 'ok'
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            raise
+        finally:
+            if REGISTRY.enabled:
+                TASK_DURATION.labels(
+                    type(self.agent_executor).__name__, outcome
+                ).observe(time.perf_counter() - start)
         await queue.close()
 
     async def _setup_message_execution(
@@ -503,6 +523,11 @@ class DefaultRequestHandler(RequestHandler):
 
         Allows a client to re-attach to a running streaming task's event stream.
         Requires the task and its queue to still be active.
+
+        If `params.metadata` carries `fromSequence` (the number of events the
+        client already received), the events it missed are replayed first,
+        followed by the live stream. When the missed events are no longer
+        retained, the current task snapshot is sent instead.
         """
         task: Task | None = await self.task_store.get(params.id, context)
         if not task:
@@ -525,10 +550,40 @@ class DefaultRequestHandler(RequestHandler):
 
         result_aggregator = ResultAggregator(task_manager)
 
-        queue = await self._queue_manager.tap(task.id)
+        from_sequence = (params.metadata or {}).get(
+            RESUBSCRIBE_FROM_SEQUENCE_KEY
+        )
+        missed: list[Event] = []
+        queue: EventQueue | None
+        if isinstance(from_sequence, int):
+            try:
+                tapped = await self._queue_manager.tap_from(
+                    task.id, from_sequence
+                )
+            except EventLogGap as e:
+                logger.info(
+                    'Cannot replay task %s from sequence %d: %s',
+                    task.id,
+                    from_sequence,
+                    e,
+                )
+                missed = [task]
+                queue = await self._queue_manager.tap(task.id)
+            else:
+                missed, queue = tapped if tapped else ([], None)
+        else:
+            queue = await self._queue_manager.tap(task.id)
         if not queue:
             raise ServerError(error=TaskNotFoundError())
 
+        # Replayed events were already applied to the stored task by the
+        # original stream, so they are emitted without being processed again.
+        for event in missed:
+            yield event
+            if _is_final_event(event):
+                await queue.close(True)
+                return
+
         consumer = EventConsumer(queue)
         async for event in result_aggregator.consume_and_emit(consumer):
             yield event
@@ -579,3 +634,14 @@ class DefaultRequestHandler(RequestHandler):
         await self._push_config_store.delete_info(
             params.id, params.push_notification_config_id
         )
+
+
+def _is_final_event(event: Event) -> bool:
+    """Whether a stream ends after this event."""
+    if isinstance(event, Message):
+        return True
+    if isinstance(event, TaskStatusUpdateEvent):
+        return event.final
+    return (
+        isinstance(event, Task) and event.status.state in TERMINAL_TASK_STATES
+    )
@@ -1,7 +1,10 @@
 """Components for managing tasks within the A2A server."""
 
+import importlib
 import logging
 
+from typing import Any
+
 from a2a.server.tasks.base_push_notification_sender import (
     BasePushNotificationSender,
 )
@@ -9,60 +12,79 @@ from a2a.server.tasks.inmemory_push_notification_config_store import (
     InMemoryPushNotificationConfigStore,
 )
 from a2a.server.tasks.inmemory_task_store import InMemoryTaskStore
+from a2a.server.tasks.outbox_push_notification_sender import (
+    OutboxPushNotificationSender,
+)
 from a2a.server.tasks.push_notification_config_store import (
     PushNotificationConfigStore,
 )
 from a2a.server.tasks.push_notification_sender import PushNotificationSender
 from a2a.server.tasks.result_aggregator import ResultAggregator
 from a2a.server.tasks.task_manager import TaskManager
+from a2a.server.tasks.task_state_builder import TaskStateBuilder
 from a2a.server.tasks.task_store import TaskStore
 from a2a.server.tasks.task_updater import TaskUpdater
 
 
 logger = logging.getLogger(__name__)
 
-try:
-    from a2a.server.tasks.database_task_store import (
-        DatabaseTaskStore,  # type: ignore
-    )
-except ImportError as e:
-    _original_error = e
-    # If the database task store is not available, we can still use in-memory stores.
-    logger.debug(
-        'DatabaseTaskStore not loaded. This is expected if database dependencies are not installed. Error: %s',
-        e,
-    )
+# The SQL-backed stores pull in SQLAlchemy, which takes hundreds of
+# milliseconds to import; load them only when they are first accessed.
+_LAZY_IMPORTS = {
+    'DatabaseTaskStore': 'a2a.server.tasks.database_task_store',
+    'DatabasePushNotificationConfigStore': (
+        'a2a.server.tasks.database_push_notification_config_store'
+    ),
+}
 
-    class DatabaseTaskStore:  # type: ignore
-        """Placeholder for DatabaseTaskStore when dependencies are not installed."""
 
-        def __init__(self, *args, **kwargs):
-            raise ImportError(
-                'To use DatabaseTaskStore, its dependencies must be installed. '
-                'You can install them with \'pip install "a2a-sdk[sql]"\''
-            ) from _original_error
+def _missing_dependency_placeholder(name: str, error: ImportError) -> type:
+    """Builds a stand-in class that raises when the SQL extras are missing."""
 
+    def __init__(self, *args, **kwargs):  # noqa: ANN001, ANN002, ANN003
+        raise ImportError(
+            f'To use {name}, its dependencies must be installed. '
+            'You can install them with \'pip install "a2a-sdk[sql]"\''
+        ) from error
 
-try:
-    from a2a.server.tasks.database_push_notification_config_store import (
-        DatabasePushNotificationConfigStore,  # type: ignore
-    )
-except ImportError as e:
-    _original_error = e
-    # If the database push notification config store is not available, we can still use in-memory stores.
-    logger.debug(
-        'DatabasePushNotificationConfigStore not loaded. This is expected if database dependencies are not installed. Error: %s',
-        e,
+    return type(
+        name,
+        (),
+        {
+            '__init__': __init__,
+            '__doc__': f'Placeholder for {name} when dependencies are not installed.',
+        },
     )
 
-    class DatabasePushNotificationConfigStore:  # type: ignore
-        """Placeholder for DatabasePushNotificationConfigStore when dependencies are not installed."""
 
-        def __init__(self, *args, **kwargs):
-            raise ImportError(
-                'To use DatabasePushNotificationConfigStore, its dependencies must be installed. '
-                'You can install them with \'pip install "a2a-sdk[sql]"\''
-            ) from _original_error
+def __getattr__(name: str) -> Any:
+    """Imports the database-backed stores on first access.
+
+    Args:
+        name: The attribute being looked up on this package.
+
+    Returns:
+        The requested class, or a placeholder that raises on instantiation if
+        the database dependencies are not installed.
+
+    Raises:
+        AttributeError: If `name` is not a lazily loaded attribute.
+    """
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    try:
+        value = getattr(importlib.import_module(module_name), name)
+    except ImportError as e:
+        # If the database stores are not available, we can still use in-memory stores.
+        logger.debug(
+            '%s not loaded. This is expected if database dependencies are not installed. Error: %s',
+            name,
+            e,
+        )
+        value = _missing_dependency_placeholder(name, e)
+    globals()[name] = value
+    return value
 
 
 __all__ = [
@@ -71,10 +93,12 @@ __all__ = [
     'DatabaseTaskStore',
     'InMemoryPushNotificationConfigStore',
     'InMemoryTaskStore',
+    'OutboxPushNotificationSender',
     'PushNotificationConfigStore',
     'PushNotificationSender',
     'ResultAggregator',
     'TaskManager',
+    'TaskStateBuilder',
     'TaskStore',
     'TaskUpdater',
 ]
@@ -1,5 +1,8 @@
+import asyncio
 import logging
 
+from enum import Enum
+
 
 try:
     from sqlalchemy import Table, delete, select
@@ -22,16 +25,54 @@ except ImportError as e:
 from a2a.server.context import ServerCallContext
 from a2a.server.models import Base, TaskModel, create_task_model
 from a2a.server.tasks.task_store import TaskStore
-from a2a.types import Task  # Task is the Pydantic model
+from a2a.types import Task, TaskState  # Task is the Pydantic model
 
 
 logger = logging.getLogger(__name__)
 
 
+class DurabilityLevel(str, Enum):
+    """How long `DatabaseTaskStore.save` waits before a write is durable."""
+
+    IMMEDIATE = 'immediate'
+    """Each save commits its own transaction before returning."""
+
+    GROUP_COMMIT = 'group_commit'
+    """Each save returns once committed, but concurrent saves share a
+    transaction and repeated saves of one task are coalesced."""
+
+    WRITE_BEHIND = 'write_behind'
+    """Saves return immediately and are flushed in batches every
+    `flush_interval` seconds. Saves that leave a task terminal or waiting on
+    the user still wait for their flush."""
+
+
+# States after which a task may not be written again for a long time, so a
+# save reaching them always waits for the write to be committed.
+_FLUSH_STATES = frozenset(
+    {
+        TaskState.completed,
+        TaskState.canceled,
+        TaskState.failed,
+        TaskState.rejected,
+        TaskState.input_required,
+        TaskState.auth_required,
+    }
+)
+
+
 class DatabaseTaskStore(TaskStore):
     """SQLAlchemy-based implementation of TaskStore.
 
     Stores task objects in a database supported by SQLAlchemy.
+
+    With a `durability` other than `DurabilityLevel.IMMEDIATE`, saves are
+    buffered in memory and written in batches. Multiple updates to the same
+    task within a batch are coalesced into one row, and each batch is written
+    as a single bulk upsert. `get` sees buffered writes. A batch that fails
+    to write is kept in the buffer and retried with exponential backoff up to
+    `max_retry_delay`. Call `close` (or `flush`) on shutdown so buffered
+    writes are not lost; saves made after `close` are written immediately.
     """
 
     engine: AsyncEngine
@@ -45,6 +86,10 @@ class DatabaseTaskStore(TaskStore):
         engine: AsyncEngine,
         create_table: bool = True,
         table_name: str = 'tasks',
+        durability: DurabilityLevel = DurabilityLevel.IMMEDIATE,
+        flush_interval: float = 0.05,
+        max_batch_size: int = 100,
+        max_retry_delay: float = 5.0,
     ) -> None:
         """Initializes the DatabaseTaskStore.
 
@@ -52,6 +97,12 @@ class DatabaseTaskStore(TaskStore):
             engine: An existing SQLAlchemy AsyncEngine to be used by Task Store
             create_table: If true, create tasks table on initialization.
             table_name: Name of the database table. Defaults to 'tasks'.
+            durability: When a save is considered done. See `DurabilityLevel`.
+            flush_interval: Write-behind window in seconds.
+            max_batch_size: Number of buffered tasks that triggers a flush
+                before the window ends.
+            max_retry_delay: Upper bound in seconds for the delay between
+                retries of a batch that failed to write.
         """
         logger.debug(
             'Initializing DatabaseTaskStore with existing engine, table: %s',
@@ -70,6 +121,20 @@ class DatabaseTaskStore(TaskStore):
             else create_task_model(table_name)
         )
 
+        self.durability = DurabilityLevel(durability)
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_retry_delay = max_retry_delay
+        self._retry_delay = 0.0
+        self._closed = False
+        self._pending: dict[str, Task] = {}
+        self._flushing: dict[str, Task] = {}
+        self._batch_done: asyncio.Future[None] | None = None
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._urgent = asyncio.Event()
+        self._flusher: asyncio.Task[None] | None = None
+
     async def initialize(self) -> None:
         """Initialize the database and create the table if needed."""
         if self._initialized:
@@ -125,16 +190,39 @@ class DatabaseTaskStore(TaskStore):
     ) -> None:
         """Saves or updates a task in the database."""
         await self._ensure_initialized()
-        db_task = self._to_orm(task)
-        async with self.async_session_maker.begin() as session:
-            await session.merge(db_task)
-            logger.debug('Task %s saved/updated successfully.', task.id)
+        if self.durability == DurabilityLevel.IMMEDIATE or self._closed:
+            db_task = self._to_orm(task)
+            async with self.async_session_maker.begin() as session:
+                await session.merge(db_task)
+                logger.debug('Task %s saved/updated successfully.', task.id)
+            return
+
+        # Callers keep mutating their task object, so buffer a snapshot.
+        # A later save of the same task replaces the earlier one.
+        self._pending[task.id] = task.model_copy(deep=True)
+        self._ensure_flusher()
+        self._wake.set()
+        wait = (
+            self.durability == DurabilityLevel.GROUP_COMMIT
+            or task.status.state in _FLUSH_STATES
+        )
+        if wait or len(self._pending) >= self.max_batch_size:
+            self._urgent.set()
+        if wait:
+            await self._wait_for_flush()
+        logger.debug('Task %s buffered for saving.', task.id)
 
     async def get(
         self, task_id: str, context: ServerCallContext | None = None
     ) -> Task | None:
         """Retrieves a task from the database by ID."""
         await self._ensure_initialized()
+        buffered = self._pending.get(task_id) or self._flushing.get(task_id)
+        if buffered is not None:
+            logger.debug('Task %s retrieved from the write buffer.', task_id)
+            # Callers mutate the task they get; the buffered snapshot is what
+            # will be written, so hand out a copy.
+            return buffered.model_copy(deep=True)
         async with self.async_session_maker() as session:
             stmt = select(self.task_model).where(self.task_model.id == task_id)
             result = await session.execute(stmt)
@@ -153,14 +241,187 @@ class DatabaseTaskStore(TaskStore):
         """Deletes a task from the database by ID."""
         await self._ensure_initialized()
 
-        async with self.async_session_maker.begin() as session:
+        buffered = self._pending.pop(task_id, None) is not None
+        # Wait for an in-flight batch so it cannot re-insert the task.
+        async with (
+            self._flush_lock,
+            self.async_session_maker.begin() as session,
+        ):
             stmt = delete(self.task_model).where(self.task_model.id == task_id)
             result = await session.execute(stmt)
             # Commit is automatic when using session.begin()
 
-            if result.rowcount > 0:
+            if result.rowcount > 0 or buffered:
                 logger.info('Task %s deleted successfully.', task_id)
             else:
                 logger.warning(
                     'Attempted to delete nonexistent task with id: %s', task_id
                 )
+
+    async def flush(self) -> None:
+        """Writes all buffered saves to the database.
+
+        Waits for a batch already being written, then writes what is left.
+
+        Raises:
+            Exception: The error from the write if it failed. The saves stay
+                buffered and are retried by the background flusher.
+        """
+        await self._flush()
+
+    async def close(self) -> None:
+        """Flushes buffered saves and stops the background flusher.
+
+        New saves bypass the buffer from here on. The background flusher is
+        only stopped after the final flush, so a batch it is writing is not
+        interrupted.
+        """
+        self._closed = True
+        try:
+            await self._flush()
+        finally:
+            if self._flusher is not None:
+                self._flusher.cancel()
+                try:
+                    await self._flusher
+                except asyncio.CancelledError:
+                    pass
+                self._flusher = None
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def _run_flusher(self) -> None:
+        """Flushes the buffer after each write-behind window."""
+        while True:
+            await self._wake.wait()
+            if self._retry_delay:
+                await asyncio.sleep(self._retry_delay)
+            elif not self._urgent.is_set():
+                try:
+                    await asyncio.wait_for(
+                        self._urgent.wait(), timeout=self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+            self._urgent.clear()
+            try:
+                await self._flush()
+            except Exception:  # noqa: BLE001
+                pass  # Logged by _flush; the batch stays buffered.
+
+    async def _wait_for_flush(self) -> None:
+        """Waits until the batch holding the currently buffered saves commits."""
+        if self._batch_done is None:
+            self._batch_done = asyncio.get_running_loop().create_future()
+        await asyncio.shield(self._batch_done)
+
+    async def _flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            done, self._batch_done = self._batch_done, None
+            self._flushing = batch
+            try:
+                await self._upsert(list(batch.values()))
+            except BaseException as e:
+                # Put the batch back unless a newer save replaced a task.
+                for task_id, task in batch.items():
+                    self._pending.setdefault(task_id, task)
+                self._wake.set()
+                if isinstance(e, Exception):
+                    self._retry_delay = min(
+                        self.max_retry_delay,
+                        max(self.flush_interval, self._retry_delay * 2),
+                    )
+                    logger.exception(
+                        'Failed to write %d buffered task(s); '
+                        'retrying in %.2fs.',
+                        len(batch),
+                        self._retry_delay,
+                    )
+                    if done is not None and not done.done():
+                        done.set_exception(e)
+                else:
+                    self._carry_over(done)
+                raise
+            finally:
+                self._flushing = {}
+            self._retry_delay = 0.0
+            logger.debug('Flushed %d buffered task(s).', len(batch))
+            if done is not None and not done.done():
+                done.set_result(None)
+
+    def _carry_over(self, done: asyncio.Future[None] | None) -> None:
+        """Hands the waiters of an interrupted batch to the next batch."""
+        if done is None or done.done():
+            return
+        if self._batch_done is None:
+            self._batch_done = done
+            return
+
+        def _relay(next_done: asyncio.Future[None]) -> None:
+            if done.done():
+                return
+            if next_done.cancelled():
+                done.cancel()
+            elif next_done.exception() is not None:
+                done.set_exception(next_done.exception())
+            else:
+                done.set_result(None)
+
+        self._batch_done.add_done_callback(_relay)
+
+    async def _upsert(self, tasks: list[Task]) -> None:
+        """Writes tasks in one transaction, as a single bulk upsert if possible."""
+        table = self.task_model.__table__
+        rows = [
+            {
+                'id': task.id,
+                'context_id': task.context_id,
+                'kind': task.kind,
+                'status': task.status,
+                'artifacts': task.artifacts,
+                'history': task.history,
+                'metadata': task.metadata,
+            }
+            for task in tasks
+        ]
+        dialect = self.engine.dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import (
+                    insert as dialect_insert,
+                )
+            stmt = dialect_insert(table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.id],
+                set_={
+                    column.name: stmt.excluded[column.name]
+                    for column in table.columns
+                    if column.name != 'id'
+                },
+            )
+        elif dialect in ('mysql', 'mariadb'):
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+            stmt = mysql_insert(table).values(rows)
+            stmt = stmt.on_duplicate_key_update(
+                {
+                    column.name: stmt.inserted[column.name]
+                    for column in table.columns
+                    if column.name != 'id'
+                }
+            )
+        else:
+            async with self.async_session_maker.begin() as session:
+                for task in tasks:
+                    await session.merge(self._to_orm(task))
+            return
+        async with self.engine.begin() as conn:
+            await conn.execute(stmt)
@@ -1,58 +1,262 @@
-import asyncio
 import logging
+import threading
+import time
+
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
 
 from a2a.server.context import ServerCallContext
 from a2a.server.tasks.task_store import TaskStore
-from a2a.types import Task
+from a2a.types import Task, TaskState
 
 
 logger = logging.getLogger(__name__)
 
 
+_TERMINAL_STATES = frozenset(
+    {
+        TaskState.completed,
+        TaskState.canceled,
+        TaskState.failed,
+        TaskState.rejected,
+    }
+)
+
+
+@dataclass(slots=True)
+class _TaskEntry:
+    """A stored task snapshot plus the bookkeeping needed for eviction."""
+
+    task: Task
+    size: int = 0
+    terminal_since: float | None = None
+    referenced: bool = False
+
+
+@dataclass
+class _Shard:
+    """A partition of the store with its own write lock and eviction order."""
+
+    tasks: dict[str, _TaskEntry] = field(default_factory=dict)
+    # Terminal task ids, oldest first. Used for TTL and CLOCK-style LRU eviction.
+    terminal: OrderedDict[str, None] = field(default_factory=OrderedDict)
+    size: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
 class InMemoryTaskStore(TaskStore):
     """In-memory implementation of TaskStore.
 
-    Stores task objects in a dictionary in memory. Task data is lost when the
-    server process stops.
+    Stores task objects in memory, partitioned into shards. Task data is lost
+    when the server process stops.
+
+    `save` stores a deep copy of the task, so the stored snapshot is never
+    mutated afterwards and `get` can return it without taking any lock.
+    Callers must treat tasks returned by `get` as read-only and copy them
+    before modifying (`TaskManager` does this). Writes take the lock of the
+    shard owning the task, so writers on different tasks rarely contend.
+
+    Tasks in a terminal state (completed, canceled, failed, rejected) can be
+    evicted after `ttl_seconds`, when more than `max_terminal_tasks` are kept,
+    or when the estimated size of all stored tasks exceeds `max_bytes`.
+    Active tasks are never evicted.
     """
 
-    def __init__(self) -> None:
-        """Initializes the InMemoryTaskStore."""
+    def __init__(
+        self,
+        num_shards: int = 16,
+        ttl_seconds: float | None = None,
+        max_terminal_tasks: int | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        """Initializes the InMemoryTaskStore.
+
+        Args:
+            num_shards: Number of independent partitions.
+            ttl_seconds: How long a terminal task is retained. `None` keeps
+                terminal tasks until another limit evicts them.
+            max_terminal_tasks: Maximum number of terminal tasks retained;
+                the least recently used ones are evicted first.
+            max_bytes: Memory budget, measured as the serialized size of the
+                stored tasks. Only terminal tasks are evicted to meet it.
+        """
         logger.debug('Initializing InMemoryTaskStore')
-        self.tasks: dict[str, Task] = {}
-        self.lock = asyncio.Lock()
+        if num_shards < 1:
+            raise ValueError('num_shards must be at least 1')
+        self._shards = [_Shard() for _ in range(num_shards)]
+        self.ttl_seconds = ttl_seconds
+        self.max_terminal_tasks = max_terminal_tasks
+        self.max_bytes = max_bytes
+        self._evict_lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def _shard(self, task_id: str) -> _Shard:
+        return self._shards[hash(task_id) % len(self._shards)]
+
+    def __len__(self) -> int:
+        return sum(len(shard.tasks) for shard in self._shards)
+
+    @property
+    def size_bytes(self) -> int:
+        """Estimated size of all stored tasks (only tracked with `max_bytes`)."""
+        return sum(shard.size for shard in self._shards)
 
     async def save(
         self, task: Task, context: ServerCallContext | None = None
     ) -> None:
         """Saves or updates a task in the in-memory store."""
-        async with self.lock:
-            self.tasks[task.id] = task
-            logger.debug('Task %s saved successfully.', task.id)
+        snapshot = task.model_copy(deep=True)
+        size = len(snapshot.model_dump_json()) if self.max_bytes else 0
+        terminal = snapshot.status.state in _TERMINAL_STATES
+        shard = self._shard(task.id)
+        with shard.lock:
+            previous = shard.tasks.get(task.id)
+            terminal_since = None
+            if terminal:
+                terminal_since = (
+                    previous.terminal_since
+                    if previous and previous.terminal_since is not None
+                    else time.monotonic()
+                )
+            shard.tasks[task.id] = _TaskEntry(
+                task=snapshot, size=size, terminal_since=terminal_since
+            )
+            shard.size += size - (previous.size if previous else 0)
+            if terminal:
+                shard.terminal.setdefault(task.id, None)
+            else:
+                shard.terminal.pop(task.id, None)
+        logger.debug('Task %s saved successfully.', task.id)
+        if terminal or self.max_bytes:
+            self._evict()
 
     async def get(
         self, task_id: str, context: ServerCallContext | None = None
     ) -> Task | None:
-        """Retrieves a task from the in-memory store by ID."""
-        async with self.lock:
-            logger.debug('Attempting to get task with id: %s', task_id)
-            task = self.tasks.get(task_id)
-            if task:
-                logger.debug('Task %s retrieved successfully.', task_id)
-            else:
-                logger.debug('Task %s not found in store.', task_id)
-            return task
+        """Retrieves a task from the in-memory store by ID.
+
+        The returned task is the shared stored snapshot and must not be
+        modified in place.
+        """
+        logger.debug('Attempting to get task with id: %s', task_id)
+        entry = self._shard(task_id).tasks.get(task_id)
+        if entry is None or self._expired(entry, time.monotonic()):
+            logger.debug('Task %s not found in store.', task_id)
+            return None
+        entry.referenced = True
+        logger.debug('Task %s retrieved successfully.', task_id)
+        return entry.task
 
     async def delete(
         self, task_id: str, context: ServerCallContext | None = None
     ) -> None:
         """Deletes a task from the in-memory store by ID."""
-        async with self.lock:
-            logger.debug('Attempting to delete task with id: %s', task_id)
-            if task_id in self.tasks:
-                del self.tasks[task_id]
-                logger.debug('Task %s deleted successfully.', task_id)
-            else:
-                logger.warning(
-                    'Attempted to delete nonexistent task with id: %s', task_id
+        logger.debug('Attempting to delete task with id: %s', task_id)
+        shard = self._shard(task_id)
+        with shard.lock:
+            removed = self._remove(shard, task_id)
+        if removed:
+            logger.debug('Task %s deleted successfully.', task_id)
+        else:
+            logger.warning(
+                'Attempted to delete nonexistent task with id: %s', task_id
+            )
+
+    def _expired(self, entry: _TaskEntry, now: float) -> bool:
+        return (
+            self.ttl_seconds is not None
+            and entry.terminal_since is not None
+            and now - entry.terminal_since >= self.ttl_seconds
+        )
+
+    @staticmethod
+    def _remove(shard: _Shard, task_id: str) -> bool:
+        entry = shard.tasks.pop(task_id, None)
+        if entry is None:
+            return False
+        shard.terminal.pop(task_id, None)
+        shard.size -= entry.size
+        return True
+
+    def _evict(self) -> None:
+        """Applies the TTL, terminal-task count and memory budget limits."""
+        if not self._evict_lock.acquire(blocking=False):
+            # Another writer is already evicting; it will observe our save.
+            return
+        try:
+            now = time.monotonic()
+            if self.ttl_seconds is not None and now >= self._next_sweep:
+                # Expired tasks are already hidden from `get`; sweeping them
+                # out of memory a little late is fine.
+                self._next_sweep = now + self.ttl_seconds / 4
+                for shard in self._shards:
+                    self._evict_expired(shard, now)
+            if self.max_terminal_tasks is not None:
+                excess = (
+                    sum(len(shard.terminal) for shard in self._shards)
+                    - self.max_terminal_tasks
+                )
+                self._evict_until(lambda evicted: evicted >= excess)
+            if self.max_bytes is not None:
+                self._evict_until(
+                    lambda evicted: self.size_bytes <= self.max_bytes
                 )
+        finally:
+            self._evict_lock.release()
+
+    def _evict_expired(self, shard: _Shard, now: float) -> None:
+        with shard.lock:
+            for task_id in list(shard.terminal):
+                if self._expired(shard.tasks[task_id], now):
+                    self._remove(shard, task_id)
+                    logger.debug('Task %s expired and was evicted.', task_id)
+
+    def _evict_until(self, done: Callable[[int], bool]) -> None:
+        """Evicts terminal tasks, oldest first, until `done(count)` holds.
+
+        A task that was read since it was last considered gets a second
+        chance and is moved to the back of its shard's eviction order.
+        """
+        evicted = 0
+        while not done(evicted):
+            shard = self._oldest_shard()
+            if shard is None:
+                if self.max_bytes is not None and self.size_bytes > self.max_bytes:
+                    logger.warning(
+                        'InMemoryTaskStore exceeds its memory budget with only active tasks left (%d > %d bytes).',
+                        self.size_bytes,
+                        self.max_bytes,
+                    )
+                return
+            with shard.lock:
+                task_id = self._pop_victim(shard)
+                if task_id is None:
+                    continue
+                self._remove(shard, task_id)
+            evicted += 1
+            logger.debug('Task %s evicted from the store.', task_id)
+
+    def _oldest_shard(self) -> _Shard | None:
+        """Returns the shard whose next eviction candidate is oldest."""
+        oldest: _Shard | None = None
+        oldest_since = 0.0
+        for shard in self._shards:
+            with shard.lock:
+                if not shard.terminal:
+                    continue
+                since = shard.tasks[next(iter(shard.terminal))].terminal_since
+            if oldest is None or since < oldest_since:
+                oldest, oldest_since = shard, since
+        return oldest
+
+    @staticmethod
+    def _pop_victim(shard: _Shard) -> str | None:
+        for _ in range(len(shard.terminal)):
+            task_id = next(iter(shard.terminal))
+            entry = shard.tasks[task_id]
+            if not entry.referenced:
+                return task_id
+            entry.referenced = False
+            shard.terminal.move_to_end(task_id)
+        return next(iter(shard.terminal), None)
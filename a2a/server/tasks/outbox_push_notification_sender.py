@@ -0,0 +1,534 @@
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import time
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from a2a.server.tasks.push_notification_config_store import (
+    PushNotificationConfigStore,
+)
+from a2a.server.tasks.push_notification_sender import PushNotificationSender
+from a2a.types import Task
+
+
+logger = logging.getLogger(__name__)
+
+
+_STATE_PENDING = 'pending'
+_STATE_IN_FLIGHT = 'in_flight'
+_STATE_DEAD = 'dead'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS push_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    token TEXT,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_push_outbox_due
+    ON push_outbox(state, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_push_outbox_target
+    ON push_outbox(task_id, url, state);
+"""
+
+# A pending entry can be sent only when it is the oldest undelivered entry for
+# its task and URL, so states for one target go out one at a time and in order.
+_HEAD_OF_TARGET = (
+    'o.state = ? AND NOT EXISTS (SELECT 1 FROM push_outbox AS i '
+    'WHERE i.task_id = o.task_id AND i.url = o.url AND (i.state = ? '
+    'OR (i.state = ? AND i.id < o.id)))'
+)
+_HEAD_OF_TARGET_ARGS = (_STATE_PENDING, _STATE_IN_FLIGHT, _STATE_PENDING)
+
+# Client errors that will not succeed on retry. Other 4xx responses
+# (timeouts, rate limiting) are retried like server errors.
+_RETRYABLE_CLIENT_ERRORS = frozenset({408, 409, 425, 429})
+
+# Retry delays for recording a delivery outcome when the outbox is locked or
+# unavailable, in seconds.
+_SETTLE_RETRY_DELAY = 0.5
+_SETTLE_MAX_RETRY_DELAY = 30.0
+
+# How often the dispatcher removes expired dead entries, in seconds.
+_PURGE_INTERVAL = 3600.0
+
+
+@dataclass
+class _OutboxEntry:
+    id: int
+    task_id: str
+    url: str
+    token: str | None
+    payload: str
+    attempts: int
+
+
+class OutboxPushNotificationSender(PushNotificationSender):
+    """Push-notification sender that delivers from a durable local outbox.
+
+    `send_notification` only records the latest task state in a SQLite outbox
+    and returns, so a slow or failing webhook never blocks the request that
+    produced the update. Background workers deliver the entries:
+
+    - failed deliveries are retried with exponential backoff and jitter, and
+      moved to a dead state after `max_attempts`;
+    - at most `per_url_concurrency` requests run against one URL at a time;
+    - a newer state for the same task and URL replaces an undelivered older
+      one, including one waiting to be retried, and states for one task and
+      URL are delivered one at a time and in order;
+    - entries left in flight by a crashed process are retried on start, and
+      dead entries are removed after `dead_retention`.
+
+    Delivery starts when the sender is created inside a running event loop,
+    or otherwise on `start` or the first `send_notification`, so entries
+    left over from a previous run go out without waiting for a new update.
+    """
+
+    def __init__(
+        self,
+        httpx_client: httpx.AsyncClient,
+        config_store: PushNotificationConfigStore,
+        db_path: str,
+        num_workers: int = 4,
+        per_url_concurrency: int = 2,
+        max_attempts: int = 8,
+        base_backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        dead_retention: float = 7 * 24 * 3600.0,
+    ) -> None:
+        """Initializes the OutboxPushNotificationSender.
+
+        Args:
+            httpx_client: An async HTTP client instance to send notifications.
+            config_store: A PushNotificationConfigStore instance to retrieve configurations.
+            db_path: Path of the SQLite outbox file. A relative path is
+                resolved against the working directory at construction.
+            num_workers: Maximum number of deliveries in flight overall.
+            per_url_concurrency: Maximum number of deliveries in flight per URL.
+            max_attempts: Attempts before an entry is marked dead.
+            base_backoff: Delay before the first retry, in seconds.
+            max_backoff: Upper bound on the retry delay, in seconds.
+            dead_retention: How long dead entries are kept for inspection,
+                in seconds.
+        """
+        self._client = httpx_client
+        self._config_store = config_store
+        self.db_path = os.path.abspath(db_path)
+        self.num_workers = num_workers
+        self.per_url_concurrency = per_url_concurrency
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.dead_retention = dead_retention
+        self._url_in_flight: dict[str, int] = {}
+        self._deliveries: set[asyncio.Task[None]] = set()
+        self._wake = asyncio.Event()
+        self._dispatcher: asyncio.Task[None] | None = None
+        self._initialized = False
+        self._start_lock = asyncio.Lock()
+        self._next_purge = 0.0
+        self._starting: asyncio.Task[None] | None = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            self._starting = loop.create_task(self.start())
+
+    async def start(self) -> None:
+        """Opens the outbox and starts delivering the entries it holds."""
+        await self._ensure_started()
+
+    async def send_notification(self, task: Task) -> None:
+        """Queues a push notification for every configured URL of the task."""
+        push_configs = await self._config_store.get_info(task.id)
+        if not push_configs:
+            return
+
+        payload = task.model_dump_json(exclude_none=True)
+        targets = [(config.url, config.token) for config in push_configs]
+        await self._ensure_started()
+        await asyncio.to_thread(self._enqueue, task.id, targets, payload)
+        self._wake.set()
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Stops the dispatcher and waits for in-flight deliveries.
+
+        Undelivered entries stay in the outbox and are sent after restart.
+        """
+        if self._starting is not None:
+            await asyncio.gather(self._starting, return_exceptions=True)
+            self._starting = None
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        if self._deliveries:
+            await asyncio.wait(self._deliveries, timeout=timeout)
+
+    async def pending_count(self) -> int:
+        """Returns the number of entries waiting to be delivered."""
+        await self._ensure_started()
+        return await asyncio.to_thread(self._count, _STATE_PENDING)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    async def _ensure_started(self) -> None:
+        async with self._start_lock:
+            # Recovery must run once: a second pass would reset entries the
+            # running dispatcher already claimed.
+            if not self._initialized:
+                await asyncio.to_thread(self._init_db)
+                self._initialized = True
+            if self._dispatcher is None or self._dispatcher.done():
+                self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            recovered = conn.execute(
+                'UPDATE push_outbox SET state = ? WHERE state = ?',
+                (_STATE_PENDING, _STATE_IN_FLIGHT),
+            ).rowcount
+            # A recovered entry may have been superseded while it was in
+            # flight; keep only the newest state for each target.
+            conn.execute(
+                'DELETE FROM push_outbox WHERE state = ? AND EXISTS '
+                '(SELECT 1 FROM push_outbox AS n WHERE n.task_id = push_outbox.task_id '
+                'AND n.url = push_outbox.url AND n.state = ? AND n.id > push_outbox.id)',
+                (_STATE_PENDING, _STATE_PENDING),
+            )
+        finally:
+            conn.close()
+        if recovered:
+            logger.info(
+                'Recovered %d push-notification(s) left in flight.', recovered
+            )
+
+    def _enqueue(
+        self,
+        task_id: str,
+        targets: list[tuple[str, str | None]],
+        payload: str,
+    ) -> None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for url, token in targets:
+                # Replace an undelivered older state instead of queueing both.
+                updated = conn.execute(
+                    'UPDATE push_outbox SET payload = ?, token = ?, attempts = 0, '
+                    'next_attempt_at = ?, last_error = NULL '
+                    'WHERE task_id = ? AND url = ? AND state = ?',
+                    (payload, token, now, task_id, url, _STATE_PENDING),
+                ).rowcount
+                if updated:
+                    logger.debug(
+                        'Coalesced push-notification for task_id=%s to URL: %s',
+                        task_id,
+                        url,
+                    )
+                    continue
+                conn.execute(
+                    'INSERT INTO push_outbox (task_id, url, token, payload, state, '
+                    'next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (task_id, url, token, payload, _STATE_PENDING, now, now),
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _claim(self, limit: int, busy_urls: set[str]) -> list[_OutboxEntry]:
+        """Marks up to `limit` due entries in flight and returns them."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(
+                f'SELECT * FROM push_outbox AS o WHERE {_HEAD_OF_TARGET} '
+                'AND o.next_attempt_at <= ? ORDER BY o.next_attempt_at, o.id',
+                (*_HEAD_OF_TARGET_ARGS, now),
+            ).fetchall()
+            claimed: list[_OutboxEntry] = []
+            taken: dict[str, int] = {}
+            for row in rows:
+                url = row['url']
+                in_use = self._url_in_flight.get(url, 0) + taken.get(url, 0)
+                if url in busy_urls or in_use >= self.per_url_concurrency:
+                    continue
+                taken[url] = taken.get(url, 0) + 1
+                claimed.append(
+                    _OutboxEntry(
+                        id=row['id'],
+                        task_id=row['task_id'],
+                        url=url,
+                        token=row['token'],
+                        payload=row['payload'],
+                        attempts=row['attempts'],
+                    )
+                )
+                if len(claimed) >= limit:
+                    break
+            conn.executemany(
+                'UPDATE push_outbox SET state = ? WHERE id = ?',
+                [(_STATE_IN_FLIGHT, entry.id) for entry in claimed],
+            )
+            conn.execute('COMMIT')
+            return claimed
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _next_due(self, busy_urls: set[str]) -> float | None:
+        """Returns when the next entry `_claim` could take becomes due.
+
+        Entries waiting behind another entry for the same target or on a
+        saturated URL are skipped; a finished delivery wakes the dispatcher.
+        """
+        exclude = ', '.join('?' * len(busy_urls))
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f'SELECT MIN(o.next_attempt_at) FROM push_outbox AS o WHERE {_HEAD_OF_TARGET}'
+                + (f' AND o.url NOT IN ({exclude})' if busy_urls else ''),
+                (*_HEAD_OF_TARGET_ARGS, *busy_urls),
+            ).fetchone()
+            return row[0]
+        finally:
+            conn.close()
+
+    def _purge_dead(self) -> int:
+        """Removes dead entries that died more than `dead_retention` ago."""
+        conn = self._connect()
+        try:
+            # A dead entry's next_attempt_at records when it was given up on.
+            return conn.execute(
+                'DELETE FROM push_outbox WHERE state = ? AND next_attempt_at < ?',
+                (_STATE_DEAD, time.time() - self.dead_retention),
+            ).rowcount
+        finally:
+            conn.close()
+
+    def _count(self, state: str) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'SELECT COUNT(*) FROM push_outbox WHERE state = ?', (state,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def _complete(self, entry_id: int) -> None:
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM push_outbox WHERE id = ?', (entry_id,))
+        finally:
+            conn.close()
+
+    def _reschedule(
+        self, entry: _OutboxEntry, error: str, permanent: bool
+    ) -> None:
+        attempts = entry.attempts + 1
+        dead = permanent or attempts >= self.max_attempts
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+        delay *= random.uniform(0.5, 1.0)
+        next_attempt_at = time.time() + delay
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # A newer state queued while this one was in flight supersedes
+            # it: drop this entry and let the newer one inherit the backoff.
+            superseded = conn.execute(
+                'UPDATE push_outbox SET attempts = ?, '
+                'next_attempt_at = MAX(next_attempt_at, ?), last_error = ? '
+                'WHERE task_id = ? AND url = ? AND state = ? AND id > ?',
+                (
+                    attempts,
+                    next_attempt_at,
+                    error,
+                    entry.task_id,
+                    entry.url,
+                    _STATE_PENDING,
+                    entry.id,
+                ),
+            ).rowcount
+            if superseded:
+                conn.execute('DELETE FROM push_outbox WHERE id = ?', (entry.id,))
+            else:
+                conn.execute(
+                    'UPDATE push_outbox SET state = ?, attempts = ?, '
+                    'next_attempt_at = ?, last_error = ? WHERE id = ?',
+                    (
+                        _STATE_DEAD if dead else _STATE_PENDING,
+                        attempts,
+                        time.time() if dead else next_attempt_at,
+                        error,
+                        entry.id,
+                    ),
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        if superseded:
+            logger.debug(
+                'Push-notification for task_id=%s to URL: %s superseded by a newer state.',
+                entry.task_id,
+                entry.url,
+            )
+        elif dead:
+            logger.error(
+                'Giving up on push-notification for task_id=%s to URL: %s after %d attempt(s): %s',
+                entry.task_id,
+                entry.url,
+                attempts,
+                error,
+            )
+
+    async def _dispatch_loop(self) -> None:
+        """Claims due entries and starts deliveries within the limits."""
+        while True:
+            self._wake.clear()
+            if time.time() >= self._next_purge:
+                self._next_purge = time.time() + _PURGE_INTERVAL
+                try:
+                    purged = await asyncio.to_thread(self._purge_dead)
+                except sqlite3.Error:
+                    logger.exception('Failed to purge dead push-notifications.')
+                else:
+                    if purged:
+                        logger.info(
+                            'Removed %d expired dead push-notification(s).',
+                            purged,
+                        )
+            free = self.num_workers - len(self._deliveries)
+            busy = {
+                url
+                for url, count in self._url_in_flight.items()
+                if count >= self.per_url_concurrency
+            }
+            if free > 0:
+                try:
+                    entries = await asyncio.to_thread(self._claim, free, busy)
+                except sqlite3.Error:
+                    logger.exception('Failed to read the push-notification outbox.')
+                    entries = []
+                for entry in entries:
+                    self._url_in_flight[entry.url] = (
+                        self._url_in_flight.get(entry.url, 0) + 1
+                    )
+                    delivery = asyncio.create_task(self._deliver(entry))
+                    self._deliveries.add(delivery)
+                    delivery.add_done_callback(self._deliveries.discard)
+                if entries:
+                    continue
+
+            # With every worker busy nothing is claimable until a delivery
+            # finishes and sets `_wake`.
+            next_due = (
+                await asyncio.to_thread(self._next_due, busy)
+                if free > 0
+                else None
+            )
+            wake_at = self._next_purge if next_due is None else min(next_due, self._next_purge)
+            timeout = max(0.0, wake_at - time.time())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, entry: _OutboxEntry) -> None:
+        headers = {'Content-Type': 'application/json'}
+        if entry.token:
+            headers['X-A2A-Notification-Token'] = entry.token
+        try:
+            response = await self._client.post(
+                entry.url, content=entry.payload, headers=headers
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            permanent = (
+                400 <= status < 500 and status not in _RETRYABLE_CLIENT_ERRORS
+            )
+            await self._settle(
+                entry, self._reschedule, entry, f'HTTP {status}', permanent
+            )
+            logger.warning(
+                'Push-notification for task_id=%s to URL: %s failed with HTTP %d.',
+                entry.task_id,
+                entry.url,
+                status,
+            )
+        except Exception as e:
+            await self._settle(entry, self._reschedule, entry, repr(e), False)
+            logger.warning(
+                'Error sending push-notification for task_id=%s to URL: %s: %r',
+                entry.task_id,
+                entry.url,
+                e,
+            )
+        else:
+            await self._settle(entry, self._complete, entry.id)
+            logger.info(
+                'Push-notification sent for task_id=%s to URL: %s',
+                entry.task_id,
+                entry.url,
+            )
+        finally:
+            self._url_in_flight[entry.url] -= 1
+            if not self._url_in_flight[entry.url]:
+                del self._url_in_flight[entry.url]
+            self._wake.set()
+
+    async def _settle(
+        self, entry: _OutboxEntry, update: Callable[..., None], *args: Any
+    ) -> None:
+        """Records a delivery outcome, retrying until the outbox accepts it.
+
+        Giving up would leave the entry in flight, which holds back every
+        later state for its task and URL until the process restarts.
+        """
+        delay = _SETTLE_RETRY_DELAY
+        while True:
+            try:
+                await asyncio.to_thread(update, *args)
+                return
+            except sqlite3.Error:
+                logger.exception(
+                    'Failed to record the push-notification outcome for task_id=%s to URL: %s; retrying in %.1fs.',
+                    entry.task_id,
+                    entry.url,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                delay = min(_SETTLE_MAX_RETRY_DELAY, delay * 2)
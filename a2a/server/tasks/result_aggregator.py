@@ -69,6 +69,7 @@ class ResultAggregator:
         async for event in consumer.consume_all():
             await self.task_manager.process(event)
             yield event
+        await self.task_manager.flush()
 
     async def consume_all(
         self, consumer: EventConsumer
@@ -92,6 +93,7 @@ class ResultAggregator:
                 self._message = event
                 return event
             await self.task_manager.process(event)
+        await self.task_manager.flush()
         return await self.task_manager.get_task()
 
     async def consume_and_break_on_interrupt(
@@ -164,6 +166,8 @@ class ResultAggregator:
                 )
                 interrupted = True
                 break
+        else:
+            await self.task_manager.flush()
         return await self.task_manager.get_task(), interrupted
 
     async def _continue_consuming(
@@ -184,3 +188,4 @@ class ResultAggregator:
             await self.task_manager.process(event)
             if event_callback:
                 await event_callback()
+        await self.task_manager.flush()
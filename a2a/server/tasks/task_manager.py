@@ -2,6 +2,7 @@ import logging
 
 from a2a.server.context import ServerCallContext
 from a2a.server.events.event_queue import Event
+from a2a.server.tasks.task_state_builder import TaskStateBuilder
 from a2a.server.tasks.task_store import TaskStore
 from a2a.types import (
     InvalidParamsError,
@@ -12,7 +13,6 @@ from a2a.types import (
     TaskStatus,
     TaskStatusUpdateEvent,
 )
-from a2a.utils import append_artifact_to_task
 from a2a.utils.errors import ServerError
 
 
@@ -24,6 +24,11 @@ class TaskManager:
 
     Responsible for retrieving, saving, and updating the `Task` object based on
     events received from the agent.
+
+    Events are applied to a `TaskStateBuilder`; a `Task` is only materialized
+    when it is requested or persisted. Appended artifact chunks are persisted
+    with the next status update, the artifact's last chunk or `flush`,
+    rather than one by one.
     """
 
     def __init__(
@@ -51,7 +56,8 @@ class TaskManager:
         self.context_id = context_id
         self.task_store = task_store
         self._initial_message = initial_message
-        self._current_task: Task | None = None
+        self._state: TaskStateBuilder | None = None
+        self._unsaved = False
         self._call_context: ServerCallContext | None = context
         logger.debug(
             'TaskManager initialized with task_id: %s, context_id: %s',
@@ -62,30 +68,30 @@ class TaskManager:
     async def get_task(self) -> Task | None:
         """Retrieves the current task object, either from memory or the store.
 
-        If `task_id` is set, it first checks the in-memory `_current_task`,
+        If `task_id` is set, it first checks the in-memory task state,
         then attempts to load it from the `task_store`.
 
         Returns:
-            The `Task` object if found, otherwise `None`.
+            The `Task` object if found, otherwise `None`. It is a read-only
+            snapshot of the current state.
         """
         if not self.task_id:
             logger.debug('task_id is not set, cannot get task.')
             return None
 
-        if self._current_task:
-            return self._current_task
+        if self._state:
+            return self._state.snapshot()
 
         logger.debug(
             'Attempting to get task from store with id: %s', self.task_id
         )
-        self._current_task = await self.task_store.get(
-            self.task_id, self._call_context
-        )
-        if self._current_task:
+        task = await self._load_task()
+        if task:
+            self._state = TaskStateBuilder(task)
             logger.debug('Task %s retrieved successfully.', self.task_id)
         else:
             logger.debug('Task %s not found.', self.task_id)
-        return self._current_task
+        return task
 
     async def save_task_event(
         self, event: Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
@@ -104,6 +110,13 @@ class TaskManager:
             ServerError: If the task ID in the event conflicts with the TaskManager's ID
                          when the TaskManager's ID is already set.
         """
+        await self._apply_task_event(event)
+        return self._state.snapshot() if self._state else None
+
+    async def _apply_task_event(
+        self, event: Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
+    ) -> None:
+        """Validates an event, applies it to the task state and persists it if due."""
         task_id_from_event = (
             event.id if isinstance(event, Task) else event.task_id
         )
@@ -132,30 +145,25 @@ class TaskManager:
         )
         if isinstance(event, Task):
             await self._save_task(event)
-            return event
-
-        task: Task = await self.ensure_task(event)
+            return
 
+        state = await self._ensure_state(event)
         if isinstance(event, TaskStatusUpdateEvent):
-            logger.debug(
-                'Updating task %s status to: %s', task.id, event.status.state
-            )
-            if task.status.message:
-                if not task.history:
-                    task.history = [task.status.message]
-                else:
-                    task.history.append(task.status.message)
-            if event.metadata:
-                if not task.metadata:
-                    task.metadata = {}
-                task.metadata.update(event.metadata)
-            task.status = event.status
+            state.apply_status_update(event)
         else:
-            logger.debug('Appending artifact to task %s', task.id)
-            append_artifact_to_task(task, event)
+            state.apply_artifact_update(event)
+            if event.append and not event.last_chunk:
+                # Persisting every chunk would re-serialize the whole task
+                # each time; the final chunk or next status update saves it.
+                self._unsaved = True
+                return
 
-        await self._save_task(task)
-        return task
+        await self._save_task(state.snapshot())
+
+    async def flush(self) -> None:
+        """Persists artifact chunks that were applied but not saved yet."""
+        if self._unsaved and self._state:
+            await self._save_task(self._state.snapshot())
 
     async def ensure_task(
         self, event: TaskStatusUpdateEvent | TaskArtifactUpdateEvent
@@ -168,12 +176,20 @@ class TaskManager:
         Returns:
             An existing or newly created `Task` object.
         """
-        task: Task | None = self._current_task
-        if not task and self.task_id:
+        return (await self._ensure_state(event)).snapshot()
+
+    async def _ensure_state(
+        self, event: TaskStatusUpdateEvent | TaskArtifactUpdateEvent
+    ) -> TaskStateBuilder:
+        if self._state:
+            return self._state
+
+        task: Task | None = None
+        if self.task_id:
             logger.debug(
                 'Attempting to retrieve existing task with id: %s', self.task_id
             )
-            task = await self.task_store.get(self.task_id, self._call_context)
+            task = await self._load_task()
 
         if not task:
             logger.info(
@@ -185,8 +201,10 @@ class TaskManager:
             # Create a task object with the available information and persist the event
             task = self._init_task_obj(event.task_id, event.context_id)
             await self._save_task(task)
+        else:
+            self._state = TaskStateBuilder(task)
 
-        return task
+        return self._state
 
     async def process(self, event: Event) -> Event:
         """Processes an event, updates the task state if applicable, stores it, and returns the event.
@@ -203,7 +221,7 @@ class TaskManager:
         if isinstance(
             event, Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
         ):
-            await self.save_task_event(event)
+            await self._apply_task_event(event)
 
         return event
 
@@ -230,15 +248,26 @@ class TaskManager:
             history=history,
         )
 
+    async def _load_task(self) -> Task | None:
+        """Loads the task from the store.
+
+        Stores may hand out shared snapshots (see `InMemoryTaskStore`). The
+        task state builder never modifies the task it starts from, so no
+        copy is needed.
+        """
+        return await self.task_store.get(self.task_id, self._call_context)
+
     async def _save_task(self, task: Task) -> None:
-        """Saves the given task to the task store and updates the in-memory `_current_task`.
+        """Saves the given task to the task store and makes it the in-memory task state.
 
         Args:
             task: The `Task` object to save.
         """
         logger.debug('Saving task with id: %s', task.id)
         await self.task_store.save(task, self._call_context)
-        self._current_task = task
+        if self._state is None or self._state.snapshot() is not task:
+            self._state = TaskStateBuilder(task)
+        self._unsaved = False
         if not self.task_id:
             logger.info('New task created with id: %s', task.id)
             self.task_id = task.id
@@ -255,17 +284,9 @@ class TaskManager:
             task: The `Task` object to update.
 
         Returns:
-            The updated `Task` object (updated in-place).
+            The updated `Task` object. `task` itself is not modified.
         """
-        if task.status.message:
-            if task.history:
-                task.history.append(task.status.message)
-            else:
-                task.history = [task.status.message]
-            task.status.message = None
-        if task.history:
-            task.history.append(message)
-        else:
-            task.history = [message]
-        self._current_task = task
-        return task
+        if self._state is None or self._state.id != task.id:
+            self._state = TaskStateBuilder(task)
+        self._state.add_message(message)
+        return self._state.snapshot()
@@ -0,0 +1,159 @@
+import logging
+
+from typing import Any
+
+from a2a.types import (
+    Artifact,
+    Message,
+    Part,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class _ArtifactState:
+    """An artifact whose parts are appended to in place."""
+
+    __slots__ = ('artifact', 'parts', '_materialized')
+
+    def __init__(self, artifact: Artifact) -> None:
+        self.artifact = artifact
+        self.parts: list[Part] = list(artifact.parts)
+        self._materialized: Artifact | None = artifact
+
+    def extend(self, parts: list[Part]) -> None:
+        self.parts.extend(parts)
+        self._materialized = None
+
+    def materialize(self) -> Artifact:
+        if self._materialized is None:
+            self._materialized = self.artifact.model_copy(
+                update={'parts': list(self.parts)}
+            )
+        return self._materialized
+
+
+class TaskStateBuilder:
+    """Incrementally updated state of a single task.
+
+    Applies task events as deltas to plain lists and dicts instead of
+    updating and re-validating a `Task` model on every event, so the cost of
+    an event no longer grows with the size of the task. A `Task` is only
+    materialized by `snapshot`, which is cached until the next change.
+
+    Snapshots are never modified by the builder afterwards and must be
+    treated as read-only by callers. The events applied to the builder are
+    referenced, not copied.
+    """
+
+    def __init__(self, task: Task) -> None:
+        """Initializes the builder from an existing task.
+
+        Args:
+            task: The task to start from. It is not modified.
+        """
+        self.id = task.id
+        self.context_id = task.context_id
+        self.status: TaskStatus = task.status
+        self._history: list[Message] | None = (
+            list(task.history) if task.history is not None else None
+        )
+        self._artifacts: dict[str, _ArtifactState] | None = (
+            {a.artifact_id: _ArtifactState(a) for a in task.artifacts}
+            if task.artifacts is not None
+            else None
+        )
+        self._metadata: dict[str, Any] | None = (
+            dict(task.metadata) if task.metadata is not None else None
+        )
+        self._snapshot: Task | None = task
+
+    def _add_history(self, message: Message) -> None:
+        if self._history is None:
+            self._history = []
+        self._history.append(message)
+
+    def apply_status_update(self, event: TaskStatusUpdateEvent) -> None:
+        """Moves the current status message to history and sets the new status."""
+        logger.debug(
+            'Updating task %s status to: %s', self.id, event.status.state
+        )
+        if self.status.message:
+            self._add_history(self.status.message)
+        if event.metadata:
+            if self._metadata is None:
+                self._metadata = {}
+            self._metadata.update(event.metadata)
+        self.status = event.status
+        self._snapshot = None
+
+    def apply_artifact_update(self, event: TaskArtifactUpdateEvent) -> None:
+        """Adds, replaces or extends an artifact.
+
+        Mirrors `a2a.utils.append_artifact_to_task`: without `append` the
+        artifact replaces any artifact with the same id, with `append` its
+        parts are appended to the existing artifact. Chunks for an unknown
+        artifact are ignored.
+        """
+        if self._artifacts is None:
+            self._artifacts = {}
+        artifact = event.artifact
+        existing = self._artifacts.get(artifact.artifact_id)
+        if not event.append:
+            logger.debug(
+                'Setting artifact with id %s for task %s',
+                artifact.artifact_id,
+                self.id,
+            )
+            self._artifacts[artifact.artifact_id] = _ArtifactState(artifact)
+        elif existing is not None:
+            logger.debug(
+                'Appending parts to artifact id %s for task %s',
+                artifact.artifact_id,
+                self.id,
+            )
+            existing.extend(artifact.parts)
+        else:
+            logger.warning(
+                'Received append=True for nonexistent artifact index %s in task %s. Ignoring chunk.',
+                artifact.artifact_id,
+                self.id,
+            )
+            return
+        self._snapshot = None
+
+    def add_message(self, message: Message) -> None:
+        """Adds a new message to the history, after the current status message."""
+        if self.status.message:
+            self._add_history(self.status.message)
+            self.status = self.status.model_copy(update={'message': None})
+        self._add_history(message)
+        self._snapshot = None
+
+    def snapshot(self) -> Task:
+        """Returns the current state as a `Task`.
+
+        The fields come from already validated models, so the task is
+        constructed without validating it again.
+        """
+        if self._snapshot is None:
+            fields: dict[str, Any] = {
+                'id': self.id,
+                'context_id': self.context_id,
+                'status': self.status,
+            }
+            if self._history is not None:
+                fields['history'] = list(self._history)
+            if self._artifacts is not None:
+                fields['artifacts'] = [
+                    state.materialize() for state in self._artifacts.values()
+                ]
+            if self._metadata is not None:
+                fields['metadata'] = dict(self._metadata)
+            self._snapshot = Task.model_construct(**fields)
+        return self._snapshot
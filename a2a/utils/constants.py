@@ -4,3 +4,6 @@ AGENT_CARD_WELL_KNOWN_PATH = '/.well-known/agent-card.json'
 PREV_AGENT_CARD_WELL_KNOWN_PATH = '/.well-known/agent.json'
 EXTENDED_AGENT_CARD_PATH = '/agent/authenticatedExtendedCard'
 DEFAULT_RPC_URL = '/'
+METRICS_PATH = '/metrics'
+# Seconds clients may reuse a served agent card before revalidating it.
+AGENT_CARD_CACHE_MAX_AGE = 300
@@ -0,0 +1,334 @@
+"""In-process metrics for the A2A Python SDK.
+
+A small Prometheus-compatible metrics registry: counters and histograms
+kept in memory and rendered in the Prometheus text exposition format by
+`MetricsRegistry.render`, e.g. from the `/metrics` endpoint of an A2A
+server application.
+
+Recording is switched on and off with `a2a.utils.telemetry.configure_telemetry`.
+Instrumented code checks `REGISTRY.enabled` before touching a metric, so
+disabled metrics cost a single attribute lookup.
+
+Usage:
+    ```python
+    from a2a.utils.metrics import REGISTRY, Histogram
+
+    LATENCY = Histogram('my_latency_seconds', 'Latency of my calls.', ['op'])
+    REGISTRY.register(LATENCY)
+
+    if REGISTRY.enabled:
+        LATENCY.labels('fetch').observe(0.012)
+    ```
+"""
+
+import bisect
+import math
+import threading
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping, Sequence
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+"""Latency buckets, in seconds, from half a millisecond to five minutes."""
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+"""Content type of the Prometheus text exposition format."""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+    )
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(names, values, strict=True)
+    )
+    return '{' + pairs + '}'
+
+
+class _Metric(ABC):
+    """Base class of labelled metrics; children hold one value per label set."""
+
+    type_name = ''
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_child(self) -> object:
+        """Creates the value holder for a new label set."""
+
+    def labels(self, *values: str) -> object:
+        """Returns the child for the given label values, creating it if needed.
+
+        Call sites on a hot path should keep the child instead of calling
+        `labels` every time.
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f'{self.name} expects labels {self.labelnames}, got {key}'
+                )
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def clear(self) -> None:
+        """Drops every recorded value."""
+        with self._lock:
+            self._children.clear()
+
+    @abstractmethod
+    def _samples(self, const_labels: Mapping[str, str]) -> Iterable[str]:
+        """Yields the sample lines of every child in the text format.
+
+        Args:
+            const_labels: Labels put in front of the metric's own labels on
+                every sample.
+        """
+
+    def render(self, const_labels: Mapping[str, str] | None = None) -> str:
+        lines = [
+            f'# HELP {self.name} {_escape(self.documentation)}',
+            f'# TYPE {self.name} {self.type_name}',
+        ]
+        lines.extend(self._samples(const_labels or {}))
+        return '\n'.join(lines)
+
+
+class _CounterChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, optionally split by labels."""
+
+    type_name = 'counter'
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def labels(self, *values: str) -> _CounterChild:
+        """Returns the counter for the given label values."""
+        return super().labels(*values)  # type: ignore[return-value]
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increments the counter of a metric without labels."""
+        self.labels().inc(amount)
+
+    def _samples(self, const_labels: Mapping[str, str]) -> Iterable[str]:
+        names = (*const_labels, *self.labelnames)
+        for key, child in sorted(self._children.items()):
+            labels = _format_labels(names, (*const_labels.values(), *key))
+            yield f'{self.name}{labels} {_format_value(child.value)}'  # type: ignore[attr-defined]
+
+
+class _HistogramChild:
+    __slots__ = ('_lock', 'bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One count per bucket, plus the +Inf bucket; not cumulative.
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Counts of observed values in fixed buckets, optionally split by labels."""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initializes the Histogram.
+
+        Args:
+            name: The metric name.
+            documentation: The help text of the metric.
+            labelnames: The names of the labels the histogram is split by.
+            buckets: Upper bounds of the buckets, in increasing order. The
+                `+Inf` bucket is always added.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(b for b in buckets if b != math.inf)
+        if list(self.buckets) != sorted(self.buckets):
+            raise ValueError('Histogram buckets must be in increasing order')
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def labels(self, *values: str) -> _HistogramChild:
+        """Returns the histogram for the given label values."""
+        return super().labels(*values)  # type: ignore[return-value]
+
+    def observe(self, value: float) -> None:
+        """Records a value in a histogram without labels."""
+        self.labels().observe(value)
+
+    def _samples(self, const_labels: Mapping[str, str]) -> Iterable[str]:
+        const_names, const_values = tuple(const_labels), tuple(const_labels.values())
+        names = (*const_names, *self.labelnames)
+        bucket_names = (*names, 'le')
+        for key, child in sorted(self._children.items()):
+            with child._lock:  # type: ignore[attr-defined]
+                counts = list(child.counts)  # type: ignore[attr-defined]
+                total = child.sum  # type: ignore[attr-defined]
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, math.inf), counts, strict=True
+            ):
+                cumulative += count
+                labels = _format_labels(
+                    bucket_names, (*const_values, *key, _format_value(bound))
+                )
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(names, (*const_values, *key))
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together.
+
+    Attributes:
+        enabled: Whether instrumented code records values. Metrics can
+            always be updated directly; the flag is checked by the SDK's own
+            call sites.
+        const_labels: Labels added to every rendered sample, e.g. a worker
+            id when several processes serve the same metrics endpoint and
+            each scrape reaches only one of them.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty, disabled MetricsRegistry."""
+        self.enabled = False
+        self.const_labels: dict[str, str] = {}
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        """Adds a metric to the registry.
+
+        Raises:
+            ValueError: If another metric with the same name is registered.
+        """
+        existing = self._metrics.get(metric.name)
+        if existing is not None and existing is not metric:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+
+    def clear(self) -> None:
+        """Drops the values recorded by every registered metric."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        if not self._metrics:
+            return ''
+        return (
+            '\n'.join(
+                metric.render(self.const_labels)
+                for _, metric in sorted(self._metrics.items())
+            )
+            + '\n'
+        )
+
+
+REGISTRY = MetricsRegistry()
+"""The registry of the SDK's metrics, served by the A2A server applications."""
+
+CALL_DURATION = Histogram(
+    'a2a_call_duration_seconds',
+    'Duration of calls to methods instrumented with trace_function.',
+    ['method'],
+)
+REQUEST_DURATION = Histogram(
+    'a2a_request_duration_seconds',
+    'Duration of non-streaming JSON-RPC requests, by method.',
+    ['method'],
+)
+EVENTS = Counter(
+    'a2a_events_total',
+    'Events enqueued to event queues, by event type.',
+    ['type'],
+)
+QUEUE_DEPTH = Histogram(
+    'a2a_event_queue_depth',
+    'Unread events in the producer queue after each enqueue.',
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+TASK_DURATION = Histogram(
+    'a2a_task_duration_seconds',
+    'Duration of agent executions, by agent executor and outcome.',
+    ['agent', 'outcome'],
+)
+
+for _metric in (
+    CALL_DURATION,
+    REQUEST_DURATION,
+    EVENTS,
+    QUEUE_DEPTH,
+    TASK_DURATION,
+):
+    REGISTRY.register(_metric)
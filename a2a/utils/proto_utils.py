@@ -1,13 +1,14 @@
 # mypy: disable-error-code="arg-type"
 """Utils for converting between proto and Python types."""
 
-import json
 import logging
 import re
 
-from typing import Any
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Generic, TypeVar
 
-from google.protobuf import json_format, struct_pb2
+from google.protobuf import struct_pb2
 
 from a2a import types
 from a2a.grpc import a2a_pb2
@@ -24,12 +25,67 @@ _TASK_PUSH_CONFIG_NAME_MATCH = re.compile(
 )
 
 
+_S = TypeVar('_S')
+_T = TypeVar('_T')
+
+
+class _ContentCache(Generic[_S, _T]):
+    """Bounded LRU cache of conversions keyed by the content of the source.
+
+    The same content is converted over and over: a task's history messages
+    and unchanged artifacts are part of every snapshot of it, and the agent
+    card is sent with every request. Sources are mutable Pydantic models
+    (`RequestContext` fills in a message's task and context ids, artifacts
+    are extended in place), so the key is the source's JSON serialization
+    rather than its identity. Serializing is several times cheaper than
+    building the proto, and a modified source simply misses the cache.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[bytes, _T] = OrderedDict()
+
+    def get(self, source: _S, convert: Callable[[_S], _T]) -> _T:
+        key = source.__pydantic_serializer__.to_json(source)
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            return result
+        result = convert(source)
+        self._entries[key] = result
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Messages and artifacts are copied into the protos they are embedded in,
+# so the cached protos themselves are never modified.
+_MESSAGE_CACHE: _ContentCache[types.Message, a2a_pb2.Message] = _ContentCache(
+    4096
+)
+_ARTIFACT_CACHE: _ContentCache[types.Artifact, a2a_pb2.Artifact] = (
+    _ContentCache(1024)
+)
+_AGENT_CARD_CACHE: _ContentCache[types.AgentCard, a2a_pb2.AgentCard] = (
+    _ContentCache(16)
+)
+
+
+def clear_conversion_caches() -> None:
+    """Drops all cached conversions of messages, artifacts and agent cards."""
+    _MESSAGE_CACHE.clear()
+    _ARTIFACT_CACHE.clear()
+    _AGENT_CARD_CACHE.clear()
+
+
 def dict_to_struct(dictionary: dict[str, Any]) -> struct_pb2.Struct:
     """Converts a Python dict to a Struct proto.
 
-    Unfortunately, using `json_format.ParseDict` does not work because this
-    wants the dictionary to be an exact match of the Struct proto with fields
-    and keys and values, not the traditional Python dict structure.
+    Nested dicts and lists are converted by `Struct.update`, which is
+    several times faster than assigning the fields one by one.
 
     Args:
       dictionary: The Python dict to convert.
@@ -38,14 +94,39 @@ def dict_to_struct(dictionary: dict[str, Any]) -> struct_pb2.Struct:
       The Struct proto.
     """
     struct = struct_pb2.Struct()
-    for key, val in dictionary.items():
-        if isinstance(val, dict):
-            struct[key] = dict_to_struct(val)
-        else:
-            struct[key] = val
+    struct.update(dictionary)
     return struct
 
 
+def _value_to_python(value: struct_pb2.Value) -> Any:
+    kind = value.WhichOneof('kind')
+    if kind == 'struct_value':
+        return struct_to_dict(value.struct_value)
+    if kind == 'list_value':
+        return [_value_to_python(item) for item in value.list_value.values]
+    if kind == 'null_value' or kind is None:
+        return None
+    return getattr(value, kind)
+
+
+def struct_to_dict(struct: struct_pb2.Struct) -> dict[str, Any]:
+    """Converts a Struct proto to a Python dict.
+
+    Produces the same result as `json_format.MessageToDict` (numbers are
+    floats), reading the values directly instead of going through the
+    generic JSON mapping.
+
+    Args:
+      struct: The Struct proto to convert.
+
+    Returns:
+      The Python dict.
+    """
+    return {
+        key: _value_to_python(value) for key, value in struct.fields.items()
+    }
+
+
 def make_dict_serializable(value: Any) -> Any:
     """Dict pre-processing utility: converts non-serializable values to serializable form.
 
@@ -133,6 +214,10 @@ class ToProto:
     def message(cls, message: types.Message | None) -> a2a_pb2.Message | None:
         if message is None:
             return None
+        return _MESSAGE_CACHE.get(message, cls._message)
+
+    @classmethod
+    def _message(cls, message: types.Message) -> a2a_pb2.Message:
         return a2a_pb2.Message(
             message_id=message.message_id,
             content=[cls.part(p) for p in message.parts],
@@ -235,6 +320,10 @@ class ToProto:
 
     @classmethod
     def artifact(cls, artifact: types.Artifact) -> a2a_pb2.Artifact:
+        return _ARTIFACT_CACHE.get(artifact, cls._artifact)
+
+    @classmethod
+    def _artifact(cls, artifact: types.Artifact) -> a2a_pb2.Artifact:
         return a2a_pb2.Artifact(
             artifact_id=artifact.artifact_id,
             description=artifact.description,
@@ -374,6 +463,14 @@ class ToProto:
         cls,
         card: types.AgentCard,
     ) -> a2a_pb2.AgentCard:
+        """Converts an agent card, reusing an earlier conversion of equal content.
+
+        The returned proto may be shared and must not be modified.
+        """
+        return _AGENT_CARD_CACHE.get(card, cls._agent_card)
+
+    @classmethod
+    def _agent_card(cls, card: types.AgentCard) -> a2a_pb2.AgentCard:
         return a2a_pb2.AgentCard(
             capabilities=cls.capabilities(card.capabilities),
             default_input_modes=list(card.default_input_modes),
@@ -589,7 +686,7 @@ class FromProto:
     def metadata(cls, metadata: struct_pb2.Struct) -> dict[str, Any]:
         if not metadata.fields:
             return {}
-        return json_format.MessageToDict(metadata)
+        return struct_to_dict(metadata)
 
     @classmethod
     def part(cls, part: a2a_pb2.Part) -> types.Part:
@@ -624,8 +721,7 @@ class FromProto:
 
     @classmethod
     def data(cls, data: a2a_pb2.DataPart) -> dict[str, Any]:
-        json_data = json_format.MessageToJson(data.data)
-        return json.loads(json_data)
+        return struct_to_dict(data.data)
 
     @classmethod
     def file(
@@ -917,7 +1013,7 @@ class FromProto:
         return types.AgentExtension(
             uri=extension.uri,
             description=extension.description,
-            params=json_format.MessageToDict(extension.params),
+            params=struct_to_dict(extension.params),
             required=extension.required,
         )
 
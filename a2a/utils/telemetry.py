@@ -17,6 +17,15 @@ Features:
 - Dynamic attribute setting via an `attribute_extractor` callback.
 - Automatic recording of exceptions and setting of span status.
 - Selective method tracing in classes using include/exclude lists.
+- Head sampling: with `TracingMode.SAMPLED` only a fraction of the top-level
+  calls are traced, together with every call made under them.
+- Per-method latency histograms (`a2a_call_duration_seconds`) recorded in
+  process by `a2a.utils.metrics`, without creating spans.
+
+Tracing and metrics are configured once per process with
+`configure_telemetry`. By default every call is traced and no metrics are
+recorded. With tracing off and metrics disabled, a wrapped call costs one
+attribute check on top of the call itself.
 
 Usage:
     For a single function:
@@ -51,16 +60,32 @@ Usage:
             # This method will not be traced
             pass
     ```
+
+    To sample 1% of the traces and serve latency histograms instead:
+    ```python
+    from a2a.utils.telemetry import TracingMode, configure_telemetry
+
+    configure_telemetry(
+        tracing=TracingMode.SAMPLED, sample_rate=0.01, metrics_enabled=True
+    )
+    ```
 """
 
 import asyncio
+import contextlib
 import functools
 import inspect
 import logging
+import random
+import time
 
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextvars import ContextVar, Token
+from enum import Enum
 from typing import TYPE_CHECKING, Any
 
+from a2a.utils import metrics
+
 
 if TYPE_CHECKING:
     from opentelemetry.trace import SpanKind as SpanKindType
@@ -74,6 +99,7 @@ try:
     from opentelemetry.trace import SpanKind as _SpanKind
     from opentelemetry.trace import StatusCode
 
+    _otel_installed = True
 except ImportError:
     logger.debug(
         'OpenTelemetry not found. Tracing will be disabled. '
@@ -98,14 +124,113 @@ except ImportError:
     trace = _NoOp()  # type: ignore
     _SpanKind = _NoOp()  # type: ignore
     StatusCode = _NoOp()  # type: ignore
+    _otel_installed = False
 
 SpanKind = _SpanKind
-__all__ = ['SpanKind']
+__all__ = ['SpanKind', 'TracingMode', 'configure_telemetry']
 
 INSTRUMENTING_MODULE_NAME = 'a2a-python-sdk'
 INSTRUMENTING_MODULE_VERSION = '1.0.0'
 
 
+class TracingMode(str, Enum):
+    """Which calls wrapped by `trace_function` get a span."""
+
+    OFF = 'off'
+    SAMPLED = 'sampled'
+    FULL = 'full'
+
+
+class _Settings:
+    """Process-wide telemetry settings read by every wrapped call."""
+
+    __slots__ = ('active', 'mode', 'sample_rate', 'tracing')
+
+    def __init__(self) -> None:
+        self.mode = TracingMode.FULL
+        self.sample_rate = 1.0
+        self.tracing = _otel_installed
+        self.active = self.tracing
+
+
+_settings = _Settings()
+
+# Sampling decision of the current trace: None outside of any wrapped call,
+# then inherited by every call made under the top-level one.
+_sampled: ContextVar[bool | None] = ContextVar(
+    'a2a_trace_sampled', default=None
+)
+
+
+def configure_telemetry(
+    tracing: TracingMode | str | None = None,
+    sample_rate: float | None = None,
+    metrics_enabled: bool | None = None,
+) -> None:
+    """Configures tracing and metrics for all instrumented calls.
+
+    Arguments left as None keep their current value.
+
+    Args:
+        tracing: `full` traces every call (the default), `sampled` traces a
+            fraction of the top-level calls and everything they call, `off`
+            creates no spans. Spans are only created if OpenTelemetry is
+            installed.
+        sample_rate: Fraction of top-level calls traced in `sampled` mode,
+            between 0 and 1.
+        metrics_enabled: Whether to record the SDK's metrics (see
+            `a2a.utils.metrics`). Disabled by default.
+    """
+    if tracing is not None:
+        _settings.mode = TracingMode(tracing)
+    if sample_rate is not None:
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError('sample_rate must be between 0 and 1')
+        _settings.sample_rate = sample_rate
+    if metrics_enabled is not None:
+        metrics.REGISTRY.enabled = metrics_enabled
+    _settings.tracing = _otel_installed and _settings.mode != TracingMode.OFF
+    _settings.active = _settings.tracing or metrics.REGISTRY.enabled
+    logger.debug(
+        'Telemetry: tracing=%s, sample_rate=%s, metrics=%s',
+        _settings.mode.value,
+        _settings.sample_rate,
+        metrics.REGISTRY.enabled,
+    )
+
+
+def _sample() -> tuple[bool, Token[bool | None] | None]:
+    """Decides whether the current call is traced.
+
+    Returns:
+        The decision, and the token to reset the sampling context with when
+        the call is the top-level call of a new trace.
+    """
+    if not _settings.tracing:
+        return False, None
+    if _settings.mode == TracingMode.FULL:
+        return True, None
+    sampled = _sampled.get()
+    if sampled is not None:
+        return sampled, None
+    sampled = random.random() < _settings.sample_rate
+    return sampled, _sampled.set(sampled)
+
+
+async def _timed_iteration(
+    agen: AsyncGenerator[Any, None],
+    histogram: metrics._HistogramChild,
+    start: float,
+) -> AsyncIterator[Any]:
+    """Yields from `agen` and records the time until it is exhausted or closed."""
+    try:
+        async with contextlib.aclosing(agen):
+            async for item in agen:
+                yield item
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
 def trace_function(  # noqa: PLR0915
     func: Callable | None = None,
     *,
@@ -121,6 +246,9 @@ def trace_function(  # noqa: PLR0915
     The span will record the execution time, status (OK or ERROR), and any
     exceptions that occur.
 
+    For async generator functions the span covers only the call that creates
+    the generator, while the call duration metric covers the whole iteration.
+
     It can be used in two ways:
 
     1. As a direct decorator: `@trace_function`
@@ -169,6 +297,7 @@ def trace_function(  # noqa: PLR0915
     actual_span_name = span_name or f'{func.__module__}.{func.__name__}'
 
     is_async_func = inspect.iscoroutinefunction(func)
+    is_async_gen = inspect.isasyncgenfunction(func)
 
     logger.debug(
         'Start tracing for %s, is_async_func %s',
@@ -176,9 +305,26 @@ def trace_function(  # noqa: PLR0915
         is_async_func,
     )
 
+    call_duration = metrics.CALL_DURATION.labels(actual_span_name)
+
     @functools.wraps(func)
     async def async_wrapper(*args, **kwargs) -> Any:
         """Async Wrapper for the decorator."""
+        if not _settings.active:
+            return await func(*args, **kwargs)
+        start = time.perf_counter()
+        traced, token = _sample()
+        try:
+            if traced:
+                return await traced_async(args, kwargs)
+            return await func(*args, **kwargs)
+        finally:
+            if token is not None:
+                _sampled.reset(token)
+            if metrics.REGISTRY.enabled:
+                call_duration.observe(time.perf_counter() - start)
+
+    async def traced_async(args: tuple, kwargs: dict[str, Any]) -> Any:
         logger.debug('Start async tracer')
         tracer = trace.get_tracer(
             INSTRUMENTING_MODULE_NAME, INSTRUMENTING_MODULE_VERSION
@@ -222,6 +368,37 @@ def trace_function(  # noqa: PLR0915
     @functools.wraps(func)
     def sync_wrapper(*args, **kwargs) -> Any:
         """Sync Wrapper for the decorator."""
+        if not _settings.active:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        traced, token = _sample()
+        try:
+            if traced:
+                return traced_sync(args, kwargs)
+            return func(*args, **kwargs)
+        finally:
+            if token is not None:
+                _sampled.reset(token)
+            if metrics.REGISTRY.enabled:
+                call_duration.observe(time.perf_counter() - start)
+
+    @functools.wraps(func)
+    def async_gen_wrapper(*args, **kwargs) -> Any:
+        """Async generator wrapper: times the iteration, not just the call."""
+        if not _settings.active:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        traced, token = _sample()
+        try:
+            agen = traced_sync(args, kwargs) if traced else func(*args, **kwargs)
+        finally:
+            if token is not None:
+                _sampled.reset(token)
+        if not metrics.REGISTRY.enabled:
+            return agen
+        return _timed_iteration(agen, call_duration, start)
+
+    def traced_sync(args: tuple, kwargs: dict[str, Any]) -> Any:
         tracer = trace.get_tracer(INSTRUMENTING_MODULE_NAME)
         with tracer.start_as_current_span(actual_span_name, kind=kind) as span:
             if attributes:
@@ -254,7 +431,9 @@ def trace_function(  # noqa: PLR0915
                         )
             return result
 
-    return async_wrapper if is_async_func else sync_wrapper
+    if is_async_func:
+        return async_wrapper
+    return async_gen_wrapper if is_async_gen else sync_wrapper
 
 
 def trace_class(
@@ -0,0 +1,514 @@
+"""AIP Partner 服务的压测工具。
+
+按可配置的比例混合发送 ``start`` / ``get`` / ``continue`` / ``cancel`` 命令，支持两种
+施压方式：
+
+- 固定速率（``--rps``，开环）：按计划时间发出请求，延迟从计划发出时刻算起，服务端
+  变慢时排队时间也计入延迟，不会被“协调遗漏”掩盖；在途请求超过 ``--max-inflight``
+  时丢弃并计数；
+- 固定并发（``--concurrency``，闭环）：N 个协程循环发送请求。
+
+目标既可以是远端 URL（可选 mTLS，证书由 ``load_mtls_config_from_json`` 加载），
+也可以是同进程内的 ASGI 应用（``--app module:attr``，如 ``add_aip_rpc_router`` 构建的
+FastAPI 应用；``--app echo`` 为内置的回显 Partner）。同进程时额外统计
+``TaskManager._tasks`` 中残留的任务数。
+
+报告各命令的延迟分位数、错误率与错误分类，以及服务端内存（RSS）随请求数的增长，
+用于评估 Partner 的部署规格并发现内存泄漏一类的回归。
+
+用法:
+    python -m acps_aip.load_test --app echo --rps 200 --duration 30
+    python -m acps_aip.load_test --url https://host:8032/outline_writer \\
+        --mtls-config ./director_assistant.json --cert-dir ./certs \\
+        --concurrency 8 --requests 500 --mix start=60,get=30,cancel=10 \\
+        --server-pid 12345
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import httpx
+from pydantic import ValidationError
+
+from .aip_base_model import Message, Task, TaskCommand, TaskState, TextDataItem
+from .aip_rpc_model import RpcRequest, RpcRequestParams, RpcResponse
+
+try:  # 可选依赖：非 Linux 平台上采样进程内存
+    import psutil  # type: ignore
+except Exception:  # pragma: no cover - 没有 psutil 时只支持 /proc
+    psutil = None  # type: ignore
+
+__all__ = [
+    "DEFAULT_MIX",
+    "CommandStats",
+    "LoadGenerator",
+    "LoadReport",
+    "MemorySampler",
+    "create_echo_app",
+    "parse_mix",
+    "percentile",
+]
+
+DEFAULT_MIX: Dict[TaskCommand, float] = {
+    TaskCommand.Start: 60.0,
+    TaskCommand.Get: 30.0,
+    TaskCommand.Continue: 5.0,
+    TaskCommand.Cancel: 5.0,
+}
+ECHO_ENDPOINT = "/echo"
+# 视为请求成功的任务状态；Failed / Rejected 记为 ``task_failed``。
+_FAILED_STATES = {TaskState.Failed, TaskState.Rejected}
+# 可供 get / continue / cancel 复用的已创建任务数上限。
+_TASK_POOL_SIZE = 10_000
+
+
+def parse_mix(spec: str) -> Dict[TaskCommand, float]:
+    """解析 ``start=60,get=30,continue=5,cancel=5`` 形式的命令比例。
+
+    Raises:
+        ValueError: 命令名不支持或权重不是正数。
+    """
+    supported = {c.value: c for c in (TaskCommand.Start, TaskCommand.Get, TaskCommand.Continue, TaskCommand.Cancel)}
+    mix: Dict[TaskCommand, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        command = supported.get(name.strip().lower())
+        if command is None:
+            raise ValueError(f"unsupported command in mix: {name!r}")
+        value = float(weight or 1)
+        if value < 0:
+            raise ValueError(f"negative weight for {name!r}")
+        if value:
+            mix[command] = value
+    if not mix:
+        raise ValueError("empty command mix")
+    return mix
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """最近秩百分位数，``q`` 取 0~100。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class CommandStats:
+    """单个命令的延迟与错误统计，延迟单位为秒。"""
+
+    latencies: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        failed = sum(self.errors.values())
+        return {
+            "count": len(ordered),
+            "errors": failed,
+            "error_rate": round(failed / len(ordered), 4) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50), 4),
+            "p90": round(percentile(ordered, 90), 4),
+            "p99": round(percentile(ordered, 99), 4),
+            "max": round(ordered[-1], 4) if ordered else 0.0,
+            "error_kinds": dict(self.errors.most_common()),
+        }
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """进程当前的常驻内存（字节），无法获取时返回 ``None``。"""
+    try:
+        with open(f"/proc/{pid}/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except Exception:
+            return None
+    return None
+
+
+class MemorySampler:
+    """按固定间隔采样服务端进程的 RSS 与（同进程时）残留任务数。"""
+
+    def __init__(self, pid: Optional[int], *, in_process: bool, interval: float = 1.0) -> None:
+        self.pid = pid
+        self.in_process = in_process
+        self.interval = interval
+        # 每个采样点：已完成请求数、RSS 字节数、残留任务数
+        self.samples: List[Dict[str, Optional[int]]] = []
+
+    def sample(self, completed: int) -> None:
+        tasks = None
+        if self.in_process:
+            from .aip_rpc_server import TaskManager
+
+            tasks = len(TaskManager._tasks)
+        rss = _rss_bytes(self.pid) if self.pid is not None else None
+        self.samples.append({"requests": completed, "rss": rss, "tasks": tasks})
+
+    async def run(self, completed: "Counter[str]") -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sample(completed["done"])
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {}
+        first, last = self.samples[0], self.samples[-1]
+        result: Dict[str, Any] = {"samples": len(self.samples)}
+        requests = (last["requests"] or 0) - (first["requests"] or 0)
+        rss = [s["rss"] for s in self.samples if s["rss"] is not None]
+        if rss and first["rss"] is not None and last["rss"] is not None:
+            growth = last["rss"] - first["rss"]
+            result.update(
+                rss_start_mb=round(first["rss"] / 2**20, 1),
+                rss_end_mb=round(last["rss"] / 2**20, 1),
+                rss_peak_mb=round(max(rss) / 2**20, 1),
+                rss_growth_per_1k_requests_kb=round(growth / requests * 1000 / 1024, 1) if requests else 0.0,
+            )
+        if first["tasks"] is not None and last["tasks"] is not None:
+            result.update(tasks_start=first["tasks"], tasks_end=last["tasks"])
+        return result
+
+
+@dataclass
+class LoadReport:
+    """一次压测的结果。"""
+
+    duration: float
+    commands: Dict[str, CommandStats]
+    dropped: int = 0
+    memory: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = sum(s.count for s in self.commands.values())
+        errors = sum(sum(s.errors.values()) for s in self.commands.values())
+        return {
+            "duration": round(self.duration, 3),
+            "requests": total,
+            "achieved_rps": round(total / self.duration, 2) if self.duration else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "dropped": self.dropped,
+            "commands": {name: stats.summary() for name, stats in self.commands.items()},
+            "memory": self.memory,
+        }
+
+    def format(self) -> str:
+        data = self.to_dict()
+        lines = [
+            f"请求 {data['requests']}，耗时 {data['duration']:.1f}s，实际 {data['achieved_rps']:.1f} req/s，"
+            f"错误率 {data['error_rate']:.2%}，丢弃 {data['dropped']}",
+            "",
+            f"{'命令':<10}{'次数':>8}{'错误率':>9}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'最长(ms)':>10}",
+        ]
+        for name, s in data["commands"].items():
+            lines.append(
+                f"{name:<10}{s['count']:>8}{s['error_rate']:>9.2%}{s['p50'] * 1000:>10.1f}"
+                f"{s['p90'] * 1000:>10.1f}{s['p99'] * 1000:>10.1f}{s['max'] * 1000:>10.1f}"
+            )
+            if s["error_kinds"]:
+                kinds = "，".join(f"{k} {v}" for k, v in s["error_kinds"].items())
+                lines.append(f"{'':<10}错误：{kinds}")
+        memory = data["memory"]
+        if memory.get("rss_start_mb") is not None:
+            lines += [
+                "",
+                f"服务端 RSS {memory['rss_start_mb']} → {memory['rss_end_mb']} MB（峰值 {memory['rss_peak_mb']} MB），"
+                f"每千次请求增长 {memory['rss_growth_per_1k_requests_kb']} KB",
+            ]
+        if memory.get("tasks_end") is not None:
+            lines.append(f"TaskManager 残留任务 {memory['tasks_start']} → {memory['tasks_end']}")
+        return "\n".join(lines)
+
+
+class LoadGenerator:
+    """向一个 AIP RPC 端点施压。"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        *,
+        mix: Optional[Dict[TaskCommand, float]] = None,
+        leader_id: str = "load-test",
+        input_text: str = "压测请求：请为一只雨夜等主人的橘猫写一段分镜大纲。",
+        timeout: float = 30.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """初始化压测器。
+
+        Args:
+            client: 发送请求用的 HTTP 客户端，连接池大小应不小于并发数。
+            url: Partner 的 RPC 端点 URL。
+            mix: 命令到权重的映射，默认 ``DEFAULT_MIX``。
+            leader_id: 消息中的 ``senderId``。
+            input_text: ``start`` / ``continue`` 携带的文本。
+            timeout: 单个请求的超时时间（秒）。
+            seed: 随机种子，用于复现命令序列。
+        """
+        self.client = client
+        self.url = url
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.leader_id = leader_id
+        self.input_text = input_text
+        self.timeout = timeout
+        self.stats: Dict[str, CommandStats] = {c.value: CommandStats() for c in self.mix}
+        self.completed: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._commands = list(self.mix)
+        self._weights = [self.mix[c] for c in self._commands]
+        # 已创建的任务 (task_id, session_id)，供 get / continue / cancel 使用。
+        self._tasks: Deque[tuple] = deque(maxlen=_TASK_POOL_SIZE)
+
+    def _message(self, command: TaskCommand, task_id: str, session_id: str) -> Message:
+        data_items = []
+        if command in (TaskCommand.Start, TaskCommand.Continue):
+            data_items.append(TextDataItem(text=self.input_text))
+        return Message(
+            id=f"msg-{uuid.uuid4()}",
+            sentAt=datetime.now(timezone.utc).isoformat(),
+            senderRole="leader",
+            senderId=self.leader_id,
+            command=command,
+            dataItems=data_items,
+            taskId=task_id,
+            sessionId=session_id,
+        )
+
+    def _pick(self) -> tuple:
+        command = self._rng.choices(self._commands, self._weights)[0]
+        if command != TaskCommand.Start and self._tasks:
+            task_id, session_id = self._tasks[self._rng.randrange(len(self._tasks))]
+            return command, task_id, session_id
+        # 还没有可用的任务时先创建一个。
+        return TaskCommand.Start, f"task-{uuid.uuid4()}", f"session-{uuid.uuid4()}"
+
+    async def send_one(self, started: Optional[float] = None) -> None:
+        """按比例选出一个命令并发送，记录延迟与错误。
+
+        Args:
+            started: 计划发出时刻（``time.perf_counter``），开环模式下用它计算延迟。
+        """
+        command, task_id, session_id = self._pick()
+        request = RpcRequest(
+            id=str(uuid.uuid4()),
+            params=RpcRequestParams(message=self._message(command, task_id, session_id)),
+        )
+        started = time.perf_counter() if started is None else started
+        error = None
+        try:
+            response = await self.client.post(
+                self.url, json=request.model_dump(exclude_none=True), timeout=self.timeout
+            )
+            if response.status_code >= 400:
+                error = f"http_{response.status_code}"
+            else:
+                rpc_response = RpcResponse.model_validate(response.json())
+                if rpc_response.error is not None:
+                    error = f"rpc_{rpc_response.error.code}"
+                elif isinstance(rpc_response.result, Task):
+                    if rpc_response.result.status.state in _FAILED_STATES:
+                        error = "task_failed"
+                    if command == TaskCommand.Start:
+                        self._tasks.append((task_id, session_id))
+                    elif command == TaskCommand.Cancel:
+                        self._forget(task_id)
+        except (ValidationError, ValueError):
+            error = "invalid_response"
+        except Exception as exc:  # 连接失败、超时或应用内异常
+            error = type(exc).__name__
+        stats = self.stats.setdefault(command.value, CommandStats())
+        stats.latencies.append(time.perf_counter() - started)
+        if error:
+            stats.errors[error] += 1
+        self.completed["done"] += 1
+
+    def _forget(self, task_id: str) -> None:
+        for i, (known, _) in enumerate(self._tasks):
+            if known == task_id:
+                del self._tasks[i]
+                return
+
+    async def run(
+        self,
+        *,
+        rps: Optional[float] = None,
+        concurrency: int = 1,
+        duration: Optional[float] = None,
+        requests: Optional[int] = None,
+        max_inflight: int = 1000,
+        sampler: Optional[MemorySampler] = None,
+    ) -> LoadReport:
+        """执行压测，直到达到 ``duration`` 秒或发出 ``requests`` 个请求。
+
+        Args:
+            rps: 目标速率；为 ``None`` 时以 ``concurrency`` 个协程闭环施压。
+            concurrency: 闭环模式下的并发数。
+            duration: 施压时长（秒）。
+            requests: 请求总数。
+            max_inflight: 开环模式下允许的最大在途请求数，超出的请求被丢弃。
+            sampler: 服务端内存采样器。
+
+        Raises:
+            ValueError: ``duration`` 与 ``requests`` 都未指定。
+        """
+        if duration is None and requests is None:
+            raise ValueError("either duration or requests is required")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration if duration is not None else None
+        budget = Counter(sent=0)
+        dropped = 0
+
+        def more() -> bool:
+            if deadline is not None and loop.time() >= deadline:
+                return False
+            return requests is None or budget["sent"] < requests
+
+        if sampler is not None:
+            sampler.sample(0)
+            sampler_task = asyncio.create_task(sampler.run(self.completed))
+        started = time.perf_counter()
+        if rps:
+            interval = 1.0 / rps
+            inflight: set = set()
+            next_at = time.perf_counter()
+            while more():
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                budget["sent"] += 1
+                if len(inflight) >= max_inflight:
+                    dropped += 1
+                else:
+                    task = asyncio.create_task(self.send_one(started=next_at))
+                    inflight.add(task)
+                    task.add_done_callback(inflight.discard)
+                next_at += interval
+            if inflight:
+                await asyncio.gather(*inflight)
+        else:
+
+            async def worker() -> None:
+                while more():
+                    budget["sent"] += 1
+                    await self.send_one()
+
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        elapsed = time.perf_counter() - started
+        memory: Dict[str, Any] = {}
+        if sampler is not None:
+            sampler_task.cancel()
+            sampler.sample(self.completed["done"])
+            memory = sampler.summary()
+        return LoadReport(duration=elapsed, commands=self.stats, dropped=dropped, memory=memory)
+
+
+def create_echo_app():
+    """内置的回显 Partner：原样返回输入文本，用于测量 AIP 框架本身的开销。"""
+    from fastapi import FastAPI
+
+    from .aip_rpc_server import add_aip_rpc_router
+    from .single_turn_server import make_single_turn_handlers
+
+    app = FastAPI(title="AIP echo partner")
+    add_aip_rpc_router(app, ECHO_ENDPOINT, make_single_turn_handlers("echo", lambda text: text))
+    return app
+
+
+def _load_app(target: str):
+    if target == "echo":
+        return create_echo_app(), ECHO_ENDPOINT
+    module_name, _, attr = target.partition(":")
+    app = getattr(importlib.import_module(module_name), attr or "app")
+    return app, None
+
+
+async def _main_async(args: argparse.Namespace) -> LoadReport:
+    mix = parse_mix(args.mix) if args.mix else None
+    connections = max(args.concurrency, args.max_inflight if args.rps else 0)
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    if args.app:
+        app, default_endpoint = _load_app(args.app)
+        endpoint = args.endpoint or default_endpoint or "/"
+        url = f"http://partner{endpoint}"
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), limits=limits)
+        sampler = MemorySampler(os.getpid(), in_process=True, interval=args.sample_interval)
+    else:
+        verify: Any = True
+        if args.mtls_config:
+            from .mtls_config import load_mtls_config_from_json
+
+            config = load_mtls_config_from_json(args.mtls_config, cert_dir=args.cert_dir)
+            verify = config.create_client_ssl_context()
+        url = args.url
+        client = httpx.AsyncClient(verify=verify, limits=limits)
+        sampler = None
+        if args.server_pid:
+            sampler = MemorySampler(args.server_pid, in_process=False, interval=args.sample_interval)
+    generator = LoadGenerator(client, url, mix=mix, timeout=args.timeout, seed=args.seed)
+    async with client:
+        return await generator.run(
+            rps=args.rps,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            requests=args.requests,
+            max_inflight=args.max_inflight,
+            sampler=sampler,
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="AIP Partner 服务压测")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Partner 的 RPC 端点 URL")
+    target.add_argument("--app", help="同进程压测的 ASGI 应用（module:attr），echo 为内置回显 Partner")
+    parser.add_argument("--endpoint", help="--app 模式下的 RPC 路径")
+    parser.add_argument("--mix", help="命令比例，如 start=60,get=30,continue=5,cancel=5")
+    parser.add_argument("--rps", type=float, help="目标速率（开环）；不指定时按 --concurrency 闭环施压")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--duration", type=float, help="施压时长（秒）")
+    parser.add_argument("--requests", type=int, help="请求总数")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--mtls-config", help="含 aic 字段的 Agent 配置 JSON，用于加载客户端证书")
+    parser.add_argument("--cert-dir", help="证书目录，默认为配置文件上级目录下的 certs")
+    parser.add_argument("--server-pid", type=int, help="远端模式下采样该进程的内存（需与服务端同机）")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--json", dest="json_path", help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+    if args.duration is None and args.requests is None:
+        args.duration = 10.0
+
+    report = asyncio.run(_main_async(args))
+    print(report.format())
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,21 @@
 import os
 import time
 import json
-# 通过 pip install 'volcengine-python-sdk[ark]' 安装方舟SDK
-from volcenginesdkarkruntime import Ark
-from agents.writers.screenwriter import *
-import requests
+# 通过 pip install 'volcengine-python-sdk[ark]' 安装方舟SDK，首次调用时才导入
+from agents.animators.render_tier import TIER_FINAL, tier_options
+from tools.downloader import DownloadItem, download_files
+from tools.clients import ark_client
 
-# 请确保您已将 API Key 存储在环境变量 ARK_API_KEY 中
-# 初始化Ark客户端，从环境变量中读取您的API Key
-client = Ark(
-    # 此为默认路径，您可根据业务所在地域进行配置
-    base_url="https://ark.cn-beijing.volces.com/api/v3",
-    # 从环境变量中获取您的 API Key。此为默认方式，您可根据需要进行修改
-    api_key="c96dbd1f-aeab-461c-90d6-8096b0baeecd",
+# 方舟客户端延迟构造（地址与密钥见 tools.clients），视频任务的提交与轮询分开计时
+client = ark_client(
+    "doubao",
+    {
+        "content_generation.tasks.create": "render.submit",
+        "content_generation.tasks.get": "render.poll",
+    },
 )
+# 轮询视频任务的最长时间（秒），超时视为失败，避免卡住渲染 worker
+POLL_TIMEOUT = float(os.getenv("DOUBAO_POLL_TIMEOUT", "900"))
 
 class animator:
     def __init__(self,name,download_link):
@@ -29,27 +31,61 @@ class animator:
                 self.story = json.load(f)
         else:
             print("没有提供大纲文件，使用screenwriter生成大纲")
+            from agents.writers import screenwriter
             writer = screenwriter.Script(query=query,name = self.name)
             self.story = writer.data
         return self.story
 
     def download(self):
         os.makedirs(self.download_link, exist_ok=True)
-        for idx, url in enumerate(self.video_url):
-            try:
-                resp = requests.get(url, stream=True, timeout=30)
-                resp.raise_for_status()
-                save_path = f"{self.download_link}/{self.name}_{idx + 1}.mp4"
-                with open(save_path, "wb") as f:
-                    for chunk in resp.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                print(f"已保存：{save_path}")
-            except Exception as e:
-                print(f"下载失败 {url}：{e}")
+        items = [
+            DownloadItem(url=url, save_path=f"{self.download_link}/{self.name}_{idx + 1}.mp4")
+            for idx, url in enumerate(self.video_url)
+        ]
+        # 所有视频并发下载，共享全局并发与带宽上限
+        for item, path in zip(items, download_files(items)):
+            if path:
+                print(f"已保存：{path}")
+            else:
+                print(f"下载失败 {item.url}")
         
 
-    def create_request(self,num = 0):
+    def get_video_url(self,prompt,tier = TIER_FINAL,deadline = None):
+        # deadline 为 time.monotonic() 时刻，由调用方（如路由）给出，到点即停止轮询
+        options = tier_options("doubao", tier)
+        create_result = client.content_generation.tasks.create(
+            model=options["model"],  # draft 档位降到 480p / 5 秒
+            content=[
+                {
+                    # 文本提示词与参数组合
+                    "type": "text",
+                    "text": f"{prompt}  --resolution {options['resolution']}  --duration {options['duration']} --camerafixed false --watermark true"
+                }
+            ]
+        )
+        print("----- polling task status -----")
+        task_id = create_result.id
+        limit = time.monotonic() + POLL_TIMEOUT
+        if deadline is not None:
+            limit = min(limit, deadline)
+        while time.monotonic() < limit:
+            get_result = client.content_generation.tasks.get(task_id=task_id)
+            status = get_result.status
+            if status == "succeeded":
+                print("----- task succeeded -----")
+                print(get_result)
+                return get_result.content.video_url
+            elif status == "failed":
+                print("----- task failed -----")
+                print(f"Error: {get_result.error}")
+                return None
+            else:
+                print(f"Current status: {status}, Retrying after 3 seconds...")
+                time.sleep(3)
+        print(f"----- task {task_id} timed out, stop polling -----")
+        return None
+
+    def create_request(self,num = 0,tier = TIER_FINAL):
         cnt = 1
         for outline in self.story["script"]:
             if cnt>=num:
@@ -59,33 +95,9 @@ class animator:
                 print("视频已存在，跳过创建请求")
                 cnt+=1
                 continue
-            create_result = client.content_generation.tasks.create(
-                model="doubao-seedance-1-0-pro-fast-251015",  # 模型 Model ID 已为您填入
-                content=[
-                    {
-                        # 文本提示词与参数组合
-                        "type": "text",
-                        "text": f"{outline}  --resolution 720p  --duration 6 --camerafixed false --watermark true"
-                    }
-                ]
-            )
-            print("----- polling task status -----")
-            task_id = create_result.id
-            while True:
-                get_result = client.content_generation.tasks.get(task_id=task_id)
-                status = get_result.status
-                if status == "succeeded":
-                    print("----- task succeeded -----")
-                    print(get_result)
-                    self.video_url.append(get_result.content.video_url)
-                    break
-                elif status == "failed":
-                    print("----- task failed -----")
-                    print(f"Error: {get_result.error}")
-                    break
-                else:
-                    print(f"Current status: {status}, Retrying after 3 seconds...")
-                    time.sleep(3)
+            video_url = self.get_video_url(outline, tier)
+            if video_url:
+                self.video_url.append(video_url)
             cnt+=1
 
 if __name__ == "__main__":
@@ -1,26 +1,67 @@
-import replicate
 import json
 import os
+import time
+from agents.animators.render_tier import TIER_FINAL, tier_options
+from tools.clients import configure_replicate
 
-# 设置Replicate API令牌
-os.environ['REPLICATE_API_TOKEN'] = 'r8_64l0mizCpOiB2Jd6Y8mftGHKvt1p91L2k6B68'
+# 轮询 Replicate 任务的最长时间与间隔（秒），超时取消任务并视为失败
+POLL_TIMEOUT = float(os.getenv("MINMAX_POLL_TIMEOUT", "900"))
+POLL_INTERVAL = float(os.getenv("MINMAX_POLL_INTERVAL", "5"))
 
-data = json.load(open(r'./test/screen/monalisa.json', encoding='utf-8'))
-inpu = {
-    "prompt": data["script"][0]
-}
 
-output = replicate.run(
-    "minimax/video-01",
-    input=inpu
-)
+class Animator:
+    def __init__(self,name,download_link):
+        self.name = name
+        self.download_link = download_link+f'/{self.name}'
 
-# 直接打印输出的URL
-print(output)
-#=> "https://replicate.delivery/.../output.mp4"
+    def get_video_url(self,prompt,tier=TIER_FINAL,deadline=None):
+        # 不用 replicate.run：它阻塞到任务结束，调用方超时后无法让它停下。
+        # 这里自行轮询，到 POLL_TIMEOUT 或 deadline（time.monotonic() 时刻）即取消任务
+        options = tier_options('minmax', tier)
+        # Replicate SDK 首次调用时才导入，API 令牌见 tools.clients
+        replicate = configure_replicate()
+        prediction = replicate.predictions.create(
+            model=options['model'],
+            input={"prompt": prompt}
+        )
+        limit = time.monotonic() + POLL_TIMEOUT
+        if deadline is not None:
+            limit = min(limit, deadline)
+        while prediction.status not in ("succeeded", "failed", "canceled"):
+            if time.monotonic() >= limit:
+                print(f"Timed out, cancel prediction {prediction.id}")
+                prediction.cancel()
+                return None
+            time.sleep(POLL_INTERVAL)
+            prediction.reload()
+        if prediction.status != "succeeded":
+            print(f"Failed, status: {prediction.status}, error: {prediction.error}")
+            return None
+        output = prediction.output
+        # 视频模型的 output 为地址字符串，个别模型返回列表
+        if isinstance(output, list):
+            output = output[0] if output else None
+        return str(output) if output else None
 
-# To write the file to disk:
-# with open("output.mp4", "wb") as file:
-#     file.write(output.read())
 
-#=> output.mp4 written to disk
\ No newline at end of file
+if __name__ == '__main__':
+    replicate = configure_replicate()
+    data = json.load(open(r'./test/screen/monalisa.json', encoding='utf-8'))
+    inpu = {
+        "prompt": data["script"][0]
+    }
+
+    output = replicate.run(
+        "minimax/video-01",
+        input=inpu
+    )
+
+    # 直接打印输出的URL
+    print(output)
+    #=> "https://replicate.delivery/.../output.mp4"
+
+    # To write the file to disk:
+    # with open("output.mp4", "wb") as file:
+    #     file.write(output.read())
+
+    #=> output.mp4 written to disk
@@ -1,12 +1,14 @@
 from http import HTTPStatus
-from dashscope import VideoSynthesis
-import dashscope
 import json
 import os
-import requests
+import time
+from agents.animators.render_tier import TIER_FINAL, tier_options
+from tools.clients import configure_dashscope
+from tools.downloader import download_file
 
-dashscope.base_http_api_url = 'https://dashscope.aliyuncs.com/api/v1'
-dashscope.api_key = "sk-8c9152365e554289834e30d12885ec03"
+# 轮询万相任务的最长时间与间隔（秒），超时视为失败，避免卡住渲染 worker
+POLL_TIMEOUT = float(os.getenv("QWEN_POLL_TIMEOUT", "600"))
+POLL_INTERVAL = float(os.getenv("QWEN_POLL_INTERVAL", "5"))
 
 class Animator:
     def __init__(self,name,download_link):
@@ -22,33 +24,46 @@ class Animator:
 
     def download(self,url,idx):
         os.makedirs(self.download_link, exist_ok=True)
-        try:
-            resp = requests.get(url, stream=True, timeout=30)
-            resp.raise_for_status()
-            save_path = f"{self.download_link}/{self.name}_{idx}.mp4"
-            with open(save_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+        save_path = f"{self.download_link}/{self.name}_{idx}.mp4"
+        # 断线后从 .part 续传，失败返回 None
+        if download_file(url, save_path):
             print(f"已保存：{save_path}")
             return save_path
-        except Exception as e:
-            print(f"下载失败 {url}：{e}")
+        print(f"下载失败 {url}")
 
-    def get_video_url(self,prompt):
-        # call sync api, will return the result
+    def get_video_url(self,prompt,tier=TIER_FINAL,deadline=None):
+        # 异步提交后自行轮询，到 POLL_TIMEOUT 或调用方给出的 deadline（time.monotonic() 时刻）即放弃，
+        # 同步 call 会一直阻塞，调用方超时后也无法让它停下
         print('please wait...')
-        rsp = VideoSynthesis.call(model='wan2.5-t2v-preview',
-                                prompt=prompt,
-                                size='832*480',
-                                duration = 5)
-        print(rsp)
-        if rsp.status_code == HTTPStatus.OK:
-            print(rsp.output.video_url)
-            return rsp.output.video_url
-        else:
-            print('Failed, status_code: %s, code: %s, message: %s' %
-                (rsp.status_code, rsp.code, rsp.message))
+        options = tier_options('qwen', tier)
+        # 通义 SDK 首次生成时才导入并配置（地址与密钥见 tools.clients）
+        dashscope = configure_dashscope()
+        # options 含 model、size，以及模型支持时的 duration
+        rsp = dashscope.VideoSynthesis.async_call(prompt=prompt, **options)
+        limit = time.monotonic() + POLL_TIMEOUT
+        if deadline is not None:
+            limit = min(limit, deadline)
+        while rsp.status_code == HTTPStatus.OK:
+            status = rsp.output.task_status
+            if status == 'SUCCEEDED':
+                print(rsp.output.video_url)
+                return rsp.output.video_url
+            if status in ('FAILED', 'CANCELED', 'UNKNOWN'):
+                print('Failed, task_status: %s, message: %s' %
+                    (status, getattr(rsp.output, 'message', None)))
+                return None
+            if time.monotonic() >= limit:
+                print('Timed out, task_id: %s' % rsp.output.task_id)
+                try:
+                    # 仅排队中的任务可取消，失败也不影响放弃本次调用
+                    dashscope.VideoSynthesis.cancel(rsp)
+                except Exception as exc:
+                    print('Cancel failed: %s' % exc)
+                return None
+            time.sleep(POLL_INTERVAL)
+            rsp = dashscope.VideoSynthesis.fetch(rsp)
+        print('Failed, status_code: %s, code: %s, message: %s' %
+            (rsp.status_code, rsp.code, rsp.message))
 
 
 if __name__ == '__main__':
@@ -1,7 +1,16 @@
+import os
 import requests
 import time
 import json
-from screenwriter import Script
+from agents.animators.render_tier import TIER_FINAL, tier_options
+
+BASE_URL = 'https://www.sora2api.org/api'
+HEADERS = {
+    'Authorization': r'sk-onODJdUvQtLtKrQHs6RMRwus05FqUOJx',
+    'Content-Type': 'application/json'
+}
+# Give up polling a task after this many seconds
+POLL_TIMEOUT = float(os.getenv('SORA_POLL_TIMEOUT', '1200'))
 
 # Make your first video generation request
 def generate_video():
@@ -26,27 +35,19 @@ def generate_video():
     return result['data']['taskId']  # Save this for status checking
 
 
-
-
-
-def generate_and_wait_for_video(story):
-    base_url = 'https://www.sora2api.org/api'
-    headers = {
-        'Authorization': r'sk-onODJdUvQtLtKrQHs6RMRwus05FqUOJx',
-        'Content-Type': 'application/json'
-    }
-    prompt = story.outline[0]+'\n'+story.all_stuff+'\n'+story.script[0]
+def generate_and_wait(prompt, aspect_ratio='16:9', duration=10, deadline=None):
+    # deadline is a time.monotonic() instant; polling stops at whichever comes first
     # Step 1: Start video generation
     generate_payload = {
         'prompt': prompt,
-        'aspectRatio': '16:9',
-        'duration': 10,
+        'aspectRatio': aspect_ratio,
+        'duration': duration,
         'type': 'text2video'
     }
 
     response = requests.post(
-        f'{base_url}/generate-video',
-        headers=headers,
+        f'{BASE_URL}/generate-video',
+        headers=HEADERS,
         json=generate_payload
     )
     result = response.json()
@@ -54,10 +55,13 @@ def generate_and_wait_for_video(story):
     print(f'Video generation started, Task ID: {task_id}')
 
     # Step 2: Poll for completion
-    while True:
+    limit = time.monotonic() + POLL_TIMEOUT
+    if deadline is not None:
+        limit = min(limit, deadline)
+    while time.monotonic() < limit:
         status_response = requests.post(
-            f'{base_url}/check-video-status',
-            headers=headers,
+            f'{BASE_URL}/check-video-status',
+            headers=HEADERS,
             json={'taskId': task_id}
         )
         status_result = status_response.json()
@@ -76,11 +80,32 @@ def generate_and_wait_for_video(story):
         # Still processing, wait 5 seconds before checking again
         time.sleep(5)
 
+    raise Exception(f'Video generation timed out, task {task_id} abandoned')
+
+
+def generate_and_wait_for_video(story):
+    prompt = story.outline[0]+'\n'+story.all_stuff+'\n'+story.script[0]
+    return generate_and_wait(prompt)
+
+
+class Animator:
+    def __init__(self,name,download_link):
+        self.name = name
+        self.download_link = download_link+f'/{self.name}'
+
+    def get_video_url(self,prompt,tier=TIER_FINAL,deadline=None):
+        options = tier_options('sora', tier)
+        return generate_and_wait(prompt,
+                                 aspect_ratio=options['aspectRatio'],
+                                 duration=options['duration'],
+                                 deadline=deadline)
+
 
 # Usage
-try:
-    story = Script("隐居森林研究魔法与数学的精灵偶遇了前来避雨的勇者小队")
-    video_url = generate_and_wait_for_video(story)
-    print(f'Final video URL: {video_url}')
-except Exception as e:
-    print(f'Error: {e}')
\ No newline at end of file
+if __name__ == '__main__':
+    try:
+        data = json.load(open(r'./test/screen/monalisa.json', encoding='utf-8'))
+        video_url = generate_and_wait(data["script"][0])
+        print(f'Final video URL: {video_url}')
+    except Exception as e:
+        print(f'Error: {e}')
@@ -0,0 +1,57 @@
+"""渲染档位配置。
+
+draft 档位使用低分辨率或更快的模型，供用户反复修改分镜时快速预览；
+final 档位只用于用户确认后的成片导出，参数与引入档位之前各动画师硬编码的
+取值一致（通义 832*480 / 5 秒，豆包 -fast 模型 720p / 6 秒），不改变成片的
+画质与费用。各动画师从这里读取自己的生成参数。
+"""
+
+from typing import Any, Dict, Optional
+
+TIER_DRAFT = "draft"
+TIER_FINAL = "final"
+TIERS = (TIER_DRAFT, TIER_FINAL)
+
+# 档位 -> 动画师 -> 生成参数
+# minmax 与 sora 没有可调的画质参数，两个档位配置相同，draft 对它们并不更快。
+RENDER_TIERS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    TIER_DRAFT: {
+        # 万相 2.1 turbo 固定 5 秒，不接受 duration 参数
+        "qwen": {"model": "wanx2.1-t2v-turbo", "size": "832*480"},
+        "doubao": {"model": "doubao-seedance-1-0-pro-fast-251015", "resolution": "480p", "duration": 5},
+        "minmax": {"model": "minimax/video-01"},
+        "sora": {"aspectRatio": "16:9", "duration": 10},
+    },
+    TIER_FINAL: {
+        "qwen": {"model": "wan2.5-t2v-preview", "size": "832*480", "duration": 5},
+        "doubao": {"model": "doubao-seedance-1-0-pro-fast-251015", "resolution": "720p", "duration": 6},
+        "minmax": {"model": "minimax/video-01"},
+        "sora": {"aspectRatio": "16:9", "duration": 10},
+    },
+}
+
+
+def tier_options(provider: str, tier: str = TIER_FINAL) -> Dict[str, Any]:
+    """返回指定动画师在某个档位下的生成参数副本。
+
+    Args:
+        provider: 动画师名称，如 ``qwen``、``doubao``。
+        tier: 渲染档位，``draft`` 或 ``final``。
+
+    Raises:
+        ValueError: 档位或动画师未配置。
+    """
+    if tier not in RENDER_TIERS:
+        raise ValueError(f"未知的渲染档位: {tier}")
+    options = RENDER_TIERS[tier].get(provider)
+    if options is None:
+        raise ValueError(f"动画师 {provider} 未配置 {tier} 档位")
+    return dict(options)
+
+
+def best_tier(renders: Dict[str, Any]) -> Optional[str]:
+    """从 ``{档位: 结果}`` 中选出已有结果的最高档位，没有结果时返回 ``None``。"""
+    for tier in reversed(TIERS):
+        if renders.get(tier):
+            return tier
+    return None
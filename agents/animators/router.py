@@ -0,0 +1,354 @@
+"""与具体厂商无关的动画师路由。
+
+渲染 worker 原先只能调用通义万相，一家限流或故障时整条流水线都会卡住。
+``AnimatorRouter`` 对外暴露与 ``Animator`` 相同的接口（``get_video_url`` /
+``download``），内部为每个镜头挑选当前最合适的后端：
+
+- 每个后端记录滑动平均耗时（EWMA）、失败率与正在执行的任务数（队列深度），
+  统计写在共享的 SQLite 文件里，多个 worker 进程看到的是同一份实时数据；
+- 评分综合预计耗时、排队情况、失败率与单条成本，分数最低者优先；
+- 连续失败的后端进入冷却期，期间不再分配任务；
+- 每次调用都有时限，以截止时刻传给后端，后端到点自行停止轮询（并尽量取消任务），
+  超时计为一次失败；某个后端报错、超时或未返回视频地址时，自动切换到下一个后端重试。
+
+路由默认不启用，需设置 ``ANIMATOR_PROVIDER=auto``（见 ``tools/render_queue.py``）。
+minmax 与 sora 没有可调的画质参数，draft / final 档位对它们生成的是同样的视频。
+"""
+
+import concurrent.futures
+import contextlib
+import importlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from agents.animators.render_tier import TIER_FINAL
+from base import get_agent_logger
+from tools.downloader import download_file
+
+# 后端名称到实现的映射，格式为 "模块路径:类名"，按需导入各家 SDK。
+# 实现类需支持 ``cls(name=..., download_link=...)`` 与 ``get_video_url(prompt, tier=..., deadline=...)``，
+# ``deadline`` 为 ``time.monotonic()`` 时刻，后端须在此之前停止轮询并返回。
+ANIMATOR_PROVIDERS: Dict[str, str] = {
+    "qwen": "agents.animators.animator_qwen:Animator",
+    "doubao": "agents.animators.animator_doubao:animator",
+    "minmax": "agents.animators.animator_minmax:Animator",
+    "sora": "agents.animators.animator_sora:Animator",
+}
+
+# 尚无统计数据时使用的先验：预计单条耗时（秒）、相对成本与单次调用时限（秒）。
+PROVIDER_PROFILES: Dict[str, Dict[str, float]] = {
+    "qwen": {"latency": 120.0, "cost": 1.0, "timeout": 600.0},
+    "doubao": {"latency": 90.0, "cost": 1.2, "timeout": 600.0},
+    "minmax": {"latency": 180.0, "cost": 1.5, "timeout": 900.0},
+    "sora": {"latency": 300.0, "cost": 3.0, "timeout": 1200.0},
+}
+
+ROUTER_PROVIDERS = [
+    p.strip()
+    for p in os.getenv("ANIMATOR_PROVIDERS", ",".join(ANIMATOR_PROVIDERS)).split(",")
+    if p.strip()
+]
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+# 默认放在项目根目录下，与启动时的工作目录无关，所有 worker 进程共用同一文件。
+ANIMATOR_STATS_DB = os.getenv(
+    "ANIMATOR_STATS_DB", str(PROJECT_ROOT / "logs" / "animator_stats.db")
+)
+# 成本在评分中的权重：每单位成本折算成多少秒。
+ROUTER_COST_WEIGHT = float(os.getenv("ROUTER_COST_WEIGHT", "30"))
+# 连续失败多少次后熔断，以及基础冷却时间（秒，按失败次数指数增长）。
+ROUTER_BREAKER_THRESHOLD = int(os.getenv("ROUTER_BREAKER_THRESHOLD", "3"))
+ROUTER_BREAKER_COOLDOWN = float(os.getenv("ROUTER_BREAKER_COOLDOWN", "60"))
+ROUTER_BREAKER_MAX_COOLDOWN = 600.0
+# EWMA 平滑系数，越大越看重最近的结果。
+ROUTER_EWMA_ALPHA = 0.3
+# 超过该时长仍未结束的在途记录视为 worker 崩溃遗留，不计入队列深度。
+INFLIGHT_STALE_SECONDS = 1800.0
+# 单次调用时限（秒），设置后覆盖 ``PROVIDER_PROFILES`` 中各后端的 timeout。
+ROUTER_CALL_TIMEOUT = float(os.getenv("ROUTER_CALL_TIMEOUT", "0"))
+# 截止时刻之后再等待后端返回的宽限（秒），覆盖最后一次轮询请求与取消任务的耗时。
+ROUTER_DEADLINE_GRACE = float(os.getenv("ROUTER_DEADLINE_GRACE", "30"))
+
+logger = get_agent_logger("agents.animators.router", "ROUTER_LOG_LEVEL", "INFO")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS provider_stats (
+    provider TEXT PRIMARY KEY,
+    ewma_latency REAL,
+    failure_rate REAL NOT NULL DEFAULT 0,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    last_failure_at REAL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS provider_inflight (
+    token TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_inflight_provider ON provider_inflight(provider);
+"""
+
+
+@dataclass
+class ProviderStats:
+    """单个后端的实时统计快照。"""
+
+    provider: str
+    ewma_latency: Optional[float] = None
+    failure_rate: float = 0.0
+    consecutive_failures: int = 0
+    last_failure_at: Optional[float] = None
+    calls: int = 0
+    in_flight: int = 0
+
+    def cooldown_until(self) -> float:
+        """熔断结束的时间戳；未熔断时返回 0。"""
+        over = self.consecutive_failures - ROUTER_BREAKER_THRESHOLD
+        if over < 0 or self.last_failure_at is None:
+            return 0.0
+        cooldown = min(ROUTER_BREAKER_MAX_COOLDOWN, ROUTER_BREAKER_COOLDOWN * (2 ** over))
+        return self.last_failure_at + cooldown
+
+    def score(self) -> float:
+        """预计代价，越低越好：排队后的预计耗时按成功率放大，再加上成本。"""
+        profile = PROVIDER_PROFILES.get(self.provider, {})
+        latency = self.ewma_latency or profile.get("latency", 120.0)
+        success = max(0.05, 1.0 - self.failure_rate)
+        return latency * (1 + self.in_flight) / success + ROUTER_COST_WEIGHT * profile.get("cost", 1.0)
+
+
+class ProviderStatsStore:
+    """基于 SQLite 的后端统计，供同一台机器上的多个 worker 进程共享。"""
+
+    def __init__(self, db_path: str = ANIMATOR_STATS_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def snapshot(self, providers: Sequence[str]) -> Dict[str, ProviderStats]:
+        """读取给定后端的统计与当前在途任务数。"""
+        stats = {p: ProviderStats(provider=p) for p in providers}
+        conn = self._connect()
+        try:
+            for row in conn.execute("SELECT * FROM provider_stats"):
+                item = stats.get(row["provider"])
+                if item is None:
+                    continue
+                item.ewma_latency = row["ewma_latency"]
+                item.failure_rate = row["failure_rate"]
+                item.consecutive_failures = row["consecutive_failures"]
+                item.last_failure_at = row["last_failure_at"]
+                item.calls = row["calls"]
+            rows = conn.execute(
+                "SELECT provider, COUNT(*) AS n FROM provider_inflight WHERE started_at > ? GROUP BY provider",
+                (time.time() - INFLIGHT_STALE_SECONDS,),
+            )
+            for row in rows:
+                if row["provider"] in stats:
+                    stats[row["provider"]].in_flight = row["n"]
+        finally:
+            conn.close()
+        return stats
+
+    def begin(self, provider: str) -> str:
+        """登记一次在途调用，返回用于 ``end`` 的令牌。"""
+        token = uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO provider_inflight (token, provider, started_at) VALUES (?, ?, ?)",
+                (token, provider, time.time()),
+            )
+        return token
+
+    def end(self, token: str, provider: str, ok: bool, latency: float) -> None:
+        """结束一次调用并更新 EWMA 耗时、失败率与连续失败次数。"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM provider_inflight WHERE token = ?", (token,))
+            row = conn.execute(
+                "SELECT * FROM provider_stats WHERE provider = ?", (provider,)
+            ).fetchone()
+            ewma = row["ewma_latency"] if row else None
+            failure_rate = row["failure_rate"] if row else 0.0
+            failures = row["consecutive_failures"] if row else 0
+            last_failure_at = row["last_failure_at"] if row else None
+            calls = (row["calls"] if row else 0) + 1
+
+            failure_rate = (1 - ROUTER_EWMA_ALPHA) * failure_rate + ROUTER_EWMA_ALPHA * (0.0 if ok else 1.0)
+            if ok:
+                # 只用成功调用的耗时估计，失败往往很快返回，会拉低估计值。
+                ewma = latency if ewma is None else (1 - ROUTER_EWMA_ALPHA) * ewma + ROUTER_EWMA_ALPHA * latency
+                failures = 0
+            else:
+                failures += 1
+                last_failure_at = now
+            conn.execute(
+                "INSERT OR REPLACE INTO provider_stats "
+                "(provider, ewma_latency, failure_rate, consecutive_failures, last_failure_at, calls, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (provider, ewma, failure_rate, failures, last_failure_at, calls, now),
+            )
+
+
+class ProviderTimeout(RuntimeError):
+    """后端在时限内没有返回结果。"""
+
+
+def call_with_timeout(fn: Callable[[], Any], timeout: float, name: str = "animator") -> Any:
+    """在守护线程中执行 ``fn``，超过 ``timeout`` 秒抛出 ``ProviderTimeout``。
+
+    各家 SDK 的同步调用无法从外部中断，超时后该线程被放弃。调用方应同时把截止
+    时刻传给后端，让它自行停止轮询；这里的时限只是后端卡在单次请求上时的兜底。
+    """
+    future: "concurrent.futures.Future[Any]" = concurrent.futures.Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, name=f"router-{name}", daemon=True).start()
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        raise ProviderTimeout(f"{timeout:.0f} 秒内未返回") from None
+
+
+def _load_provider(provider: str):
+    """按 ``ANIMATOR_PROVIDERS`` 配置导入动画师类。"""
+    target = ANIMATOR_PROVIDERS[provider]
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class AnimatorRouter:
+    """按实时统计为每个镜头选择后端，并在失败时自动切换。"""
+
+    def __init__(
+        self,
+        name: str,
+        download_link: str,
+        providers: Optional[Sequence[str]] = None,
+        stats: Optional[ProviderStatsStore] = None,
+    ):
+        """初始化路由。
+
+        Args:
+            name: 项目名称，用于输出文件命名。
+            download_link: 输出根目录，视频保存在 ``{download_link}/{name}`` 下。
+            providers: 参与调度的后端，默认取 ``ANIMATOR_PROVIDERS`` 环境变量。
+            stats: 统计存储，默认使用 ``ANIMATOR_STATS_DB``。
+        """
+        self.name = name
+        self.base_link = download_link
+        self.download_link = download_link + f'/{self.name}'
+        self.providers: List[str] = [
+            p for p in (providers or ROUTER_PROVIDERS) if p in ANIMATOR_PROVIDERS
+        ]
+        if not self.providers:
+            raise ValueError("没有可用的动画师后端")
+        self.stats = stats or ProviderStatsStore()
+        self.last_provider: Optional[str] = None
+        self._instances: Dict[str, object] = {}
+
+    def rank(self) -> List[str]:
+        """按评分从优到劣排列后端，处于熔断冷却期的后端排在最后。"""
+        now = time.time()
+        snapshot = self.stats.snapshot(self.providers)
+        return sorted(
+            self.providers,
+            key=lambda p: (snapshot[p].cooldown_until() > now, snapshot[p].score()),
+        )
+
+    def _backend(self, provider: str):
+        if provider not in self._instances:
+            cls = _load_provider(provider)
+            self._instances[provider] = cls(name=self.name, download_link=self.base_link)
+        return self._instances[provider]
+
+    @staticmethod
+    def _timeout(provider: str) -> float:
+        if ROUTER_CALL_TIMEOUT > 0:
+            return ROUTER_CALL_TIMEOUT
+        return PROVIDER_PROFILES.get(provider, {}).get("timeout", 600.0)
+
+    def get_video_url(self, prompt: str, tier: str = TIER_FINAL) -> Optional[str]:
+        """依次尝试评分最优的后端生成视频，返回第一个成功的视频地址。
+
+        Raises:
+            RuntimeError: 所有后端都失败。
+        """
+        errors = []
+        for provider in self.rank():
+            token = self.stats.begin(provider)
+            started = time.monotonic()
+            timeout = self._timeout(provider)
+            ok = False
+            try:
+                backend = self._backend(provider)
+                # 后端到截止时刻自行放弃，避免超时切换后旧任务仍在后台继续出片计费
+                url = call_with_timeout(
+                    lambda: backend.get_video_url(prompt, tier=tier, deadline=started + timeout),
+                    timeout + ROUTER_DEADLINE_GRACE,
+                    provider,
+                )
+                if not url:
+                    raise RuntimeError("未返回视频地址")
+                ok = True
+            except Exception as exc:
+                errors.append(f"{provider}: {exc}")
+                logger.warning(
+                    "event=router_failover provider=%s tier=%s error=%s", provider, tier, exc
+                )
+                continue
+            finally:
+                self.stats.end(token, provider, ok, time.monotonic() - started)
+            self.last_provider = provider
+            logger.info(
+                "event=router_success provider=%s tier=%s latency=%.1f",
+                provider,
+                tier,
+                time.monotonic() - started,
+            )
+            return url
+        raise RuntimeError("所有动画师后端均失败: " + "; ".join(errors))
+
+    def download(self, url: str, idx) -> Optional[str]:
+        os.makedirs(self.download_link, exist_ok=True)
+        save_path = f"{self.download_link}/{self.name}_{idx}.mp4"
+        if download_file(url, save_path):
+            print(f"已保存：{save_path}")
+            return save_path
+        print(f"下载失败 {url}")
@@ -1,5 +1,4 @@
 import os
-from volcenginesdkarkruntime import Ark
 import json
 import os
 from a2a.server.agent_execution.agent_executor import AgentExecutor
@@ -10,15 +9,24 @@ from a2a.utils import (completed_task, new_artifact)
 from a2a.utils.errors import ServerError
 import asyncio
 #from langchain.checkpoint.memory import InMemorySaver
-from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 
 
-import time
 from tools.tool_hub import ark_web_search as web_search_tool
 from tools.web_search import web_search
+from tools.clients import LazyObject, ark_client
+from tools.compaction import ConversationCompactor, MaterialTracker, estimate_tokens, usage_tokens
+from tools.prompt_cache import ResponseChain
 
 
-assistant_prompt = PromptTemplate.from_template('''
+def _prompt_template(template):
+    # LangChain 导入较慢，首次渲染提示词时才加载
+    def build():
+        from langchain_core.prompts import PromptTemplate
+        return PromptTemplate.from_template(template)
+    return LazyObject(build, 'PromptTemplate')
+
+
+assistant_prompt = _prompt_template('''
 【角色设定】
 你是一位专业、耐心的AI视频创作导演助手，擅长引导用户从模糊的创意到具体的视频制作需求，正在辅助用户使用视频生成模型进行创作。
 
@@ -81,92 +89,144 @@ task_to_prompt = {
     "screen":"和用户对话，确认他想要如何修改分镜脚本，确保想法足够准确",
 }
 
-material_prompt = PromptTemplate.from_template('''
+material_prompt = _prompt_template('''
 这是用户当前的创作材料：
 {material}
 其中，idea是用户通过和你聊天的过程确定的暂时的创作想法，outline是大纲写作者写的视频大纲，screen是分镜写作者写的创作分镜提示词。
 ''')
 
 
-# 请确保您已将 API Key 存储在环境变量 ARK_API_KEY 中
-# 初始化Ark客户端，从环境变量中读取您的API Key
-client = Ark(
-    # 此为默认路径，您可根据业务所在地域进行配置
-    base_url="https://ark.cn-beijing.volces.com/api/v3",
-    # 从环境变量中获取您的 API Key。此为默认方式，您可根据需要进行修改
-    api_key='c96dbd1f-aeab-461c-90d6-8096b0baeecd',
-)
+# 方舟客户端在首次调用时才构造（地址与密钥见 tools.clients），并计入流水线耗时剖析
+client = ark_client("assistant")
 
 
 
+summary_prompt = '''
+你负责压缩导演助手与用户的对话记录。请把【已有摘要】与【新增对话】合并成一份新的摘要，供助手在后续对话中参考：
+- 保留用户明确表达过的偏好、已确认或否决的想法、尚未解决的问题
+- 不要复述创作材料（想法、大纲、分镜）本身，它们会单独提供
+- 使用简洁的条目，总长度不超过500字
+'''
+
+material_update_prompt = _prompt_template('''
+用户的创作材料有更新（未列出的部分与上次相同）：
+{changes}
+''')
+
+
 class Assistant:
-    def __init__(self):
-        self.last_id = None
-    
-    def init_assistant(self,user_message,material):
+    def __init__(self, session_id=None):
+        # previous_response_id 链与前缀缓存由 ResponseChain 管理，过期前自动续期
+        self.chain = ResponseChain(client, "assistant", session_id)
+        # 链上上下文超出预算时把早期对话压缩成摘要并新开一条链；材料只发送变化的部分
+        self.compactor = ConversationCompactor(self.summarize)
+        self.material = MaterialTracker()
+        self.sent_task = None
+        self.session_data = None
+        self.last_response = None
+
+    @property
+    def last_id(self):
+        return self.chain.last_id
+
+    def summarize(self, previous_summary, turns):
+        dialogue = '\n'.join(f'用户：{t.user}\n助手：{t.reply}' for t in turns)
         completion = client.responses.create(
-        # 指定您创建的方舟推理接入点 ID，此处已帮您修改为您的推理接入点 ID
             model="doubao-seed-1-6-251015",
             input=[
-                {
-                    'role':'system',
-                    'content':assistant_prompt.invoke({'task':task_to_prompt["imagination"]}).to_string()
-                },
-                {
-                    'role':'system',
-                    'content':material_prompt.invoke({'material':json.dumps(material, ensure_ascii=False)}).to_string()
-                },
-                {
-                    'role':'user',
-                    'content':user_message
-                }
+                {'role':'system','content':summary_prompt},
+                {'role':'user','content':f'【已有摘要】\n{previous_summary or "无"}\n\n【新增对话】\n{dialogue}'},
             ],
-            tools = web_search_tool,
-            caching={"type": "enabled"}, 
             thinking={"type": "disabled"},
-            expire_at=int(time.time()) + 360
+            max_output_tokens=1024,
         )
-        self.last_id = completion.id
-        return self.next_call(completion)
-    
-    def call(self, message: str,session_data:dict) -> str:
+        return completion.output[-1].content[0].text
+
+    def opening_context(self, now_task, material):
+        # 新链的开场：系统提示词、对话摘要与最近几轮原文、全量材料
+        return [
+            {
+                'role':'system',
+                'content':assistant_prompt.invoke({'task':task_to_prompt[now_task]}).to_string()
+            },
+            *self.compactor.history_messages(),
+            {
+                'role':'system',
+                'content':material_prompt.invoke({'material':self.material.full(material)}).to_string()
+            },
+        ]
+
+    def rebuild_context(self):
+        # 缓存过期后按摘要与当前材料重建，本轮输入接在其后
+        return self.opening_context(self.session_data['now_task'], self.session_data['material'])
+
+    def turn_input(self, message, session_data):
         now_task = session_data["now_task"]
         material = session_data["material"]
-        modify_material = None
-        if session_data['modify_num'] != None:
-            modify_material = session_data['material'][now_task][session_data['modify_num']-1]
         if not self.last_id:
-            return self.init_assistant(message,material)
-        input_prompt = [
-                {
+            input_prompt = self.opening_context(now_task, material)
+        else:
+            # 沿用旧链时系统提示词只在任务切换时重发，材料只发增量；
+            # 已发送的任务与材料在请求成功后才记录（见 call）
+            input_prompt = []
+            if now_task != self.sent_task:
+                input_prompt.append({
                     'role':'system',
                     'content':assistant_prompt.invoke({'task':task_to_prompt[now_task]}).to_string()
-                },
-                {
+                })
+            changes = self.material.diff(material)
+            if changes:
+                input_prompt.append({
                     'role':'system',
-                    'content':material_prompt.invoke({'material':json.dumps(material, ensure_ascii=False)}).to_string()
-                },
-                {
-                    'role':'user',
-                    'content':message
-                }
-            ]
-        if modify_material != None:
+                    'content':material_update_prompt.invoke({'changes':changes}).to_string()
+                })
+        input_prompt.append({
+            'role':'user',
+            'content':message
+        })
+        if session_data['modify_num'] != None:
+            modify_material = material[now_task][session_data['modify_num']-1]
             input_prompt.append({
                 'role':'system',
                 'content':'现在我们需要修改的内容：'+modify_material
             })
-        completion = client.responses.create(
+        return input_prompt
+
+    def compact(self, keep_turns=None):
+        self.compactor.compact(keep_turns)
+        self.chain.reset()
+        self.material.reset()
+        self.sent_task = None
+    
+    def call(self, message: str,session_data:dict) -> str:
+        self.session_data = session_data
+        if not self.compactor.summary and session_data.get('context_summary'):
+            # 继续之前保存的会话：旧链已不可用，用保存的摘要代替对话历史
+            self.compactor.summary = session_data['context_summary']
+        input_prompt = self.turn_input(message, session_data)
+        if self.last_id and self.compactor.over_budget(estimate_tokens(input_prompt)):
+            self.compact()
+            input_prompt = self.turn_input(message, session_data)
+            if self.compactor.over_budget(estimate_tokens(input_prompt)):
+                # 最近几轮原文仍然太长，全部并入摘要
+                self.compact(keep_turns=0)
+                input_prompt = self.turn_input(message, session_data)
+        fresh = not self.last_id
+        completion = self.chain.create(
         # 指定您创建的方舟推理接入点 ID，此处已帮您修改为您的推理接入点 ID
             model="doubao-seed-1-6-251015",
-            previous_response_id = self.last_id,
             input=input_prompt,
-            caching={"type": "enabled"}, 
+            rebuild=self.rebuild_context,
             thinking={"type": "disabled"},
-            expire_at=int(time.time()) + 360
+            **({'tools': web_search_tool} if fresh else {}),
         )
-        self.last_id = completion.id
-        return self.next_call(completion)
+        # 请求成功后模型才看到了本轮的任务提示与材料
+        self.sent_task = session_data['now_task']
+        self.material.mark_sent(session_data['material'])
+        reply = self.next_call(completion)
+        self.compactor.record(message, reply, usage_tokens(self.last_response), estimate_tokens(input_prompt))
+        session_data['context_summary'] = self.compactor.summary
+        return reply
     
     def next_call(self,previous_message:str):
         while True:
@@ -174,6 +234,7 @@ class Assistant:
                 (item for item in previous_message.output if item.type == "function_call"),None
             )
             if function_call is None:
+                self.last_response = previous_message
                 return previous_message.output[-1].content[0].text
             else:
                 call_id = function_call.call_id
@@ -182,9 +243,8 @@ class Assistant:
                 query = arg["query"]
                 result = web_search(query)
                 print('search query:',query)
-                completion = client.responses.create(
+                completion = self.chain.create(
                     model="doubao-seed-1-6-251015",
-                    previous_response_id = self.last_id,
                     input=[
                         {
                             'type':'function_call_output',
@@ -192,11 +252,8 @@ class Assistant:
                             'output':json.dumps(result, ensure_ascii=False)
                         }
                     ],
-                    caching={"type": "enabled"}, 
                     thinking={"type": "disabled"},
-                    expire_at=int(time.time()) + 360
                 )
-                self.last_id = completion.id
                 previous_message = completion
         return previous_message.output[-1].content[0].text
 
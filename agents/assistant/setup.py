@@ -2,23 +2,24 @@ import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from a2a.server.apps.jsonrpc.starlette_app import A2AStarletteApplication
-from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler
-from a2a.server.tasks.inmemory_task_store import InMemoryTaskStore
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
 )
-
-
-import os
+from agents.server_setup import build_server_app, serve
 
 # 添加当前目录到系统路径
 
 from director_assistant import AssistantExecuter
 
-def main(host: str, port: int):
+HOST = "127.0.0.1"
+PORT = 10008
+# 多 worker 部署、任务数据库与遥测的环境变量见 agents/server_setup.py
+NAME = "assistant"
+
+
+def build_app(host: str = HOST, port: int = PORT):
     capabilities = AgentCapabilities(streaming=False)
     decision_skill = AgentSkill(
         id='助手Agent',
@@ -38,18 +39,12 @@ def main(host: str, port: int):
         capabilities=capabilities,
         skills=[decision_skill],
     )
+    return build_server_app(agent_card, AssistantExecuter(), NAME, port)
 
-    request_handler = DefaultRequestHandler(
-        agent_executor=AssistantExecuter(),
-        task_store=InMemoryTaskStore(),
-    )
-    server = A2AStarletteApplication(
-        agent_card=agent_card, http_handler=request_handler
-    )
-    import uvicorn
 
-    uvicorn.run(server.build(), host=host, port=port)
+def main(host: str, port: int):
+    serve(build_app, "setup:build_app", str(Path(__file__).parent), host, port)
 
 
 if __name__ == '__main__':
-    main("127.0.0.1", 10008)
\ No newline at end of file
+    main(HOST, PORT)
\ No newline at end of file
@@ -1,13 +1,9 @@
 import os 
-from volcenginesdkarkruntime import Ark
 import json
+from tools.clients import ark_client
 
-client = Ark( 
-    # 此为默认路径，您可根据业务所在地域进行配置 
-    base_url="https://ark.cn-beijing.volces.com/api/v3", 
-    # 从环境变量中获取您的 API Key。此为默认方式，您可根据需要进行修改 
-    api_key="c96dbd1f-aeab-461c-90d6-8096b0baeecd", 
-) 
+# 首次出图时才导入方舟 SDK 并构造客户端
+client = ark_client("painter")
 
 def paint(prompt):
     imagesResponse = client.images.generate(
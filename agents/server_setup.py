@@ -0,0 +1,139 @@
+"""A2A agent 服务的公共启动逻辑。
+
+各 agent 的 ``setup.py`` 只描述自己的 Agent 卡片与执行器，任务存储、事件队列、遥测与
+uvicorn 的单/多 worker 启动都在这里完成：
+
+- 单 worker：内存任务存储与内存事件队列；
+- 多 worker（``A2A_WORKERS`` > 1）：事件流经本机套接字在各 worker 间共享（Windows 上
+  退化为本机 TCP 端口），任务状态存入共享数据库，续订请求落到任意 worker 都能接上，
+  无需会话粘滞。默认的 sqlite 文件按项目根目录定位（不随启动目录变化），并开启 WAL 与
+  busy_timeout，让多个 worker 进程并发读写时等待锁而不是直接报 database is locked；
+- 遥测：默认只在进程内记录指标（请求/调用延迟、队列深度、事件数、任务耗时），由
+  /metrics 以 Prometheus 文本格式暴露，多 worker 时每个样本带 ``worker`` 标签；不创建
+  span，需要链路追踪时设 ``A2A_TRACING=sampled``，按 ``A2A_TRACE_SAMPLE_RATE`` 对请求
+  做头部采样（full 为每次调用都追踪）。
+"""
+
+import os
+from pathlib import Path
+from typing import Tuple
+
+from a2a.server.agent_execution import AgentExecutor
+from a2a.server.apps.jsonrpc.starlette_app import A2AStarletteApplication
+from a2a.server.events import InMemoryQueueManager, QueueManager, SocketQueueManager
+from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler
+from a2a.server.tasks import TaskStore
+from a2a.server.tasks.inmemory_task_store import InMemoryTaskStore
+from a2a.types import AgentCard
+from a2a.utils.constants import METRICS_PATH
+from a2a.utils.metrics import REGISTRY
+from a2a.utils.telemetry import configure_telemetry
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+WORKERS = int(os.getenv("A2A_WORKERS", "1"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("A2A_SQLITE_BUSY_TIMEOUT_MS", "30000"))
+
+TRACING = os.getenv("A2A_TRACING", "off")
+TRACE_SAMPLE_RATE = float(os.getenv("A2A_TRACE_SAMPLE_RATE", "0.01"))
+METRICS = os.getenv("A2A_METRICS", "1") != "0"
+
+
+def queue_address(name: str, port: int):
+    """返回 worker 间共享事件队列的地址，可由 ``A2A_QUEUE_SOCKET`` 覆盖。"""
+    if os.name == "nt":
+        return ("127.0.0.1", port + 10000)
+    return os.getenv("A2A_QUEUE_SOCKET", f"/tmp/a2a_{name}_{port}.sock")
+
+
+def task_db_url(name: str) -> str:
+    """返回任务数据库地址，可由 ``A2A_TASK_DB`` 覆盖。"""
+    default = (PROJECT_ROOT / "logs" / f"{name}_tasks.db").as_posix()
+    return os.getenv("A2A_TASK_DB", f"sqlite+aiosqlite:///{default}")
+
+
+def build_stores(name: str, port: int) -> Tuple[TaskStore, QueueManager]:
+    """按 worker 数选择任务存储与事件队列管理器。
+
+    Args:
+        name: 服务名，用于默认的套接字与数据库文件名。
+        port: 服务端口，用于默认的套接字地址。
+    """
+    if WORKERS <= 1:
+        # 已结束的任务保留一小时，最多保留 1000 个，避免常驻内存无限增长
+        return (
+            InMemoryTaskStore(ttl_seconds=3600, max_terminal_tasks=1000),
+            InMemoryQueueManager(),
+        )
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from a2a.server.tasks import DatabaseTaskStore
+
+    engine = create_async_engine(task_db_url(name))
+    if engine.dialect.name == "sqlite":
+        database = engine.url.database
+        if database and database != ":memory:":
+            Path(database).parent.mkdir(parents=True, exist_ok=True)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, _record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.close()
+
+    return (
+        DatabaseTaskStore(engine),
+        SocketQueueManager(queue_address(name, port)),
+    )
+
+
+def build_server_app(agent_card: AgentCard, executor: AgentExecutor, name: str, port: int):
+    """组装 agent 的 Starlette 应用。
+
+    Args:
+        agent_card: 对外发布的 Agent 卡片。
+        executor: 处理请求的执行器。
+        name: 服务名，见 ``build_stores``。
+        port: 服务端口，见 ``build_stores``。
+    """
+    configure_telemetry(TRACING, TRACE_SAMPLE_RATE, METRICS)
+    if WORKERS > 1:
+        # 每次抓取只落到其中一个 worker，按进程号区分各自的序列，
+        # 否则不同 worker 的计数交替出现，看起来像计数器被重置
+        REGISTRY.const_labels["worker"] = str(os.getpid())
+    task_store, queue_manager = build_stores(name, port)
+    request_handler = DefaultRequestHandler(
+        agent_executor=executor,
+        task_store=task_store,
+        queue_manager=queue_manager,
+    )
+    server = A2AStarletteApplication(agent_card=agent_card, http_handler=request_handler)
+    return server.build(metrics_url=METRICS_PATH if METRICS else None)
+
+
+def serve(build_app, factory_path: str, app_dir: str, host: str, port: int):
+    """启动 uvicorn。
+
+    Args:
+        build_app: ``build_app(host, port)``，返回应用。
+        factory_path: 多 worker 时 uvicorn 导入 ``build_app`` 的路径，如 ``"setup:build_app"``。
+        app_dir: ``factory_path`` 所在目录。
+        host: 监听地址。
+        port: 监听端口。
+    """
+    import uvicorn
+
+    if WORKERS > 1:
+        # 多进程模式下 uvicorn 需要以导入路径加载应用，由各 worker 自行构建
+        uvicorn.run(
+            factory_path,
+            factory=True,
+            host=host,
+            port=port,
+            workers=WORKERS,
+            app_dir=app_dir,
+        )
+    else:
+        uvicorn.run(build_app(host, port), host=host, port=port)
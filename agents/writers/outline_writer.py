@@ -1,5 +1,6 @@
-from volcenginesdkarkruntime import Ark
-import time
+from tools.clients import ark_client
+from tools.prompt_cache import ResponseChain
+from agents.writers.shots import InvalidPatch, ShotList, parse_patch, patch_prompt
 
 outline_example = f'''
 镜号 1
@@ -28,25 +29,7 @@ outline_example = f'''
 /
 '''
 
-# 初始化Ark客户端
-client = Ark(
-    base_url="https://ark.cn-beijing.volces.com/api/v3",
-    api_key='c96dbd1f-aeab-461c-90d6-8096b0baeecd',
-)
-
-class OutlineWriter:
-    def __init__(self):
-        self.last_id = None
-        self.outline = []
-    
-    def init_assistant(self,message):
-        # 创建初始对话，包含outline_writer的prompt和示例
-        completion = client.responses.create(
-            model="doubao-seed-1-6-251015",
-            input=[
-                {
-                    'role':'system',
-                    'content':f'''【角色设定】
+init_prompt = f'''【角色设定】
 你是一位专业的分镜大纲撰写专家，擅长将用户的创意转化为结构化、可视化的分镜大纲，为后续视频制作提供清晰指导。
 
 【核心任务】
@@ -66,17 +49,45 @@ class OutlineWriter:
 - 镜头数量建议为5-8个（确保故事紧凑完整）
 - 内容详略得当，为后续分镜脚本智能体预留创作空间
 - 确保镜头之间的逻辑连贯性和叙事流畅性'''
+
+# 初始化Ark客户端（首次调用时才构造），大模型调用计入流水线耗时剖析
+client = ark_client("outline_writer")
+
+class OutlineWriter:
+    def __init__(self, session_id=None):
+        # previous_response_id 链与前缀缓存由 ResponseChain 管理，过期前自动续期
+        self.chain = ResponseChain(client, "outline_writer", session_id)
+        self.idea = ''
+        self.outline = []
+
+    @property
+    def last_id(self):
+        return self.chain.last_id
+
+    def rebuild_context(self):
+        # 链过期后按创作想法与当前大纲重建开场上下文
+        return [
+            {'role':'system','content':init_prompt},
+            {'role':'user','content':self.idea},
+            {'role':'assistant','content':'/'.join(self.outline)},
+        ]
+    
+    def init_assistant(self,message):
+        # 创建初始对话，包含outline_writer的prompt和示例
+        completion = self.chain.create(
+            model="doubao-seed-1-6-251015",
+            input=[
+                {
+                    'role':'system',
+                    'content':init_prompt
                 },
                 {
                     'role':'user',
                     'content':message
                 }
             ],
-            caching={"type": "enabled"}, 
             thinking={"type": "disabled"},
-            expire_at=int(time.time()) + 360
         )
-        self.last_id = completion.id
         return completion.output[-1].content[0].text
     
     def call(self,session_data:dict) -> str:
@@ -86,13 +97,59 @@ class OutlineWriter:
         :return: 分镜大纲
         """
         if not self.last_id:
-            raw_outline = self.init_assistant(''.join(session_data['material']['idea']))
-            for i in raw_outline.split('/'):
-                self.outline.append(i)
-            return self.outline
-        completion = client.responses.create(
+            self.idea = ''.join(session_data['material']['idea'])
+            shots = ShotList.parse(self.init_assistant(self.idea))
+        elif session_data.get('modify_num'):
+            shots = self.patch(session_data)
+        else:
+            shots = self.rewrite(session_data)
+        shots.store(session_data, 'outline')
+        self.outline = shots.texts()
+        return self.outline
+
+    def patch(self, session_data: dict) -> ShotList:
+        # 只把目标镜头和相邻镜头交给模型，按返回的补丁原地修改，其余镜头及其 id 不变
+        shots = ShotList.restore(session_data, 'outline', self.outline)
+        target = shots[session_data['modify_num']-1]
+        completion = self.chain.create(
+            model="doubao-seed-1-6-251015",
+            input=[
+                {
+                    'role':'system',
+                    'content':patch_prompt(shots, target.id, '分镜大纲')
+                },
+                {
+                    'role':'user',
+                    'content':str(session_data['modify_request']['outline'])
+                }
+            ],
+            rebuild=self.rebuild_context,
+            thinking={"type": "disabled"},
+        )
+        raw_patch = completion.output[-1].content[0].text
+        window = [shot.id for shot in shots.window(target.id)]
+        try:
+            patch = parse_patch(raw_patch, window, target.id, self.retry_patch)
+        except InvalidPatch as e:
+            # 不把写坏的补丁写进镜头，保留原大纲
+            print(f"补丁无效，分镜大纲保持不变：{e}")
+            return shots
+        shots.apply(patch)
+        return shots
+
+    def retry_patch(self, prompt: str) -> str:
+        completion = self.chain.create(
+            model="doubao-seed-1-6-251015",
+            input=[{'role':'user','content':prompt}],
+            rebuild=self.rebuild_context,
+            thinking={"type": "disabled"},
+        )
+        return completion.output[-1].content[0].text
+
+    def rewrite(self, session_data: dict) -> ShotList:
+        # 未指定镜头序号时按修改请求整体调整大纲
+        completion = self.chain.create(
             model="doubao-seed-1-6-251015",
-            previous_response_id = self.last_id,
             input=[
                 {
                     'role':'system',
@@ -116,16 +173,10 @@ class OutlineWriter:
                     'content':str(session_data['modify_request']['outline'])
                 }
             ],
-            caching={"type": "enabled"}, 
+            rebuild=self.rebuild_context,
             thinking={"type": "disabled"},
-            expire_at=int(time.time()) + 360
         )
-        self.last_id = completion.id
-        raw_outline = completion.output[-1].content[0].text
-        self.outline = []
-        for i in raw_outline.split('/'):
-            self.outline.append(i)
-        return self.outline
+        return ShotList.parse(completion.output[-1].content[0].text)
 
 if __name__ == "__main__":
     # 测试outline_writer功能
@@ -1,4 +1,3 @@
-from volcenginesdkarkruntime import Ark
 import json
 import os
 from a2a.server.agent_execution.agent_executor import AgentExecutor
@@ -11,13 +10,14 @@ import asyncio
 import time
 from tools.tool_hub import ark_web_search as tools
 from tools.web_search import web_search
+from tools.clients import ark_client
+from tools.prompt_cache import ResponseChain
+from agents.writers.shots import InvalidPatch, ShotList, parse_patch, patch_prompt
 
 
 
-client = Ark(
-    base_url="https://ark.cn-beijing.volces.com/api/v3",
-    api_key='c96dbd1f-aeab-461c-90d6-8096b0baeecd',
-)
+# 方舟客户端在首次调用时才构造，并计入流水线耗时剖析
+client = ark_client("screenwriter")
 
 
 change_outline_prompt = '''
@@ -161,13 +161,27 @@ outline_prompt = f'''
 '''
 
 class ScreenWriter:
-    def __init__(self):
-        self.last_id = None
+    def __init__(self, session_id=None):
+        # previous_response_id 链与前缀缓存由 ResponseChain 管理，过期前自动续期
+        self.chain = ResponseChain(client, "screenwriter", session_id)
+        self.idea = ''
         self.screen = []
+
+    @property
+    def last_id(self):
+        return self.chain.last_id
+
+    def rebuild_context(self):
+        # 链过期后按创作想法与当前分镜重建开场上下文
+        return [
+            {'role':'system','content':screen_prompt},
+            {'role':'user','content':self.idea},
+            {'role':'assistant','content':'/'.join(self.screen)},
+        ]
     
     def init_assistant(self,message):
         # 创建初始对话，包含outline_writer的prompt和示例
-        completion = client.responses.create(
+        completion = self.chain.create(
             model="doubao-seed-1-6-251015",
             tools = tools,
             input=[
@@ -180,11 +194,8 @@ class ScreenWriter:
                     'content':message
                 }
             ],
-            caching={"type": "enabled"}, 
             thinking={"type": "disabled"},
-            expire_at=int(time.time()) + 360
         )
-        self.last_id = completion.id
         return self.next_call(completion)
     
     def call(self,session_data:dict) -> str:
@@ -194,31 +205,53 @@ class ScreenWriter:
         :return: 分镜大纲
         """
         if not self.last_id:
-            raw_screen = self.init_assistant(''.join(session_data['material']['idea']))
-            for i in raw_screen.split('/'):
-                self.screen.append(i)
-            return self.screen
-        need_modify = session_data['material']['screen'][session_data['modify_num']-1]
-        completion = client.responses.create(
+            self.idea = ''.join(session_data['material']['idea'])
+            shots = ShotList.parse(self.init_assistant(self.idea))
+        else:
+            shots = self.patch(session_data)
+        # 镜头 id 随会话保存，渲染任务按 id 记录，未改动的镜头无需重新渲染
+        shots.store(session_data, 'screen')
+        self.screen = shots.texts()
+        return self.screen
+
+    def patch(self, session_data: dict) -> ShotList:
+        # 只发送目标分镜和相邻分镜，按返回的补丁原地修改
+        shots = ShotList.restore(session_data, 'screen', self.screen)
+        target = shots[session_data['modify_num']-1]
+        completion = self.chain.create(
             model="doubao-seed-1-6-251015",
-            previous_response_id = self.last_id,
             input=[
                 {
                     'role':'system',
-                    'content':f'请根据用户的修改请求，修改这个分镜脚本{need_modify}。这次脚本中不需要加其他特殊符号'
+                    'content':patch_prompt(shots, target.id, '分镜脚本')
                 },
                 {
                     'role':'user',
                     'content':session_data['modify_request']['screen']
                 }
             ],
-            caching={"type": "enabled"}, 
+            rebuild=self.rebuild_context,
             thinking={"type": "disabled"},
-            expire_at=int(time.time()) + 360
         )
-        self.last_id = completion.id
-        self.screen[session_data['modify_num']-1] = self.next_call(completion)
-        return self.screen
+        raw_patch = self.next_call(completion)
+        window = [shot.id for shot in shots.window(target.id)]
+        try:
+            patch = parse_patch(raw_patch, window, target.id, self.retry_patch)
+        except InvalidPatch as e:
+            # 不把写坏的补丁写进镜头，保留原分镜
+            print(f"补丁无效，分镜脚本保持不变：{e}")
+            return shots
+        shots.apply(patch)
+        return shots
+
+    def retry_patch(self, prompt: str) -> str:
+        completion = self.chain.create(
+            model="doubao-seed-1-6-251015",
+            input=[{'role':'user','content':prompt}],
+            rebuild=self.rebuild_context,
+            thinking={"type": "disabled"},
+        )
+        return self.next_call(completion)
     
     def next_call(self,previous_message):
         while True:
@@ -234,9 +267,8 @@ class ScreenWriter:
                 query = arg["query"]
                 result = web_search(query)
                 print('search query:',query)
-                completion = client.responses.create(
+                completion = self.chain.create(
                     model="doubao-seed-1-6-251015",
-                    previous_response_id = self.last_id,
                     input=[
                         {
                             'type':'function_call_output',
@@ -244,11 +276,8 @@ class ScreenWriter:
                             'output':json.dumps(result, ensure_ascii=False)
                         }
                     ],
-                    caching={"type": "enabled"}, 
                     thinking={"type": "disabled"},
-                    expire_at=int(time.time()) + 360
                 )
-                self.last_id = completion.id
                 previous_message = completion
         return previous_message.output[-1].content[0].text
 
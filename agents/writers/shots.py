@@ -0,0 +1,252 @@
+"""分镜的结构化表示与增量修改协议。
+
+大纲与分镜原先是模型输出按 ``/`` 切出来的字符串列表，修改一个镜头时要把整份
+大纲塞进提示词、让模型整体重写，再重新切分，下游的渲染任务只能按序号对应镜头。
+这里给每个镜头一个稳定的 id：
+
+- ``ShotList``：带 id 的镜头列表，id 随会话保存在 ``session_data['shots']`` 中，
+  与 ``material`` 里的文本列表一一对应（``material`` 仍是字符串列表，其他模块不受
+  影响）；
+- 修改时只把目标镜头和前后相邻镜头交给写作者（``patch_prompt``），写作者返回
+  JSON 补丁，``ShotPatch.parse`` 校验后由 ``ShotList.apply`` 原地应用；
+- 补丁只能引用给出的几个 id，支持 ``replace`` / ``insert_after`` / ``delete``；
+  模型只输出了修改后的正文（不含 JSON）时用它替换目标镜头；输出像 JSON 却不是
+  合法补丁时不做任何修改，``parse_patch`` 带着错误原因让模型重写一次，仍不合法
+  则保留原镜头；
+- 渲染任务按镜头 id 记录，插入或删除镜头不会让后续镜头的渲染结果失效。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+SHOT_SEPARATOR = "/"
+PATCH_OPS = ("replace", "insert_after", "delete")
+# 补丁提示词中带上目标镜头前后各几个镜头作为上下文。
+NEIGHBOR_RADIUS = 1
+# 模型输出不合法时最多请求几次补丁（含第一次）。
+PATCH_ATTEMPTS = 2
+
+PATCH_PROMPT = """【核心任务】
+根据用户的修改请求修改下面标注为“需要修改”的{label}。相邻{label}仅供保持连贯参考，除非修改请求明确涉及，否则不要改动。
+
+{shots}
+
+【输出格式】
+只输出一个 JSON 对象，不要输出其他任何内容：
+{{"ops": [{{"op": "replace", "id": "{target}", "text": "修改后的完整内容"}}]}}
+- op 可以是 replace（替换该镜头）、insert_after（在该镜头之后插入一个新镜头）、delete（删除该镜头）
+- id 只能使用上面列出的 id，通常只需要一条 replace
+- text 保持原有的格式和结构，且不要包含“/”分隔符"""
+
+PATCH_RETRY_PROMPT = """上一次的输出不是合法的补丁：{error}。
+请按【输出格式】重新输出，只输出一个 JSON 对象，id 只能使用给出的 id。"""
+
+
+def new_shot_id() -> str:
+    return f"shot-{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class Shot:
+    id: str
+    text: str
+
+
+@dataclass
+class PatchOp:
+    op: str
+    id: str
+    text: str = ""
+
+
+class InvalidPatch(ValueError):
+    """模型输出像 JSON 补丁，但无法解析或没有通过校验。"""
+
+
+@dataclass
+class ShotPatch:
+    """写作者返回的一组镜头修改。"""
+
+    ops: List[PatchOp] = field(default_factory=list)
+    # 模型只输出了正文、用它整段替换目标镜头时为 True
+    fallback: bool = False
+
+    @classmethod
+    def parse(cls, raw: str, allowed_ids: Sequence[str], target_id: str) -> "ShotPatch":
+        """解析并校验模型输出的 JSON 补丁。
+
+        Args:
+            raw: 模型输出，允许带有 markdown 代码块或前后说明文字。
+            allowed_ids: 补丁可以引用的镜头 id（目标镜头及其相邻镜头）。
+            target_id: 目标镜头 id，输出中没有 JSON 时用整段输出替换它。
+
+        Raises:
+            InvalidPatch: 输出含有 ``{`` 或 ``"ops"`` 却不是合法补丁。这类输出多半是
+                写坏的 JSON，整段替换会把它写进镜头，因此不做回退。
+        """
+        if "{" not in raw and '"ops"' not in raw:
+            text = _strip_separators(raw)
+            return cls([PatchOp("replace", target_id, text)] if text else [], fallback=True)
+        return cls(_validate_ops(_load_ops(raw), set(allowed_ids)))
+
+
+def parse_patch(
+    raw: str,
+    allowed_ids: Sequence[str],
+    target_id: str,
+    retry: Callable[[str], str],
+    attempts: int = PATCH_ATTEMPTS,
+) -> ShotPatch:
+    """解析补丁，不合法时让模型按错误原因重写。
+
+    Args:
+        raw: 第一次的模型输出。
+        allowed_ids: 见 ``ShotPatch.parse``。
+        target_id: 见 ``ShotPatch.parse``。
+        retry: 发送纠错提示并返回模型新输出的函数。
+        attempts: 最多解析几次输出（含第一次）。
+
+    Raises:
+        InvalidPatch: 每次输出都不合法，调用方应保留原镜头。
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return ShotPatch.parse(raw, allowed_ids, target_id)
+        except InvalidPatch as exc:
+            if attempt == attempts:
+                raise
+            raw = retry(PATCH_RETRY_PROMPT.format(error=exc))
+    raise InvalidPatch("没有可解析的输出")
+
+
+def _load_ops(raw: str) -> List[Dict[str, Any]]:
+    """从模型输出中取出 ``ops`` 列表。"""
+    start, end = raw.find("{"), raw.rfind("}")
+    if start < 0 or end <= start:
+        raise InvalidPatch("没有找到完整的 JSON 对象")
+    try:
+        data = json.loads(raw[start : end + 1])
+    except ValueError as exc:
+        raise InvalidPatch(f"JSON 无法解析（{exc}）") from None
+    items = data.get("ops") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise InvalidPatch("缺少非空的 ops 列表")
+    if not all(isinstance(item, dict) for item in items):
+        raise InvalidPatch("ops 中的每一项都应是对象")
+    return items
+
+
+def _validate_ops(items: List[Dict[str, Any]], allowed: set) -> List[PatchOp]:
+    ops = []
+    for item in items:
+        op, shot_id = item.get("op"), item.get("id")
+        text = _strip_separators(str(item.get("text") or ""))
+        if op not in PATCH_OPS:
+            raise InvalidPatch(f"不支持的 op：{op}")
+        if shot_id not in allowed:
+            raise InvalidPatch(f"id {shot_id} 不在给出的镜头中")
+        if op != "delete" and not text:
+            raise InvalidPatch(f"{op} 缺少 text")
+        ops.append(PatchOp(op, shot_id, text))
+    return ops
+
+
+def _strip_separators(text: str) -> str:
+    text = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", text.strip())
+    return text.strip().strip(SHOT_SEPARATOR).strip()
+
+
+class ShotList:
+    """带稳定 id 的镜头列表。"""
+
+    def __init__(self, shots: Optional[List[Shot]] = None) -> None:
+        self.shots: List[Shot] = list(shots or [])
+
+    @classmethod
+    def parse(cls, raw: str) -> "ShotList":
+        """按 ``/`` 切分模型的整段输出，丢弃空段，为每个镜头分配新 id。"""
+        return cls.from_texts([part.strip() for part in raw.split(SHOT_SEPARATOR)])
+
+    @classmethod
+    def from_texts(cls, texts: Sequence[str], ids: Optional[Sequence[str]] = None) -> "ShotList":
+        """由文本列表构造；``ids`` 与文本一一对应时沿用，否则重新分配。"""
+        texts = [text for text in texts if text and text.strip()]
+        if ids is None or len(ids) != len(texts):
+            ids = [new_shot_id() for _ in texts]
+        return cls([Shot(shot_id, text) for shot_id, text in zip(ids, texts)])
+
+    @classmethod
+    def restore(cls, session_data: Dict[str, Any], kind: str, texts: Optional[Sequence[str]] = None) -> "ShotList":
+        """从会话恢复 ``kind``（``outline`` / ``screen``）的镜头列表。
+
+        Args:
+            texts: 镜头文本，缺省时取 ``session_data['material'][kind]``。
+        """
+        if texts is None:
+            texts = session_data.get("material", {}).get(kind) or []
+        ids = (session_data.get("shots") or {}).get(kind)
+        return cls.from_texts(texts, ids)
+
+    def store(self, session_data: Dict[str, Any], kind: str) -> None:
+        """把镜头 id 写回 ``session_data['shots'][kind]``（文本由调用方写入 ``material``）。"""
+        session_data.setdefault("shots", {})[kind] = self.ids()
+
+    def ids(self) -> List[str]:
+        return [shot.id for shot in self.shots]
+
+    def texts(self) -> List[str]:
+        return [shot.text for shot in self.shots]
+
+    def index_of(self, shot_id: str) -> int:
+        for index, shot in enumerate(self.shots):
+            if shot.id == shot_id:
+                return index
+        raise KeyError(shot_id)
+
+    def window(self, shot_id: str, radius: int = NEIGHBOR_RADIUS) -> List[Shot]:
+        """目标镜头及其前后各 ``radius`` 个镜头。"""
+        index = self.index_of(shot_id)
+        return self.shots[max(index - radius, 0) : index + radius + 1]
+
+    def apply(self, patch: ShotPatch) -> List[str]:
+        """原地应用补丁，返回内容发生变化（被替换或新插入）的镜头 id。"""
+        changed: List[str] = []
+        for op in patch.ops:
+            try:
+                index = self.index_of(op.id)
+            except KeyError:
+                continue  # 同一补丁中已被删除
+            if op.op == "replace":
+                if self.shots[index].text != op.text:
+                    self.shots[index].text = op.text
+                    changed.append(op.id)
+            elif op.op == "insert_after":
+                shot = Shot(new_shot_id(), op.text)
+                self.shots.insert(index + 1, shot)
+                changed.append(shot.id)
+            elif op.op == "delete" and len(self.shots) > 1:
+                del self.shots[index]
+        return changed
+
+    def __len__(self) -> int:
+        return len(self.shots)
+
+    def __iter__(self) -> Iterator[Shot]:
+        return iter(self.shots)
+
+    def __getitem__(self, index: int) -> Shot:
+        return self.shots[index]
+
+
+def patch_prompt(shots: ShotList, target_id: str, label: str) -> str:
+    """生成只包含目标镜头及相邻镜头的修改提示词。"""
+    lines = []
+    for shot in shots.window(target_id):
+        role = "需要修改" if shot.id == target_id else "相邻，仅供参考"
+        lines.append(f"【{label} id={shot.id}（{role}）】\n{shot.text}")
+    return PATCH_PROMPT.format(label=label, shots="\n\n".join(lines), target=target_id)
@@ -0,0 +1,475 @@
+"""离线基准测试用的外部服务替身。
+
+Assistant / OutlineWriter / ScreenWriter、通义万相与豆包动画师、``web_search`` 和
+``painter.paint`` 都在导入时直接创建各家 SDK 客户端，没有密钥就无法运行。这里提供
+同名模块的本地实现，行为可配置：
+
+- ``volcenginesdkarkruntime.Ark``：``responses.create`` / ``chat.completions.create``
+  按首 token 延迟、预填充速率与输出速率模拟耗时，按 ``previous_response_id`` 累积
+  上下文并在开启 ``caching`` 时报告缓存命中的 token；支持一次联网搜索的函数调用、
+  视频任务（``content_generation.tasks``）与图片生成；
+- ``dashscope.VideoSynthesis``：提交即阻塞到“渲染”完成，返回终态任务，轮询不再等待；
+- ``tavily.TavilyClient``：固定延迟返回搜索结果；
+- ``VideoServer``：本地 HTTP 服务，按配置的大小与带宽返回“视频”，支持 Range 续传，
+  真实的 ``tools.downloader`` 从这里下载；
+- ``merge_videos``：按字节拼接分镜视频，代替依赖 moviepy 的合成。
+
+``install`` 须在导入任何 agents 模块之前调用。配置同时写入环境变量 ``BENCH_FAKES``，
+以 spawn 方式启动的渲染 worker 进程通过 ``install_from_env`` 装上同一套替身。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import threading
+import time
+import types
+import uuid
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+ENV_VAR = "BENCH_FAKES"
+
+
+@dataclass
+class FakeConfig:
+    """替身的行为参数，时间单位为秒。"""
+
+    seed: int = 0
+    # 大模型
+    llm_ttft: float = 0.4
+    llm_prefill_rate: float = 5000.0  # 未命中缓存的输入 token/秒
+    llm_token_rate: float = 60.0  # 输出 token/秒
+    llm_output_tokens: int = 300
+    llm_failure_rate: float = 0.0
+    tool_call_rate: float = 0.2  # 带 tools 的首轮请求返回一次联网搜索调用的概率
+    shots: int = 4  # 写作者输出的镜头数（以 ``/`` 分隔）
+    # 联网搜索
+    search_latency: float = 0.8
+    search_failure_rate: float = 0.0
+    # 视频与图片生成
+    render_latency: float = 20.0
+    render_failure_rate: float = 0.05
+    image_latency: float = 5.0
+    jitter: float = 0.2  # 各类延迟在 ±jitter 比例内随机波动
+    # 视频下载
+    video_size: int = 2_000_000
+    video_bandwidth: int = 0  # 字节/秒，0 表示不限速
+    video_base_url: str = ""
+
+
+class FakeServiceError(RuntimeError):
+    """替身按失败率注入的服务端错误。"""
+
+
+class FakeNotFoundError(FakeServiceError):
+    """``previous_response_id`` 不存在或缓存已过期，对应方舟的 404。"""
+
+    status_code = 404
+
+
+_config = FakeConfig()
+_rng = random.Random(0)
+_rng_lock = threading.Lock()
+
+
+def _chance(rate: float) -> bool:
+    if rate <= 0:
+        return False
+    with _rng_lock:
+        return _rng.random() < rate
+
+
+def _wait(seconds: float) -> None:
+    if seconds <= 0:
+        return
+    with _rng_lock:
+        factor = 1.0 + _rng.uniform(-_config.jitter, _config.jitter)
+    time.sleep(seconds * factor)
+
+
+def _count_tokens(value: Any) -> int:
+    """粗略估算 token 数（中英混合文本约两个字符一个 token）。"""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return len(text) // 2 + 1
+
+
+def _video_url() -> str:
+    return f"{_config.video_base_url}/videos/{uuid.uuid4().hex}.mp4"
+
+
+# 单镜头修改请求（``agents/writers/shots.patch_prompt``）里给出的目标镜头 id。
+_PATCH_TARGET = re.compile(r'"op": "replace", "id": "([^"]+)"')
+
+
+def patch_reply(target_id: str) -> str:
+    """单镜头修改请求的回复：只替换目标镜头的 JSON 补丁。"""
+    text = "镜号1：特写，橘猫的胡须上挂着雨珠，便利店的灯光在它眼中闪烁。"
+    return json.dumps({"ops": [{"op": "replace", "id": target_id, "text": text}]}, ensure_ascii=False)
+
+
+def reply_text(shots: Optional[int] = None) -> str:
+    """大模型替身的回复：一句想法，加上以 ``/`` 分隔的若干镜头。"""
+    count = _config.shots if shots is None else shots
+    body = "/".join(
+        f"镜号{i}：近景，橘猫抬头望向街口，雨滴顺着便利店的玻璃滑落。"
+        for i in range(1, count + 1)
+    )
+    return f"当前我们的想法：一只橘猫在雨夜的便利店门口等主人回家。\n{body}"
+
+
+# ---------------------------------------------------------------------- #
+# volcenginesdkarkruntime
+# ---------------------------------------------------------------------- #
+class FakeArk:
+    """``volcenginesdkarkruntime.Ark`` 的替身。
+
+    资源对象在实例上保持不变，``tools.profiler.instrument_client`` 可以照常包装。
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        # response id -> (该轮结束后的上下文 token 数, 过期时间)，用于计算缓存命中。
+        self._contexts: Dict[str, Tuple[int, Optional[float]]] = {}
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.responses = SimpleNamespace(create=self._create_response)
+        self.chat = SimpleNamespace(
+            completions=SimpleNamespace(create=self._create_chat_completion)
+        )
+        self.content_generation = SimpleNamespace(
+            tasks=SimpleNamespace(create=self._create_task, get=self._get_task)
+        )
+        self.images = SimpleNamespace(generate=self._generate_image)
+
+    def _generate(self, prompt_tokens: int, cached_tokens: int, max_tokens: Optional[int] = None) -> int:
+        """模拟一次推理的耗时，返回输出 token 数。"""
+        if _chance(_config.llm_failure_rate):
+            _wait(_config.llm_ttft)
+            raise FakeServiceError("fake ark: 服务暂时不可用")
+        output_tokens = min(_config.llm_output_tokens, max_tokens or _config.llm_output_tokens)
+        _wait(
+            _config.llm_ttft
+            + (prompt_tokens - cached_tokens) / _config.llm_prefill_rate
+            + output_tokens / _config.llm_token_rate
+        )
+        return output_tokens
+
+    def _create_response(
+        self,
+        *,
+        input: Any = None,
+        previous_response_id: Optional[str] = None,
+        tools: Any = None,
+        caching: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> SimpleNamespace:
+        history = 0
+        if previous_response_id:
+            with self._lock:
+                history, expire_at = self._contexts.get(previous_response_id, (None, None))
+            if history is None or (expire_at is not None and time.time() > expire_at):
+                raise FakeNotFoundError(f"fake ark: previous response {previous_response_id} not found")
+        prompt_tokens = history + _count_tokens(input)
+        cached_tokens = history if (caching or {}).get("type") == "enabled" else 0
+        contents = [item.get("content") for item in input or [] if isinstance(item, dict)]
+        patch_target = _PATCH_TARGET.search("\n".join(c for c in contents if isinstance(c, str)))
+        text = patch_reply(patch_target.group(1)) if patch_target else reply_text()
+        max_tokens = kwargs.get("max_output_tokens")
+        if patch_target:
+            # 补丁只包含一个镜头，输出远短于整份分镜
+            max_tokens = min(max_tokens or _count_tokens(text), _count_tokens(text))
+        output_tokens = self._generate(prompt_tokens, cached_tokens, max_tokens)
+
+        is_tool_result = any(
+            isinstance(item, dict) and item.get("type") == "function_call_output"
+            for item in (input or [])
+        )
+        if tools and not is_tool_result and _chance(_config.tool_call_rate):
+            output = [
+                SimpleNamespace(
+                    type="function_call",
+                    call_id=f"call_{uuid.uuid4().hex[:12]}",
+                    name="web_search",
+                    arguments=json.dumps({"query": "雨夜 便利店 橘猫 镜头参考"}, ensure_ascii=False),
+                )
+            ]
+        else:
+            output = [
+                SimpleNamespace(
+                    type="message",
+                    role="assistant",
+                    content=[SimpleNamespace(type="output_text", text=text)],
+                )
+            ]
+        response_id = f"resp_{uuid.uuid4().hex}"
+        with self._lock:
+            self._contexts[response_id] = (prompt_tokens + output_tokens, kwargs.get("expire_at"))
+        return SimpleNamespace(
+            id=response_id,
+            output=output,
+            usage=SimpleNamespace(
+                input_tokens=prompt_tokens,
+                output_tokens=output_tokens,
+                total_tokens=prompt_tokens + output_tokens,
+                input_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+            ),
+        )
+
+    def _create_chat_completion(self, *, messages: Any = None, **kwargs: Any) -> SimpleNamespace:
+        prompt_tokens = _count_tokens(messages)
+        output_tokens = self._generate(prompt_tokens, 0)
+        return SimpleNamespace(
+            id=f"chatcmpl_{uuid.uuid4().hex}",
+            choices=[
+                SimpleNamespace(
+                    index=0,
+                    finish_reason="stop",
+                    message=SimpleNamespace(role="assistant", content=reply_text(), tool_calls=None),
+                )
+            ],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=output_tokens,
+                total_tokens=prompt_tokens + output_tokens,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+            ),
+        )
+
+    def _create_task(self, **kwargs: Any) -> SimpleNamespace:
+        with _rng_lock:
+            factor = 1.0 + _rng.uniform(-_config.jitter, _config.jitter)
+        task_id = f"cgt-{uuid.uuid4().hex[:16]}"
+        with self._lock:
+            self._tasks[task_id] = {
+                "ready_at": time.monotonic() + _config.render_latency * factor,
+                "failed": _chance(_config.render_failure_rate),
+            }
+        return SimpleNamespace(id=task_id)
+
+    def _get_task(self, *, task_id: str, **kwargs: Any) -> SimpleNamespace:
+        with self._lock:
+            task = self._tasks[task_id]
+        if time.monotonic() < task["ready_at"]:
+            return SimpleNamespace(id=task_id, status="running", content=None, error=None)
+        if task["failed"]:
+            error = SimpleNamespace(code="InternalError", message="fake ark: 视频生成失败")
+            return SimpleNamespace(id=task_id, status="failed", content=None, error=error)
+        return SimpleNamespace(
+            id=task_id,
+            status="succeeded",
+            content=SimpleNamespace(video_url=_video_url()),
+            error=None,
+        )
+
+    def _generate_image(self, **kwargs: Any) -> SimpleNamespace:
+        _wait(_config.image_latency)
+        if _chance(_config.render_failure_rate):
+            raise FakeServiceError("fake ark: 图片生成失败")
+        url = f"{_config.video_base_url}/images/{uuid.uuid4().hex}.png"
+        return SimpleNamespace(data=[SimpleNamespace(url=url)])
+
+
+# ---------------------------------------------------------------------- #
+# dashscope / tavily
+# ---------------------------------------------------------------------- #
+class FakeVideoSynthesis:
+    """``dashscope.VideoSynthesis`` 的替身，提交时阻塞到渲染完成。
+
+    ``async_call`` 直接返回终态任务，动画师不必再按轮询间隔等待，
+    耗时只取决于 ``render_latency``。
+    """
+
+    @staticmethod
+    def call(*args: Any, **kwargs: Any) -> SimpleNamespace:
+        _wait(_config.render_latency)
+        if _chance(_config.render_failure_rate):
+            return SimpleNamespace(
+                status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                code="InternalError",
+                message="fake dashscope: 视频生成失败",
+                output=None,
+            )
+        return SimpleNamespace(
+            status_code=HTTPStatus.OK,
+            code=None,
+            message=None,
+            output=SimpleNamespace(task_status="SUCCEEDED", video_url=_video_url()),
+        )
+
+    async_call = call
+
+    @staticmethod
+    def fetch(rsp: SimpleNamespace) -> SimpleNamespace:
+        return rsp
+
+    @staticmethod
+    def cancel(rsp: SimpleNamespace) -> SimpleNamespace:
+        return rsp
+
+
+class FakeTavilyClient:
+    """``tavily.TavilyClient`` 的替身。"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def search(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        _wait(_config.search_latency)
+        if _chance(_config.search_failure_rate):
+            raise FakeServiceError("fake tavily: 搜索失败")
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"{query} 参考 {i}",
+                    "url": f"https://example.com/{i}",
+                    "content": "雨夜街景的布光与构图参考。" * 8,
+                    "score": 0.9 - i * 0.1,
+                }
+                for i in range(5)
+            ],
+        }
+
+
+def _module(name: str, **attrs: Any) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    module.__fake__ = True  # type: ignore[attr-defined]
+    return module
+
+
+# 模块名 -> 构造替身模块的函数。需要替换其他 SDK 时在这里注册即可。
+FAKE_MODULES: Dict[str, Callable[[], types.ModuleType]] = {
+    "volcenginesdkarkruntime": lambda: _module("volcenginesdkarkruntime", Ark=FakeArk),
+    "dashscope": lambda: _module(
+        "dashscope",
+        VideoSynthesis=FakeVideoSynthesis,
+        base_http_api_url=None,
+        api_key=None,
+    ),
+    "tavily": lambda: _module("tavily", TavilyClient=FakeTavilyClient),
+}
+
+# 替身不校验密钥，但 ``tools.clients`` 构造客户端前要求环境变量存在。
+FAKE_CREDENTIALS: Dict[str, str] = {
+    "volcenginesdkarkruntime": "ARK_API_KEY",
+    "dashscope": "DASHSCOPE_API_KEY",
+    "tavily": "TAVILY_API_KEY",
+}
+
+
+def install(config: FakeConfig, modules: Optional[Sequence[str]] = None) -> None:
+    """装上替身模块并把配置写入环境变量，供子进程复用。
+
+    Args:
+        config: 替身的行为参数。
+        modules: 要替换的模块名，默认 ``FAKE_MODULES`` 中的全部。
+
+    Raises:
+        RuntimeError: 真实 SDK 已被导入，替身无法再生效。
+    """
+    global _config, _rng
+    names = list(modules or FAKE_MODULES)
+    for name in names:
+        existing = sys.modules.get(name)
+        if existing is not None and not getattr(existing, "__fake__", False):
+            raise RuntimeError(f"{name} 已被导入，请在导入 agents 模块之前安装替身")
+    _config = config
+    _rng = random.Random(config.seed)
+    for name in names:
+        sys.modules[name] = FAKE_MODULES[name]()
+        os.environ.setdefault(FAKE_CREDENTIALS[name], "fake")
+    os.environ[ENV_VAR] = json.dumps({"config": asdict(config), "modules": names})
+
+
+def install_from_env() -> bool:
+    """按 ``BENCH_FAKES`` 环境变量装上替身，变量不存在时不做任何事。"""
+    raw = os.environ.get(ENV_VAR)
+    if not raw:
+        return False
+    data = json.loads(raw)
+    install(FakeConfig(**data["config"]), data["modules"])
+    return True
+
+
+def merge_videos(paths: List[str], output_path: str) -> str:
+    """按字节拼接分镜视频，代替 ``tools.merge_video.merge_videos``。"""
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "wb") as out:
+        for path in paths:
+            with open(path, "rb") as src:
+                shutil.copyfileobj(src, out)
+    return output_path
+
+
+# ---------------------------------------------------------------------- #
+# 视频下载
+# ---------------------------------------------------------------------- #
+class _VideoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    chunk = b"\0" * (64 * 1024)
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server 约定的方法名
+        size = self.server.video_size  # type: ignore[attr-defined]
+        bandwidth = self.server.bandwidth  # type: ignore[attr-defined]
+        offset = 0
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes="):
+            offset = int(range_header[len("bytes="):].split("-", 1)[0] or 0)
+        if offset and offset >= size:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if offset:
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {offset}-{size - 1}/{size}")
+        else:
+            self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(size - offset))
+        self.end_headers()
+        remaining = size - offset
+        while remaining > 0:
+            block = self.chunk[: min(len(self.chunk), remaining)]
+            self.wfile.write(block)
+            remaining -= len(block)
+            if bandwidth:
+                time.sleep(len(block) / bandwidth)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class VideoServer:
+    """在本机随机端口上提供“视频”下载的 HTTP 服务。"""
+
+    def __init__(self, video_size: int, bandwidth: int = 0, host: str = "127.0.0.1"):
+        self._server = ThreadingHTTPServer((host, 0), _VideoHandler)
+        self._server.daemon_threads = True
+        self._server.video_size = video_size  # type: ignore[attr-defined]
+        self._server.bandwidth = bandwidth  # type: ignore[attr-defined]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="bench-video-server", daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "VideoServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
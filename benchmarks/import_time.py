@@ -0,0 +1,176 @@
+"""入口模块的导入耗时预算检查。
+
+命令行编排器和各 partner 服务在处理第一个请求之前都要先导入自身模块；各家 SDK
+（方舟、通义、Tavily、Replicate）、moviepy、LangChain / LangGraph 都改为首次使用
+时才导入（见 ``tools/clients.py``）。本脚本防止它们被重新放回模块顶层：
+
+- 每个入口模块在全新的子进程里用 ``python -X importtime`` 导入，取多次中的最小值；
+- 累计导入耗时超过预算，或导入链中出现 ``HEAVY_MODULES`` 中的任何包，即判为违规；
+- 存在违规时以非零状态退出，可直接放进 CI。
+
+子进程不装 ``benchmarks/fakes.py`` 的替身：本地没装的 SDK 若被顶层导入，会表现为
+导入失败，同样计为违规。
+
+用法:
+    python benchmarks/import_time.py [--budget-ms 800] [--repeat 3] [--json result.json]
+    python benchmarks/import_time.py run_acps agents/writers/outline_server.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 默认检查的入口：CLI 编排器、partner 服务，以及会被渲染 worker 导入的模块。
+# 以 ``.py`` 结尾的是按脚本方式启动的服务，导入时把脚本所在目录放到 sys.path 最前。
+ENTRY_MODULES: List[str] = [
+    "run_acps",
+    "agents/writers/outline_server.py",
+    "agents/assistant/setup.py",
+    "agents/writers/setup.py",
+    "agents.assistant.director_assistant",
+    "agents.writers.screenwriter",
+    "agents.writers.outline_writer",
+    "agents.animators.router",
+    "agents.animators.animator_qwen",
+    "agents.animators.animator_doubao",
+    "agents.animators.animator_minmax",
+    "tools.render_queue",
+    "tools.web_search",
+    "tools.merge_video",
+]
+
+# 只允许在首次调用时导入的重量级依赖（按顶层包名匹配）。
+HEAVY_MODULES = (
+    "volcenginesdkarkruntime",
+    "dashscope",
+    "tavily",
+    "replicate",
+    "moviepy",
+    "langchain_core",
+    "langgraph",
+    "sqlalchemy",
+)
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "800"))
+
+
+@dataclass
+class ImportResult:
+    """单个入口模块的导入结果。"""
+
+    module: str
+    cumulative_ms: Optional[float] = None
+    heavy: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    violations: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+
+def _parse_importtime(stderr: str) -> Dict[str, float]:
+    """解析 ``-X importtime`` 的输出，返回模块名到累计耗时（微秒）的映射。"""
+    timings: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # 表头
+        timings[parts[2].strip()] = float(parts[1])
+    return timings
+
+
+def _import_statement(entry: str) -> Tuple[str, str]:
+    """返回导入语句与 importtime 输出中对应的模块名。"""
+    if not entry.endswith(".py"):
+        return f"import {entry}", entry
+    path = Path(entry)
+    name = path.stem
+    return f"import sys; sys.path.insert(0, {str(path.parent)!r}); import {name}", name
+
+
+def measure(module: str, repeat: int = 3) -> ImportResult:
+    """在独立子进程中多次导入 ``module``，取累计耗时的最小值。"""
+    result = ImportResult(module=module)
+    statement, name = _import_statement(module)
+    env = dict(os.environ)
+    env.pop("BENCH_FAKES", None)
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    best: Optional[float] = None
+    for _ in range(max(1, repeat)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=_PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        timings = _parse_importtime(proc.stderr)
+        if proc.returncode != 0:
+            tail = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+            result.error = tail[-1] if tail else f"exit status {proc.returncode}"
+            return result
+        imported = {imported_name.split(".")[0] for imported_name in timings}
+        result.heavy = sorted(imported.intersection(HEAVY_MODULES))
+        elapsed = timings.get(name)
+        if elapsed is not None and (best is None or elapsed < best):
+            best = elapsed
+    result.cumulative_ms = round(best / 1000, 1) if best is not None else None
+    return result
+
+
+def check(modules: Sequence[str], budget_ms: float, repeat: int = 3) -> List[ImportResult]:
+    results = []
+    for module in modules:
+        result = measure(module, repeat)
+        if result.error:
+            result.violations.append(f"导入失败: {result.error}")
+        if result.heavy:
+            result.violations.append("顶层导入了 " + ", ".join(result.heavy))
+        if result.cumulative_ms is not None and result.cumulative_ms > budget_ms:
+            result.violations.append(f"耗时 {result.cumulative_ms:.0f}ms 超出预算 {budget_ms:.0f}ms")
+        results.append(result)
+    return results
+
+
+def format_results(results: Sequence[ImportResult], budget_ms: float) -> str:
+    width = max(len(r.module) for r in results)
+    lines = [f"导入耗时预算 {budget_ms:.0f}ms（{sys.executable}）"]
+    for r in results:
+        elapsed = f"{r.cumulative_ms:8.1f}ms" if r.cumulative_ms is not None else "       -  "
+        status = "ok" if r.ok else "FAIL  " + "；".join(r.violations)
+        lines.append(f"  {r.module:<{width}}  {elapsed}  {status}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help=f"要检查的模块，默认 {len(ENTRY_MODULES)} 个入口模块")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="单个模块的累计导入耗时上限")
+    parser.add_argument("--repeat", type=int, default=3, help="每个模块导入的次数，取最小值")
+    parser.add_argument("--json", dest="json_path", help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    results = check(args.modules or ENTRY_MODULES, args.budget_ms, args.repeat)
+    print(format_results(results, args.budget_ms))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            payload = {"budget_ms": args.budget_ms, "results": [dict(asdict(r), ok=r.ok) for r in results]}
+            json.dump(payload, file, ensure_ascii=False, indent=2)
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+"""创作流水线的离线基准测试。
+
+方舟、DashScope、Tavily 与视频下载都换成 ``benchmarks/fakes.py`` 中的本地替身，
+延迟、token 速率、失败率与视频大小均可配置，不需要任何密钥，结果可复现：
+
+* ``project``：通过 ``PersonalAssistantOrchestrator`` 跑完整项目（想法 → 大纲 →
+  分镜 → 渲染 → 合成）。命令行交互由脚本化的用户代替：一路确认，可选修改若干镜头，
+  确认渲染后等待后台渲染完成再继续；多个项目在线程中并发运行，各用一个独立用户目录；
+* ``aip``：通过 AIP RPC 并发调用大纲写作者 partner（``make_single_turn_handlers``
+  + ``add_aip_rpc_router``，经 ASGI 传输直连，不走网络）。
+
+输出吞吐、p50/p99 延迟与内存峰值，并附上 ``tools.profiler`` 的分阶段耗时汇总与前缀缓存命中统计。
+视频合成换成按字节拼接（替身视频不是合法的 mp4）。
+
+用法:
+    python benchmarks/pipeline.py project [--projects 8] [--concurrency 4]
+        [--shots 4] [--edits 1] [--render-latency 20] [--render-workers 2]
+    python benchmarks/pipeline.py aip [--requests 200] [--concurrency 20]
+
+    python benchmarks/pipeline.py --json result.json project --llm-failure-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import builtins
+import contextlib
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from acps_aip.load_test import percentile  # noqa: E402
+from benchmarks import fakes  # noqa: E402
+
+QUIET_ENV = "BENCH_QUIET"
+
+# 渲染 worker 以 spawn 方式启动，会重新导入本模块：在导入任何 agents 模块之前
+# 装上替身，worker 中的动画师才会调用本地实现。
+if fakes.install_from_env() and os.environ.get(QUIET_ENV):
+    logging.disable(logging.WARNING)
+    sys.stdout = open(os.devnull, "w", encoding="utf-8")
+
+
+IDEA = "我想做一个一分钟的短片，讲一只橘猫在雨夜的便利店门口等主人回家。"
+EDIT_REQUEST = "把这个镜头改成夜景，加上雨中霓虹灯的倒影。"
+RENDER_WAIT_TIMEOUT = 1800.0
+
+
+# ---------------------------------------------------------------------- #
+# 统计
+# ---------------------------------------------------------------------- #
+def latency_summary(values: Sequence[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values, default=0.0), 4),
+    }
+
+
+def memory_summary() -> Dict[str, float]:
+    """当前进程与已回收子进程（渲染 worker）的内存峰值，单位 MB。"""
+    summary: Dict[str, float] = {}
+    if resource is not None:
+        # Linux 上 ru_maxrss 单位为 KB，macOS 上为字节。
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        summary["peak_rss_mb"] = round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1
+        )
+        summary["children_peak_rss_mb"] = round(
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1
+        )
+    if tracemalloc.is_tracing():
+        summary["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    return summary
+
+
+# ---------------------------------------------------------------------- #
+# project 场景
+# ---------------------------------------------------------------------- #
+class _InputRouter:
+    """替换 ``builtins.input``，把提示转给当前线程绑定的脚本化用户。"""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def bind(self, user: "ScriptedUser") -> None:
+        self._local.user = user
+
+    def __call__(self, prompt: str = "") -> str:
+        user = getattr(self._local, "user", None)
+        if user is None:
+            raise RuntimeError(f"基准测试中出现未预期的 input() 调用: {prompt!r}")
+        return user.answer(prompt)
+
+
+class ScriptedUser:
+    """按提示语回答编排器的 ``input()``，模拟一位一路确认到底的用户。
+
+    等待思考与等待渲染的时间分别计入 ``think`` / ``render_wait``，统计轮次耗时时扣除。
+    """
+
+    def __init__(self, project: str, edits: int, think_time: float, seed: int):
+        self.project = project
+        self.edits_left = edits
+        self.think_time = think_time
+        self.orchestrator: Any = None
+        self.think = 0.0
+        self.render_wait = 0.0
+        self._rng = random.Random(seed)
+        self._said_idea = False
+        self._editing = False
+
+    def _session(self) -> Dict[str, Any]:
+        orchestrator = self.orchestrator
+        return orchestrator._sessions.get(orchestrator.main_session_id) or {}
+
+    def _pause(self) -> None:
+        if self.think_time > 0:
+            time.sleep(self.think_time)
+            self.think += self.think_time
+
+    def _wait_for_renders(self) -> None:
+        from tools.render_queue import JOB_QUEUED, JOB_RUNNING
+
+        queue = self.orchestrator.render_queue
+        started = time.perf_counter()
+        while time.perf_counter() - started < RENDER_WAIT_TIMEOUT:
+            jobs = queue.list_jobs(project=self.orchestrator.project_name)
+            if not any(job.status in (JOB_QUEUED, JOB_RUNNING) for job in jobs):
+                break
+            time.sleep(0.2)
+        self.render_wait += time.perf_counter() - started
+
+    def answer(self, prompt: str) -> str:
+        if "项目名称" in prompt:
+            return self.project
+        if "test or use" in prompt:
+            return "use"
+        session = self._session()
+        now_task = session.get("now_task")
+        if "需要修改" in prompt and "是否" in prompt:
+            self._pause()
+            if now_task == "screen" and self.edits_left > 0:
+                self.edits_left -= 1
+                self._editing = True
+                return "需要修改"
+            if now_task == "animator":
+                self._wait_for_renders()
+            return "不需要"
+        if "序号" in prompt:
+            shots = len(session.get("material", {}).get("screen") or []) or 1
+            return str(self._rng.randint(1, shots))
+        self._pause()
+        if not self._said_idea:
+            self._said_idea = True
+            return IDEA
+        if self._editing:
+            self._editing = False
+            return EDIT_REQUEST
+        return "确认"
+
+
+@dataclass
+class ProjectResult:
+    index: int
+    ok: bool = False
+    latency: float = 0.0  # 扣除思考时间，含等待渲染
+    render_wait: float = 0.0
+    turns: List[Tuple[str, float]] = field(default_factory=list)  # (阶段, 扣除等待后的耗时)
+    project_dir: Optional[str] = None
+    error: Optional[str] = None
+
+
+def run_project(index: int, args: argparse.Namespace, router: _InputRouter) -> ProjectResult:
+    """以独立用户目录跑完一个项目。"""
+    from file_manage import UserFile
+    from run_acps import PersonalAssistantOrchestrator
+    from tools import profiler
+
+    result = ProjectResult(index=index)
+    user = ScriptedUser(f"bench_{index}", args.edits, args.think_time, args.seed + index)
+    router.bind(user)
+    orchestrator = None
+    started = time.perf_counter()
+    try:
+        orchestrator = PersonalAssistantOrchestrator(clients=None, userfile=UserFile(f"bench-{index}"))
+        user.orchestrator = orchestrator
+        result.project_dir = orchestrator.project_dir
+        for _ in range(args.max_turns):
+            turn_started = time.perf_counter()
+            idle = user.think + user.render_wait
+            reply = asyncio.run(orchestrator.handle_user_input(orchestrator.main_session_id))
+            elapsed = time.perf_counter() - turn_started - (user.think + user.render_wait - idle)
+            stage = profiler.stage_of(user._session().get("now_task"))
+            result.turns.append((stage, elapsed))
+            if reply.end_session:
+                result.ok = True
+                break
+        else:
+            raise RuntimeError(f"{args.max_turns} 轮内未完成")
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        if orchestrator is not None:
+            orchestrator.render_queue.stop_workers()
+    result.latency = time.perf_counter() - started - user.think
+    result.render_wait = user.render_wait
+    return result
+
+
+def run_project_scenario(args: argparse.Namespace) -> Dict[str, Any]:
+    # 编排器在导入时读取这些配置。
+    os.environ["RENDER_WORKERS"] = str(args.render_workers)
+    os.environ["ANIMATOR_PROVIDER"] = "auto"
+    os.environ["ANIMATOR_PROVIDERS"] = args.providers
+    os.environ["SPECULATIVE_RENDER"] = "1" if args.speculative else "0"
+    import run_acps
+    from tools import profiler, prompt_cache
+
+    run_acps.merge_videos = fakes.merge_videos
+    router = _InputRouter()
+    original_input = builtins.input
+    builtins.input = router
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="bench-project") as pool:
+            results = list(pool.map(lambda i: run_project(i, args, router), range(args.projects)))
+    finally:
+        builtins.input = original_input
+    wall = time.perf_counter() - started
+
+    succeeded = [r for r in results if r.ok]
+    turns: Dict[str, List[float]] = {}
+    for r in results:
+        for stage, elapsed in r.turns:
+            turns.setdefault(stage, []).append(elapsed)
+    paths = [r.project_dir for r in results if r.project_dir]
+    return {
+        "scenario": "project",
+        "projects": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "wall": round(wall, 3),
+        "throughput_per_min": round(len(succeeded) / wall * 60, 3) if wall else 0.0,
+        "project_latency": latency_summary([r.latency for r in succeeded]),
+        "render_wait": latency_summary([r.render_wait for r in succeeded]),
+        "turn_latency": {stage: latency_summary(values) for stage, values in turns.items()},
+        "memory": memory_summary(),
+        "errors": [f"#{r.index} {r.error}" for r in results if r.error][:10],
+        "profile": profiler.report(paths) if paths else None,
+        "prompt_cache": prompt_cache.manager.snapshot(),
+    }
+
+
+# ---------------------------------------------------------------------- #
+# aip 场景
+# ---------------------------------------------------------------------- #
+async def _run_aip(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from fastapi import FastAPI
+
+    from acps_aip.aip_base_model import TaskState
+    from acps_aip.aip_rpc_client import AipRpcClient
+    from acps_aip.aip_rpc_server import add_aip_rpc_router
+    from acps_aip.single_turn_server import make_single_turn_handlers
+    from agents.writers.outline_writer import OutlineWriter
+    from tools import profiler, prompt_cache
+
+    project_dir = os.path.join(os.getcwd(), "aip")
+    profiler.bind(project_dir)
+
+    def process(text: str) -> str:
+        with profiler.span("agent", "outline_writer.call", stage="outline"):
+            outline = OutlineWriter().call({"material": {"idea": [text]}})
+        return "/".join(outline)
+
+    app = FastAPI()
+    add_aip_rpc_router(
+        app,
+        "/outline_writer",
+        make_single_turn_handlers(agent_id="outline_writer", processor=process),
+    )
+    client = AipRpcClient(partner_url="http://partner/outline_writer", leader_id="benchmark")
+    await client.http_client.aclose()
+    client.http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                task = await client.start_task(session_id=f"session-{i}", user_input=IDEA)
+            except Exception as exc:
+                errors.append(f"#{i} {type(exc).__name__}: {exc}")
+                return
+            if task.status.state != TaskState.Completed:
+                errors.append(f"#{i} task {task.status.state.value}")
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+    finally:
+        await client.close()
+    wall = time.perf_counter() - started
+    profiler.write_breakdown(project_dir)
+    return {
+        "scenario": "aip",
+        "requests": args.requests,
+        "succeeded": len(latencies),
+        "failed": args.requests - len(latencies),
+        "wall": round(wall, 3),
+        "throughput_per_s": round(len(latencies) / wall, 3) if wall else 0.0,
+        "latency": latency_summary(latencies),
+        "memory": memory_summary(),
+        "errors": errors[:10],
+        "profile": profiler.report([project_dir]),
+        "prompt_cache": prompt_cache.manager.snapshot(),
+    }
+
+
+# ---------------------------------------------------------------------- #
+# 输出
+# ---------------------------------------------------------------------- #
+def _format_latency(label: str, summary: Dict[str, float]) -> str:
+    return (
+        f"{label:<20}{summary['count']:>6}{summary['p50']:>10.2f}"
+        f"{summary['p99']:>10.2f}{summary['max']:>10.2f}"
+    )
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    lines = [f"场景 {summary['scenario']}，墙钟 {summary['wall']:.1f}s"]
+    if summary["scenario"] == "project":
+        lines.append(
+            f"项目 {summary['projects']}，成功 {summary['succeeded']}，失败 {summary['failed']}，"
+            f"吞吐 {summary['throughput_per_min']:.2f} 项目/分钟"
+        )
+        latencies = [("项目（含渲染等待）", summary["project_latency"]), ("渲染等待", summary["render_wait"])]
+        latencies += [(f"轮次/{stage}", s) for stage, s in summary["turn_latency"].items()]
+    else:
+        lines.append(
+            f"请求 {summary['requests']}，成功 {summary['succeeded']}，失败 {summary['failed']}，"
+            f"吞吐 {summary['throughput_per_s']:.2f} 请求/秒"
+        )
+        latencies = [("start_task", summary["latency"])]
+    lines += ["", f"{'延迟(s)':<20}{'次数':>6}{'p50':>10}{'p99':>10}{'最长':>10}"]
+    lines += [_format_latency(label, s) for label, s in latencies]
+    memory = summary["memory"]
+    if memory:
+        lines += ["", "内存峰值(MB) " + "，".join(f"{k} {v}" for k, v in memory.items())]
+    if summary["errors"]:
+        lines += ["", "错误（最多 10 条）:"] + [f"  {e}" for e in summary["errors"]]
+    profile = summary.get("profile")
+    if profile and profile["stages"]:
+        lines += ["", f"{'阶段':<12}{'墙钟(s)':>12}"]
+        lines += [f"{name:<12}{stage['wall']:>12.1f}" for name, stage in profile["stages"].items()]
+    cache = summary.get("prompt_cache")
+    if cache and cache["agents"]:
+        lines += ["", f"{'前缀缓存':<16}{'请求':>6}{'命中率':>8}{'重建':>6}{'保活':>6}{'缓存token占比':>14}"]
+        for name, stats in list(cache["agents"].items()) + [("合计", cache["total"])]:
+            lines.append(
+                f"{name:<16}{stats['requests']:>6}{stats['hit_rate'] or 0:>8.2f}{stats['rebuilds']:>6}"
+                f"{stats['refreshes']:>6}{stats['cached_ratio'] or 0:>14.2f}"
+            )
+    return "\n".join(lines)
+
+
+def _fake_config(args: argparse.Namespace) -> fakes.FakeConfig:
+    names = {f.name for f in fields(fakes.FakeConfig)}
+    return fakes.FakeConfig(**{k: v for k, v in vars(args).items() if k in names})
+
+
+def _add_fake_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("外部服务替身")
+    for f in fields(fakes.FakeConfig):
+        if f.name == "video_base_url":
+            continue
+        group.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workdir", help="运行目录，默认使用临时目录并在结束后删除")
+    parser.add_argument("--json", dest="json_path", help="把结果写入 JSON 文件")
+    parser.add_argument("--trace-memory", action="store_true", help="用 tracemalloc 统计 Python 内存峰值（有额外开销）")
+    parser.add_argument("--verbose", action="store_true", help="保留编排器与 worker 的输出和日志")
+    sub = parser.add_subparsers(dest="scenario", required=True)
+
+    project = sub.add_parser("project", help="通过 PersonalAssistantOrchestrator 跑完整项目")
+    project.add_argument("--projects", type=int, default=8)
+    project.add_argument("--concurrency", type=int, default=4)
+    project.add_argument("--edits", type=int, default=1, help="每个项目修改的镜头数")
+    project.add_argument("--think-time", type=float, default=0.0, help="用户每次输入前的思考时间（秒）")
+    project.add_argument("--render-workers", type=int, default=2, help="每个项目的渲染 worker 进程数")
+    project.add_argument("--providers", default="qwen,doubao", help="路由可用的动画师后端")
+    project.add_argument("--speculative", action="store_true", help="开启分镜草稿抢先渲染")
+    project.add_argument("--max-turns", type=int, default=40)
+    _add_fake_arguments(project)
+
+    aip = sub.add_parser("aip", help="通过 AIP RPC 并发调用大纲写作者")
+    aip.add_argument("--requests", type=int, default=200)
+    aip.add_argument("--concurrency", type=int, default=20)
+    _add_fake_arguments(aip)
+
+    args = parser.parse_args(argv)
+    config = _fake_config(args)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-")
+    os.makedirs(workdir, exist_ok=True)
+    cwd = os.getcwd()
+    if not args.verbose:
+        os.environ[QUIET_ENV] = "1"
+        logging.disable(logging.WARNING)
+    if args.trace_memory:
+        tracemalloc.start()
+
+    with fakes.VideoServer(config.video_size, config.video_bandwidth) as server:
+        config.video_base_url = server.url
+        fakes.install(config)
+        # 用户目录、渲染队列与日志都写在运行目录下。
+        os.chdir(workdir)
+        try:
+            with contextlib.ExitStack() as stack:
+                if not args.verbose:
+                    devnull = stack.enter_context(open(os.devnull, "w", encoding="utf-8"))
+                    stack.enter_context(contextlib.redirect_stdout(devnull))
+                if args.scenario == "project":
+                    summary = run_project_scenario(args)
+                else:
+                    summary = asyncio.run(_run_aip(args))
+        finally:
+            os.chdir(cwd)
+            if not args.workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    summary["config"] = vars(args)
+    print(format_summary(summary))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
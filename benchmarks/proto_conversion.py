@@ -0,0 +1,203 @@
+"""Micro-benchmark for the proto <-> Pydantic conversions in `a2a.utils.proto_utils`.
+
+Builds a large task (long history, chunked artifacts, metadata everywhere)
+and times:
+
+* `ToProto.task` against the previous implementation, which converted
+  every message and artifact field by field on every call and built
+  Structs key by key;
+* `ToProto.task` with empty conversion caches, as for the first response
+  about a task, and with warm caches, as for every later snapshot of the
+  same task (streaming, `tasks/get`);
+* `FromProto.task`;
+* the Struct helpers against the previous implementations (per-key
+  assignment, and a JSON round trip through `json_format`).
+
+Each comparison also checks that both sides produce the same result.
+
+Usage:
+    python benchmarks/proto_conversion.py [--history 200] [--artifacts 20]
+        [--parts 50] [--repeat 20]
+"""
+
+import argparse
+import json
+import sys
+import timeit
+
+from pathlib import Path
+
+from google.protobuf import json_format, struct_pb2
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from a2a import types  # noqa: E402
+from a2a.grpc import a2a_pb2  # noqa: E402
+from a2a.utils import proto_utils  # noqa: E402
+
+
+def legacy_dict_to_struct(dictionary: dict) -> struct_pb2.Struct:
+    struct = struct_pb2.Struct()
+    for key, val in dictionary.items():
+        if isinstance(val, dict):
+            struct[key] = legacy_dict_to_struct(val)
+        else:
+            struct[key] = val
+    return struct
+
+
+def legacy_struct_to_dict(struct: struct_pb2.Struct) -> dict:
+    return json.loads(json_format.MessageToJson(struct))
+
+
+class LegacyToProto(proto_utils.ToProto):
+    """`ToProto` without the conversion caches and `Struct.update`."""
+
+    @classmethod
+    def message(cls, message):
+        if message is None:
+            return None
+        return cls._message(message)
+
+    @classmethod
+    def artifact(cls, artifact):
+        return cls._artifact(artifact)
+
+    @classmethod
+    def metadata(cls, metadata):
+        if metadata is None:
+            return None
+        return legacy_dict_to_struct(metadata)
+
+    @classmethod
+    def data(cls, data):
+        return a2a_pb2.DataPart(data=legacy_dict_to_struct(data))
+
+
+def metadata(i: int) -> dict:
+    return {
+        'index': i,
+        'source': 'benchmark',
+        'scores': [0.1 * i, 0.2 * i, {'nested': True}],
+        'trace': {'span': f'span-{i}', 'attributes': {'k': 'v' * 16}},
+    }
+
+
+def text_part(text: str, i: int) -> types.Part:
+    return types.Part(root=types.TextPart(text=text, metadata=metadata(i)))
+
+
+def build_task(history: int, artifacts: int, parts: int) -> types.Task:
+    messages = [
+        types.Message(
+            role=types.Role.user if i % 2 else types.Role.agent,
+            message_id=f'msg-{i}',
+            task_id='task-1',
+            context_id='ctx-1',
+            parts=[text_part('lorem ipsum ' * 20, i)],
+            metadata=metadata(i),
+        )
+        for i in range(history)
+    ]
+    return types.Task(
+        id='task-1',
+        context_id='ctx-1',
+        status=types.TaskStatus(
+            state=types.TaskState.working, message=messages[-1]
+        ),
+        history=messages,
+        artifacts=[
+            types.Artifact(
+                artifact_id=f'artifact-{a}',
+                name=f'artifact {a}',
+                parts=[text_part(f'chunk {p} ' * 10, p) for p in range(parts)],
+                metadata=metadata(a),
+            )
+            for a in range(artifacts)
+        ],
+        metadata=metadata(0),
+    )
+
+
+def timed(label: str, func, repeat: int) -> float:
+    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f'{label:<40} {seconds * 1000:10.2f} ms')
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', type=int, default=200)
+    parser.add_argument('--artifacts', type=int, default=20)
+    parser.add_argument('--parts', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    task = build_task(args.history, args.artifacts, args.parts)
+    print(
+        f'task: {args.history} messages, {args.artifacts} artifacts x '
+        f'{args.parts} parts\n'
+    )
+
+    def cold() -> None:
+        proto_utils.clear_conversion_caches()
+        proto_utils.ToProto.task(task)
+
+    proto = proto_utils.ToProto.task(task)
+    assert LegacyToProto.task(task) == proto
+    old_s = timed(
+        'ToProto.task (field by field, before)',
+        lambda: LegacyToProto.task(task),
+        args.repeat,
+    )
+    cold_s = timed('ToProto.task (cold caches)', cold, args.repeat)
+    print(f'{"  speedup":<40} {old_s / cold_s:10.1f} x')
+    warm_s = timed(
+        'ToProto.task (warm caches)',
+        lambda: proto_utils.ToProto.task(task),
+        args.repeat,
+    )
+    assert proto_utils.ToProto.task(task) == proto
+    print(f'{"  speedup over before":<40} {old_s / warm_s:10.1f} x')
+
+    restored = proto_utils.FromProto.task(proto)
+    assert restored.model_dump() == proto_utils.FromProto.task(proto).model_dump()
+    timed(
+        'FromProto.task',
+        lambda: proto_utils.FromProto.task(proto),
+        args.repeat,
+    )
+
+    print()
+    big = {f'key-{i}': metadata(i) for i in range(200)}
+    assert proto_utils.dict_to_struct(big) == legacy_dict_to_struct(big)
+    old = timed(
+        'dict_to_struct (per-key, before)',
+        lambda: legacy_dict_to_struct(big),
+        args.repeat,
+    )
+    new = timed(
+        'dict_to_struct (Struct.update)',
+        lambda: proto_utils.dict_to_struct(big),
+        args.repeat,
+    )
+    print(f'{"  speedup":<40} {old / new:10.1f} x')
+
+    struct = proto_utils.dict_to_struct(big)
+    assert proto_utils.struct_to_dict(struct) == legacy_struct_to_dict(struct)
+    old = timed(
+        'struct_to_dict (JSON round trip, before)',
+        lambda: legacy_struct_to_dict(struct),
+        args.repeat,
+    )
+    new = timed(
+        'struct_to_dict (direct)',
+        lambda: proto_utils.struct_to_dict(struct),
+        args.repeat,
+    )
+    print(f'{"  speedup":<40} {old / new:10.1f} x')
+
+
+if __name__ == '__main__':
+    main()
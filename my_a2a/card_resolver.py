@@ -1,16 +1,81 @@
+import asyncio
 import json
+import os
+import re
+import time
+import weakref
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from termcolor import colored
 
+# 卡片缓存的默认有效期（秒），服务端返回 Cache-Control: max-age 时以服务端为准
+CARD_CACHE_TTL = float(os.getenv("A2A_CARD_CACHE_TTL", "300"))
+
+# 进程内共享的卡片缓存：card_url -> {"data", "etag", "expires_at"}
+_CARD_CACHE: Dict[str, Dict[str, Any]] = {}
+# 正在进行的异步获取，同一卡片的并发请求只发一次；按事件循环分开保存，
+# asyncio.run 换了新的事件循环后不会去等待旧循环上的任务
+_INFLIGHT: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def clear_card_cache() -> None:
+    """清空卡片缓存，下次获取会重新请求"""
+    _CARD_CACHE.clear()
+
+
 class A2ACardResolver:
     """
     A2A Agent Card 解析器，负责从A2A服务器获取Agent卡片信息
+
+    获取结果缓存在进程内，有效期内直接返回缓存；过期后携带 If-None-Match 重新校验，
+    卡片未变化时服务端只返回 304，不再传输卡片内容
     """
     def __init__(self, base_url, agent_card_path='/.well-known/agent.json'):
         self.base_url = base_url.rstrip('/')
         self.agent_card_path = agent_card_path.lstrip('/')
 
+    @property
+    def card_url(self) -> str:
+        return f"{self.base_url}/{self.agent_card_path}"
+
+    def _cached(self) -> Optional[Dict[str, Any]]:
+        """返回仍在有效期内的缓存卡片"""
+        entry = _CARD_CACHE.get(self.card_url)
+        if entry and time.monotonic() < entry["expires_at"]:
+            return entry["data"]
+        return None
+
+    def _conditional_headers(self) -> Dict[str, str]:
+        entry = _CARD_CACHE.get(self.card_url)
+        if entry and entry.get("etag"):
+            return {"If-None-Match": entry["etag"]}
+        return {}
+
+    def _store(self, response: httpx.Response) -> Dict[str, Any]:
+        """根据响应更新缓存并返回卡片内容，304 时沿用缓存内容"""
+        entry = _CARD_CACHE.get(self.card_url)
+        if response.status_code == 304 and entry:
+            data = entry["data"]
+            etag = response.headers.get("ETag", entry.get("etag"))
+        else:
+            response.raise_for_status()
+            data = response.json()
+            etag = response.headers.get("ETag")
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            _CARD_CACHE.pop(self.card_url, None)
+            return data
+        match = _MAX_AGE.search(cache_control)
+        if "no-cache" in cache_control:
+            ttl = 0.0
+        else:
+            ttl = float(match.group(1)) if match else CARD_CACHE_TTL
+        _CARD_CACHE[self.card_url] = {"data": data, "etag": etag, "expires_at": time.monotonic() + ttl}
+        return data
+
     def get_agent_card(self) -> Dict[str, Any]:
         """
         同步获取Agent卡片信息
@@ -18,11 +83,13 @@ class A2ACardResolver:
         Returns:
             Dict[str, Any]: Agent卡片信息的字典表示
         """
+        cached = self._cached()
+        if cached is not None:
+            return cached
         with httpx.Client(timeout=10.0) as client:
             try:
-                response = client.get(f"{self.base_url}/{self.agent_card_path}")
-                response.raise_for_status()
-                return response.json()
+                response = client.get(self.card_url, headers=self._conditional_headers())
+                return self._store(response)
             except json.JSONDecodeError as e:
                 print(colored(f"解析Agent卡片JSON时出错: {str(e)}", "red"))
                 raise Exception(f"解析Agent卡片JSON时出错: {str(e)}") from e
@@ -32,3 +99,39 @@ class A2ACardResolver:
             except Exception as e:
                 print(colored(f"获取Agent卡片时出错: {str(e)}", "red"))
                 raise
+
+    async def get_agent_card_async(self, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+        """
+        异步获取Agent卡片信息，传入 client 时复用其连接池，不会阻塞事件循环
+        
+        Args:
+            client: 可选的共享 httpx.AsyncClient
+            
+        Returns:
+            Dict[str, Any]: Agent卡片信息的字典表示
+        """
+        cached = self._cached()
+        if cached is not None:
+            return cached
+        inflight = _INFLIGHT.setdefault(asyncio.get_running_loop(), {})
+        task = inflight.get(self.card_url)
+        if task is None:
+            task = asyncio.create_task(self._fetch_async(client))
+            inflight[self.card_url] = task
+            task.add_done_callback(lambda _: inflight.pop(self.card_url, None))
+        # shield 住共享请求，避免某个调用方被取消时连带取消其他调用方
+        return await asyncio.shield(task)
+
+    async def _fetch_async(self, client: Optional[httpx.AsyncClient]) -> Dict[str, Any]:
+        if client is None:
+            async with httpx.AsyncClient(timeout=10.0) as own_client:
+                return await self._fetch_async(own_client)
+        try:
+            response = await client.get(self.card_url, headers=self._conditional_headers(), timeout=10.0)
+            return self._store(response)
+        except json.JSONDecodeError as e:
+            print(colored(f"解析Agent卡片JSON时出错: {str(e)}", "red"))
+            raise Exception(f"解析Agent卡片JSON时出错: {str(e)}") from e
+        except httpx.HTTPError as e:
+            print(colored(f"HTTP错误: {str(e)}", "red"))
+            raise Exception(f"获取Agent卡片时出错: {str(e)}") from e
@@ -1,11 +1,20 @@
 import json
+import time
 import asyncio
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Dict, List, Any, AsyncIterator, Awaitable, Optional, Sequence, Tuple
 from termcolor import colored
 import httpx
 from a2a.client.helpers import create_text_message_object
 from .card_resolver import A2ACardResolver
-from .protocol import build_message_request, build_task_request, DEFAULT_TIMEOUT, LONG_TIMEOUT, MAX_POLL_ATTEMPTS, DEFAULT_POLL_INTERVAL, MAX_RETRIES
+from .protocol import (
+    build_message_request, build_task_request, build_resubscribe_request, RPCMethods, TaskStatus, TERMINAL_STATES,
+    DEFAULT_TIMEOUT, LONG_TIMEOUT, MAX_POLL_DURATION, MIN_POLL_INTERVAL, MAX_POLL_INTERVAL, POLL_BACKOFF,
+    MAX_CONNECTIONS, MAX_KEEPALIVE_CONNECTIONS,
+)
+
+# 流式事件尚未给出最终结果时的占位返回值
+_PENDING = object()
 
 def load_servers_config(config_path: str) -> Dict[str, Dict[str, Any]]:
     """从配置文件加载服务器配置"""
@@ -16,12 +25,156 @@ def load_servers_config(config_path: str) -> Dict[str, Dict[str, Any]]:
         print(colored(f"加载服务器配置失败: {str(e)}", "red"))
         return {}
 
+async def _iter_sse(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """逐条解析 SSE 响应中的 data 事件"""
+    data_lines: List[str] = []
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+            continue
+        if line or not data_lines:
+            continue
+        payload = "\n".join(data_lines)
+        data_lines = []
+        try:
+            yield json.loads(payload)
+        except json.JSONDecodeError:
+            print(colored(f"忽略无法解析的流式事件: {payload[:80]}", "yellow"))
+    if data_lines:
+        try:
+            yield json.loads("\n".join(data_lines))
+        except json.JSONDecodeError:
+            pass
+
+class _TaskPoller:
+    """
+    单个服务器上所有未完成任务共用的轮询循环
+    
+    每个任务维护自己的轮询间隔：状态不变时按 POLL_BACKOFF 退避，状态变化时重置为
+    MIN_POLL_INTERVAL。所有任务由同一个后台协程调度，查询复用该服务器的连接池。
+    """
+    
+    def __init__(self, client: "A2AClient", server_url: str):
+        self._client = client
+        self._server_url = server_url
+        self._watches: Dict[str, Dict[str, Any]] = {}
+        self._runner: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+    
+    def watch(self, task_id: str, timeout: float = MAX_POLL_DURATION) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        """登记一个待完成任务，返回在任务到达终态（或超时）时完成的 Future"""
+        watch = self._watches.get(task_id)
+        if watch is None:
+            now = time.monotonic()
+            watch = {
+                "future": asyncio.get_running_loop().create_future(),
+                "interval": MIN_POLL_INTERVAL,
+                "next": now,
+                "deadline": now + timeout,
+                "state": None,
+            }
+            self._watches[task_id] = watch
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return watch["future"]
+    
+    async def _run(self):
+        try:
+            while self._watches:
+                now = time.monotonic()
+                due = [task_id for task_id, w in self._watches.items() if w["next"] <= now]
+                if due:
+                    # 单个任务出错不能中断其他任务的轮询
+                    await asyncio.gather(*(self._poll_one(task_id) for task_id in due), return_exceptions=True)
+                    continue
+                self._wakeup.clear()
+                delay = min(w["next"] for w in self._watches.values()) - now
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # 循环被取消或意外退出时，不能让仍在等待的调用方永远挂起
+            for task_id in list(self._watches):
+                self._finish(task_id, None)
+    
+    def _finish(self, task_id: str, result: Optional[Dict[str, Any]]):
+        watch = self._watches.pop(task_id, None)
+        if watch is not None and not watch["future"].done():
+            watch["future"].set_result(result)
+    
+    def _reschedule(self, watch: Dict[str, Any], changed: bool):
+        if changed:
+            watch["interval"] = MIN_POLL_INTERVAL
+        else:
+            watch["interval"] = min(MAX_POLL_INTERVAL, watch["interval"] * POLL_BACKOFF)
+        watch["next"] = time.monotonic() + watch["interval"]
+    
+    async def _poll_one(self, task_id: str):
+        watch = self._watches.get(task_id)
+        if watch is None:
+            return
+        if watch["future"].done():
+            # 调用方已取消等待
+            self._watches.pop(task_id, None)
+            return
+        if time.monotonic() >= watch["deadline"]:
+            print(colored(f"\n警告: 等待任务 {task_id} 完成超时，请检查服务器状态", "yellow"))
+            self._finish(task_id, None)
+            return
+        
+        try:
+            response_data = await self._client._rpc(self._server_url, build_task_request(task_id), DEFAULT_TIMEOUT)
+        except (httpx.HTTPError, ValueError):
+            print(colored("r", "yellow"), end="", flush=True)
+            self._reschedule(watch, changed=False)
+            return
+        except Exception as e:
+            print(colored(f"\n错误: 查询任务 {task_id} 失败: {e}", "red"))
+            self._finish(task_id, None)
+            return
+        
+        try:
+            self._handle(task_id, watch, response_data)
+        except Exception as e:
+            # 响应格式异常等意料之外的错误只结束该任务
+            print(colored(f"\n错误: 无法解析任务 {task_id} 的状态: {e}", "red"))
+            self._finish(task_id, None)
+    
+    def _handle(self, task_id: str, watch: Dict[str, Any], response_data: Dict[str, Any]):
+        if "error" in response_data:
+            error_msg = response_data["error"].get("message", "未知错误")
+            if "not found" in error_msg.lower() or "not exist" in error_msg.lower():
+                # 任务可能尚未创建，继续等待
+                self._reschedule(watch, changed=False)
+                return
+            print(colored(f"\n错误: {error_msg}", "red"))
+            self._finish(task_id, None)
+            return
+        
+        result = response_data.get("result", {})
+        state = result.get("status", {}).get("state")
+        if state in TERMINAL_STATES:
+            self._finish(task_id, result)
+            return
+        if state == TaskStatus.RUNNING:
+            print(colored("(运行中)", "green"), end="", flush=True)
+        else:
+            print(colored(".", "cyan"), end="", flush=True)
+        self._reschedule(watch, changed=state != watch["state"])
+        watch["state"] = state
+
 class A2AClient:
     """
     A2A客户端类，用于与A2A服务器通信
     
     该客户端实现了A2A JSON-RPC协议，提供消息发送和任务查询功能。
-    简化版本，专注于发送请求和接收回复的核心功能。
+    每个服务器复用一个带连接池的 httpx.AsyncClient；Agent卡片声明支持流式时通过
+    message/stream 接收结果，否则由共享的轮询循环以自适应间隔查询任务状态。
+    
+    连接池与轮询循环运行在客户端专用的后台事件循环上，调用方每次 asyncio.run
+    新建事件循环时仍复用同一批连接；用完后调用 aclose() 关闭连接并停止该循环。
     """
     
     def __init__(self, config_path: str):
@@ -35,41 +188,120 @@ class A2AClient:
         self.servers_config = load_servers_config(config_path)
         self.server_names = list(self.servers_config.keys())
         self.clients = {}  # 存储各服务器对应的URL和信息
+        # 连接池与轮询循环都绑定在客户端专用的事件循环上
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self._pollers: Dict[str, _TaskPoller] = {}
         
         # 初始化客户端连接
         self._init_clients()
     
+    async def __aenter__(self) -> "A2AClient":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
     def _init_clients(self):
-        """同步初始化所有的A2A客户端"""
+        """登记所有的A2A服务器，Agent卡片在首次请求时异步获取"""
         for name, config in self.servers_config.items():
             url = config.get('url')
             if not url:
                 print(colored(f"警告: 服务器 {name} 未配置URL，将被跳过", "yellow"))
                 continue
-            
+            self.clients[name] = {
+                "url": url,
+                "agent_card": None
+            }
+    
+    def _io_loop(self) -> asyncio.AbstractEventLoop:
+        """返回客户端专用的事件循环，首次使用时在后台线程中启动"""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=self._run_loop, args=(loop,), name="a2a-client", daemon=True).start()
+                self._loop = loop
+            return self._loop
+    
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+    
+    async def _call(self, coro: Awaitable[Any]) -> Any:
+        """在客户端专用的事件循环上执行协程，调用方可以处在任意事件循环中"""
+        loop = self._io_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+    
+    def _http_client(self, server_url: str) -> httpx.AsyncClient:
+        """返回该服务器的共享 AsyncClient"""
+        client = self._http.get(server_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=DEFAULT_TIMEOUT,
+                headers={"Content-Type": "application/json"},
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+            self._http[server_url] = client
+        return client
+    
+    def _poller(self, server_url: str) -> _TaskPoller:
+        poller = self._pollers.get(server_url)
+        if poller is None:
+            poller = self._pollers[server_url] = _TaskPoller(self, server_url)
+        return poller
+    
+    async def aclose(self):
+        """关闭所有连接并停止客户端的事件循环，之后再次使用会重新创建"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            await self._call(self._close_clients())
+        finally:
+            with self._loop_lock:
+                if self._loop is loop:
+                    self._loop = None
+            loop.call_soon_threadsafe(loop.stop)
+    
+    async def _close_clients(self):
+        clients, self._http, self._pollers = list(self._http.values()), {}, {}
+        for client in clients:
+            await client.aclose()
+    
+    async def _rpc(self, server_url: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        response = await self._http_client(server_url).post(f"{server_url}/", json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _ensure_card(self, server_name: str) -> Dict[str, Any]:
+        """首次使用时异步获取并缓存 Agent 卡片"""
+        server_info = self.clients[server_name]
+        if server_info["agent_card"] is None:
+            url = server_info["url"]
             try:
-                # 使用同步方法获取agent_card
-                card_resolver = A2ACardResolver(url)
-                try:
-                    print(colored(f"正在连接服务器: {name} ({url})", "blue"))
-                    agent_card = card_resolver.get_agent_card()
-                    
-                    # 存储服务器信息
-                    self.clients[name] = {
-                        "url": url,
-                        "agent_card": agent_card
-                    }
-                    print(colored(f"已成功连接到A2A服务器: {name}", "green"))
-                except Exception as e:
-                    print(colored(f"获取agent_card时出错: {str(e)}", "red"))
-                    # 即使获取卡片失败，也记录URL以允许发送请求
-                    self.clients[name] = {
-                        "url": url,
-                        "agent_card": {}
-                    }
-                
+                print(colored(f"正在连接服务器: {server_name} ({url})", "blue"))
+                resolver = A2ACardResolver(url)
+                server_info["agent_card"] = await resolver.get_agent_card_async(self._http_client(url))
+                print(colored(f"已成功连接到A2A服务器: {server_name}", "green"))
             except Exception as e:
-                print(colored(f"初始化客户端 {name} 时出错: {str(e)}", "red"))
+                print(colored(f"获取agent_card时出错: {str(e)}", "red"))
+                # 即使获取卡片失败，也记录URL以允许发送请求
+                server_info["agent_card"] = {}
+        return server_info["agent_card"]
+    
+    @staticmethod
+    def _supports_streaming(agent_card: Dict[str, Any]) -> bool:
+        return bool((agent_card.get("capabilities") or {}).get("streaming"))
     
     async def send_request(self, server_name: str, message: str) -> Optional[str]:
         """
@@ -82,6 +314,9 @@ class A2AClient:
         Returns:
             Optional[str]: 服务器响应，如果出错则返回None
         """
+        return await self._call(self._send_request(server_name, message))
+    
+    async def _send_request(self, server_name: str, message: str) -> Optional[str]:
         if server_name not in self.servers_config:
             print(colored(f"错误: 未找到名为 {server_name} 的服务器", "red"))
             return None
@@ -90,217 +325,229 @@ class A2AClient:
             print(colored(f"错误: 服务器 {server_name} 未成功初始化", "red"))
             return None
         
-        server_info = self.clients[server_name]
-        server_url = server_info["url"]
+        server_url = self.clients[server_name]["url"]
+        agent_card = await self._ensure_card(server_name)
         
         print(colored(f"\n正在向 {server_name} 发送请求...", "cyan"))
         
         try:
-            message_dict = build_message_request(message)
-            #print(message_dict)
-            
-            try:
-                async with httpx.AsyncClient(timeout=LONG_TIMEOUT) as client:
-                    response = await client.post(
-                        f"{server_url}/",
-                        json=message_dict,
-                        headers={"Content-Type": "application/json"}
-                    )
-                    response.raise_for_status()
-                    response_data = response.json()
-                    #print(colored(f"请求已发送，响应: {json.dumps(response_data, indent=2)}", "blue"))
-                    
-                    # 检查响应中是否包含完整的结果
-                    text_content = self._extract_text_from_response(response_data)
-                    if text_content:
-                        return text_content
-                        
-            except httpx.ReadTimeout:
-                print(colored("请求发送超时，但服务器可能仍在处理。尝试获取任务状态...", "yellow"))
-                # 从请求数据中获取可能的任务ID
-                task_id = request_data["params"]["message"]["contextId"]
-                print(colored(f"使用备用任务ID: {task_id}", "yellow"))
-                
-                task_result = await self._poll_task_status(server_url, task_id, max_retries=5)
-                if task_result:
-                    return task_result
-                else:
-                    print(colored("无法确认请求是否被服务器处理。请稍后重试。", "red"))
-                    return None
-            except Exception as e:
-                print(colored(f"HTTP请求出错: {str(e)}", "red"))
-                import traceback
-                traceback.print_exc()
-                return None
-            
-            # 如果没有直接返回结果，并且成功获取了响应数据，继续处理
-            if response_data is None:
-                return None
-            # 检查响应中是否有错误
-            if "error" in response_data:
-                error_msg = response_data["error"].get("message", "未知错误")
-                print(colored(f"错误: {error_msg}", "red"))
-                return None
-            
-            # 获取任务ID
-            result = response_data.get("result", {})
-            # 检查是否有状态字段，如果有且为completed，说明响应中已包含结果
-            if "status" in result and isinstance(result["status"], dict) and result["status"].get("state") == "completed":
-                print(colored("任务已完成，直接从响应中提取结果", "green"))
-                # 从响应中提取结果
-                artifacts = result.get("artifacts", [])
-                if artifacts:
-                    for artifact in artifacts:
-                        parts = artifact.get("parts", [])
-                        for part in parts:
-                            if "text" in part:
-                                return part["text"]
-                print(colored("在完成的任务中未找到文本内容", "yellow"))
-                return None
-            
-            task_id = result.get("taskId")
-            if not task_id:
-                # 尝试从result.id获取任务ID
-                task_id = result.get("id")
-                if not task_id:
-                    print(colored("错误: 服务器未返回任务ID", "red"))
-                    return None
-                print(colored(f"从result.id字段获取到任务ID: {task_id}", "blue"))
-            
-            # 轮询任务状态
-            task_result = await self._poll_task_status(server_url, task_id)
-            
-            # 处理任务结果
-            if task_result:
-                return task_result
-            else:
-                print(colored("无法获取有效的任务结果。请稍后重试。", "red"))
-                return None
-                
+            if self._supports_streaming(agent_card):
+                return await self._send_streaming(server_url, message)
+            return await self._send_blocking(server_url, message)
         except Exception as e:
             print(colored(f"发送请求时出错: {str(e)}", "red"))
             import traceback
             traceback.print_exc()
             return None
     
-    async def _poll_task_status(self, server_url: str, task_id: str, max_attempts: int = MAX_POLL_ATTEMPTS, 
-                               interval: float = DEFAULT_POLL_INTERVAL, max_retries: int = MAX_RETRIES) -> Optional[str]:
+    async def send_many(self, requests: Sequence[Tuple[str, str]]) -> List[Optional[str]]:
+        """
+        并发发送多条请求，共享各服务器的连接池与轮询循环
+        
+        Args:
+            requests: (服务器名称, 请求消息) 列表
+            
+        Returns:
+            List[Optional[str]]: 与输入顺序一致的响应列表
+        """
+        return await self._call(self._send_many(requests))
+    
+    async def _send_many(self, requests: Sequence[Tuple[str, str]]) -> List[Optional[str]]:
+        return list(await asyncio.gather(*(self._send_request(name, message) for name, message in requests)))
+    
+    async def _send_blocking(self, server_url: str, message: str) -> Optional[str]:
+        """通过 message/send 发送请求，未直接返回结果时轮询任务状态"""
+        message_dict = build_message_request(message)
+        try:
+            response_data = await self._rpc(server_url, message_dict, LONG_TIMEOUT)
+        except httpx.ReadTimeout:
+            print(colored("请求发送超时，但服务器可能仍在处理。尝试获取任务状态...", "yellow"))
+            # 从请求数据中获取可能的任务ID
+            task_id = message_dict["params"]["message"]["contextId"]
+            print(colored(f"使用备用任务ID: {task_id}", "yellow"))
+            task_result = await self._wait_for_task(server_url, task_id)
+            if task_result is None:
+                print(colored("无法确认请求是否被服务器处理。请稍后重试。", "red"))
+            return task_result
+        except Exception as e:
+            print(colored(f"HTTP请求出错: {str(e)}", "red"))
+            import traceback
+            traceback.print_exc()
+            return None
+        return await self._handle_send_response(server_url, response_data)
+    
+    async def _handle_send_response(self, server_url: str, response_data: Dict[str, Any]) -> Optional[str]:
+        """处理 message/send 的响应：直接提取结果，或取出任务ID等待完成"""
+        # 检查响应中是否包含完整的结果
+        text_content = self._extract_text_from_response(response_data)
+        if text_content:
+            return text_content
+        
+        # 检查响应中是否有错误
+        if "error" in response_data:
+            error_msg = response_data["error"].get("message", "未知错误")
+            print(colored(f"错误: {error_msg}", "red"))
+            return None
+        
+        result = response_data.get("result", {})
+        if result.get("kind") == "message":
+            return self._extract_text_from_artifacts([result])
+        # 检查是否有状态字段，如果有且为completed，说明响应中已包含结果
+        if "status" in result and isinstance(result["status"], dict) and result["status"].get("state") == "completed":
+            print(colored("任务已完成，直接从响应中提取结果", "green"))
+            return self._task_result_text(result)
+        
+        task_id = result.get("taskId")
+        if not task_id:
+            # 尝试从result.id获取任务ID
+            task_id = result.get("id")
+            if not task_id:
+                print(colored("错误: 服务器未返回任务ID", "red"))
+                return None
+            print(colored(f"从result.id字段获取到任务ID: {task_id}", "blue"))
+        
+        task_result = await self._wait_for_task(server_url, task_id)
+        if task_result is None:
+            print(colored("无法获取有效的任务结果。请稍后重试。", "red"))
+        return task_result
+    
+    async def _send_streaming(self, server_url: str, message: str) -> Optional[str]:
+        """通过 message/stream 接收结果；连接中断时重新订阅，仍失败则退回轮询"""
+        # events 记录已收到的任务事件数，重新订阅时服务端从这里补发
+        stream_state: Dict[str, Any] = {"task_id": None, "texts": {}, "events": 0}
+        request = build_message_request(message, method=RPCMethods.STREAM_MESSAGE)
+        try:
+            outcome = await self._consume_stream(server_url, request, stream_state)
+        except httpx.TransportError as e:
+            task_id = stream_state["task_id"]
+            if not task_id:
+                raise
+            print(colored(f"\n流式连接中断({str(e)})，重新订阅任务 {task_id}", "yellow"))
+            try:
+                request = build_resubscribe_request(task_id, from_sequence=stream_state["events"])
+                outcome = await self._consume_stream(server_url, request, stream_state)
+            except httpx.HTTPError:
+                print(colored("重新订阅失败，改为轮询任务状态", "yellow"))
+                return await self._wait_for_task(server_url, task_id)
+        
+        if outcome is not _PENDING:
+            return outcome
+        # 流已结束但没有收到终态事件
+        if stream_state["task_id"]:
+            return await self._wait_for_task(server_url, stream_state["task_id"])
+        return self._joined_stream_text(stream_state)
+    
+    async def _consume_stream(self, server_url: str, request: Dict[str, Any], stream_state: Dict[str, Any]):
+        client = self._http_client(server_url)
+        async with client.stream(
+            "POST",
+            f"{server_url}/",
+            json=request,
+            headers={"Accept": "text/event-stream"},
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, read=LONG_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+            if "text/event-stream" not in response.headers.get("content-type", ""):
+                # 服务端未按流式返回，按普通响应处理
+                await response.aread()
+                return await self._handle_send_response(server_url, response.json())
+            async for event in _iter_sse(response):
+                outcome = self._handle_stream_event(event, stream_state)
+                if outcome is not _PENDING:
+                    return outcome
+        return _PENDING
+    
+    def _handle_stream_event(self, event: Dict[str, Any], stream_state: Dict[str, Any]):
+        """处理单条流式事件，到达终态时返回结果，否则返回 _PENDING"""
+        if "error" in event:
+            error_msg = event["error"].get("message", "未知错误")
+            print(colored(f"\n错误: {error_msg}", "red"))
+            return None
+        
+        result = event.get("result") or {}
+        kind = result.get("kind")
+        stream_state["events"] += 1
+        if kind == "message":
+            return self._extract_text_from_artifacts([result])
+        if kind == "task":
+            stream_state["task_id"] = result.get("id")
+            if result.get("status", {}).get("state") in TERMINAL_STATES:
+                return self._task_result_text(result)
+            return _PENDING
+        
+        stream_state["task_id"] = stream_state["task_id"] or result.get("taskId")
+        if kind == "artifact-update":
+            artifact = result.get("artifact", {})
+            text = "".join(part.get("text", "") for part in artifact.get("parts", []))
+            key = artifact.get("artifactId")
+            if result.get("append"):
+                stream_state["texts"][key] = stream_state["texts"].get(key, "") + text
+            else:
+                stream_state["texts"][key] = text
+            print(colored(".", "cyan"), end="", flush=True)
+        elif kind == "status-update":
+            status = result.get("status", {})
+            state = status.get("state")
+            if state == TaskStatus.COMPLETED:
+                print(colored("\n响应已收到! ✓", "green", attrs=["bold"]))
+                text = self._joined_stream_text(stream_state)
+                if not text and status.get("message"):
+                    text = self._extract_text_from_artifacts([status["message"]])
+                return text
+            if state in TERMINAL_STATES:
+                print(colored(f"\n错误: 任务执行失败 ({state})", "red"))
+                return None
+            if result.get("final"):
+                return self._joined_stream_text(stream_state)
+        return _PENDING
+    
+    @staticmethod
+    def _joined_stream_text(stream_state: Dict[str, Any]) -> Optional[str]:
+        text = "".join(stream_state["texts"].values())
+        return text or None
+    
+    async def _wait_for_task(self, server_url: str, task_id: str, timeout: float = MAX_POLL_DURATION) -> Optional[str]:
         """
-        轮询任务状态，带有重试机制
+        等待任务到达终态，轮询由该服务器共享的轮询循环完成
         
         Args:
             server_url: 服务器URL
             task_id: 任务ID
-            max_attempts: 最大尝试次数
-            interval: 轮询间隔（秒）
-            max_retries: 单次请求的最大重试次数
+            timeout: 最长等待时间（秒）
             
         Returns:
             Optional[str]: 任务结果，如果超时或出错则返回None
         """
         print(colored("等待服务器处理请求", "cyan"), end="")
+        result = await self._poller(server_url).watch(task_id, timeout)
+        if result is None:
+            return None
+        return self._task_result_text(result)
+    
+    def _task_result_text(self, result: Dict[str, Any]) -> Optional[str]:
+        """从终态任务中提取文本，失败的任务打印错误信息并返回None"""
+        status = result.get("status", {}).get("state")
+        if status != TaskStatus.COMPLETED:
+            print(colored(f"\n错误: 任务执行失败 ({status})", "red"))
+            error_info = result.get("error", {})
+            if error_info:
+                print(colored(f"错误详情: {json.dumps(error_info, indent=2)}", "red"))
+            return None
         
-        for attempt in range(max_attempts):
-            # 显示进度百分比以提供更好的反馈
-            progress = min(100, int((attempt / max_attempts) * 100))
-            if attempt % 5 == 0:  # 每5次更新一次进度显示
-                print(colored(f"\n等待中... {progress}% ({attempt}/{max_attempts})", "cyan"), end="")
-            else:
-                print(colored(".", "cyan"), end="", flush=True)
+        print(colored("\n响应已收到! ✓", "green", attrs=["bold"]))
+        # 从结果中提取文本
+        text_content = self._extract_text_from_artifacts(result.get("artifacts", []))
+        if text_content:
+            return text_content
             
-            # 构建获取任务状态的请求
-            request_data = build_task_request(task_id)
-            
-            # 实现重试逻辑
-            retry_count = 0
-            while retry_count <= max_retries:
-                try:
-                    # 使用更长的超时时间
-                    async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-                        response = await client.post(
-                            f"{server_url}/",
-                            json=request_data,
-                            headers={"Content-Type": "application/json"}
-                        )
-                        response.raise_for_status()
-                        response_data = response.json()
-                    
-                    # 处理响应数据
-                    if "error" in response_data:
-                        error_msg = response_data["error"].get("message", "未知错误")
-                        if "not found" in error_msg.lower() or "not exist" in error_msg.lower():
-                            if retry_count == max_retries:
-                                print(colored(f"\n任务ID {task_id} 暂未创建，继续等待...", "yellow"))
-                                break
-                            retry_count += 1
-                            await asyncio.sleep(1)
-                            continue
-                        else:
-                            print(colored(f"\n错误: {error_msg}", "red"))
-                            return None
-                    
-                    # 重置重试计数器
-                    retry_count = 0
-                    
-                    # 获取任务状态
-                    result = response_data.get("result", {})
-                    status = result.get("status", {}).get("state")
-                    
-                    # 任务完成
-                    if status == "completed":
-                        print(colored("\n响应已收到! ✓", "green", attrs=["bold"]))
-                        
-                        # 从结果中提取文本
-                        artifacts = result.get("artifacts", [])
-                        text_content = self._extract_text_from_artifacts(artifacts)
-                        if text_content:
-                            return text_content
-                            
-                        # 尝试其他可能的文本位置
-                        if "output" in result:
-                            if isinstance(result["output"], str):
-                                return result["output"]
-                            elif isinstance(result["output"], dict) and "text" in result["output"]:
-                                return result["output"]["text"]
-                        
-                        print(colored("未在响应中找到文本内容", "yellow"))
-                        return None
-                    
-                    # 任务失败
-                    elif status == "failed":
-                        print(colored("\n错误: 任务执行失败", "red"))
-                        error_info = result.get("error", {})
-                        if error_info:
-                            print(colored(f"错误详情: {json.dumps(error_info, indent=2)}", "red"))
-                        return None
-                    
-                    # 任务正在运行
-                    elif status == "running":
-                        print(colored("(运行中)", "green"), end="", flush=True)
-                        break
-                    
-                    # 其他状态
-                    break
-                
-                except (httpx.ReadTimeout, httpx.ConnectTimeout) as e:
-                    if retry_count == max_retries:
-                        print(colored(f"\n第{retry_count+1}次尝试获取任务状态超时", "yellow"))
-                        break
-                    retry_count += 1
-                    print(colored("r", "yellow"), end="", flush=True)
-                    continue
-                
-                except Exception as e:
-                    if retry_count == max_retries:
-                        print(colored(f"\n轮询任务状态时出错: {str(e)}", "red"))
-                        break
-                    retry_count += 1
-                    continue
-            
-            # 等待间隔时间后继续下一次轮询
-            await asyncio.sleep(interval)
+        # 尝试其他可能的文本位置
+        if "output" in result:
+            if isinstance(result["output"], str):
+                return result["output"]
+            elif isinstance(result["output"], dict) and "text" in result["output"]:
+                return result["output"]["text"]
         
-        print(colored("\n警告: 等待任务完成超时，请检查服务器状态", "yellow"))
+        print(colored("未在响应中找到文本内容", "yellow"))
         return None
     
     def _extract_text_from_response(self, response_data: Dict[str, Any]) -> Optional[str]:
@@ -322,4 +569,4 @@ class A2AClient:
                         return part["text"]
         
         print(colored("未找到文本内容", "yellow"))
-        return None
\ No newline at end of file
+        return None
@@ -13,10 +13,22 @@ POLL_TIMEOUT = 30.0
 DEFAULT_POLL_INTERVAL = 2.0
 MAX_POLL_ATTEMPTS = 60
 MAX_RETRIES = 3
+# 自适应轮询：从很短的间隔开始，任务状态不变时按倍数退避，状态变化时重置
+MIN_POLL_INTERVAL = 0.2
+MAX_POLL_INTERVAL = 10.0
+POLL_BACKOFF = 1.6
+# 单个任务的最长等待时间（秒），与原先 60 次 x 2 秒保持一致
+MAX_POLL_DURATION = MAX_POLL_ATTEMPTS * DEFAULT_POLL_INTERVAL
+
+# 连接池设置，每个服务器一个
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
 
 # JSON-RPC方法
 class RPCMethods(str, Enum):
     SEND_MESSAGE = "message/send"
+    STREAM_MESSAGE = "message/stream"
+    RESUBSCRIBE = "tasks/resubscribe"
     GET_TASK = "tasks/get"  # 修正：使用复数形式 tasks/get
     CANCEL_TASK = "tasks/cancel"
 
@@ -26,10 +38,16 @@ class TaskStatus(str, Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELED = "canceled"
+    REJECTED = "rejected"
+
+# 终态：到达后不再轮询
+TERMINAL_STATES = {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELED, TaskStatus.REJECTED}
 
 # 构建消息请求
-def build_message_request(message: str, context_id: str = None, message_id: str = None) -> Dict[str, Any]:
-    """构建符合A2A协议的消息请求"""
+def build_message_request(message: str, context_id: str = None, message_id: str = None,
+                          method: str = RPCMethods.SEND_MESSAGE) -> Dict[str, Any]:
+    """构建符合A2A协议的消息请求，``method`` 为 message/stream 时走 SSE 流式返回"""
     from uuid import uuid4
     
     if not context_id:
@@ -40,7 +58,7 @@ def build_message_request(message: str, context_id: str = None, message_id: str
     return {
         "jsonrpc": "2.0",
         "id": str(uuid4()),
-        "method": RPCMethods.SEND_MESSAGE,
+        "method": method,
         "params": {
             "message": {
                 "messageId": message_id,
@@ -72,3 +90,21 @@ def build_task_request(task_id: str) -> Dict[str, Any]:
             "id": task_id
         }
     }
+
+# 构建任务重新订阅请求
+def build_resubscribe_request(task_id: str, from_sequence: Optional[int] = None) -> Dict[str, Any]:
+    """构建 tasks/resubscribe 请求，流式连接断开后用于继续接收任务事件
+
+    from_sequence 为此前已收到的事件数，服务端据此只补发缺失的事件
+    """
+    from uuid import uuid4
+
+    params: Dict[str, Any] = {"id": task_id}
+    if from_sequence is not None:
+        params["metadata"] = {"fromSequence": from_sequence}
+    return {
+        "jsonrpc": "2.0",
+        "id": str(uuid4()),
+        "method": RPCMethods.RESUBSCRIBE,
+        "params": params
+    }
@@ -5,6 +5,7 @@ from a2a.server.agent_execution.context import RequestContext
 import json
 import os
 import asyncio
+import httpx
 from a2a.server.agent_execution.simple_request_context_builder import SimpleRequestContextBuilder
 from typing import Any, Dict, List, Optional, Set, TypedDict
 from my_a2a.client import A2AClient
@@ -71,15 +72,22 @@ class AgentRegistry:
         if self._entries:
             return self._status
 
-        for agent_type, base_url in self.agent_urls.items():
+        # 所有卡片并发获取，共用一个连接池；卡片缓存有效时不发请求，过期后多为 304
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            results = await asyncio.gather(
+                *(self._fetch_card(base_url, client) for base_url in self.agent_urls.values()),
+                return_exceptions=True,
+            )
+
+        for (agent_type, base_url), result in zip(self.agent_urls.items(), results):
             # 默认认为服务不可用，只有成功拿到卡片才置为 True
             card = None
             available = False
-            try:
-                card = await asyncio.to_thread(self._fetch_card, base_url)
+            if isinstance(result, Exception):
+                print(f"获取 {agent_type} agent card 失败: {result}")
+            else:
+                card = result
                 available = True
-            except Exception as exc:
-                print(f"获取 {agent_type} agent card 失败: {exc}")
 
             entry = self._build_entry(agent_type, base_url, card)
             self._entries[agent_type] = entry
@@ -89,11 +97,11 @@ class AgentRegistry:
 
         return self._status
 
-    def _fetch_card(self, base_url: str) -> Dict[str, Any]:
-        """同步读取 Agent Card，适配到线程池调用。"""
+    async def _fetch_card(self, base_url: str, client: httpx.AsyncClient) -> Dict[str, Any]:
+        """异步读取 Agent Card，结果经解析器的卡片缓存复用。"""
 
         resolver = A2ACardResolver(base_url)
-        return resolver.get_agent_card()
+        return await resolver.get_agent_card_async(client)
 
     def _build_entry(self, agent_type: str, base_url: str, card: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """将原始卡片信息组装成内部统一结构。"""
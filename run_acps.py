@@ -1,12 +1,13 @@
 from __future__ import annotations
 import re
 import asyncio
+import functools
 import json
 import os
 import sys
 import uuid
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Set, TypedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, TypedDict
 from urllib.parse import urlsplit, urlunsplit
 
 from dotenv import load_dotenv
@@ -18,8 +19,6 @@ if _PROJECT_ROOT not in sys.path:
 
 from base import get_agent_logger
 from transform_ import to_json, from_json
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langgraph.graph import StateGraph, END
 from agents.assistant.director_assistant import Assistant
 from acps_aip.aip_rpc_client import AipRpcClient
 from acps_aip.aip_base_model import Task, TextDataItem
@@ -32,9 +31,27 @@ from file_manage import UserFile
 from agents.writers.screenwriter import ScreenWriter
 from agents.assistant.director_assistant import Assistant
 from agents.writers.outline_writer import OutlineWriter
-from agents.animators.animator_qwen import Animator
+from agents.writers.shots import Shot, ShotList
 
+from agents.animators.render_tier import TIER_DRAFT, TIER_FINAL, best_tier
+
+from tools import profiler
 from tools.merge_video import merge_videos
+from tools.render_queue import (
+    JOB_CANCELED,
+    JOB_FAILED,
+    JOB_SUCCEEDED,
+    RenderEvent,
+    RenderJob,
+    RenderQueue,
+)
+
+if TYPE_CHECKING:
+    # 仅用于类型标注；LangChain / LangGraph 导入较慢，运行时按需加载
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+    from langgraph.graph import StateGraph
+
+
 class AgentEntry(TypedDict):
     """缓存单个 Agent 基础信息与预处理关键字。"""
 
@@ -77,6 +94,14 @@ AGENT_DISCOVERY_DEFAULTS: Dict[str, Dict[str, Any]] = {
 
 REQUIRED_AGENT_KEYS: List[str] = list(AGENT_DISCOVERY_DEFAULTS.keys())
 
+# 后台渲染 worker 进程数量，渲染任务与对话轮次解耦。
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+# 抢先渲染（默认关闭）：分镜生成后立即为前几个镜头渲染低分辨率草稿。
+SPECULATIVE_RENDER = os.getenv("SPECULATIVE_RENDER", "0").lower() in ("1", "true", "yes")
+SPECULATIVE_SHOTS = int(os.getenv("SPECULATIVE_SHOTS", "2"))
+# 确认分镜后的渲染档位：final 直接出成片；draft 先出草稿，再次确认后提升为成片。
+RENDER_TIER = os.getenv("RENDER_TIER", TIER_FINAL)
+
 # 用户在 CLI 中可用于立即退出的指令集合。
 EXIT_COMMANDS = {"退出", "再见", "bye", "quit", "exit", "结束"}
 
@@ -336,14 +361,23 @@ class PersonalAssistantOrchestrator:
         self.outline = None
         self.screen = []
         self.abstract = None
-        self.assistant = Assistant()
-        self.outline_writer = OutlineWriter()
-        self.screen_writer = ScreenWriter()
-    
-        self.animator = Animator(name=self.project_name,download_link=self.userfile.file_path)
-        
-    # 构建 LangGraph 状态图，节点集合与 a2a 版本保持一致（intent/confirm/workflow/chat/decline）。
-        self._graph = self._build_graph()
+        # 三个 Agent 的前缀缓存按会话登记，活跃期间由 tools.prompt_cache 在过期前续期
+        self.assistant = Assistant(self.main_session_id)
+        self.outline_writer = OutlineWriter(self.main_session_id)
+        self.screen_writer = ScreenWriter(self.main_session_id)
+
+        # 渲染任务交给后台 worker 进程，编排器只负责入队与订阅完成事件。
+        self.render_queue = RenderQueue(os.path.join(self.userfile.file_path, 'render_queue.db'))
+        self._render_workers_started = False
+        # 各阶段耗时记录写在项目目录下，与 project.json 同级。
+        self.project_dir = os.path.join(self.userfile.file_path, self.project_name)
+        profiler.bind(self.project_dir)
+
+    @functools.cached_property
+    def _graph(self):
+        """LangGraph 状态图，首轮对话时才构建，启动阶段不必导入 LangGraph。"""
+        # 节点集合与 a2a 版本保持一致（intent/confirm/workflow/chat/decline）。
+        return self._build_graph()
 
     async def acps_call_agent(self, keyword: str, payload: str, session_id: str) -> str:
         """根据关键词解析对应 Agent 并发起 RPC 调用。
@@ -375,18 +409,204 @@ class PersonalAssistantOrchestrator:
         material = session_data["material"]
         if self.mode == 'test':
             return f'call {now_task}'
-        if now_task == "outline":
-            res = self.outline_writer.call(session_data)
-            state["session_data"]["material"]["outline"] = res
-        if now_task == 'screen':
-            res = self.screen_writer.call(session_data)
-            state["session_data"]["material"]["screen"] = res
-        if now_task == "animator":
-            video = self.animator.call(session_data)
-            state["session_data"]["material"]["video_address"].append(video)
-            res = '已完成第'+str(session_data["video_generating"])+'个视频生成'
-            session_data["video_generating"] += 1
+        with profiler.span("agent", f"fun_call_agent.{now_task}", stage=profiler.stage_of(now_task)):
+            if now_task == "outline":
+                res = self.outline_writer.call(session_data)
+                state["session_data"]["material"]["outline"] = res
+            if now_task == 'screen':
+                res = self.screen_writer.call(session_data)
+                state["session_data"]["material"]["screen"] = res
+                if SPECULATIVE_RENDER:
+                    self._speculate_drafts(session_data)
+            if now_task == "animator":
+                res = self._submit_render_jobs(session_data)
         return res
+
+    def _ensure_render_workers(self) -> None:
+        """首次提交渲染任务时再启动 worker 进程与完成事件订阅。"""
+        if self._render_workers_started:
+            return
+        self.render_queue.start_workers(RENDER_WORKERS)
+        self.render_queue.subscribe(self._on_render_event)
+        self._render_workers_started = True
+
+    def _on_render_event(self, event: RenderEvent) -> None:
+        """渲染事件回调（运行在订阅线程中），仅做提示与日志。"""
+        if event.kind not in (JOB_SUCCEEDED, JOB_FAILED):
+            return
+        job = self.render_queue.get(event.job_id)
+        if job is None or job.project != self.project_name:
+            return
+        logger.info(
+            "event=render_update job_id=%s shot=%d status=%s",
+            job.id,
+            job.shot_index + 1,
+            job.status,
+        )
+        if job.status == JOB_SUCCEEDED and job.tier == TIER_DRAFT:
+            print(f"\n[草稿预览] 第{job.shot_index + 1}个镜头：{job.result_path}")
+        elif job.status == JOB_SUCCEEDED:
+            print(f"\n[渲染完成] 第{job.shot_index + 1}个镜头：{job.result_path}")
+        else:
+            print(f"\n[渲染失败] 第{job.shot_index + 1}个镜头：{job.error}")
+
+    def _speculate_drafts(self, session_data: Dict[str, Any]) -> None:
+        """在用户审阅分镜期间，为前 ``SPECULATIVE_SHOTS`` 个镜头提交草稿渲染。
+
+        提示词已变化的镜头会先作废旧草稿再重新提交。
+        """
+        self._ensure_render_workers()
+        draft_jobs = session_data.setdefault("draft_jobs", {})
+        shots = self._screen_shots(session_data)
+        self._prune_jobs(session_data, shots)
+        for idx, shot in enumerate(list(shots)[:SPECULATIVE_SHOTS]):
+            if self._live_job(draft_jobs.get(shot.id), shot.text) is not None:
+                continue
+            self._invalidate_draft(session_data, shot.id)
+            draft_jobs[shot.id] = self._enqueue_shot(idx, shot, TIER_DRAFT)
+
+    @staticmethod
+    def _screen_shots(session_data: Dict[str, Any]) -> ShotList:
+        """当前分镜及其稳定 id；渲染任务按镜头 id 记录，插入或删除镜头不影响其他镜头。"""
+        shots = ShotList.restore(session_data, "screen")
+        shots.store(session_data, "screen")
+        return shots
+
+    @staticmethod
+    def _ensure_shot_ids(session_data: Dict[str, Any]) -> None:
+        """为旧会话补上镜头 id，并把按序号记录的渲染任务迁移到对应的 id 下。"""
+        if "shots" in session_data:
+            return
+        material = session_data["material"]
+        for kind in ("outline", "screen"):
+            texts = material.get(kind) or []
+            kept = [idx for idx, text in enumerate(texts) if text and text.strip()]
+            shots = ShotList.from_texts(texts)
+            shots.store(session_data, kind)
+            material[kind] = shots.texts()
+            if kind != "screen":
+                continue
+            for name in ("render_jobs", "draft_jobs"):
+                jobs = session_data.get(name) or {}
+                session_data[name] = {
+                    shot.id: jobs[str(idx)] for idx, shot in zip(kept, shots) if str(idx) in jobs
+                }
+
+    def _prune_jobs(self, session_data: Dict[str, Any], shots: ShotList) -> None:
+        """取消已被删除的镜头的渲染任务。"""
+        current = set(shots.ids())
+        for name in ("render_jobs", "draft_jobs"):
+            jobs = session_data.get(name) or {}
+            for key in [key for key in jobs if key not in current]:
+                self.render_queue.cancel(jobs.pop(key))
+
+    def _invalidate_draft(self, session_data: Dict[str, Any], shot_id: str) -> None:
+        """用户修改某个镜头时，取消并丢弃该镜头的草稿渲染。"""
+        job_id = (session_data.get("draft_jobs") or {}).pop(shot_id, None)
+        if job_id:
+            self.render_queue.cancel(job_id)
+
+    def _enqueue_shot(self, idx: int, shot: Shot, tier: str) -> str:
+        """以当前项目身份提交单个镜头的渲染任务。"""
+        return self.render_queue.enqueue(
+            project=self.project_name,
+            shot_index=idx,
+            prompt=shot.text,
+            output_dir=self.userfile.file_path,
+            tier=tier,
+            shot_id=shot.id,
+        )
+
+    def _live_job(self, job_id: Optional[str], prompt: str) -> Optional[RenderJob]:
+        """返回仍然有效（提示词未变且未失败/取消）的渲染任务，否则返回 ``None``。"""
+        job = self.render_queue.get(job_id) if job_id else None
+        if job is None or job.prompt != prompt or job.status in (JOB_FAILED, JOB_CANCELED):
+            return None
+        return job
+
+    def _submit_render_jobs(self, session_data: Dict[str, Any]) -> str:
+        """按分镜提交渲染任务，提示词未变且仍有效的任务会被跳过。
+
+        ``RENDER_TIER`` 为 ``draft`` 时，首次确认只渲染草稿供快速迭代；草稿渲染成功
+        的镜头在用户再次确认后才提升为成片。尚未开始的草稿会被原地提升，无需重复提交。
+
+        Args:
+            session_data: 当前会话状态，``draft_jobs``/``render_jobs`` 分别按镜头 id
+                记录各分镜草稿与成片的任务 ID。
+
+        Returns:
+            返回给用户的提交结果说明。
+        """
+        self._ensure_render_workers()
+        render_jobs = session_data.setdefault("render_jobs", {})
+        draft_jobs = session_data.setdefault("draft_jobs", {})
+        drafts = finals = 0
+        shots = self._screen_shots(session_data)
+        self._prune_jobs(session_data, shots)
+        for idx, shot in enumerate(shots):
+            key, prompt = shot.id, shot.text
+            if self._live_job(render_jobs.get(key), prompt) is not None:
+                continue
+            stale = render_jobs.pop(key, None)
+            if stale:
+                # 分镜已被修改，旧的渲染结果作废。
+                self.render_queue.cancel(stale)
+            draft = self._live_job(draft_jobs.get(key), prompt)
+            if RENDER_TIER == TIER_DRAFT:
+                if draft is None:
+                    self._invalidate_draft(session_data, key)
+                    draft_jobs[key] = self._enqueue_shot(idx, shot, TIER_DRAFT)
+                    drafts += 1
+                    continue
+                if draft.status != JOB_SUCCEEDED:
+                    # 草稿还没出片，等用户预览后再提升。
+                    continue
+            if draft is not None and self.render_queue.promote(draft.id):
+                render_jobs[key] = draft_jobs.pop(key)
+            else:
+                render_jobs[key] = self._enqueue_shot(idx, shot, TIER_FINAL)
+            finals += 1
+        session_data["video_generating"] = len(render_jobs)
+        return (
+            f'已提交{drafts}个镜头的草稿渲染、{finals}个镜头的成片渲染，'
+            '渲染在后台进行，您可以继续聊天或修改其他分镜。'
+        )
+
+    def _sync_render_results(self, session_data: Dict[str, Any]) -> bool:
+        """把已完成的渲染结果写回素材。
+
+        ``session_data['shot_renders']`` 按镜头 id 记录各档位的视频与当前最高档位，
+        属于渲染记录，和 ``render_jobs`` 一样不放进发给模型的 ``material``；
+        ``material['video_address']`` 只收录成片，用于最终合成。
+
+        Returns:
+            所有分镜的成片均渲染成功时返回 ``True``。
+        """
+        render_jobs = session_data.get("render_jobs") or {}
+        draft_jobs = session_data.get("draft_jobs") or {}
+        material = session_data["material"]
+        if not render_jobs and not draft_jobs:
+            return False
+        addresses = []
+        shot_renders = {}
+        all_done = bool(render_jobs)
+        for shot in self._screen_shots(session_data):
+            key, prompt = shot.id, shot.text
+            renders = {}
+            for tier, jobs in ((TIER_DRAFT, draft_jobs), (TIER_FINAL, render_jobs)):
+                job = self._live_job(jobs.get(key), prompt)
+                if job is not None and job.status == JOB_SUCCEEDED:
+                    renders[tier] = job.result_path
+            shot_renders[key] = {"tier": best_tier(renders), **renders}
+            if TIER_FINAL in renders:
+                addresses.append(renders[TIER_FINAL])
+            else:
+                all_done = False
+        session_data["shot_renders"] = shot_renders
+        # 旧版本把渲染记录存在 material 里，随会话迁移出来
+        material.pop("shot_renders", None)
+        material["video_address"] = addresses
+        return all_done
     
     def _get_session_state(self, session_id: str) -> Dict[str, Any]:
         """返回或创建指定会话的运行时状态字典。
@@ -413,12 +633,21 @@ class PersonalAssistantOrchestrator:
                 },
                 "modify_num": None,
                 "video_generating": 0,
+                # 大纲与分镜各镜头的稳定 id，与 material 中的列表一一对应
+                "shots": {"outline": [], "screen": []},
+                "render_jobs": {},
+                "draft_jobs": {},
+                # 各镜头已完成的渲染（镜头 id -> 档位与视频路径）
+                "shot_renders": {},
                 "editing_screen": None,
                 "message_count": 0,
+                # 助手压缩早期对话得到的摘要，随会话保存，重新打开项目时用于恢复上下文
+                "context_summary": "",
                 "now_task" : "imagination",
                 "now_state":"None",
             }
             self._sessions[session_id] = session_data
+        self._ensure_shot_ids(session_data)
         return session_data
 
     def assistant_node(self,state:ChatGraphState)->ChatGraphState:
@@ -433,8 +662,6 @@ class PersonalAssistantOrchestrator:
             agentans = self.fun_call_agent(state)
             state['session_data']["now_state"] = "None"
             state['reply'] = AssistantReply(agentans)
-            if state['session_data']['video_generating'] > len(state['session_data']['material']['video_address']):
-                state['session_data']['chat_with_assistant'] = False
             return state
         
         if self.mode == 'test':
@@ -541,13 +768,18 @@ class PersonalAssistantOrchestrator:
         if not isinstance(reply, AssistantReply):
             fallback_text = result_state.get("response", "抱歉，我暂时无法处理该请求。")
             reply = AssistantReply(str(fallback_text))
+        if self._sync_render_results(result_state['session_data']):
+            result_state['session_data']['chat_with_assistant'] = False
         print(result_state['session_data'])
         self.userfile.save_content(self.project_name,result_state['session_data']['material'],result_state['session_id'])
         self.userfile.save_session(result_state['session_id'],result_state['session_data'])
         if result_state['session_data']['chat_with_assistant'] == False:
             reply.end_session = True
-            merge_videos(result_state['session_data']['material']['video_address'],self.userfile.file_path+self.project_name+'/'+self.project_name+'.mp4')
-        # 维护对话轮次计数，便于后续做上下文压缩等扩展。
+            with profiler.span("merge", "merge_videos", stage="merge"):
+                merge_videos(result_state['session_data']['material']['video_address'],self.userfile.file_path+self.project_name+'/'+self.project_name+'.mp4')
+            self.render_queue.stop_workers()
+        profiler.write_breakdown(self.project_dir)
+        # 维护对话轮次计数；上下文压缩由助手按 token 预算进行（见 tools.compaction）。
         return _finalize(reply)
 
     def route_state(self,state:ChatGraphState):
@@ -564,13 +796,16 @@ class PersonalAssistantOrchestrator:
                 session_data['modify_num'] = num
                 if now_task == 'animator':
                     session_data['now_task'] = 'screen'
+                if session_data['now_task'] == 'screen':
+                    shots = self._screen_shots(session_data)
+                    if 0 < num <= len(shots):
+                        self._invalidate_draft(session_data, shots[num - 1].id)
             if intend == '不需要':
                 session_data['now_state'] = 'create'
                 if now_task == 'outline':
                     session_data['now_task'] = 'screen'
                 if now_task == 'screen':
                     session_data['now_task'] = 'animator'
-                    session_data['video_generating'] += 1
         return session_data
     
     def route_task(self,state:ChatGraphState):
@@ -586,9 +821,23 @@ class PersonalAssistantOrchestrator:
             session_data['now_state'] = 'create'
         return session_data
     
+    @staticmethod
+    def _profiled_node(name: str, node):
+        """为 LangGraph 节点计时，所属阶段取自会话的当前任务。"""
+
+        @functools.wraps(node)
+        def wrapper(state: ChatGraphState) -> ChatGraphState:
+            stage = profiler.stage_of(state["session_data"].get("now_task"))
+            with profiler.span("node", name, stage=stage):
+                return node(state)
+
+        return wrapper
+
     def _build_graph(self) -> StateGraph:
+        from langgraph.graph import StateGraph, END
+
         builder = StateGraph(ChatGraphState)
-        builder.add_node("assistant",self.assistant_node)
+        builder.add_node("assistant",self._profiled_node("assistant_node", self.assistant_node))
         builder.set_entry_point("assistant")
         builder.add_edge("assistant",END)
         return builder.compile()
@@ -0,0 +1,46 @@
+"""Tests for the deadline handling of AnimatorRouter."""
+
+import time
+
+from agents.animators import router
+
+
+class _PollingBackend:
+    """Backend that polls until the deadline, like the real animators."""
+
+    def __init__(self, url=None):
+        self.url = url
+        self.stopped_at = None
+
+    def get_video_url(self, prompt, tier=None, deadline=None):
+        if self.url:
+            return self.url
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.stopped_at = time.monotonic()
+        return None
+
+
+def test_backend_stops_polling_at_the_router_deadline(tmp_path, monkeypatch):
+    monkeypatch.setattr(router, 'ROUTER_CALL_TIMEOUT', 0.2)
+    monkeypatch.setattr(router, 'ROUTER_DEADLINE_GRACE', 5.0)
+    animator = router.AnimatorRouter(
+        'demo',
+        str(tmp_path),
+        providers=['qwen', 'doubao'],
+        stats=router.ProviderStatsStore(str(tmp_path / 'stats.db')),
+    )
+    slow, fast = _PollingBackend(), _PollingBackend('https://videos.test/1.mp4')
+    animator._instances = {'qwen': slow, 'doubao': fast}
+    monkeypatch.setattr(animator, 'rank', lambda: ['qwen', 'doubao'])
+
+    started = time.monotonic()
+    assert animator.get_video_url('prompt') == 'https://videos.test/1.mp4'
+    # The slow backend gave up on its own instead of being abandoned.
+    assert slow.stopped_at is not None
+    assert slow.stopped_at - started < 1.0
+    assert animator.last_provider == 'doubao'
+
+
+def test_stats_db_does_not_depend_on_the_working_directory():
+    assert router.ANIMATOR_STATS_DB.startswith(str(router.PROJECT_ROOT))
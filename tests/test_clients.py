@@ -0,0 +1,20 @@
+"""tools.clients 的密钥检查测试。"""
+
+import pytest
+
+from tools.clients import MissingCredential, ark_client, configure_dashscope, tavily_client
+
+
+@pytest.mark.parametrize(
+    "name, use",
+    [
+        ("ARK_API_KEY", lambda: ark_client("tester").responses),
+        ("TAVILY_API_KEY", lambda: tavily_client().search),
+        ("DASHSCOPE_API_KEY", configure_dashscope),
+    ],
+)
+def test_missing_key_fails_on_first_use_and_names_the_variable(monkeypatch, name, use):
+    monkeypatch.delenv(name, raising=False)
+
+    with pytest.raises(MissingCredential, match=name):
+        use()
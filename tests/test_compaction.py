@@ -0,0 +1,161 @@
+"""tools.compaction 的增量材料与对话压缩测试。"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from agents.assistant import director_assistant
+from tools.compaction import ConversationCompactor, MaterialTracker, Turn, estimate_tokens
+from tools.prompt_cache import PromptCacheManager, ResponseChain
+
+
+def test_diff_is_not_recorded_until_marked_sent():
+    tracker = MaterialTracker()
+    tracker.full({"idea": ["雨夜"]})
+    tracker.mark_sent({"idea": ["雨夜"]})
+
+    changed = {"idea": ["晴天"]}
+    first = tracker.diff(changed)
+    assert first is not None
+    # 请求失败没有调用 mark_sent，重试时仍给出同样的增量
+    assert tracker.diff(changed) == first
+
+    tracker.mark_sent(changed)
+    assert tracker.diff(changed) is None
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous_summary, turns):
+        self.calls.append((previous_summary, [t.user for t in turns]))
+        return f"摘要{len(self.calls)}"
+
+
+def _compactor(turns, **kwargs):
+    compactor = ConversationCompactor(FakeSummarizer(), **kwargs)
+    for index in range(turns):
+        compactor.record(f"问{index}", f"答{index}", context_tokens=100 * (index + 1))
+    return compactor
+
+
+def test_over_budget_counts_the_chain_and_the_pending_input():
+    compactor = _compactor(2, budget=300)
+
+    assert compactor.context_tokens == 200
+    assert not compactor.over_budget(100)
+    assert compactor.over_budget(101)
+
+
+def test_compact_summarizes_older_turns_and_keeps_the_recent_ones():
+    compactor = _compactor(4, budget=300, keep_turns=2)
+
+    compactor.compact()
+
+    assert compactor.summarize.calls == [("", ["问0", "问1"])]
+    assert [t.user for t in compactor.turns] == ["问2", "问3"]
+    assert compactor.context_tokens == 0
+    assert compactor.history_messages() == [
+        {"role": "system", "content": "此前对话的摘要：\n摘要1"},
+        {"role": "user", "content": "问2"},
+        {"role": "assistant", "content": "答2"},
+        {"role": "user", "content": "问3"},
+        {"role": "assistant", "content": "答3"},
+    ]
+
+    # 再次压缩时旧摘要与新移出的轮次一起交给摘要函数
+    compactor.record("问4", "答4", context_tokens=50)
+    compactor.compact()
+    assert compactor.summarize.calls[-1] == ("摘要1", ["问2"])
+
+
+def test_compact_with_keep_turns_zero_folds_everything_into_the_summary():
+    compactor = _compactor(3, keep_turns=2)
+
+    compactor.compact(keep_turns=0)
+
+    assert compactor.summarize.calls == [("", ["问0", "问1", "问2"])]
+    assert compactor.turns == []
+    assert compactor.history_messages() == [{"role": "system", "content": "此前对话的摘要：\n摘要1"}]
+
+
+def test_failed_summary_falls_back_to_truncation():
+    def broken(previous_summary, turns):
+        raise RuntimeError("summary model unavailable")
+
+    compactor = ConversationCompactor(broken, keep_turns=0)
+    compactor.summary = "旧摘要"
+    compactor.turns = [Turn("问", "答")]
+
+    compactor.compact()
+
+    assert compactor.summary == "旧摘要\n用户：问\n助手：答"
+
+
+class _Template:
+    def __init__(self, template):
+        self.template = template
+
+    def invoke(self, values):
+        text = self.template.format(**values)
+        return SimpleNamespace(to_string=lambda: text)
+
+
+class ContextResponses:
+    """按 ``previous_response_id`` 累计每条链上下文 token 数的假接口。"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.context = {}
+
+    def create(self, *, input, previous_response_id=None, **kwargs):
+        before = self.context.get(previous_response_id, 0)
+        self.requests.append((previous_response_id, before, input))
+        reply = self.replies.pop(0)
+        response_id = f"resp-{len(self.requests)}"
+        sent = estimate_tokens(input)
+        self.context[response_id] = before + sent + estimate_tokens(reply)
+        return SimpleNamespace(
+            id=response_id,
+            output=[SimpleNamespace(type="message", content=[SimpleNamespace(text=reply)])],
+            usage=SimpleNamespace(input_tokens=before + sent, output_tokens=estimate_tokens(reply)),
+        )
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    monkeypatch.setattr(director_assistant, "assistant_prompt", _Template("任务：{task}"))
+    monkeypatch.setattr(director_assistant, "material_prompt", _Template("材料：{material}"))
+    monkeypatch.setattr(director_assistant, "material_update_prompt", _Template("材料更新：{changes}"))
+
+
+def test_assistant_compacts_and_stays_within_the_budget(prompts):
+    budget = 600
+    # 第 5 轮的回复很长，保留最近两轮仍超出预算，需要全部并入摘要
+    replies = ["好" * 60] * 4 + ["长" * 300] + ["好" * 60] * 3
+    responses = ContextResponses(replies)
+    summarizer = FakeSummarizer()
+    assistant = director_assistant.Assistant()
+    assistant.chain = ResponseChain(
+        SimpleNamespace(responses=responses), "assistant", cache_manager=PromptCacheManager(refresh=False)
+    )
+    assistant.compactor = ConversationCompactor(summarizer, budget=budget, keep_turns=2)
+    keeps = []
+    compact = assistant.compactor.compact
+    assistant.compactor.compact = lambda keep_turns=None: (keeps.append(keep_turns), compact(keep_turns))
+    session_data = {"now_task": "imagination", "material": {"idea": ["雨夜"]}, "modify_num": None}
+
+    for index in range(len(replies)):
+        assert assistant.call(f"第{index}轮" + "问" * 60, session_data) == replies[index]
+
+    for previous_id, before, sent in responses.requests:
+        assert before + estimate_tokens(sent) <= budget
+    assert None in keeps and 0 in keeps
+    # 压缩后新开的链以摘要开场，并重发全量材料
+    rebuilt = [sent for previous_id, _, sent in responses.requests[1:] if previous_id is None]
+    assert rebuilt
+    assert all(any(m["content"].startswith("此前对话的摘要") for m in sent) for sent in rebuilt)
+    assert all(any(m["content"].startswith("材料：") for m in sent) for sent in rebuilt)
+    assert session_data["context_summary"] == assistant.compactor.summary
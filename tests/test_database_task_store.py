@@ -0,0 +1,114 @@
+"""Tests for the buffered write modes of DatabaseTaskStore."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiosqlite')
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from a2a.server.tasks.database_task_store import (
+    DatabaseTaskStore,
+    DurabilityLevel,
+)
+from a2a.types import Task, TaskState, TaskStatus
+
+
+class _SlowStore(DatabaseTaskStore):
+    """Store whose writes take long enough to be interrupted."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+        self.failing = False
+
+    async def _upsert(self, tasks):
+        self.writes += 1
+        if self.failing:
+            raise RuntimeError('database unavailable')
+        await asyncio.sleep(0.1)
+        await super()._upsert(tasks)
+
+
+def _task(task_id, state=TaskState.working):
+    return Task(id=task_id, context_id='ctx', status=TaskStatus(state=state))
+
+
+def _store(durability=DurabilityLevel.WRITE_BEHIND, **kwargs):
+    engine = create_async_engine('sqlite+aiosqlite:///:memory:')
+    return _SlowStore(
+        engine, durability=durability, flush_interval=0.01, **kwargs
+    )
+
+
+def test_close_waits_for_the_batch_being_written():
+    async def scenario():
+        store = _store()
+        await store.initialize()
+        await store.save(_task('t1'))
+        await asyncio.sleep(0.05)  # The flusher is now inside _upsert.
+        await store.close()
+        assert store._pending == {}
+        return await store.get('t1')
+
+    task = asyncio.run(scenario())
+    assert task is not None and task.id == 't1'
+
+
+def test_waiters_survive_an_interrupted_flush():
+    async def scenario():
+        store = _store(DurabilityLevel.GROUP_COMMIT)
+        await store.initialize()
+        save = asyncio.create_task(store.save(_task('t1')))
+        await asyncio.sleep(0.05)
+        store._flusher.cancel()
+        await asyncio.sleep(0)
+        await store.close()
+        await asyncio.wait_for(save, timeout=1)
+        return await store.get('t1')
+
+    assert asyncio.run(scenario()) is not None
+
+
+def test_failed_flush_backs_off_and_keeps_the_batch():
+    async def scenario():
+        store = _store(max_retry_delay=0.2)
+        store.failing = True
+        await store.initialize()
+        await store.save(_task('t1'))
+        await asyncio.sleep(0.5)
+        # Retrying every flush_interval would make about 50 attempts.
+        attempts = store.writes
+        assert 't1' in store._pending
+        store.failing = False
+        await store.close()
+        return attempts, await store.get('t1')
+
+    attempts, task = asyncio.run(scenario())
+    assert 3 <= attempts <= 10
+    assert task is not None
+
+
+def test_save_after_close_is_written_immediately():
+    async def scenario():
+        store = _store()
+        await store.close()
+        await store.save(_task('t1'))
+        assert store._pending == {}
+        return await store.get('t1')
+
+    assert asyncio.run(scenario()) is not None
+
+
+def test_mutating_a_buffered_task_does_not_change_what_is_written():
+    async def scenario():
+        store = _store()
+        await store.initialize()
+        await store.save(_task('t1'))
+        fetched = await store.get('t1')
+        fetched.status.state = TaskState.failed
+        await store.close()
+        return await store.get('t1')
+
+    assert asyncio.run(scenario()).status.state == TaskState.working
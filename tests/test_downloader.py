@@ -0,0 +1,145 @@
+"""tools.downloader.DownloadManager 的续传与校验测试。"""
+
+import asyncio
+import hashlib
+import json
+
+import httpx
+import pytest
+
+from tools.downloader import DownloadError, DownloadItem, DownloadManager
+
+BODY = bytes(range(256)) * 40
+ETAG = '"v1"'
+URL = "http://videos.test/shot.mp4"
+
+
+def _serve(body=BODY, etag=ETAG, requests=None):
+    """按 Range / If-Range 返回 ``body`` 的 MockTransport 处理函数。"""
+
+    def handler(request):
+        if requests is not None:
+            requests.append(request)
+        headers = {"ETag": etag, "Content-Type": "video/mp4"}
+        byte_range = request.headers.get("Range")
+        if_range = request.headers.get("If-Range")
+        if byte_range and (if_range is None or if_range == etag):
+            start = int(byte_range.split("=")[1].rstrip("-"))
+            if start >= len(body):
+                return httpx.Response(416, headers={"Content-Range": f"bytes */{len(body)}"})
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            return httpx.Response(206, headers=headers, content=body[start:])
+        return httpx.Response(200, headers=headers, content=body)
+
+    return handler
+
+
+def _partial(tmp_path, data, etag=ETAG, url=URL):
+    save_path = tmp_path / "shot.mp4"
+    (tmp_path / "shot.mp4.part").write_bytes(data)
+    (tmp_path / "shot.mp4.part.json").write_text(
+        json.dumps({"url": url, "etag": etag, "last_modified": None}), encoding="utf-8"
+    )
+    return save_path
+
+
+def _download(handler, item, **kwargs):
+    async def run():
+        async with DownloadManager(
+            transport=httpx.MockTransport(handler), retry_backoff=0, **kwargs
+        ) as manager:
+            return await manager.download(item)
+
+    return asyncio.run(run())
+
+
+def test_resumes_from_the_part_file(tmp_path):
+    save_path = _partial(tmp_path, BODY[:1000])
+    requests = []
+
+    _download(_serve(requests=requests), DownloadItem(URL, str(save_path)))
+
+    assert save_path.read_bytes() == BODY
+    assert requests[0].headers["Range"] == "bytes=1000-"
+    assert requests[0].headers["If-Range"] == ETAG
+    assert not (tmp_path / "shot.mp4.part").exists()
+    assert not (tmp_path / "shot.mp4.part.json").exists()
+
+
+def test_changed_source_restarts_instead_of_splicing(tmp_path):
+    save_path = _partial(tmp_path, b"x" * 1000, etag='"old"')
+    new_body = BODY[::-1]
+
+    _download(_serve(body=new_body, etag='"v2"'), DownloadItem(URL, str(save_path)))
+
+    assert save_path.read_bytes() == new_body
+
+
+def test_416_on_a_complete_part_finishes_the_download(tmp_path):
+    save_path = _partial(tmp_path, BODY)
+
+    _download(_serve(), DownloadItem(URL, str(save_path)))
+
+    assert save_path.read_bytes() == BODY
+
+
+def test_416_on_a_mismatched_part_downloads_from_scratch(tmp_path):
+    save_path = _partial(tmp_path, BODY + b"stale tail")
+    requests = []
+
+    _download(_serve(requests=requests), DownloadItem(URL, str(save_path)))
+
+    assert save_path.read_bytes() == BODY
+    assert "Range" not in requests[-1].headers
+
+
+def test_size_mismatch_is_retried_then_reported(tmp_path):
+    requests = []
+    item = DownloadItem(URL, str(tmp_path / "shot.mp4"), expected_size=len(BODY) + 1)
+
+    with pytest.raises(DownloadError):
+        _download(_serve(requests=requests), item, max_retries=2)
+
+    assert len(requests) == 3
+    assert not (tmp_path / "shot.mp4").exists()
+    assert not (tmp_path / "shot.mp4.part").exists()
+
+
+def test_sha256_mismatch_fails_without_keeping_the_file(tmp_path):
+    good = DownloadItem(URL, str(tmp_path / "a.mp4"), sha256=hashlib.sha256(BODY).hexdigest())
+    bad = DownloadItem(URL, str(tmp_path / "b.mp4"), sha256="0" * 64)
+
+    assert _download(_serve(), good) == good.save_path
+    with pytest.raises(DownloadError):
+        _download(_serve(), bad)
+    assert not (tmp_path / "b.mp4").exists()
+    assert not (tmp_path / "b.mp4.part").exists()
+
+
+def test_backoff_does_not_hold_the_concurrency_slot(tmp_path):
+    order = []
+    serve = _serve()
+
+    def handler(request):
+        name = request.url.path.strip("/")
+        order.append(name)
+        if name == "flaky" and order.count("flaky") == 1:
+            return httpx.Response(503)
+        return serve(request)
+
+    async def run():
+        manager = DownloadManager(
+            max_concurrency=1, retry_backoff=0.2, transport=httpx.MockTransport(handler)
+        )
+        async with manager:
+            return await manager.download_many(
+                [
+                    DownloadItem("http://videos.test/flaky", str(tmp_path / "flaky.mp4")),
+                    DownloadItem("http://videos.test/steady", str(tmp_path / "steady.mp4")),
+                ]
+            )
+
+    paths = asyncio.run(run())
+    assert all(paths)
+    # steady 在 flaky 退避期间完成，而不是排在它的重试之后
+    assert order == ["flaky", "steady", "flaky"]
@@ -0,0 +1,12 @@
+"""入口模块导入耗时预算检查（benchmarks/import_time.py）的测试包装。"""
+
+import pytest
+
+from benchmarks import import_time
+
+
+@pytest.mark.parametrize("module", import_time.ENTRY_MODULES)
+def test_entry_module_imports_within_budget(module):
+    result, = import_time.check([module], import_time.DEFAULT_BUDGET_MS)
+
+    assert result.ok, "；".join(result.violations)
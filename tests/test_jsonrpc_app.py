@@ -0,0 +1,120 @@
+"""Tests for the JSON-RPC Starlette application."""
+
+from unittest.mock import AsyncMock
+
+from starlette.testclient import TestClient
+
+from a2a.server.apps.jsonrpc.starlette_app import A2AStarletteApplication
+from a2a.server.request_handlers.request_handler import RequestHandler
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    Task,
+    TaskState,
+    TaskStatus,
+)
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+
+def _card():
+    return AgentCard(
+        name='agent',
+        description='test agent',
+        url='http://localhost',
+        version='1.0.0',
+        capabilities=AgentCapabilities(),
+        default_input_modes=['text'],
+        default_output_modes=['text'],
+        skills=[],
+    )
+
+
+def _client(card=None, handler=None):
+    app = A2AStarletteApplication(
+        agent_card=card or _card(),
+        http_handler=handler or AsyncMock(spec=RequestHandler),
+    )
+    return TestClient(app.build())
+
+
+def test_agent_card_etag_follows_in_place_changes():
+    card = _card()
+    client = _client(card)
+    first = client.get(AGENT_CARD_WELL_KNOWN_PATH)
+    etag = first.headers['ETag']
+    assert (
+        client.get(
+            AGENT_CARD_WELL_KNOWN_PATH, headers={'If-None-Match': etag}
+        ).status_code
+        == 304
+    )
+
+    card.version = '1.0.1'
+
+    response = client.get(
+        AGENT_CARD_WELL_KNOWN_PATH, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.json()['version'] == '1.0.1'
+
+
+def test_request_with_invalid_id_type_is_an_invalid_request():
+    client = _client()
+    for request_id in (1.5, {'id': 1}, [1]):
+        response = client.post(
+            '/',
+            json={
+                'jsonrpc': '2.0',
+                'id': request_id,
+                'method': 'message/send',
+                'params': {},
+            },
+        )
+        body = response.json()
+        assert body['error']['code'] == -32600
+        assert body.get('id') is None
+
+
+def _get_task(task_id, request_id=None):
+    request = {
+        'jsonrpc': '2.0',
+        'method': 'tasks/get',
+        'params': {'id': task_id},
+    }
+    if request_id is not None:
+        request['id'] = request_id
+    return request
+
+
+def _task_handler():
+    handler = AsyncMock(spec=RequestHandler)
+    handler.on_get_task.side_effect = lambda params, context: Task(
+        id=params.id,
+        context_id='ctx',
+        status=TaskStatus(state=TaskState.working),
+    )
+    return handler
+
+
+def test_batch_notifications_are_dispatched_without_a_response():
+    handler = _task_handler()
+    client = _client(handler=handler)
+
+    response = client.post('/', json=[_get_task('t1'), _get_task('t2', 7)])
+
+    assert [item['id'] for item in response.json()] == [7]
+    called = sorted(
+        call.args[0].id for call in handler.on_get_task.await_args_list
+    )
+    assert called == ['t1', 't2']
+
+
+def test_batch_of_only_notifications_has_no_body():
+    handler = _task_handler()
+    client = _client(handler=handler)
+
+    response = client.post('/', json=[_get_task('t1'), _get_task('t2')])
+
+    assert response.status_code == 204
+    assert handler.on_get_task.await_count == 2
@@ -0,0 +1,40 @@
+"""my_a2a.card_resolver 的缓存与并发合并测试。"""
+
+import asyncio
+
+import httpx
+
+from my_a2a import card_resolver
+from my_a2a.card_resolver import A2ACardResolver
+
+CARD = {"name": "echo"}
+
+
+def test_inflight_fetch_is_scoped_to_its_event_loop():
+    card_resolver.clear_card_cache()
+    resolver = A2ACardResolver("http://agent.test")
+
+    async def hang(request):
+        await asyncio.Event().wait()
+
+    async def reply(request):
+        return httpx.Response(200, json=CARD)
+
+    # 第一个事件循环上的请求一直没有完成，循环就被关闭了
+    old_loop = asyncio.new_event_loop()
+    hanging = httpx.AsyncClient(transport=httpx.MockTransport(hang))
+    try:
+        old_loop.run_until_complete(
+            asyncio.wait_for(resolver.get_agent_card_async(hanging), 0.1)
+        )
+    except asyncio.TimeoutError:
+        pass
+    old_loop.close()
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(reply)) as client:
+            return await asyncio.wait_for(resolver.get_agent_card_async(client), 2)
+
+    # 新的事件循环自己发起请求，而不是去等待旧循环上的任务
+    assert asyncio.run(fetch()) == CARD
+    card_resolver.clear_card_cache()
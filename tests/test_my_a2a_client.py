@@ -0,0 +1,118 @@
+"""my_a2a.client.A2AClient 的连接复用测试。"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from my_a2a.client import A2AClient, _TaskPoller
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.server.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply({"name": "echo", "capabilities": {"streaming": False}})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        text = request["params"]["message"]["parts"][0]["text"]
+        self._reply({"jsonrpc": "2.0", "id": request["id"], "result": {"artifacts": [{"parts": [{"text": text}]}]}})
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.connections = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    url = f"http://127.0.0.1:{server.server_port}"
+    config = tmp_path / "servers.json"
+    config.write_text(json.dumps({"echo": {"url": url}}), encoding="utf-8")
+    client = A2AClient(str(config))
+    yield client
+    asyncio.run(client.aclose())
+
+
+def test_pool_survives_across_asyncio_run(client, server):
+    url = client.clients["echo"]["url"]
+
+    assert asyncio.run(client.send_request("echo", "first")) == "first"
+    pool = client._http[url]
+    assert asyncio.run(client.send_request("echo", "second")) == "second"
+
+    # 两次 asyncio.run 使用同一个连接池，且只建立了一条 TCP 连接
+    assert client._http[url] is pool
+    assert not pool.is_closed
+    assert len(server.connections) == 1
+
+
+def test_aclose_closes_pool_and_client_is_reusable(client):
+    url = client.clients["echo"]["url"]
+    assert asyncio.run(client.send_request("echo", "a")) == "a"
+    pool = client._http[url]
+
+    asyncio.run(client.aclose())
+    assert pool.is_closed
+    assert client._http == {}
+
+    assert asyncio.run(client.send_request("echo", "b")) == "b"
+    assert client._http[url] is not pool
+
+
+class _FlakyRpcClient:
+    """轮询用的替身：指定任务抛出意外异常，其余任务直接完成。"""
+
+    async def _rpc(self, url, request, timeout):
+        task_id = request["params"]["id"]
+        if task_id == "broken":
+            raise KeyError("result")
+        return {"result": {"id": task_id, "status": {"state": "completed"}}}
+
+
+def test_poller_error_does_not_strand_other_watchers():
+    async def scenario():
+        poller = _TaskPoller(_FlakyRpcClient(), "http://agent.test")
+        broken = poller.watch("broken")
+        healthy = poller.watch("healthy")
+        return await asyncio.wait_for(asyncio.gather(broken, healthy), timeout=2)
+
+    broken, healthy = asyncio.run(scenario())
+    assert broken is None
+    assert healthy["status"]["state"] == "completed"
+
+
+def test_cancelled_poller_resolves_pending_watchers():
+    class _Hanging:
+        async def _rpc(self, url, request, timeout):
+            await asyncio.sleep(60)
+
+    async def scenario():
+        poller = _TaskPoller(_Hanging(), "http://agent.test")
+        future = poller.watch("t1")
+        await asyncio.sleep(0.05)
+        poller._runner.cancel()
+        return await asyncio.wait_for(future, timeout=1)
+
+    assert asyncio.run(scenario()) is None
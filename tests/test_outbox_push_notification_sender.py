@@ -0,0 +1,183 @@
+"""Tests for OutboxPushNotificationSender scheduling."""
+
+import asyncio
+import json
+import sqlite3
+
+import httpx
+
+from a2a.server.tasks.inmemory_push_notification_config_store import (
+    InMemoryPushNotificationConfigStore,
+)
+from a2a.server.tasks.outbox_push_notification_sender import (
+    OutboxPushNotificationSender,
+)
+from a2a.types import PushNotificationConfig, Task, TaskState, TaskStatus
+
+
+URL = 'http://hooks.test/notify'
+
+
+def _task(task_id, state=TaskState.working):
+    return Task(id=task_id, context_id='ctx', status=TaskStatus(state=state))
+
+
+async def _sender(tmp_path, handler, task_ids, **kwargs):
+    config_store = InMemoryPushNotificationConfigStore()
+    for task_id in task_ids:
+        await config_store.set_info(task_id, PushNotificationConfig(url=URL))
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return OutboxPushNotificationSender(
+        client, config_store, db_path=str(tmp_path / 'outbox.db'), **kwargs
+    )
+
+
+async def _drain(sender, timeout=5.0):
+    async def empty():
+        while await sender.pending_count() or sender._deliveries:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(empty(), timeout)
+
+
+def test_saturated_url_does_not_spin(tmp_path):
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def handler(request):
+            await gate.wait()
+            return httpx.Response(200)
+
+        sender = await _sender(
+            tmp_path, handler, ['t1', 't2'], per_url_concurrency=1
+        )
+        calls = 0
+        next_due = sender._next_due
+
+        def counting_next_due(*args):
+            nonlocal calls
+            calls += 1
+            return next_due(*args)
+
+        sender._next_due = counting_next_due
+        await sender.send_notification(_task('t1'))
+        await sender.send_notification(_task('t2'))
+        await asyncio.sleep(0.5)
+        gate.set()
+        await _drain(sender)
+        await sender.close()
+        return calls
+
+    assert asyncio.run(scenario()) < 10
+
+
+def test_failed_state_is_superseded_by_a_newer_one(tmp_path):
+    async def scenario():
+        gate = asyncio.Event()
+        sent = []
+
+        async def handler(request):
+            sent.append(json.loads(request.content)['status']['state'])
+            if len(sent) == 1:
+                await gate.wait()
+                return httpx.Response(503)
+            return httpx.Response(200)
+
+        sender = await _sender(tmp_path, handler, ['t1'], base_backoff=0.05)
+        await sender.send_notification(_task('t1'))
+        while not sent:
+            await asyncio.sleep(0.01)
+        await sender.send_notification(_task('t1', TaskState.completed))
+        gate.set()
+        await _drain(sender)
+        await asyncio.sleep(0.2)  # Past the backoff of the failed entry.
+        await sender.close()
+        return sent
+
+    assert asyncio.run(scenario()) == ['working', 'completed']
+
+
+def test_recovered_entries_are_sent_without_a_new_notification(tmp_path):
+    sent = []
+
+    async def handler(request):
+        sent.append(json.loads(request.content)['id'])
+        return httpx.Response(200)
+
+    # Left behind by a previous process: created outside a running loop, so
+    # nothing is delivered yet.
+    previous = OutboxPushNotificationSender(
+        httpx.AsyncClient(), InMemoryPushNotificationConfigStore(),
+        db_path=str(tmp_path / 'outbox.db'),
+    )
+    previous._init_db()
+    previous._enqueue('t1', [(URL, None)], _task('t1').model_dump_json())
+
+    async def scenario():
+        sender = await _sender(tmp_path, handler, [])
+        # Only wait; anything touching the sender would start it anyway.
+        for _ in range(100):
+            if sent:
+                break
+            await asyncio.sleep(0.01)
+        await sender.close()
+
+    asyncio.run(scenario())
+    assert sent == ['t1']
+
+
+def test_failed_outcome_write_is_retried_and_does_not_block_the_target(
+    tmp_path, monkeypatch
+):
+    from a2a.server.tasks import outbox_push_notification_sender as outbox
+
+    monkeypatch.setattr(outbox, '_SETTLE_RETRY_DELAY', 0.01)
+    sent = []
+
+    async def handler(request):
+        sent.append(json.loads(request.content)['status']['state'])
+        return httpx.Response(200)
+
+    async def scenario():
+        sender = await _sender(tmp_path, handler, ['t1'])
+        complete = sender._complete
+        failures = []
+
+        def flaky_complete(entry_id):
+            if not failures:
+                failures.append(entry_id)
+                raise sqlite3.OperationalError('database is locked')
+            complete(entry_id)
+
+        sender._complete = flaky_complete
+        await sender.send_notification(_task('t1'))
+        await _drain(sender)
+        await sender.send_notification(_task('t1', TaskState.completed))
+        await _drain(sender)
+        await sender.close()
+        return failures
+
+    assert asyncio.run(scenario())
+    assert sent == ['working', 'completed']
+
+
+def test_expired_dead_entries_are_purged(tmp_path):
+    async def handler(request):
+        return httpx.Response(400)
+
+    async def scenario():
+        sender = await _sender(
+            tmp_path, handler, ['t1'], max_attempts=1, dead_retention=0
+        )
+        await sender.send_notification(_task('t1'))
+        await _drain(sender)
+        dead = await asyncio.to_thread(sender._count, 'dead')
+        await asyncio.sleep(0.01)
+        sender._next_purge = 0.0
+        sender._wake.set()
+        await asyncio.sleep(0.1)
+        remaining = await asyncio.to_thread(sender._count, 'dead')
+        await sender.close()
+        return dead, remaining
+
+    assert asyncio.run(scenario()) == (1, 0)
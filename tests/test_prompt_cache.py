@@ -0,0 +1,104 @@
+"""tools.prompt_cache.ResponseChain 的保活与重建测试。"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from tools.prompt_cache import PromptCacheManager, ResponseChain
+
+
+class MissingResponse(Exception):
+    status_code = 404
+
+
+class FakeResponses:
+    def __init__(self):
+        self.calls = []
+        self.missing = set()
+        self.tool_call_next = False
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("previous_response_id") in self.missing:
+            raise MissingResponse("previous response not found")
+        output = []
+        if self.tool_call_next:
+            self.tool_call_next = False
+            output.append(SimpleNamespace(type="function_call", call_id="call-1"))
+        return SimpleNamespace(id=f"resp-{len(self.calls)}", output=output, usage=None)
+
+
+@pytest.fixture
+def chain():
+    client = SimpleNamespace(responses=FakeResponses())
+    return ResponseChain(client, "tester", cache_manager=PromptCacheManager(refresh=False))
+
+
+def seed():
+    return [{"role": "system", "content": "seed"}]
+
+
+def test_keepalive_moves_the_chain_to_the_renewed_response(chain):
+    calls = chain.client.responses.calls
+    chain.create(input=[{"role": "user", "content": "hi"}], rebuild=seed, model="m", tools=["web_search"])
+    chain.expire_at = chain.last_used + 30  # 进入续期窗口
+
+    assert chain.refresh()
+    keepalive = calls[-1]
+    assert keepalive["previous_response_id"] == "resp-1"
+    assert "tools" not in keepalive and keepalive["model"] == "m"
+    # 只有保活响应获得了新的过期时间，之后的请求接在它后面
+    assert chain.last_id == "resp-2"
+
+    chain.create(input=[{"role": "user", "content": "next"}])
+    assert calls[-1]["previous_response_id"] == "resp-2"
+
+
+def test_rebuilt_chain_keeps_the_tools_of_the_first_turn(chain):
+    calls = chain.client.responses.calls
+    chain.create(input=[{"role": "user", "content": "hi"}], rebuild=seed, model="m", tools=["web_search"])
+    chain.expire_at = 0  # 会话空闲到缓存过期
+
+    # 调用方看到 last_id 仍然存在，不会再传 tools
+    chain.create(input=[{"role": "user", "content": "again"}], model="m")
+    rebuilt = calls[-1]
+    assert rebuilt["previous_response_id"] is None
+    assert rebuilt["tools"] == ["web_search"]
+    assert rebuilt["input"][0] == seed()[0]
+
+
+def test_lapsed_chain_is_rebuilt_with_tools(chain):
+    responses = chain.client.responses
+    chain.create(input=[{"role": "user", "content": "hi"}], rebuild=seed, tools=["web_search"])
+    responses.missing.add("resp-1")  # 服务端提前淘汰了缓存
+
+    chain.create(input=[{"role": "user", "content": "again"}])
+    assert responses.calls[-1]["previous_response_id"] is None
+    assert responses.calls[-1]["tools"] == ["web_search"]
+
+
+def test_tool_output_after_expiry_stays_on_the_chain(chain):
+    responses = chain.client.responses
+    responses.tool_call_next = True
+    chain.create(input=[{"role": "user", "content": "search"}], rebuild=seed)
+    chain.expire_at = 0  # 工具调用耗时超过了缓存有效期
+
+    output = [{"type": "function_call_output", "call_id": "call-1", "output": "result"}]
+    chain.create(input=output)
+    assert responses.calls[-1]["previous_response_id"] == "resp-1"
+    assert responses.calls[-1]["input"] == output
+
+
+def test_rebuild_turns_orphan_tool_output_into_a_message(chain):
+    responses = chain.client.responses
+    responses.tool_call_next = True
+    chain.create(input=[{"role": "user", "content": "search"}], rebuild=seed)
+    chain.expire_at = 0
+    responses.missing.add("resp-1")
+
+    chain.create(input=[{"type": "function_call_output", "call_id": "call-1", "output": "result"}])
+    sent = responses.calls[-1]
+    assert sent["previous_response_id"] is None
+    assert sent["input"][0] == seed()[0]
+    assert all(item.get("type") != "function_call_output" for item in sent["input"])
+    assert "result" in sent["input"][1]["content"]
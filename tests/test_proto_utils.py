@@ -0,0 +1,49 @@
+"""Tests for the conversion caches in a2a.utils.proto_utils."""
+
+from a2a import types
+from a2a.utils.proto_utils import ToProto
+
+
+def _text(text):
+    return types.Part(root=types.TextPart(text=text))
+
+
+def test_message_mutated_after_conversion_is_converted_again():
+    message = types.Message(
+        role=types.Role.user, message_id='m1', parts=[_text('hi')]
+    )
+    assert ToProto.message(message).task_id == ''
+
+    # RequestContext fills these in on the caller's message object.
+    message.task_id = 't1'
+    message.context_id = 'c1'
+
+    proto = ToProto.message(message)
+    assert (proto.task_id, proto.context_id) == ('t1', 'c1')
+
+
+def test_artifact_part_edited_in_place_is_converted_again():
+    artifact = types.Artifact(artifact_id='a1', parts=[_text('draft')])
+    ToProto.artifact(artifact)
+
+    artifact.parts[0].root.text = 'final'
+
+    assert ToProto.artifact(artifact).parts[0].text == 'final'
+
+
+def test_agent_card_mutation_is_not_served_from_cache():
+    card = types.AgentCard(
+        name='agent',
+        description='d',
+        url='http://localhost',
+        version='1.0.0',
+        capabilities=types.AgentCapabilities(),
+        default_input_modes=['text'],
+        default_output_modes=['text'],
+        skills=[],
+    )
+    ToProto.agent_card(card)
+
+    card.version = '1.0.1'
+
+    assert ToProto.agent_card(card).version == '1.0.1'
@@ -0,0 +1,117 @@
+"""agents.writers.shots 的补丁解析与应用测试。"""
+
+import json
+
+import pytest
+
+from agents.writers.shots import (
+    InvalidPatch,
+    PatchOp,
+    ShotList,
+    ShotPatch,
+    parse_patch,
+    patch_prompt,
+)
+
+
+def _shots():
+    return ShotList.parse("第一镜 / 第二镜 / 第三镜")
+
+
+def _ops(*ops):
+    return json.dumps({"ops": [dict(op) for op in ops]}, ensure_ascii=False)
+
+
+def test_parse_accepts_a_fenced_patch():
+    shots = _shots()
+    target = shots[1].id
+    raw = "好的：\n```json\n" + _ops({"op": "replace", "id": target, "text": "新的第二镜"}) + "\n```"
+
+    patch = ShotPatch.parse(raw, shots.ids(), target)
+
+    assert patch == ShotPatch([PatchOp("replace", target, "新的第二镜")])
+
+
+def test_plain_text_output_replaces_the_target():
+    patch = ShotPatch.parse("改写后的第二镜 /", ["a", "b"], "b")
+
+    assert patch.fallback
+    assert patch.ops == [PatchOp("replace", "b", "改写后的第二镜")]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '{"ops": [{"op": "replace", "id": "b", "text": "未闭合"',
+        '"ops": []',
+        _ops({"op": "rewrite", "id": "b", "text": "x"}),
+        _ops({"op": "replace", "id": "z", "text": "越界"}),
+        _ops({"op": "insert_after", "id": "b"}),
+    ],
+)
+def test_broken_json_is_rejected_instead_of_written_into_the_shot(raw):
+    with pytest.raises(InvalidPatch):
+        ShotPatch.parse(raw, ["a", "b"], "b")
+
+
+def test_parse_patch_retries_with_the_error_and_then_gives_up():
+    prompts = []
+
+    def retry(prompt):
+        prompts.append(prompt)
+        return _ops({"op": "replace", "id": "b", "text": "修好了"})
+
+    patch = parse_patch('{"ops": "broken"}', ["a", "b"], "b", retry)
+    assert patch.ops == [PatchOp("replace", "b", "修好了")]
+    assert len(prompts) == 1 and "ops" in prompts[0]
+
+    with pytest.raises(InvalidPatch):
+        parse_patch("{", ["a", "b"], "b", lambda prompt: "{}")
+
+
+def test_apply_keeps_the_ids_of_untouched_shots():
+    shots = _shots()
+    first, second, third = shots.ids()
+    patch = ShotPatch(
+        [
+            PatchOp("replace", second, "新的第二镜"),
+            PatchOp("insert_after", second, "插入的镜头"),
+            PatchOp("delete", third),
+        ]
+    )
+
+    changed = shots.apply(patch)
+
+    assert shots.texts() == ["第一镜", "新的第二镜", "插入的镜头"]
+    assert shots.ids()[:2] == [first, second]
+    assert changed == [second, shots.ids()[2]]
+
+
+def test_apply_never_deletes_the_last_shot():
+    shots = ShotList.parse("唯一的镜头")
+    shots.apply(ShotPatch([PatchOp("delete", shots[0].id)]))
+
+    assert shots.texts() == ["唯一的镜头"]
+
+
+def test_ids_survive_a_session_round_trip():
+    shots = _shots()
+    session_data = {"material": {"screen": shots.texts()}}
+    shots.store(session_data, "screen")
+
+    restored = ShotList.restore(session_data, "screen")
+    assert restored.ids() == shots.ids()
+
+    # 文本数量与保存的 id 对不上时重新分配
+    session_data["material"]["screen"].append("第四镜")
+    reassigned = ShotList.restore(session_data, "screen").ids()
+    assert len(set(reassigned)) == 4
+    assert not set(reassigned) & set(shots.ids())
+
+
+def test_patch_prompt_only_includes_the_neighbours():
+    shots = ShotList.parse("一 / 二 / 三 / 四")
+    prompt = patch_prompt(shots, shots[1].id, "分镜脚本")
+
+    assert shots[0].id in prompt and shots[2].id in prompt
+    assert shots[3].id not in prompt
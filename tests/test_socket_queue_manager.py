@@ -0,0 +1,146 @@
+"""Tests for sharing task event streams through SocketQueueManager."""
+
+import asyncio
+
+import pytest
+
+from a2a import types
+from a2a.server.events import (
+    EventQueue,
+    QueueBroker,
+    SocketQueueManager,
+    TaskQueueExists,
+)
+from a2a.server.events.event_consumer import QueueClosed
+
+
+def _message(message_id):
+    return types.Message(
+        role=types.Role.agent,
+        message_id=message_id,
+        parts=[types.Part(root=types.TextPart(text=message_id))],
+    )
+
+
+async def _published(queue, count):
+    """Consumes the owner's own queue, as its request handler would."""
+    for _ in range(count):
+        await queue.dequeue_event()
+        queue.task_done()
+    await asyncio.sleep(0.05)  # Let the forwarder reach the broker.
+
+
+async def _eventually(operation, timeout=2.0):
+    async def poll():
+        while (result := await operation()) is None:
+            await asyncio.sleep(0.02)
+        return result
+
+    return await asyncio.wait_for(poll(), timeout)
+
+
+def test_claim_subscribe_replay_and_close_across_managers():
+    async def scenario():
+        broker = QueueBroker()
+        owner = SocketQueueManager(broker=broker)
+        other = SocketQueueManager(broker=broker)
+        queue = EventQueue()
+        await owner.add('t1', queue)
+        with pytest.raises(TaskQueueExists):
+            await other.add('t1', EventQueue())
+
+        await queue.enqueue_event(_message('m1'))
+        await queue.enqueue_event(_message('m2'))
+        await _published(queue, 2)
+        missed, relayed = await other.tap_from('t1', 1)
+
+        await queue.enqueue_event(_message('m3'))
+        live = await asyncio.wait_for(relayed.dequeue_event(), 2)
+        relayed.task_done()
+        await _published(queue, 1)
+
+        await owner.close('t1')
+        with pytest.raises((QueueClosed, asyncio.QueueEmpty)):
+            await asyncio.wait_for(relayed.dequeue_event(), 2)
+        released = await other.tap('t1')
+
+        await other.aclose()
+        await owner.aclose()
+        await broker.close()
+        return [e.message_id for e in missed], live.message_id, released
+
+    missed, live, released = asyncio.run(scenario())
+    assert missed == ['m2']
+    assert live == 'm3'
+    assert released is None
+
+
+def test_owner_reconnects_after_the_broker_host_exits(tmp_path):
+    async def scenario():
+        address = str(tmp_path / 'queue.sock')
+        host = SocketQueueManager(address)
+        owner = SocketQueueManager(address)
+        reader = SocketQueueManager(address)
+        await host.create_or_tap('hosted')  # Starts the broker in `host`.
+        queue = await owner.create_or_tap('t1')
+
+        await host.aclose()
+        await asyncio.sleep(0.05)
+
+        # The next publish reconnects, hosting the broker in `owner`, and
+        # registers the task again instead of dropping the event.
+        await queue.enqueue_event(_message('after-restart'))
+        await _published(queue, 1)
+        relayed = await _eventually(lambda: reader.tap('t1'))
+
+        await queue.enqueue_event(_message('live'))
+        event = await asyncio.wait_for(relayed.dequeue_event(), 2)
+        await reader.aclose()
+        await owner.aclose()
+        return owner._hosted_broker, event.message_id
+
+    hosted_broker, message_id = asyncio.run(scenario())
+    assert message_id == 'live'
+    assert hosted_broker is None  # Stopped again by aclose.
+
+
+def test_subscriber_that_stops_reading_is_cut_off(monkeypatch):
+    from a2a.server.events import socket_queue_manager
+
+    monkeypatch.setattr(socket_queue_manager, 'DEFAULT_MAX_QUEUE_SIZE', 4)
+
+    async def scenario():
+        broker = QueueBroker()
+        owner = SocketQueueManager(broker=broker)
+        other = SocketQueueManager(broker=broker)
+        queue = EventQueue(max_queue_size=8)
+        await owner.add('t1', queue)
+        stalled = await other.tap('t1')  # Never read below.
+
+        # More than the subscription's queue (1024) plus its inbox (4).
+        for index in range(1100):
+            await queue.enqueue_event(_message(f'm{index}'))
+            await queue.dequeue_event()
+            queue.task_done()
+
+        async def closed():
+            return True if stalled.is_closed() else None
+
+        cut_off = await _eventually(closed)
+        # The shared connection keeps serving the other subscriptions.
+        healthy = await other.tap('t1')
+        await queue.enqueue_event(_message('next'))
+
+        async def relayed_until_next():
+            # Events published before `next` may still be in flight.
+            while (await healthy.dequeue_event()).message_id != 'next':
+                healthy.task_done()
+            return 'next'
+
+        received = await asyncio.wait_for(relayed_until_next(), 2)
+        await other.aclose()
+        await owner.aclose()
+        await broker.close()
+        return cut_off, received
+
+    assert asyncio.run(scenario()) == (True, 'next')
@@ -0,0 +1,74 @@
+"""Tests for the call duration metric recorded by trace_function."""
+
+import asyncio
+
+import pytest
+
+from a2a.utils import metrics
+from a2a.utils.metrics import Histogram, _Metric
+from a2a.utils.telemetry import _settings, configure_telemetry, trace_function
+
+
+@pytest.fixture
+def metrics_on():
+    previous = (_settings.mode, _settings.sample_rate, metrics.REGISTRY.enabled)
+    configure_telemetry(tracing='off', metrics_enabled=True)
+    metrics.CALL_DURATION.clear()
+    yield metrics.CALL_DURATION
+    configure_telemetry(*previous)
+    metrics.CALL_DURATION.clear()
+
+
+def test_async_generator_duration_covers_the_iteration(metrics_on):
+    @trace_function(span_name='test.stream')
+    async def stream():
+        for i in range(3):
+            await asyncio.sleep(0.05)
+            yield i
+
+    async def consume():
+        return [item async for item in stream()]
+
+    assert asyncio.run(consume()) == [0, 1, 2]
+    child = metrics_on.labels('test.stream')
+    assert sum(child.counts) == 1
+    assert child.sum >= 0.15
+
+
+def test_async_generator_closed_early_is_recorded(metrics_on):
+    @trace_function(span_name='test.partial')
+    async def stream():
+        while True:
+            await asyncio.sleep(0.01)
+            yield 1
+
+    async def consume():
+        agen = stream()
+        await agen.__anext__()
+        await agen.aclose()
+
+    asyncio.run(consume())
+    assert sum(metrics_on.labels('test.partial').counts) == 1
+
+
+def test_metric_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric('abstract', 'not instantiable')
+    assert Histogram('concrete_seconds', 'instantiable').render()
+
+
+def test_const_labels_prefix_every_sample():
+    registry = metrics.MetricsRegistry()
+    requests = metrics.Counter('worker_requests_total', 'requests', ['method'])
+    latency = Histogram('worker_latency_seconds', 'latency', buckets=(1.0,))
+    registry.register(requests)
+    registry.register(latency)
+    requests.labels('get').inc()
+    latency.observe(0.5)
+
+    registry.const_labels['worker'] = '42'
+    text = registry.render()
+
+    assert 'worker_requests_total{worker="42",method="get"} 1' in text
+    assert 'worker_latency_seconds_bucket{worker="42",le="1"} 1' in text
+    assert 'worker_latency_seconds_count{worker="42"} 1' in text
@@ -0,0 +1,131 @@
+"""外部服务客户端的延迟构建。
+
+各 Agent 原先在模块顶层 ``from volcenginesdkarkruntime import Ark`` 并立即构造
+客户端，导入任意一个 Agent 模块就会连带加载方舟、通义、Tavily 等 SDK 及其
+依赖（httpx、pydantic 模型、加密库等），命令行与 partner 服务冷启动要先等几秒。
+这里把 SDK 的导入和客户端构造推迟到第一次真正调用时：
+
+- ``LazyObject``：线程安全的代理，首次访问属性时才调用工厂构造真实对象；
+- ``ark_client`` / ``tavily_client``：返回对应 SDK 客户端的代理，模块顶层可以照旧
+  写 ``client = ark_client("assistant")``，调用方式不变；
+- ``configure_dashscope``：首次使用时导入并配置通义 SDK，返回模块本身。
+
+地址可用环境变量覆盖；密钥只从环境变量读取（``ARK_API_KEY`` / ``TAVILY_API_KEY`` /
+``DASHSCOPE_API_KEY`` / ``REPLICATE_API_TOKEN``），在构造客户端时检查，缺失时抛出
+``MissingCredential`` 并指明变量名，导入模块本身不需要密钥。
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+ARK_BASE_URL = os.getenv("ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
+DASHSCOPE_BASE_URL = os.getenv("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com/api/v1")
+
+
+class MissingCredential(RuntimeError):
+    """调用外部服务所需的密钥环境变量未设置。"""
+
+
+def credential(name: str, service: str) -> str:
+    """读取密钥环境变量，未设置或为空时抛出 ``MissingCredential``。"""
+    value = os.getenv(name, "").strip()
+    if not value:
+        raise MissingCredential(f"未设置环境变量 {name}，无法调用 {service}")
+    return value
+
+
+class LazyObject:
+    """在首次属性访问时才构造目标对象的代理。
+
+    构造只发生一次；多个线程同时首次访问时由锁保证工厂只被调用一次。
+    ``get()`` 返回真实对象，需要把客户端交给只接受原类型的代码时使用。
+    """
+
+    __slots__ = ("_factory", "_instance", "_lock", "_name")
+
+    def __init__(self, factory: Callable[[], Any], name: str = "") -> None:
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_name", name or getattr(factory, "__name__", "object"))
+
+    def get(self) -> Any:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    @property
+    def loaded(self) -> bool:
+        """目标对象是否已经构造。"""
+        return self._instance is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.get(), name, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "pending"
+        return f"<LazyObject {self._name} ({state})>"
+
+
+def ark_client(label: str, methods: Optional[Dict[str, str]] = None) -> LazyObject:
+    """返回方舟客户端代理，构造时一并接入耗时剖析。
+
+    Args:
+        label: 剖析记录的名称前缀，通常是调用方 Agent 名。
+        methods: 方法路径到调用类型的映射，透传给 ``profiler.instrument_client``。
+    """
+
+    def build() -> Any:
+        api_key = credential("ARK_API_KEY", "方舟")
+        from volcenginesdkarkruntime import Ark
+
+        from tools import profiler
+
+        client = Ark(base_url=ARK_BASE_URL, api_key=api_key)
+        return profiler.instrument_client(client, label, methods)
+
+    return LazyObject(build, f"ark:{label}")
+
+
+def tavily_client() -> LazyObject:
+    """返回 Tavily 搜索客户端代理。"""
+
+    def build() -> Any:
+        api_key = credential("TAVILY_API_KEY", "Tavily 搜索")
+        from tavily import TavilyClient
+
+        return TavilyClient(api_key)
+
+    return LazyObject(build, "tavily")
+
+
+@functools.lru_cache(maxsize=None)
+def configure_dashscope() -> Any:
+    """导入并配置通义 SDK，返回 ``dashscope`` 模块；重复调用只配置一次。"""
+    api_key = credential("DASHSCOPE_API_KEY", "通义")
+    import dashscope
+
+    dashscope.base_http_api_url = DASHSCOPE_BASE_URL
+    dashscope.api_key = api_key
+    return dashscope
+
+
+@functools.lru_cache(maxsize=None)
+def configure_replicate() -> Any:
+    """检查令牌后导入 Replicate SDK，返回 ``replicate`` 模块（SDK 自行读取环境变量中的令牌）。"""
+    credential("REPLICATE_API_TOKEN", "Replicate")
+    import replicate
+
+    return replicate
@@ -0,0 +1,207 @@
+"""长对话的上下文压缩。
+
+导演助手每轮都把完整的系统提示词和 ``json.dumps(material)``（想法、大纲、全部分镜
+提示词）拼进输入，又沿 ``previous_response_id`` 链不断累积，分镜越多、轮次越多，
+后期每轮越慢越贵。这里提供两部分：
+
+- ``MaterialTracker``：记录上一次发给模型的创作材料，之后只发送变化的条目
+  （新增 / 修改 / 删除的大纲或分镜），材料没变时不发送；
+- ``ConversationCompactor``：在本地保留对话轮次，链上累计的上下文超过
+  ``ASSISTANT_CONTEXT_BUDGET`` 时，把较早的轮次交给摘要函数压缩成一段摘要，
+  只保留最近 ``ASSISTANT_KEEP_TURNS`` 轮原文，由调用方用摘要开一条新链。
+
+token 数按字符粗略估算（汉字约 1 token，其余约 4 字符 1 token），只用于判断是否
+需要压缩；链上的实际用量以接口返回的 ``usage`` 为准。
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from base import get_agent_logger
+
+CONTEXT_BUDGET = int(os.getenv("ASSISTANT_CONTEXT_BUDGET", "16000"))
+KEEP_TURNS = int(os.getenv("ASSISTANT_KEEP_TURNS", "4"))
+# 摘要本身的长度上限（字符），摘要函数失败时的兜底截断也按此长度。
+SUMMARY_MAX_CHARS = int(os.getenv("ASSISTANT_SUMMARY_MAX_CHARS", "1500"))
+
+# 材料字段的中文名，用于生成增量说明。
+MATERIAL_LABELS: Dict[str, str] = {
+    "idea": "想法",
+    "outline": "大纲",
+    "screen": "分镜",
+    "video_address": "已生成视频",
+}
+
+_CJK = re.compile(r"[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]")
+
+logger = get_agent_logger("tools.compaction", "COMPACTION_LOG_LEVEL", "INFO")
+
+
+def estimate_tokens(value: Any) -> int:
+    """粗略估算文本或消息列表的 token 数。"""
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False)
+    cjk = len(_CJK.findall(value))
+    return cjk + (len(value) - cjk + 3) // 4
+
+
+def usage_tokens(response: Any) -> Optional[int]:
+    """一次响应结束后链上的上下文 token 数（输入 + 输出），取不到时返回 ``None``。"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    input_tokens = getattr(usage, "input_tokens", None)
+    if input_tokens is None:
+        return None
+    return input_tokens + (getattr(usage, "output_tokens", 0) or 0)
+
+
+class MaterialTracker:
+    """记录上次发送的创作材料，计算增量。
+
+    ``full`` / ``diff`` 只生成要发送的内容，不改变记录；请求成功后再调用
+    ``mark_sent``，请求失败时下一次仍按上次成功发送的材料计算增量。
+    """
+
+    def __init__(self) -> None:
+        self._sent: Optional[Dict[str, Any]] = None
+
+    def reset(self) -> None:
+        """新开链后模型看不到之前的材料，下一次需要发送全量。"""
+        self._sent = None
+
+    def mark_sent(self, material: Dict[str, Any]) -> None:
+        """请求成功后记录模型已看到的材料。"""
+        self._sent = copy.deepcopy(material)
+
+    def full(self, material: Dict[str, Any]) -> str:
+        """全量材料（JSON）。"""
+        return json.dumps(material, ensure_ascii=False)
+
+    def diff(self, material: Dict[str, Any]) -> Optional[str]:
+        """返回相对上次发送的增量说明，没有变化时返回 ``None``。
+
+        需先发送过一次全量材料并用 ``mark_sent`` 记录。
+        """
+        if self._sent is None:
+            raise RuntimeError("尚未发送过全量材料")
+        lines: List[str] = []
+        for key in list(self._sent) + [k for k in material if k not in self._sent]:
+            old, new = self._sent.get(key), material.get(key)
+            if old == new:
+                continue
+            label = MATERIAL_LABELS.get(key, key)
+            if isinstance(old, list) and isinstance(new, list):
+                for index in range(max(len(old), len(new))):
+                    before = old[index] if index < len(old) else None
+                    after = new[index] if index < len(new) else None
+                    if before == after:
+                        continue
+                    if after is None:
+                        lines.append(f"- {label}第{index + 1}项已删除")
+                    elif before is None:
+                        lines.append(f"- {label}新增第{index + 1}项：{_text(after)}")
+                    else:
+                        lines.append(f"- {label}第{index + 1}项改为：{_text(after)}")
+            else:
+                lines.append(f"- {label}改为：{_text(new)}")
+        return "\n".join(lines) if lines else None
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+@dataclass
+class Turn:
+    user: str
+    reply: str
+
+
+Summarizer = Callable[[str, List[Turn]], str]
+
+
+class ConversationCompactor:
+    """按 token 预算压缩较早的对话轮次。
+
+    Args:
+        summarize: ``summarize(previous_summary, turns) -> summary``，把旧摘要与
+            即将移出的轮次合并成新摘要，通常调用一次大模型；失败时退回截断。
+        budget: 链上上下文加本轮输入的 token 上限。
+        keep_turns: 压缩后保留原文的最近轮数。
+    """
+
+    def __init__(
+        self,
+        summarize: Optional[Summarizer] = None,
+        budget: int = CONTEXT_BUDGET,
+        keep_turns: int = KEEP_TURNS,
+    ) -> None:
+        self.summarize = summarize
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.summary = ""
+        self.turns: List[Turn] = []
+        self.context_tokens = 0
+        self.compactions = 0
+
+    def record(self, user: str, reply: str, context_tokens: Optional[int] = None, sent_tokens: int = 0) -> None:
+        """记录一轮对话及其结束后链上的上下文大小。
+
+        Args:
+            context_tokens: 接口返回的上下文 token 数；缺省时按本轮发送与回复估算累加。
+            sent_tokens: 本轮发送内容的估算 token 数，仅在缺少 ``context_tokens`` 时使用。
+        """
+        self.turns.append(Turn(user, reply))
+        if context_tokens is not None:
+            self.context_tokens = context_tokens
+        else:
+            self.context_tokens += sent_tokens + estimate_tokens(reply)
+
+    def over_budget(self, pending_tokens: int) -> bool:
+        """沿当前链再发送 ``pending_tokens`` 是否会超出预算。"""
+        return self.context_tokens + pending_tokens > self.budget
+
+    def compact(self, keep_turns: Optional[int] = None) -> None:
+        """把较早的轮次并入摘要，只保留最近几轮；调用方随后应新开一条链。"""
+        keep = self.keep_turns if keep_turns is None else keep_turns
+        older = self.turns[: max(len(self.turns) - keep, 0)]
+        if older:
+            self.summary = self._summarize(older)
+            self.turns = self.turns[len(older):]
+        self.context_tokens = 0
+        self.compactions += 1
+        logger.info(
+            "event=context_compacted summarized_turns=%d kept_turns=%d summary_chars=%d",
+            len(older),
+            len(self.turns),
+            len(self.summary),
+        )
+
+    def _summarize(self, turns: List[Turn]) -> str:
+        if self.summarize is not None:
+            try:
+                summary = self.summarize(self.summary, turns).strip()
+                if summary:
+                    return summary[:SUMMARY_MAX_CHARS]
+            except Exception as exc:  # 摘要失败时退回截断，不影响本轮对话
+                logger.warning("event=context_summary_failed error=%s", exc)
+        parts = [self.summary] if self.summary else []
+        parts += [f"用户：{t.user}\n助手：{t.reply}" for t in turns]
+        return "\n".join(parts)[-SUMMARY_MAX_CHARS:]
+
+    def history_messages(self) -> List[Dict[str, str]]:
+        """新链开场时重放的历史：摘要加最近几轮原文。"""
+        messages: List[Dict[str, str]] = []
+        if self.summary:
+            messages.append({"role": "system", "content": f"此前对话的摘要：\n{self.summary}"})
+        for turn in self.turns:
+            messages.append({"role": "user", "content": turn.user})
+            messages.append({"role": "assistant", "content": turn.reply})
+        return messages
@@ -0,0 +1,378 @@
+"""生成媒体的并发、可断点续传下载器。
+
+各动画师原先用 ``requests.get(..., chunk_size=8192)`` 顺序下载，断线后只能整段
+重下。这里统一提供：
+
+- 基于 httpx 的异步并发下载，全局并发数与带宽上限可配置；
+- 写入 ``.part`` 临时文件，旁边的 ``.part.json`` 记录来源 URL 与 ETag /
+  Last-Modified；重试时带 ``If-Range`` 通过 HTTP Range 续传，来源或校验值不一致
+  （例如同一路径的镜头被重新渲染）时丢弃旧的 ``.part`` 从头下载；
+- 按文件大小自适应的分块大小；
+- 下载完成后校验文件大小（Content-Length / 期望大小）与可选的 SHA-256。
+
+同步代码（动画师、渲染 worker）可直接调用 ``download_file`` / ``download_files``，
+它们都提交到进程内共享的后台事件循环，由同一个 ``DownloadManager`` 执行，并发
+与带宽上限对整个进程生效；异步代码用 ``get_manager()`` 取当前事件循环的实例。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from base import get_agent_logger
+
+# 全局下载配置，可通过环境变量调整。
+DOWNLOAD_MAX_CONCURRENCY = int(os.getenv("DOWNLOAD_MAX_CONCURRENCY", "4"))
+# 带宽上限（字节/秒），0 表示不限速。
+DOWNLOAD_MAX_BANDWIDTH = int(os.getenv("DOWNLOAD_MAX_BANDWIDTH", "0"))
+DOWNLOAD_MAX_RETRIES = int(os.getenv("DOWNLOAD_MAX_RETRIES", "5"))
+DOWNLOAD_TIMEOUT = float(os.getenv("DOWNLOAD_TIMEOUT", "30"))
+
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+PART_SUFFIX = ".part"
+# 与 ``.part`` 同目录的元数据文件，记录来源 URL 与 ETag / Last-Modified。
+PART_META_SUFFIX = ".part.json"
+
+logger = get_agent_logger("tools.downloader", "DOWNLOADER_LOG_LEVEL", "INFO")
+
+
+class DownloadError(RuntimeError):
+    """重试耗尽或校验失败时抛出。"""
+
+
+class _IncompleteDownload(Exception):
+    """连接中途断开导致文件不完整，可续传重试。"""
+
+
+@dataclass(frozen=True)
+class DownloadItem:
+    """一次下载请求。"""
+
+    url: str
+    save_path: str
+    expected_size: Optional[int] = None  # 已知文件大小时用于校验
+    sha256: Optional[str] = None  # 已知摘要时用于校验
+
+
+def _pick_chunk_size(total: Optional[int]) -> int:
+    """按文件大小选择分块：约切成 64 块，限制在 64KB~4MB 之间。"""
+    if not total:
+        return MIN_CHUNK_SIZE * 4
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, total // 64))
+
+
+class _TokenBucket:
+    """简单令牌桶，用于在多个并发下载之间共享带宽上限。"""
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self._allowance = float(rate)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def consume(self, amount: int) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            self._allowance = min(
+                float(self.rate), self._allowance + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._allowance -= amount
+            if self._allowance < 0:
+                await asyncio.sleep(-self._allowance / self.rate)
+
+
+class DownloadManager:
+    """共享连接池、并发与带宽限制的下载管理器。
+
+    一个事件循环内应复用同一个实例（见 ``get_manager``），这样并发与带宽上限才是
+    全局生效的。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = DOWNLOAD_MAX_CONCURRENCY,
+        max_bandwidth: int = DOWNLOAD_MAX_BANDWIDTH,
+        max_retries: int = DOWNLOAD_MAX_RETRIES,
+        timeout: float = DOWNLOAD_TIMEOUT,
+        retry_backoff: float = 1.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """初始化下载管理器。
+
+        Args:
+            max_concurrency: 同时进行的下载数上限。
+            max_bandwidth: 所有下载合计的带宽上限（字节/秒），0 表示不限。
+            max_retries: 单个文件的最大重试次数。
+            timeout: 单次 HTTP 请求的超时（秒）。
+            retry_backoff: 第一次重试前的等待（秒），之后每次翻倍，最多 30 秒。
+            transport: 自定义 httpx 传输层，测试时可传入 ``httpx.MockTransport``。
+        """
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.retry_backoff = retry_backoff
+        self._transport = transport
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._bucket = _TokenBucket(max_bandwidth) if max_bandwidth > 0 else None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "DownloadManager":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=self._transport,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=20),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def download(self, item: DownloadItem) -> str:
+        """下载单个文件，失败时从 ``.part`` 断点续传重试。
+
+        并发名额只在每次请求期间占用，退避等待时让给其他下载。
+
+        Returns:
+            最终保存路径。
+
+        Raises:
+            DownloadError: 重试耗尽或校验失败。
+        """
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    return await self._download_once(item)
+            except (httpx.TransportError, httpx.HTTPStatusError, _IncompleteDownload) as exc:
+                if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code < 500:
+                    _discard_part(item.save_path + PART_SUFFIX)
+                    raise DownloadError(f"下载失败 {item.url}: {exc}") from exc
+                last_error = exc
+                if attempt == self.max_retries:
+                    break
+                delay = min(30.0, self.retry_backoff * 2 ** attempt)
+                logger.warning(
+                    "event=download_retry url=%s attempt=%d delay=%.1f error=%s",
+                    item.url,
+                    attempt + 1,
+                    delay,
+                    exc,
+                )
+                await asyncio.sleep(delay)
+        # 重试耗尽后 .part 的来源已不可信，不留到下次
+        _discard_part(item.save_path + PART_SUFFIX)
+        raise DownloadError(f"下载失败 {item.url}: {last_error}") from last_error
+
+    async def download_many(
+        self, items: Sequence[DownloadItem]
+    ) -> List[Optional[str]]:
+        """并发下载多个文件，返回与输入顺序一致的路径列表，失败项为 ``None``。"""
+        results = await asyncio.gather(
+            *(self.download(item) for item in items), return_exceptions=True
+        )
+        paths: List[Optional[str]] = []
+        for item, result in zip(items, results):
+            if isinstance(result, BaseException):
+                logger.error("event=download_failed url=%s error=%s", item.url, result)
+                paths.append(None)
+            else:
+                paths.append(result)
+        return paths
+
+    async def _download_once(self, item: DownloadItem) -> str:
+        part_path = item.save_path + PART_SUFFIX
+        os.makedirs(os.path.dirname(os.path.abspath(item.save_path)), exist_ok=True)
+        meta = _resumable_meta(part_path, item.url)
+        offset = os.path.getsize(part_path) if meta is not None else 0
+        headers: Dict[str, str] = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            validator = meta.get("etag") or meta.get("last_modified")
+            if validator:
+                # 源文件已变化时服务端返回 200 与完整内容，而不是 206
+                headers["If-Range"] = validator
+
+        client = self._get_client()
+        async with client.stream("GET", item.url, headers=headers) as response:
+            if response.status_code == 416 and offset:
+                total = _range_total(response) or item.expected_size
+                if total != offset:
+                    # 大小未知或与 .part 不符，说明 .part 来自别的文件
+                    _discard_part(part_path)
+                    raise _IncompleteDownload(f"续传范围无效: .part {offset} 字节，源文件 {total}")
+            else:
+                response.raise_for_status()
+                if offset and response.status_code == 206 and not _same_source(meta, response):
+                    _discard_part(part_path)
+                    raise _IncompleteDownload("源文件已变化，丢弃旧的 .part")
+                if offset and response.status_code != 206:
+                    # 服务端不支持 Range 或源文件已变化，从头下载。
+                    offset = 0
+                if not offset:
+                    _write_meta(part_path, item.url, response)
+                length = response.headers.get("Content-Length")
+                total = offset + int(length) if length is not None else None
+                chunk_size = _pick_chunk_size(total)
+                mode = "ab" if offset else "wb"
+                with open(part_path, mode) as f:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        if self._bucket is not None:
+                            await self._bucket.consume(len(chunk))
+                        f.write(chunk)
+
+        self._verify(item, part_path, total)
+        os.replace(part_path, item.save_path)
+        _remove_quietly(_meta_path(part_path))
+        logger.info(
+            "event=download_complete url=%s path=%s resumed_from=%d",
+            item.url,
+            item.save_path,
+            offset,
+        )
+        return item.save_path
+
+    @staticmethod
+    def _verify(item: DownloadItem, part_path: str, total: Optional[int]) -> None:
+        size = os.path.getsize(part_path)
+        expected = item.expected_size or total
+        if expected is not None and size != expected:
+            if size > expected:
+                _discard_part(part_path)
+            raise _IncompleteDownload(f"文件大小不符: {size} != {expected}")
+        if item.sha256:
+            digest = hashlib.sha256()
+            with open(part_path, "rb") as f:
+                for block in iter(lambda: f.read(MAX_CHUNK_SIZE), b""):
+                    digest.update(block)
+            if digest.hexdigest() != item.sha256.lower():
+                _discard_part(part_path)
+                raise DownloadError(f"SHA-256 校验失败: {item.save_path}")
+
+
+def _meta_path(part_path: str) -> str:
+    return part_path[: -len(PART_SUFFIX)] + PART_META_SUFFIX
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _discard_part(part_path: str) -> None:
+    """删除 ``.part`` 及其元数据，下次从头下载。"""
+    _remove_quietly(part_path)
+    _remove_quietly(_meta_path(part_path))
+
+
+def _resumable_meta(part_path: str, url: str) -> Optional[Dict[str, Any]]:
+    """返回可以续传的 ``.part`` 元数据；来源不是 ``url`` 或元数据缺失时丢弃 ``.part``。"""
+    if not os.path.exists(part_path):
+        _remove_quietly(_meta_path(part_path))
+        return None
+    try:
+        with open(_meta_path(part_path), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = None
+    if not isinstance(meta, dict) or meta.get("url") != url:
+        _discard_part(part_path)
+        return None
+    return meta
+
+
+def _write_meta(part_path: str, url: str, response: httpx.Response) -> None:
+    meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    with open(_meta_path(part_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _same_source(meta: Dict[str, Any], response: httpx.Response) -> bool:
+    """206 响应的校验值是否与 ``.part`` 记录的一致（任一方缺失时视为一致）。"""
+    for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+        stored, current = meta.get(key), response.headers.get(header)
+        if stored and current and stored != current:
+            return False
+    return True
+
+
+def _range_total(response: httpx.Response) -> Optional[int]:
+    """从 416 响应的 ``Content-Range: bytes */N`` 中取源文件大小。"""
+    value = response.headers.get("Content-Range", "")
+    total = value.rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+# 每个事件循环一个管理器；同步接口共用进程内的后台事件循环，因而共用同一个管理器。
+_managers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, DownloadManager]" = (
+    weakref.WeakKeyDictionary()
+)
+_background_lock = threading.Lock()
+_background: Optional[asyncio.AbstractEventLoop] = None
+_background_pid: Optional[int] = None
+
+
+def get_manager() -> DownloadManager:
+    """返回当前事件循环共享的 ``DownloadManager``，须在事件循环中调用。"""
+    loop = asyncio.get_running_loop()
+    manager = _managers.get(loop)
+    if manager is None:
+        manager = _managers[loop] = DownloadManager()
+    return manager
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """进程内共享的后台事件循环，首次使用时在守护线程中启动（fork 后重新创建）。"""
+    global _background, _background_pid
+    with _background_lock:
+        if _background is None or _background_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="downloader", daemon=True).start()
+            _background, _background_pid = loop, os.getpid()
+        return _background
+
+
+async def _download_all(items: Sequence[DownloadItem]) -> List[Optional[str]]:
+    return await get_manager().download_many(items)
+
+
+def _run_sync(items: Sequence[DownloadItem]) -> List[Optional[str]]:
+    future = asyncio.run_coroutine_threadsafe(_download_all(items), _background_loop())
+    return future.result()
+
+
+def download_file(url: str, save_path: str, **kwargs) -> Optional[str]:
+    """同步下载单个文件，失败返回 ``None``。"""
+    return _run_sync([DownloadItem(url=url, save_path=save_path, **kwargs)])[0]
+
+
+def download_files(items: Sequence[DownloadItem]) -> List[Optional[str]]:
+    """同步并发下载多个文件，失败项为 ``None``。"""
+    return _run_sync(items)
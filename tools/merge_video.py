@@ -1,4 +1,3 @@
-from moviepy import VideoFileClip, concatenate_videoclips
 import os
 
 def merge_videos(video_paths, output_path):
@@ -15,6 +14,9 @@ def merge_videos(video_paths, output_path):
     if not video_paths:
         raise ValueError("视频路径列表不能为空")
 
+    # moviepy 连带加载 numpy / imageio，只在真正拼接时导入
+    from moviepy import VideoFileClip, concatenate_videoclips
+
     clips = []
     for path in video_paths:
         if not os.path.isfile(path):
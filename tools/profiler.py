@@ -0,0 +1,457 @@
+"""创作流水线的分阶段耗时剖析。
+
+一个项目的墙钟时间分布在 idea → outline → screen → animation → merge 五个阶段，
+以及阶段内的 LangGraph 节点、大模型调用、联网搜索和渲染（排队 / 提交 / 轮询 /
+下载）上。原先只能翻 ``logs/client_personal_assistant.log`` 估算，这里提供内置计时：
+
+- ``span`` / ``traced``：记录一段调用的起止时间，嵌套调用自动继承所属阶段并记下
+  父节点，形成一棵调用树；
+- ``instrument_client``：为方舟等 SDK 客户端的方法（``responses.create`` 等）计时，
+  大模型调用顺带记录 token 用量；
+- 记录以 JSON Lines 追加写入项目目录下的 ``profile.jsonl``（与 ``project.json``
+  同级），编排器与渲染 worker 进程写同一个文件；
+- ``write_breakdown`` 生成该项目的分阶段汇总 ``profile.json``；
+- ``python -m tools.profiler report`` 汇总所有项目，给出各阶段与各类调用的耗时
+  占比，用来决定先优化哪个阶段。
+
+未绑定项目（``bind`` 之前）或设置 ``PIPELINE_PROFILE=0`` 时所有计时都是空操作。
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from base import get_agent_logger
+
+PROFILE_ENABLED = os.getenv("PIPELINE_PROFILE", "1").lower() not in ("0", "false", "no")
+PROFILE_FILE = "profile.jsonl"
+BREAKDOWN_FILE = "profile.json"
+
+# 流水线阶段（按先后顺序）与会话 now_task 到阶段的映射。
+STAGES = ("idea", "outline", "screen", "animation", "merge")
+TASK_STAGES: Dict[str, str] = {
+    "imagination": "idea",
+    "outline": "outline",
+    "screen": "screen",
+    "animator": "animation",
+}
+OTHER_STAGE = "other"
+
+# 大模型客户端上需要计时的方法路径及其调用类型。
+LLM_METHODS: Dict[str, str] = {
+    "responses.create": "llm",
+    "chat.completions.create": "llm",
+}
+
+logger = get_agent_logger("tools.profiler", "PROFILER_LOG_LEVEL", "INFO")
+
+# 同一进程内并发运行多个项目时（如基准测试），各线程通过 ContextVar 绑定各自的
+# 项目目录；未绑定的线程回落到进程级的默认目录。
+_profile_path: Optional[str] = None
+_bound_path: ContextVar[Optional[str]] = ContextVar("pipeline_profile_path", default=None)
+_write_lock = threading.Lock()
+
+
+@dataclass
+class _Span:
+    id: str
+    stage: str
+
+
+_current: ContextVar[Optional[_Span]] = ContextVar("pipeline_span", default=None)
+
+
+def bind(project_dir: Optional[str]) -> None:
+    """把之后的计时记录写到 ``project_dir/profile.jsonl``，传 ``None`` 则停止记录。"""
+    global _profile_path
+    if not PROFILE_ENABLED or not project_dir:
+        _profile_path = None
+        _bound_path.set(None)
+        return
+    os.makedirs(project_dir, exist_ok=True)
+    _profile_path = os.path.join(project_dir, PROFILE_FILE)
+    _bound_path.set(_profile_path)
+
+
+def _current_path() -> Optional[str]:
+    return _bound_path.get() or _profile_path
+
+
+def stage_of(now_task: Optional[str]) -> str:
+    """会话当前任务对应的流水线阶段。"""
+    return TASK_STAGES.get(now_task or "", OTHER_STAGE)
+
+
+def _write(path: str, record: Dict[str, Any]) -> None:
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    try:
+        # 每条记录一次追加写，编排器与 worker 进程可以共用同一个文件。
+        with _write_lock, open(path, "a", encoding="utf-8") as file:
+            file.write(line)
+    except OSError as exc:
+        logger.warning("event=profile_write_failed path=%s error=%s", path, exc)
+
+
+def record(
+    op: str,
+    start: float,
+    duration: float,
+    *,
+    name: str = "",
+    stage: Optional[str] = None,
+    ok: bool = True,
+    **attrs: Any,
+) -> None:
+    """直接写入一条已知起止时间的记录，例如渲染任务的排队等待。"""
+    path = _current_path()
+    if path is None:
+        return
+    parent = _current.get()
+    _write(
+        path,
+        {
+            "id": uuid.uuid4().hex[:12],
+            "parent": parent.id if parent else None,
+            "stage": stage or (parent.stage if parent else OTHER_STAGE),
+            "op": op,
+            "name": name,
+            "start": round(start, 6),
+            "duration": round(max(duration, 0.0), 6),
+            "ok": ok,
+            "pid": os.getpid(),
+            **attrs,
+        }
+    )
+
+
+@contextmanager
+def span(
+    op: str, name: str = "", *, stage: Optional[str] = None, **attrs: Any
+) -> Iterator[Dict[str, Any]]:
+    """为一段代码计时。
+
+    Args:
+        op: 调用类型，如 ``node`` / ``llm`` / ``search`` / ``render.download``。
+        name: 具体名称，如节点名或方法路径。
+        stage: 所属流水线阶段，缺省时继承外层 span 的阶段。
+        **attrs: 额外写入记录的字段。
+
+    Yields:
+        可变的属性字典，调用方可在代码块内补充字段（如 token 用量）。
+    """
+    path = _current_path()
+    if path is None:
+        yield {}
+        return
+    parent = _current.get()
+    current = _Span(
+        id=uuid.uuid4().hex[:12],
+        stage=stage or (parent.stage if parent else OTHER_STAGE),
+    )
+    token = _current.set(current)
+    extra: Dict[str, Any] = dict(attrs)
+    start = time.time()
+    started = time.perf_counter()
+    ok = True
+    try:
+        yield extra
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        _current.reset(token)
+        _write(
+            path,
+            {
+                "id": current.id,
+                "parent": parent.id if parent else None,
+                "stage": current.stage,
+                "op": op,
+                "name": name,
+                "start": round(start, 6),
+                "duration": round(time.perf_counter() - started, 6),
+                "ok": ok,
+                "pid": os.getpid(),
+                **extra,
+            }
+        )
+
+
+def traced(op: str, name: Optional[str] = None, stage: Optional[str] = None) -> Callable:
+    """函数装饰器版本的 ``span``，名称默认取函数名。"""
+
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(op, label, stage=stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _usage(result: Any) -> Dict[str, Any]:
+    """提取大模型响应中的 token 用量（兼容 responses 与 chat.completions）。"""
+    usage = getattr(result, "usage", None)
+    if usage is None:
+        return {}
+    fields = {
+        "input_tokens": getattr(usage, "input_tokens", None)
+        or getattr(usage, "prompt_tokens", None),
+        "output_tokens": getattr(usage, "output_tokens", None)
+        or getattr(usage, "completion_tokens", None),
+    }
+    details = getattr(usage, "input_tokens_details", None) or getattr(
+        usage, "prompt_tokens_details", None
+    )
+    cached = getattr(details, "cached_tokens", None)
+    if cached is not None:
+        fields["cached_tokens"] = cached
+    return {k: v for k, v in fields.items() if isinstance(v, int)}
+
+
+def _timed_method(method: Callable, op: str, name: str) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with span(op, name, model=kwargs.get("model")) as extra:
+            result = method(*args, **kwargs)
+            if op == "llm":
+                extra.update(_usage(result))
+            return result
+
+    wrapper.__profiled__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def instrument_client(
+    client: Any, label: str, methods: Optional[Dict[str, str]] = None
+) -> Any:
+    """为 SDK 客户端上的方法加计时，返回原客户端。
+
+    Args:
+        client: 方舟等 SDK 客户端实例，资源对象（``client.responses`` 等）需在
+            多次访问间保持为同一个对象。
+        label: 记录名称前缀，通常是调用方 Agent 名。
+        methods: 方法路径到调用类型的映射，默认 ``LLM_METHODS``。
+    """
+    for path, op in (methods or LLM_METHODS).items():
+        *parents, attr = path.split(".")
+        owner = client
+        try:
+            for part in parents:
+                owner = getattr(owner, part)
+            method = getattr(owner, attr)
+        except AttributeError:
+            continue
+        if getattr(method, "__profiled__", False):
+            continue
+        try:
+            setattr(owner, attr, _timed_method(method, op, f"{label}.{path}"))
+        except AttributeError:
+            logger.debug("event=profile_instrument_skipped path=%s", path)
+    return client
+
+
+# ---------------------------------------------------------------------- #
+# 汇总与报告
+# ---------------------------------------------------------------------- #
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """读取一个 ``profile.jsonl``，跳过写坏的行。"""
+    records: List[Dict[str, Any]] = []
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _union(intervals: List[Tuple[float, float]]) -> float:
+    """区间并集总长：并行的渲染 worker 不会被重复计入墙钟时间。"""
+    total = 0.0
+    end = float("-inf")
+    for start, stop in sorted(intervals):
+        if stop <= end:
+            continue
+        total += stop - max(start, end)
+        end = stop
+    return total
+
+
+def breakdown(records: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """按阶段与调用类型汇总耗时。
+
+    阶段的 ``wall`` 是该阶段顶层记录的区间并集；``ops`` 下各调用类型的 ``total``
+    是耗时之和（并行调用会累加），``self`` 扣除了其直接子调用的耗时。
+    """
+    children: Dict[str, float] = {}
+    for rec in records:
+        if rec.get("parent"):
+            children[rec["parent"]] = children.get(rec["parent"], 0.0) + rec["duration"]
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    roots: Dict[str, List[Tuple[float, float]]] = {}
+    all_roots: List[Tuple[float, float]] = []
+    for rec in records:
+        stage = stages.setdefault(rec.get("stage") or OTHER_STAGE, {"wall": 0.0, "ops": {}})
+        op = stage["ops"].setdefault(
+            rec["op"], {"count": 0, "total": 0.0, "self": 0.0, "max": 0.0, "errors": 0}
+        )
+        duration = rec["duration"]
+        op["count"] += 1
+        op["total"] += duration
+        op["self"] += max(duration - children.get(rec["id"], 0.0), 0.0)
+        op["max"] = max(op["max"], duration)
+        op["errors"] += 0 if rec.get("ok", True) else 1
+        for key in ("input_tokens", "output_tokens", "cached_tokens"):
+            if key in rec:
+                op[key] = op.get(key, 0) + rec[key]
+        if not rec.get("parent"):
+            interval = (rec["start"], rec["start"] + duration)
+            roots.setdefault(rec.get("stage") or OTHER_STAGE, []).append(interval)
+            all_roots.append(interval)
+
+    for name, intervals in roots.items():
+        stages[name]["wall"] = _union(intervals)
+    for stage in stages.values():
+        stage["wall"] = round(stage["wall"], 3)
+        for op in stage["ops"].values():
+            for key in ("total", "self", "max"):
+                op[key] = round(op[key], 3)
+
+    order = {name: idx for idx, name in enumerate(STAGES)}
+    return {
+        "wall": round(_union(all_roots), 3),
+        "records": len(records),
+        "stages": dict(sorted(stages.items(), key=lambda kv: order.get(kv[0], len(order)))),
+    }
+
+
+def write_breakdown(project_dir: str) -> Optional[Dict[str, Any]]:
+    """根据 ``profile.jsonl`` 重新生成项目的 ``profile.json``。"""
+    records = load_records(os.path.join(project_dir, PROFILE_FILE))
+    if not records:
+        return None
+    summary = breakdown(records)
+    with open(os.path.join(project_dir, BREAKDOWN_FILE), "w", encoding="utf-8") as file:
+        json.dump(summary, file, ensure_ascii=False, indent=4)
+    return summary
+
+
+def _merge(summaries: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """把多个项目的汇总相加。"""
+    merged: Dict[str, Any] = {"wall": 0.0, "records": 0, "projects": len(summaries), "stages": {}}
+    for summary in summaries:
+        merged["wall"] += summary["wall"]
+        merged["records"] += summary["records"]
+        for name, stage in summary["stages"].items():
+            target = merged["stages"].setdefault(name, {"wall": 0.0, "ops": {}})
+            target["wall"] += stage["wall"]
+            for op_name, op in stage["ops"].items():
+                dest = target["ops"].setdefault(op_name, {})
+                for key, value in op.items():
+                    if key == "max":
+                        dest[key] = max(dest.get(key, 0.0), value)
+                    else:
+                        dest[key] = dest.get(key, 0) + value
+    return merged
+
+
+def report(paths: Sequence[str]) -> Dict[str, Any]:
+    """汇总若干项目目录（或 ``profile.jsonl`` 文件）。"""
+    summaries = []
+    for path in paths:
+        if os.path.isdir(path):
+            path = os.path.join(path, PROFILE_FILE)
+        records = load_records(path)
+        if records:
+            summaries.append(breakdown(records))
+    return _merge(summaries)
+
+
+def _format_report(summary: Dict[str, Any], top: int) -> str:
+    wall = summary["wall"] or 1.0
+    lines = [
+        f"项目数 {summary['projects']}，记录 {summary['records']} 条，"
+        f"墙钟合计 {summary['wall']:.1f}s（不含用户思考时间）",
+        "",
+        f"{'阶段':<12}{'墙钟(s)':>12}{'占比':>8}",
+    ]
+    for name, stage in summary["stages"].items():
+        lines.append(f"{name:<12}{stage['wall']:>12.1f}{stage['wall'] / wall:>8.0%}")
+
+    ops = [
+        (stage_name, op_name, op)
+        for stage_name, stage in summary["stages"].items()
+        for op_name, op in stage["ops"].items()
+    ]
+    ops.sort(key=lambda item: item[2]["self"], reverse=True)
+    lines += [
+        "",
+        f"{'阶段/调用':<28}{'次数':>6}{'自身(s)':>10}{'总计(s)':>10}{'平均(s)':>9}{'最长(s)':>9}{'失败':>6}",
+    ]
+    for stage_name, op_name, op in ops[:top]:
+        label = f"{stage_name}/{op_name}"
+        mean = op["total"] / op["count"] if op["count"] else 0.0
+        lines.append(
+            f"{label:<28}{op['count']:>6}{op['self']:>10.2f}{op['total']:>10.2f}"
+            f"{mean:>9.2f}{op['max']:>9.2f}{op['errors']:>6}"
+        )
+        if "input_tokens" in op:
+            lines.append(
+                f"{'':<28}tokens 输入 {op['input_tokens']} / 缓存命中 "
+                f"{op.get('cached_tokens', 0)} / 输出 {op.get('output_tokens', 0)}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="创作流水线耗时报告")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="汇总各项目的 profile.jsonl")
+    rep.add_argument(
+        "paths",
+        nargs="*",
+        help="项目目录或 profile.jsonl，默认 ./user_files/*/*",
+    )
+    rep.add_argument("--top", type=int, default=15, help="列出自身耗时最多的前 N 类调用")
+    rep.add_argument("--json", action="store_true", help="输出 JSON")
+    rep.add_argument("--write", action="store_true", help="同时刷新各项目的 profile.json")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(
+        os.path.dirname(p) for p in glob.glob(os.path.join("user_files", "*", "*", PROFILE_FILE))
+    )
+    if args.write:
+        for path in paths:
+            if os.path.isdir(path):
+                write_breakdown(path)
+    summary = report(paths)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    elif not summary["projects"]:
+        print("没有找到耗时记录")
+    else:
+        print(_format_report(summary, args.top))
+
+
+if __name__ == "__main__":
+    main()
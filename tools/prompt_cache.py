@@ -0,0 +1,357 @@
+"""方舟 Responses API 的前缀缓存管理。
+
+助手、大纲写作者与分镜写作者都用 ``caching={"type": "enabled"}`` 配合
+``previous_response_id`` 串联多轮对话，缓存在 ``expire_at`` 后失效。原先每次请求
+固定写 ``int(time.time()) + 360``：用户离开六分钟再回来，链已过期，要么报错，要么
+整段上下文按全价重新计费。本模块统一管理这些缓存句柄：
+
+- ``ResponseChain``：某个会话中某个 Agent 的一条响应链，记录当前 response id、
+  过期时间与最近使用时间，代为填写 ``previous_response_id`` / ``caching`` /
+  ``expire_at``；
+- 链已过期（或服务端找不到上一轮响应）时，用 Agent 提供的 ``rebuild`` 回调按
+  已持久化的创作材料重建开场上下文，开一条新链继续对话；重建只发生在轮次边界，
+  工具调用进行到一半时仍接在原链上，原链确实已失效才把工具结果转成普通消息重建；
+- ``PromptCacheManager`` 在后台为活跃会话（最近 ``PROMPT_CACHE_ACTIVE_WINDOW``
+  秒内有过真实请求）在过期前发一次极短的保活请求，把缓存续期。保活请求接在链上，
+  链随之推进到保活响应；重建上下文只取自持久化的材料与对话记录，不含保活轮次；
+- 按 Agent 统计命中（沿用旧链）、冷启动、过期重建、保活次数与缓存 token 数，
+  ``manager.snapshot()`` 返回汇总，保活与重建同时写入 ``tools.profiler`` 记录。
+
+``PROMPT_CACHE_REFRESH=0`` 关闭后台保活，只保留过期重建。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from base import get_agent_logger
+from tools import profiler
+
+CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "360"))
+# 距过期不足该秒数时由后台续期；请求时剩余不足 ``EXPIRY_GUARD`` 秒的链视为已过期。
+REFRESH_MARGIN = int(os.getenv("PROMPT_CACHE_REFRESH_MARGIN", "60"))
+EXPIRY_GUARD = 2
+# 最近一次真实请求距今超过该秒数的会话不再保活，缓存随之自然过期。
+ACTIVE_WINDOW = int(os.getenv("PROMPT_CACHE_ACTIVE_WINDOW", "1800"))
+REFRESH_ENABLED = os.getenv("PROMPT_CACHE_REFRESH", "1").lower() not in ("0", "false", "no")
+
+KEEPALIVE_PROMPT = "（会话保活请求，无需处理，请只回复“好”）"
+# 新开链时需要重新带上的请求参数；保活请求只带模型与思考设置，不带工具
+CHAIN_OPTIONS = ("model", "thinking", "tools")
+KEEPALIVE_OPTIONS = ("model", "thinking")
+KEEPALIVE_MAX_TOKENS = 8
+
+logger = get_agent_logger("tools.prompt_cache", "PROMPT_CACHE_LOG_LEVEL", "INFO")
+
+RebuildFn = Callable[[], List[Dict[str, Any]]]
+
+
+@dataclass
+class CacheStats:
+    """单个 Agent 的缓存统计。"""
+
+    requests: int = 0
+    hits: int = 0  # 沿用未过期的链
+    cold: int = 0  # 首次请求，新开链
+    rebuilds: int = 0  # 链过期后按材料重建
+    refreshes: int = 0
+    refresh_failures: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+
+    def add(self, other: "CacheStats") -> None:
+        for key, value in asdict(other).items():
+            setattr(self, key, getattr(self, key) + value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = round(self.hits / self.requests, 3) if self.requests else None
+        data["cached_ratio"] = (
+            round(self.cached_tokens / self.input_tokens, 3) if self.input_tokens else None
+        )
+        return data
+
+
+def _is_missing_response(exc: Exception) -> bool:
+    """服务端是否因上一轮响应不存在（已过期）而拒绝请求。"""
+    status = getattr(exc, "status_code", None)
+    text = str(exc).lower()
+    return status == 404 or (status == 400 and "previous_response" in text)
+
+
+def _has_pending_tool_call(response: Any) -> bool:
+    return any(getattr(item, "type", None) == "function_call" for item in getattr(response, "output", None) or [])
+
+
+def _close_tool_turn(input: List[Any]) -> List[Any]:
+    """把输入中的工具结果转成普通用户消息。
+
+    新链上没有对应的 ``function_call``，原样发送 ``function_call_output`` 会被服务端
+    拒绝；转成文本后模型仍能看到工具结果，重建发生在一个完整的轮次边界上。
+    """
+    outputs = [item for item in input if isinstance(item, dict) and item.get("type") == "function_call_output"]
+    if not outputs:
+        return list(input)
+    rest = [item for item in input if item not in outputs]
+    text = "\n".join(str(item.get("output", "")) for item in outputs)
+    return [{"role": "user", "content": f"（之前请求的工具调用结果如下）\n{text}"}] + rest
+
+
+class ResponseChain:
+    """一个会话中某个 Agent 的 ``previous_response_id`` 链。
+
+    Args:
+        client: 方舟客户端（可以是 ``tools.clients`` 的延迟代理）。
+        agent: Agent 名称，用于统计与日志。
+        session: 会话标识，缺省时按实例随机生成。
+        cache_manager: 所属管理器，默认模块级 ``manager``。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        agent: str,
+        session: Optional[str] = None,
+        cache_manager: Optional["PromptCacheManager"] = None,
+    ) -> None:
+        self.client = client
+        self.agent = agent
+        self.session = session or f"local-{uuid.uuid4().hex[:8]}"
+        self.response_id: Optional[str] = None
+        self.expire_at = 0.0
+        self.last_used = 0.0
+        self.stats = CacheStats()
+        self._request_options: Dict[str, Any] = {}
+        self._pending_tool_call = False
+        self._rebuild: Optional[RebuildFn] = None
+        self._lock = threading.RLock()
+        self._manager = cache_manager or manager
+        self._manager.register(self)
+
+    @property
+    def last_id(self) -> Optional[str]:
+        return self.response_id
+
+    def reset(self) -> None:
+        """丢弃当前链，下一次请求重新开始。"""
+        with self._lock:
+            self.response_id = None
+            self.expire_at = 0.0
+            self._pending_tool_call = False
+
+    def _alive(self, now: float) -> bool:
+        return self.response_id is not None and self.expire_at - now > EXPIRY_GUARD
+
+    def create(self, *, input: List[Any], rebuild: Optional[RebuildFn] = None, **kwargs: Any) -> Any:
+        """沿当前链发起一次 ``responses.create``。
+
+        Args:
+            input: 本轮输入。
+            rebuild: 链已过期时调用，返回重建开场上下文的消息列表（系统提示词与
+                已确认的材料），拼在本轮输入之前。缺省时沿用本链上一次传入的回调
+                （回传工具结果的请求通常不带）。
+            **kwargs: 其余参数原样透传（``model`` / ``tools`` / ``thinking`` 等）。
+                ``model`` / ``thinking`` / ``tools`` 会被记住：由本方法自行新开链
+                （冷启动或重建）时即使调用方没有再传，也会重新带上。
+        """
+        with self._lock:
+            if rebuild is not None:
+                self._rebuild = rebuild
+            rebuild = self._rebuild
+            self._request_options.update(
+                (key, kwargs[key]) for key in CHAIN_OPTIONS if key in kwargs
+            )
+            now = time.time()
+            # 上一轮响应在等工具结果时不能在这里重建：工具结果只能接在原链上
+            if self._alive(now) or (self._pending_tool_call and self.response_id is not None):
+                kind = "hit"
+            elif self.response_id is None:
+                kind = "cold"
+            else:
+                kind = "rebuild"
+            try:
+                response = self._send(input, kind, rebuild, kwargs)
+            except Exception as exc:
+                if kind != "hit" or not _is_missing_response(exc):
+                    raise
+                # 服务端比本地记录更早淘汰了缓存
+                logger.info(
+                    "event=prompt_cache_lapsed agent=%s session=%s error=%s", self.agent, self.session, exc
+                )
+                kind = "rebuild"
+                response = self._send(input, kind, rebuild, kwargs)
+            self._record(kind, response)
+            return response
+
+    def _send(self, input: List[Any], kind: str, rebuild: Optional[RebuildFn], kwargs: Dict[str, Any]) -> Any:
+        if kind == "rebuild":
+            started = time.time()
+            seed = rebuild() if rebuild else []
+            logger.info(
+                "event=prompt_cache_rebuild agent=%s session=%s idle=%.0fs seed_messages=%d",
+                self.agent,
+                self.session,
+                started - self.last_used,
+                len(seed),
+            )
+            profiler.record("cache.rebuild", started, 0.0, name=self.agent, idle=round(started - self.last_used, 1))
+            input = list(seed) + _close_tool_turn(input)
+        if kind != "hit":
+            # 新链上没有之前声明过的工具等选项，按记住的选项补齐
+            kwargs = {**self._request_options, **kwargs}
+        expire_at = int(time.time()) + CACHE_TTL
+        response = self.client.responses.create(
+            input=input,
+            previous_response_id=self.response_id if kind == "hit" else None,
+            caching={"type": "enabled"},
+            expire_at=expire_at,
+            **kwargs,
+        )
+        self.response_id = response.id
+        self.expire_at = expire_at
+        self.last_used = time.time()
+        self._pending_tool_call = _has_pending_tool_call(response)
+        return response
+
+    def _record(self, kind: str, response: Any) -> None:
+        delta = CacheStats(requests=1)
+        if kind == "hit":
+            delta.hits = 1
+        elif kind == "cold":
+            delta.cold = 1
+        else:
+            delta.rebuilds = 1
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            delta.input_tokens = getattr(usage, "input_tokens", 0) or 0
+            details = getattr(usage, "input_tokens_details", None)
+            delta.cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        self.stats.add(delta)
+        logger.debug(
+            "event=prompt_cache_request agent=%s session=%s kind=%s input_tokens=%s cached_tokens=%s",
+            self.agent,
+            self.session,
+            kind,
+            delta.input_tokens,
+            delta.cached_tokens,
+        )
+
+    def needs_refresh(self, now: float) -> bool:
+        """会话仍活跃、缓存即将过期且没有未完成的工具调用时需要续期。"""
+        return (
+            self.response_id is not None
+            and not self._pending_tool_call
+            and now - self.last_used < ACTIVE_WINDOW
+            and self.expire_at - now < REFRESH_MARGIN
+        )
+
+    def refresh(self) -> bool:
+        """发一次极短的保活请求把缓存续期，返回是否成功。
+
+        只有新建的响应会按新的 ``expire_at`` 缓存，所以链推进到保活响应上：
+        之后的真实请求接在保活响应之后，保活的一问一答（内容固定且很短）留在
+        上下文中。重建时的开场上下文来自 ``rebuild`` 回调，不包含保活轮次。
+        """
+        if not self._lock.acquire(blocking=False):
+            return False  # 正在进行真实请求，本身就会续期
+        try:
+            now = time.time()
+            if not self.needs_refresh(now) or self.expire_at <= now:
+                return False  # 已经过期的链只能在下次请求时重建
+            started = time.time()
+            expire_at = int(started) + CACHE_TTL
+            try:
+                response = self.client.responses.create(
+                    input=[{"role": "user", "content": KEEPALIVE_PROMPT}],
+                    previous_response_id=self.response_id,
+                    caching={"type": "enabled"},
+                    expire_at=expire_at,
+                    max_output_tokens=KEEPALIVE_MAX_TOKENS,
+                    **{key: value for key, value in self._request_options.items() if key in KEEPALIVE_OPTIONS},
+                )
+            except Exception as exc:  # 保活失败不影响会话，过期后会按材料重建
+                self.stats.refresh_failures += 1
+                logger.warning(
+                    "event=prompt_cache_refresh_failed agent=%s session=%s error=%s", self.agent, self.session, exc
+                )
+                profiler.record("cache.refresh", started, time.time() - started, name=self.agent, ok=False)
+                return False
+            # 只有保活响应获得了新的过期时间，链随之推进
+            self.response_id = response.id
+            self.expire_at = expire_at
+            self.stats.refreshes += 1
+            profiler.record("cache.refresh", started, time.time() - started, name=self.agent)
+            logger.info("event=prompt_cache_refreshed agent=%s session=%s", self.agent, self.session)
+            return True
+        finally:
+            self._lock.release()
+
+
+class PromptCacheManager:
+    """登记所有响应链，后台为活跃会话续期并汇总统计。"""
+
+    def __init__(self, refresh: bool = REFRESH_ENABLED) -> None:
+        self.refresh_enabled = refresh
+        self._chains: "weakref.WeakSet[ResponseChain]" = weakref.WeakSet()
+        self._retired_by_agent: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, chain: ResponseChain) -> None:
+        with self._lock:
+            self._chains.add(chain)
+            weakref.finalize(chain, self._retire, chain.agent, chain.stats)
+            if self.refresh_enabled and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prompt-cache-refresh", daemon=True)
+                self._thread.start()
+
+    def _retire(self, agent: str, stats: CacheStats) -> None:
+        # 链被回收后保留它的统计
+        with self._lock:
+            self._retired_by_agent.setdefault(agent, CacheStats()).add(stats)
+
+    def chains(self) -> List[ResponseChain]:
+        with self._lock:
+            return list(self._chains)
+
+    def refresh_due(self, now: Optional[float] = None) -> int:
+        """为所有需要续期的链发保活请求，返回成功续期的条数。"""
+        now = time.time() if now is None else now
+        return sum(1 for chain in self.chains() if chain.needs_refresh(now) and chain.refresh())
+
+    def _run(self) -> None:
+        interval = max(1.0, min(REFRESH_MARGIN / 3, 30.0))
+        while not self._stop.wait(interval):
+            try:
+                self.refresh_due()
+            except Exception:  # 后台线程不能退出
+                logger.exception("event=prompt_cache_refresh_loop_error")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """按 Agent 汇总的命中统计，另附总计。"""
+        with self._lock:
+            by_agent = {agent: CacheStats(**asdict(stats)) for agent, stats in self._retired_by_agent.items()}
+            chains = list(self._chains)
+        for chain in chains:
+            by_agent.setdefault(chain.agent, CacheStats()).add(chain.stats)
+        total = CacheStats()
+        for stats in by_agent.values():
+            total.add(stats)
+        return {
+            "agents": {agent: stats.to_dict() for agent, stats in sorted(by_agent.items())},
+            "total": total.to_dict(),
+            "active_chains": sum(1 for chain in chains if chain.response_id is not None),
+        }
+
+
+manager = PromptCacheManager()
@@ -0,0 +1,564 @@
+"""基于 SQLite 的本地渲染任务队列。
+
+动画渲染动辄数分钟，若在对话轮次内同步执行，用户在渲染期间无法继续聊天或
+修改其他分镜。本模块把渲染任务持久化到 SQLite，由独立的 worker 进程领取执行，
+编排器只需入队并订阅完成事件即可。
+
+任务状态流转：``queued -> running -> succeeded / failed / canceled``。
+"""
+
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agents.animators.render_tier import TIER_DRAFT, TIER_FINAL
+from base import get_agent_logger
+from tools import profiler
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELED = "canceled"
+TERMINAL_STATES = {JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELED}
+
+# provider 名称到动画师实现的映射，格式为 "模块路径:类名"。
+# worker 进程按需导入，避免编排器进程加载各家 SDK。
+# ``auto`` 由路由按实时耗时、失败率与排队情况在多家后端之间调度并自动切换，
+# 会改变出片的厂商、模型与费用，需设置 ``ANIMATOR_PROVIDER=auto`` 显式开启；
+# 默认仍只用通义万相。
+ANIMATOR_BACKENDS: Dict[str, str] = {
+    "auto": "agents.animators.router:AnimatorRouter",
+    "qwen": "agents.animators.animator_qwen:Animator",
+}
+DEFAULT_PROVIDER = os.getenv("ANIMATOR_PROVIDER", "qwen")
+
+logger = get_agent_logger("tools.render_queue", "RENDER_QUEUE_LOG_LEVEL", "INFO")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    shot_index INTEGER NOT NULL,
+    shot_id TEXT,
+    prompt TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    tier TEXT NOT NULL DEFAULT 'final',
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    result_path TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class JobCanceled(Exception):
+    """worker 在执行过程中发现任务已被取消时抛出。"""
+
+
+@dataclass
+class RenderJob:
+    """渲染任务的只读快照。"""
+
+    id: str
+    project: str
+    shot_index: int
+    shot_id: Optional[str]
+    prompt: str
+    provider: str
+    output_dir: str
+    tier: str
+    status: str
+    progress: float
+    result_path: Optional[str]
+    error: Optional[str]
+    cancel_requested: bool
+    created_at: float
+    updated_at: float
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "RenderJob":
+        return cls(
+            id=row["id"],
+            project=row["project"],
+            shot_index=row["shot_index"],
+            shot_id=row["shot_id"],
+            prompt=row["prompt"],
+            provider=row["provider"],
+            output_dir=row["output_dir"],
+            tier=row["tier"],
+            status=row["status"],
+            progress=row["progress"],
+            result_path=row["result_path"],
+            error=row["error"],
+            cancel_requested=bool(row["cancel_requested"]),
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+
+@dataclass
+class RenderEvent:
+    """任务进度事件，``kind`` 取值为任务状态或 ``progress``。"""
+
+    id: int
+    job_id: str
+    kind: str
+    progress: float
+    message: Optional[str]
+    created_at: float
+
+
+class RenderQueue:
+    """SQLite 持久化的渲染任务队列，可被多个进程同时访问。"""
+
+    def __init__(self, db_path: str, poll_interval: float = 1.0):
+        """初始化队列并建表。
+
+        Args:
+            db_path: SQLite 数据库文件路径，不存在时自动创建。
+            poll_interval: worker 空闲轮询与事件订阅的间隔（秒）。
+        """
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self._workers: List[multiprocessing.Process] = []
+        self._stop_event: Optional[Any] = None
+        self._subscribers: List[threading.Thread] = []
+        self._subscriber_stop = threading.Event()
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "tier" not in columns:
+                # 兼容早期没有渲染档位的队列数据库。
+                conn.execute("ALTER TABLE jobs ADD COLUMN tier TEXT NOT NULL DEFAULT 'final'")
+            if "shot_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN shot_id TEXT")
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ #
+    # 连接与事务
+    # ------------------------------------------------------------------ #
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """以 ``BEGIN IMMEDIATE`` 开启写事务，保证多进程领取任务互斥。"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _add_event(
+        conn: sqlite3.Connection,
+        job_id: str,
+        kind: str,
+        progress: float = 0.0,
+        message: Optional[str] = None,
+    ) -> None:
+        conn.execute(
+            "INSERT INTO events (job_id, kind, progress, message, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, progress, message, time.time()),
+        )
+
+    # ------------------------------------------------------------------ #
+    # 编排器侧接口
+    # ------------------------------------------------------------------ #
+    def enqueue(
+        self,
+        project: str,
+        shot_index: int,
+        prompt: str,
+        output_dir: str,
+        provider: str = DEFAULT_PROVIDER,
+        tier: str = TIER_FINAL,
+        shot_id: Optional[str] = None,
+    ) -> str:
+        """提交一个渲染任务。
+
+        Args:
+            project: 项目名称，同时作为视频文件名前缀。
+            shot_index: 分镜序号（从 0 开始）。
+            prompt: 分镜提示词。
+            output_dir: 用户目录，视频保存在 ``output_dir/project`` 下。
+            provider: 动画师实现名称，对应 ``ANIMATOR_BACKENDS`` 的键。
+            tier: 渲染档位，``draft`` 或 ``final``。
+            shot_id: 分镜的稳定 id（见 ``agents/writers/shots.py``），会写进视频
+                文件名；插入或删除镜头后序号会变化，id 保证文件不会互相覆盖。
+
+        Returns:
+            新任务的 ID。
+        """
+        if provider not in ANIMATOR_BACKENDS:
+            raise ValueError(f"未知的动画师实现: {provider}")
+        job_id = f"render-{uuid.uuid4()}"
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, project, shot_index, shot_id, prompt, provider, output_dir, tier, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, project, shot_index, shot_id, prompt, provider, output_dir, tier, JOB_QUEUED, now, now),
+            )
+            self._add_event(conn, job_id, JOB_QUEUED)
+        logger.info(
+            "event=render_enqueued job_id=%s project=%s shot=%d provider=%s tier=%s",
+            job_id,
+            project,
+            shot_index,
+            provider,
+            tier,
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        """按 ID 查询任务快照，不存在时返回 ``None``。"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return RenderJob.from_row(row) if row else None
+
+    def list_jobs(
+        self, project: Optional[str] = None, status: Optional[str] = None
+    ) -> List[RenderJob]:
+        """按项目/状态过滤任务列表，按提交时间排序。"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if project is not None:
+            clauses.append("project = ?")
+            params.append(project)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT * FROM jobs{where} ORDER BY created_at", params
+            ).fetchall()
+        finally:
+            conn.close()
+        return [RenderJob.from_row(row) for row in rows]
+
+    def cancel(self, job_id: str) -> bool:
+        """取消任务。
+
+        排队中的任务立即置为 ``canceled``；运行中的任务打上取消标记，
+        由 worker 在下一个检查点放弃结果。
+
+        Returns:
+            任务仍处于可取消状态时返回 ``True``。
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row["status"] in TERMINAL_STATES:
+                return False
+            if row["status"] == JOB_QUEUED:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, cancel_requested = 1, updated_at = ? WHERE id = ?",
+                    (JOB_CANCELED, time.time(), job_id),
+                )
+                self._add_event(conn, job_id, JOB_CANCELED)
+            else:
+                conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ?",
+                    (time.time(), job_id),
+                )
+        logger.info("event=render_cancel job_id=%s status=%s", job_id, row["status"])
+        return True
+
+    def promote(self, job_id: str) -> bool:
+        """把尚未开始的草稿任务直接升级为最终档位。
+
+        Returns:
+            升级成功返回 ``True``；任务已开始或已结束时返回 ``False``，
+            调用方需另行提交最终档位任务。
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET tier = ?, updated_at = ? WHERE id = ? AND status = ? AND tier = ?",
+                (TIER_FINAL, time.time(), job_id, JOB_QUEUED, TIER_DRAFT),
+            )
+            promoted = cursor.rowcount > 0
+            if promoted:
+                self._add_event(conn, job_id, "promoted")
+        return promoted
+
+    def events_since(self, last_event_id: int = 0, limit: int = 500) -> List[RenderEvent]:
+        """读取 ``last_event_id`` 之后的进度事件。"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                (last_event_id, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            RenderEvent(
+                id=row["id"],
+                job_id=row["job_id"],
+                kind=row["kind"],
+                progress=row["progress"],
+                message=row["message"],
+                created_at=row["created_at"],
+            )
+            for row in rows
+        ]
+
+    def subscribe(
+        self,
+        callback: Callable[[RenderEvent], None],
+        from_event_id: Optional[int] = None,
+    ) -> threading.Thread:
+        """在后台线程中轮询事件表，逐条回调新事件。
+
+        Args:
+            callback: 事件回调，运行在订阅线程中，应尽量轻量。
+            from_event_id: 起始事件 ID，默认从当前最新事件之后开始。
+
+        Returns:
+            订阅线程对象（守护线程）。
+        """
+        if from_event_id is None:
+            conn = self._connect()
+            try:
+                from_event_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+            finally:
+                conn.close()
+
+        def _loop(last_id: int) -> None:
+            while not self._subscriber_stop.is_set():
+                try:
+                    events = self.events_since(last_id)
+                except sqlite3.Error as exc:
+                    logger.warning("event=render_subscribe_error error=%s", exc)
+                    events = []
+                for event in events:
+                    last_id = event.id
+                    try:
+                        callback(event)
+                    except Exception:  # pragma: no cover - defensive
+                        logger.exception("event=render_callback_failed job_id=%s", event.job_id)
+                if not events:
+                    self._subscriber_stop.wait(self.poll_interval)
+
+        thread = threading.Thread(
+            target=_loop, args=(from_event_id,), name="render-queue-subscriber", daemon=True
+        )
+        thread.start()
+        self._subscribers.append(thread)
+        return thread
+
+    # ------------------------------------------------------------------ #
+    # worker 侧接口
+    # ------------------------------------------------------------------ #
+    def claim(self, worker_id: str) -> Optional[RenderJob]:
+        """原子地领取最早提交的排队任务。"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (JOB_QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, updated_at = ? WHERE id = ?",
+                (JOB_RUNNING, worker_id, time.time(), row["id"]),
+            )
+            self._add_event(conn, row["id"], JOB_RUNNING)
+        job = RenderJob.from_row(row)
+        job.status = JOB_RUNNING
+        return job
+
+    def report_progress(self, job_id: str, progress: float, message: Optional[str] = None) -> None:
+        """更新任务进度，若任务已被取消则抛出 ``JobCanceled``。"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None or row["cancel_requested"]:
+                raise JobCanceled(job_id)
+            conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?",
+                (progress, time.time(), job_id),
+            )
+            self._add_event(conn, job_id, "progress", progress, message)
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result_path: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """写入终态。运行期间被取消的任务一律记为 ``canceled``。"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is not None and row["cancel_requested"]:
+                status = JOB_CANCELED
+            progress = 1.0 if status == JOB_SUCCEEDED else 0.0
+            conn.execute(
+                "UPDATE jobs SET status = ?, progress = ?, result_path = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, progress, result_path, error, time.time(), job_id),
+            )
+            self._add_event(conn, job_id, status, progress, error or result_path)
+        logger.info("event=render_finished job_id=%s status=%s path=%s", job_id, status, result_path)
+
+    def requeue_stale(self) -> int:
+        """将上次进程退出时遗留的 ``running`` 任务重新排队。"""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status = ?", (JOB_RUNNING,)
+            ).fetchall()
+            for row in rows:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = NULL, progress = 0, updated_at = ? WHERE id = ?",
+                    (JOB_QUEUED, time.time(), row["id"]),
+                )
+                self._add_event(conn, row["id"], JOB_QUEUED, message="requeued")
+        return len(rows)
+
+    # ------------------------------------------------------------------ #
+    # worker 进程管理
+    # ------------------------------------------------------------------ #
+    def start_workers(self, num_workers: int = 2) -> None:
+        """启动渲染 worker 进程，重复调用时不会重复启动。"""
+        if any(proc.is_alive() for proc in self._workers):
+            return
+        recovered = self.requeue_stale()
+        if recovered:
+            logger.info("event=render_requeue_stale count=%d", recovered)
+        ctx = multiprocessing.get_context("spawn")
+        self._stop_event = ctx.Event()
+        self._workers = []
+        for idx in range(num_workers):
+            proc = ctx.Process(
+                target=_worker_main,
+                args=(self.db_path, self.poll_interval, self._stop_event, f"worker-{idx}"),
+                name=f"render-worker-{idx}",
+                daemon=True,
+            )
+            proc.start()
+            self._workers.append(proc)
+        logger.info("event=render_workers_started count=%d", num_workers)
+
+    def stop_workers(self, timeout: float = 5.0) -> None:
+        """通知 worker 退出并停止事件订阅线程。"""
+        self._subscriber_stop.set()
+        if self._stop_event is not None:
+            self._stop_event.set()
+        for proc in self._workers:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+        self._workers = []
+
+
+def _load_backend(provider: str):
+    """按 ``ANIMATOR_BACKENDS`` 配置导入动画师类。"""
+    target = ANIMATOR_BACKENDS[provider]
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def run_job(queue: RenderQueue, job: RenderJob) -> None:
+    """执行单个渲染任务：生成视频、下载到本地并写回终态。"""
+    # worker 进程把计时记录写进任务所属项目的目录，与编排器的记录合并统计
+    profiler.bind(os.path.join(job.output_dir, job.project))
+    started = time.time()
+    profiler.record(
+        "render.queue_wait",
+        job.created_at,
+        started - job.created_at,
+        name=job.provider,
+        stage="animation",
+        shot=job.shot_index,
+        tier=job.tier,
+    )
+    try:
+        with profiler.span(
+            "render.job", job.provider, stage="animation", shot=job.shot_index, tier=job.tier
+        ):
+            animator_cls = _load_backend(job.provider)
+            animator = animator_cls(name=job.project, download_link=job.output_dir)
+            queue.report_progress(job.id, 0.05, "submitted")
+            with profiler.span("render.generate", job.provider) as attrs:
+                url = animator.get_video_url(job.prompt, tier=job.tier)
+                # 路由模式下记录实际出片的后端，便于排查
+                served_by = getattr(animator, "last_provider", None) or job.provider
+                attrs["provider"] = served_by
+            if not url:
+                raise RuntimeError("视频生成失败，未返回视频地址")
+            queue.report_progress(job.id, 0.8, f"downloading provider={served_by}")
+            # 文件名带上分镜 id，草稿单独命名，避免覆盖其他镜头或最终成片
+            idx = job.shot_index + 1 if not job.shot_id else f"{job.shot_index + 1}_{job.shot_id}"
+            if job.tier != TIER_FINAL:
+                idx = f"{idx}_{job.tier}"
+            with profiler.span("render.download", served_by):
+                path = animator.download(url, idx=idx)
+            if not path:
+                raise RuntimeError(f"视频下载失败: {url}")
+        queue.finish(job.id, JOB_SUCCEEDED, result_path=path)
+    except JobCanceled:
+        queue.finish(job.id, JOB_CANCELED)
+    except Exception as exc:
+        logger.exception("event=render_failed job_id=%s", job.id)
+        queue.finish(job.id, JOB_FAILED, error=str(exc))
+
+
+def _worker_main(db_path: str, poll_interval: float, stop_event: Any, worker_name: str) -> None:
+    """worker 进程入口：循环领取并执行任务，直到收到停止信号。"""
+    queue = RenderQueue(db_path, poll_interval=poll_interval)
+    worker_id = f"{worker_name}-{os.getpid()}"
+    while not stop_event.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+        logger.info("event=render_start job_id=%s worker=%s", job.id, worker_id)
+        run_job(queue, job)
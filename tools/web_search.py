@@ -1,10 +1,13 @@
-from tavily import TavilyClient
-api = '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'
-client = TavilyClient(api)
+from tools import profiler
+from tools.clients import tavily_client
 
+# Tavily SDK 在第一次搜索时才导入，密钥见 tools.clients
+client = tavily_client()
+
+@profiler.traced("search", "tavily.search")
 def web_search(query):
     response = client.search(
         query=query,
         search_depth="basic"
     )
-    return response
\ No newline at end of file
+    return response